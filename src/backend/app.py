@@ -1,6 +1,7 @@
 import sys
 import os
-from flask import Flask
+import hmac
+from flask import Flask, Response, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 
@@ -8,8 +9,21 @@ from flask_jwt_extended import JWTManager
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from config import Config
-from utils.logger import setup_logging, get_logger
+from utils.logger import setup_logging, get_logger, get_logging_stats
 from database import init_database, close_database, get_database_status
+from services.scheduler_service import init_scheduler
+from services.report_service import init_report_service
+from services.file_storage import init_file_storage
+from services.progress_stream import init_progress_stream
+from services.billing_service import init_billing_service
+from services.settings_store import init_settings_store
+from services.password_hasher import init_password_hasher, password_hasher
+from services.token_revocation import init_token_revocation
+from services.rate_limiter import init_rate_limiter
+from services.metrics import init_metrics, metrics
+from services.profiling import init_request_profiler, init_continuous_profiler, continuous_profiler
+from services.tracing import init_tracing, tracer
+from commands import register_commands
 
 # Import route blueprints
 from routes.auth_routes import auth_bp
@@ -27,6 +41,7 @@ from routes.analytics_routes import analytics_bp
 from routes.billing_routes import billing_bp
 from routes.files_routes import files_bp
 from routes.notifications_routes import notifications_bp
+from routes.profiling_routes import profiling_bp
 
 def create_app():
     app = Flask(__name__)
@@ -37,12 +52,25 @@ def create_app():
     logger = get_logger(__name__)
     logger.info("Starting IkeNei Backend API application")
     
+    # Trace sampled requests through controllers, repositories and MongoDB
+    init_tracing(app)
+    
+    # Time every request from here on (and expose the numbers at /metrics)
+    init_metrics(app)
+    
+    # Profile single requests on demand (X-Profile header) or by sampling
+    init_request_profiler(app)
+    
+    # Always-on stack sampling across all threads (when enabled)
+    init_continuous_profiler(app)
+    
     # Initialize extensions with explicit CORS configuration
     CORS(app, 
          origins=['http://localhost:5173', 'http://localhost:5174', 'http://localhost:3000'],
          allow_headers=['Content-Type', 'Authorization'],
          methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'OPTIONS'])
     jwt = JWTManager(app)
+    init_token_revocation(app, jwt)
     logger.info("Flask extensions initialized")
     
     # Register blueprints
@@ -61,7 +89,8 @@ def create_app():
         (analytics_bp, 'Analytics'),
         (billing_bp, 'Billing'),
         (files_bp, 'Files'),
-        (notifications_bp, 'Notifications')
+        (notifications_bp, 'Notifications'),
+        (profiling_bp, 'Profiling')
     ]
     
     for blueprint, name in blueprints:
@@ -76,6 +105,36 @@ def create_app():
         logger.error(f"Database initialization failed: {str(e)}")
         # Continue without database for now, but log the error
     
+    # Configure rate limiting for public and auth endpoints
+    init_rate_limiter(app)
+    
+    # Configure the bounded bcrypt pool (starts on first login or registration)
+    init_password_hasher(app)
+    
+    # Configure the in-memory settings cache (scopes load on first read)
+    init_settings_store(app)
+    
+    # Configure the report generation pool (worker processes start on first use)
+    init_report_service(app)
+    
+    # Configure file storage (local disk or GridFS)
+    init_file_storage(app)
+    
+    # Configure live survey run progress (change streams when on a replica set)
+    init_progress_stream(app)
+    
+    # Configure usage pricing for invoice runs
+    init_billing_service(app)
+    
+    # CLI commands (bulk import)
+    register_commands(app)
+    
+    # Start background jobs (overdue run expiry)
+    try:
+        init_scheduler(app)
+    except Exception as e:
+        logger.error(f"Scheduler initialization failed: {str(e)}")
+    
     # Health check endpoint
     @app.route('/health')
     def health_check():
@@ -85,7 +144,11 @@ def create_app():
             return {
                 "status": "healthy", 
                 "message": "IkeNei Backend API is running",
-                "database": db_status
+                "database": db_status,
+                "password_hashing": password_hasher.get_metrics(),
+                "logging": get_logging_stats(),
+                "continuous_profiler": continuous_profiler.get_metrics(),
+                "tracing": tracer.get_metrics()
             }
         except Exception as e:
             logger.error(f"Health check failed: {str(e)}")
@@ -98,6 +161,16 @@ def create_app():
                 }
             }
     
+    # Prometheus metrics endpoint (all workers, when METRICS_DIR is shared)
+    @app.route('/metrics')
+    def metrics_endpoint():
+        token = app.config.get('METRICS_TOKEN')
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+            return {"error": "Unauthorized"}, 401
+        if not metrics.enabled:
+            return {"error": "Metrics are disabled"}, 404
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+    
     # Database health check endpoint
     @app.route('/health/database')
     def database_health_check():
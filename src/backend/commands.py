@@ -0,0 +1,118 @@
+"""
+Flask CLI commands
+Run with: flask --app app <command> (from the backend directory)
+"""
+
+import json
+import time
+import click
+from bson import ObjectId
+from flask import current_app
+from flask.cli import with_appcontext
+from services.bulk_import import import_file, IMPORTERS
+from services.password_hasher import password_hasher
+from database.seeds.synthetic_data import DEFAULT_SCALE, make_scale, expected_counts, generate_synthetic_data
+
+@click.command('import-data')
+@click.argument('entity', type=click.Choice(sorted(IMPORTERS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--account-id', required=True, help='Account that owns the imported records')
+@click.option('--on-duplicate', type=click.Choice(['skip', 'update']), default='skip', show_default=True)
+@click.option('--batch-size', type=int, default=None, help='Rows per batch (default: IMPORT_BATCH_SIZE)')
+@click.option('--dry-run', is_flag=True, help='Validate and resolve duplicates without writing')
+@click.option('--errors-out', type=click.Path(dir_okay=False), default=None, help='Write the per-row errors to a JSON file')
+@with_appcontext
+def import_data(entity, path, account_id, on_duplicate, batch_size, dry_run, errors_out):
+    """Bulk import subjects or respondents from a CSV/XLSX file"""
+    if not ObjectId.is_valid(account_id):
+        raise click.BadParameter(f"{account_id!r} is not a valid account ID", param_hint="'--account-id'")
+
+    with open(path, 'rb') as stream:
+        try:
+            result = import_file(
+                entity,
+                stream,
+                path,
+                account_id,
+                batch_size=batch_size or current_app.config.get('IMPORT_BATCH_SIZE'),
+                on_duplicate=on_duplicate,
+                dry_run=dry_run
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+    if errors_out:
+        with open(errors_out, 'w') as output:
+            json.dump(result['errors'], output, indent=2, default=str)
+
+    click.echo(
+        f"{'[dry run] ' if dry_run else ''}{result['total_rows']} rows: {result['inserted']} inserted, "
+        f"{result['updated']} updated, {result['skipped']} skipped, {result['error_count']} errors "
+        f"in {result['duration_ms'] / 1000:.1f}s"
+    )
+    if result['errors'] and not errors_out:
+        for error in result['errors'][:20]:
+            click.echo(f"  row {error['row']}: {'; '.join(error['errors'])}", err=True)
+
+@click.command('seed-synthetic')
+@click.option('--accounts', type=int, default=DEFAULT_SCALE['accounts'], show_default=True)
+@click.option('--subjects', type=int, default=DEFAULT_SCALE['subjects_per_account'], show_default=True, help='Subjects per account')
+@click.option('--respondents', type=click.IntRange(1, 99), default=DEFAULT_SCALE['respondents_per_subject'], show_default=True, help='Respondents per subject')
+@click.option('--surveys', type=int, default=DEFAULT_SCALE['surveys_per_account'], show_default=True, help='Approved surveys per account')
+@click.option('--runs', type=int, default=DEFAULT_SCALE['runs_per_subject'], show_default=True, help='Survey runs per subject')
+@click.option('--questions', type=int, default=DEFAULT_SCALE['questions_per_survey'], show_default=True, help='Questions per survey')
+@click.option('--traits', type=int, default=DEFAULT_SCALE['traits'], show_default=True, help='Shared trait library size')
+@click.option('--response-rate', type=float, default=DEFAULT_SCALE['response_rate'], show_default=True, help='Share of run respondents who responded')
+@click.option('--seed', type=int, default=0, show_default=True, help='Same seed and scale = same data')
+@click.option('--workers', type=int, default=None, help='Generator processes (default: one per CPU core)')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='Documents per insert_many')
+@click.option('--password', default='password123', show_default=True, help='Password shared by the generated accounts')
+@click.option('--drop', is_flag=True, help='Delete existing documents in the seeded collections first')
+@click.option('--yes', is_flag=True, help='Do not ask before --drop')
+@with_appcontext
+def seed_synthetic(accounts, subjects, respondents, surveys, runs, questions, traits, response_rate, seed, workers,
+                   batch_size, password, drop, yes):
+    """Generate a large synthetic dataset for performance environments"""
+    scale = make_scale(
+        accounts=accounts,
+        subjects_per_account=subjects,
+        respondents_per_subject=respondents,
+        surveys_per_account=surveys,
+        runs_per_subject=runs,
+        questions_per_survey=questions,
+        traits=traits,
+        response_rate=response_rate
+    )
+    db_name = current_app.config.get('MONGODB_DB_NAME')
+    expected = expected_counts(scale)
+    click.echo(f"Generating ~{sum(expected.values()):,} documents into {db_name}: "
+               + ', '.join(f"{count:,} {name}" for name, count in expected.items()))
+    if drop and not yes:
+        click.confirm(f"Delete all accounts, subjects, surveys, runs and responses in {db_name} first?", abort=True)
+
+    def progress(done, counts):
+        click.echo(f"  {done:,}/{accounts:,} accounts, {sum(counts.values()):,} documents")
+
+    # One bcrypt hash for every generated account (hashing each would take hours)
+    password_hash = password_hasher.hash(password)
+    started = time.perf_counter()
+    counts = generate_synthetic_data(
+        current_app.config.get('MONGO_URI'),
+        db_name,
+        scale,
+        password_hash,
+        seed=seed,
+        workers=workers,
+        batch_size=batch_size,
+        drop=drop,
+        progress=progress
+    )
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    click.echo(f"Inserted {total:,} documents in {elapsed:.1f}s ({total / elapsed:,.0f}/s)"
+               + ('' if total else ' - everything for this seed and scale already exists'))
+
+def register_commands(app):
+    """Register the CLI commands on the app"""
+    app.cli.add_command(import_data)
+    app.cli.add_command(seed_synthetic)
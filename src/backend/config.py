@@ -13,6 +13,8 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-string'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    TOKEN_REVOCATION_SYNC_SECONDS = int(os.environ.get('TOKEN_REVOCATION_SYNC_SECONDS') or 5)  # revocations reach other workers within this
+    TOKEN_REVOCATION_OVERLAP_SECONDS = int(os.environ.get('TOKEN_REVOCATION_OVERLAP_SECONDS') or 60)  # re-read window per sync
     
     # Email configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER')
@@ -20,10 +22,128 @@ class Config:
     MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'true').lower() in ['true', 'on', '1']
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+    MAIL_USE_SSL = os.environ.get('MAIL_USE_SSL', 'false').lower() in ['true', 'on', '1']
+    MAIL_TIMEOUT = int(os.environ.get('MAIL_TIMEOUT') or 30)
+    MAIL_POOL_SIZE = int(os.environ.get('MAIL_POOL_SIZE') or 4)
+    MAIL_MAX_MESSAGES_PER_CONNECTION = int(os.environ.get('MAIL_MAX_MESSAGES_PER_CONNECTION') or 100)
+    MAIL_MAX_IDLE_SECONDS = int(os.environ.get('MAIL_MAX_IDLE_SECONDS') or 60)
+    MAIL_DOMAIN_LIMITS = os.environ.get('MAIL_DOMAIN_LIMITS', '')  # e.g. "gmail.com:2,outlook.com:4"
+    MAIL_DEFAULT_DOMAIN_LIMIT = int(os.environ.get('MAIL_DEFAULT_DOMAIN_LIMIT') or 0)  # 0 = uncapped
     
     # File upload configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or 'uploads'
+    FILE_STORAGE_BACKEND = os.environ.get('FILE_STORAGE_BACKEND') or 'local'  # local or gridfs
+    FILE_MAX_SIZE = int(os.environ.get('FILE_MAX_SIZE') or 2 * 1024 * 1024 * 1024)  # 2GB per file
+    FILE_UPLOAD_CHUNK_SIZE = int(os.environ.get('FILE_UPLOAD_CHUNK_SIZE') or 8 * 1024 * 1024)  # must stay below MAX_CONTENT_LENGTH
+    FILE_UPLOAD_EXPIRY_HOURS = int(os.environ.get('FILE_UPLOAD_EXPIRY_HOURS') or 24)
+    
+    # Background scheduler configuration
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'true').lower() in ['true', 'on', '1']
+    SCHEDULER_MIN_INTERVAL_SECONDS = int(os.environ.get('SCHEDULER_MIN_INTERVAL_SECONDS') or 30)
+    SCHEDULER_MAX_INTERVAL_SECONDS = int(os.environ.get('SCHEDULER_MAX_INTERVAL_SECONDS') or 3600)
+    SCHEDULER_LOCK_TTL_SECONDS = int(os.environ.get('SCHEDULER_LOCK_TTL_SECONDS') or 300)
+    RUN_EXPIRY_BATCH_SIZE = int(os.environ.get('RUN_EXPIRY_BATCH_SIZE') or 500)
+    REMINDERS_ENABLED = os.environ.get('REMINDERS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    REMINDER_DAYS_AHEAD = int(os.environ.get('REMINDER_DAYS_AHEAD') or 3)
+    REMINDER_THROTTLE_HOURS = int(os.environ.get('REMINDER_THROTTLE_HOURS') or 24)
+    REMINDER_BATCH_SIZE = int(os.environ.get('REMINDER_BATCH_SIZE') or 100)
+    REMINDER_RATE_PER_SECOND = float(os.environ.get('REMINDER_RATE_PER_SECOND') or 10)
+    
+    # Report generation configuration
+    REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS') or 0)  # 0 = one per CPU core
+    REPORT_ARTIFACTS_DIR = os.environ.get('REPORT_ARTIFACTS_DIR') or 'reports'
+    
+    # Data export configuration
+    EXPORT_DIR = os.environ.get('EXPORT_DIR') or 'exports'
+    
+    # Live progress stream configuration (auto = change streams on a replica set, else in-process)
+    PROGRESS_STREAM_BACKEND = os.environ.get('PROGRESS_STREAM_BACKEND') or 'auto'  # auto, change_stream or local
+    PROGRESS_STREAM_HEARTBEAT_SECONDS = int(os.environ.get('PROGRESS_STREAM_HEARTBEAT_SECONDS') or 15)
+    PROGRESS_STREAM_MAX_SECONDS = int(os.environ.get('PROGRESS_STREAM_MAX_SECONDS') or 600)  # clients reconnect after this
+    PROGRESS_STREAM_QUEUE_SIZE = int(os.environ.get('PROGRESS_STREAM_QUEUE_SIZE') or 100)  # per viewer
+    
+    # Notification configuration
+    NOTIFICATION_FANOUT_BATCH_SIZE = int(os.environ.get('NOTIFICATION_FANOUT_BATCH_SIZE') or 1000)  # inboxes per insert_many
+    
+    # Bulk survey launch configuration
+    BULK_LAUNCH_MAX_SUBJECTS = int(os.environ.get('BULK_LAUNCH_MAX_SUBJECTS') or 1000)
+    
+    # Bulk import configuration
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE') or 1000)  # rows per duplicate lookup and bulk_write
+    IMPORT_MAX_SIZE = int(os.environ.get('IMPORT_MAX_SIZE') or 200 * 1024 * 1024)  # 200MB per import file
+    
+    # Billing configuration (prices in integer cents, applied to metered usage)
+    BILLING_CURRENCY = os.environ.get('BILLING_CURRENCY') or 'USD'
+    BILLING_BASE_FEE_CENTS = int(os.environ.get('BILLING_BASE_FEE_CENTS') or 0)  # per account with usage in the period
+    BILLING_RUN_PRICE_CENTS = int(os.environ.get('BILLING_RUN_PRICE_CENTS') or 500)  # per survey run (subject) launched
+    BILLING_RESPONDENT_PRICE_CENTS = int(os.environ.get('BILLING_RESPONDENT_PRICE_CENTS') or 50)  # per respondent invited
+    BILLING_RESPONSE_PRICE_CENTS = int(os.environ.get('BILLING_RESPONSE_PRICE_CENTS') or 0)  # per response collected
+    
+    # Settings cache configuration (each worker revalidates its in-memory settings at most this often)
+    SETTINGS_REVALIDATE_SECONDS = int(os.environ.get('SETTINGS_REVALIDATE_SECONDS') or 5)
+    SETTINGS_CACHE_MAX_ACCOUNTS = int(os.environ.get('SETTINGS_CACHE_MAX_ACCOUNTS') or 5000)  # per worker
+    
+    # Password hashing configuration (bcrypt runs on a bounded pool; hashes at another cost are upgraded on login)
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS') or 12)
+    PASSWORD_HASH_POOL = os.environ.get('PASSWORD_HASH_POOL') or 'thread'  # thread or process
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or max(1, (os.cpu_count() or 2) // 2))
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE') or 64)  # waiting hashes before shedding
+    PASSWORD_HASH_MAX_WAIT_SECONDS = int(os.environ.get('PASSWORD_HASH_MAX_WAIT_SECONDS') or 5)  # estimated wait before shedding
+    
+    # Rate limiting configuration (token buckets; policies as JSON, e.g. {"auth_login": [{"key": "ip", "rate": 1, "burst": 10}]})
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() in ['true', 'on', '1']
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND') or 'memory'  # memory (per worker), mongo or redis (shared)
+    RATE_LIMIT_REDIS_URL = os.environ.get('RATE_LIMIT_REDIS_URL') or 'redis://localhost:6379/0'
+    RATE_LIMIT_POLICIES = os.environ.get('RATE_LIMIT_POLICIES')  # overrides the built-in policies by name
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS') or 100000)  # in-process buckets per worker
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES') or 0)  # proxies whose X-Forwarded-For is trusted
+    
+    # Logging configuration (records go through a bounded queue to one writer thread per worker)
+    LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
+    LOG_FORMAT = os.environ.get('LOG_FORMAT') or 'text'  # text or json (one object per line)
+    LOG_DIR = os.environ.get('LOG_DIR')  # defaults to src/logs
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE') or 10000)  # records beyond this are dropped, not waited on
+    LOG_HOT_PATH = os.environ.get('LOG_HOT_PATH', 'false').lower() in ['true', 'on', '1']  # skip call/route entry and exit lines (errors still log)
+    LOG_CALL_SAMPLE_RATE = float(os.environ.get('LOG_CALL_SAMPLE_RATE') or 1.0)  # share of calls whose entry and exit are logged
+    LOG_CALL_SAMPLE_RATES = os.environ.get('LOG_CALL_SAMPLE_RATES')  # JSON by qualified name, e.g. {"SurveysController.get_surveys": 0.1}
+    LOG_ARG_MAX_LENGTH = int(os.environ.get('LOG_ARG_MAX_LENGTH') or 500)  # characters per logged argument
+    
+    # Metrics configuration (/metrics in Prometheus text format)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    METRICS_DIR = os.environ.get('METRICS_DIR')  # shared by gunicorn workers; empty it on server start. Unset = this process only
+    METRICS_FLUSH_SECONDS = int(os.environ.get('METRICS_FLUSH_SECONDS') or 5)  # how often each worker writes its totals to METRICS_DIR
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # if set, scrapers must send "Authorization: Bearer <token>"
+    METRICS_QUERY_COUNT_HEADER = os.environ.get('METRICS_QUERY_COUNT_HEADER', 'false').lower() in ['true', 'on', '1']  # X-DB-Query-Count on every response, for load tests
+    
+    # Request profiling configuration (send "X-Profile: cprofile" or "X-Profile: sampling" with X-Profile-Token or a system admin token)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'true').lower() in ['true', 'on', '1']
+    PROFILING_DIR = os.environ.get('PROFILING_DIR')  # defaults to src/profiles
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')  # unset = only system admins can request profiles
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE') or 0)  # share of all requests profiled
+    PROFILING_MODE = os.environ.get('PROFILING_MODE') or 'cprofile'  # cprofile or sampling, for sampled requests and "X-Profile: 1"
+    PROFILING_SAMPLE_INTERVAL_MS = int(os.environ.get('PROFILING_SAMPLE_INTERVAL_MS') or 1)  # stack sampler interval
+    PROFILING_MAX_PROFILES = int(os.environ.get('PROFILING_MAX_PROFILES') or 200)  # oldest are deleted beyond this
+    PROFILING_MAX_CONCURRENT = int(os.environ.get('PROFILING_MAX_CONCURRENT') or 2)  # per worker
+    
+    # Continuous profiler configuration (samples every thread's stack; one collapsed-stack file per window)
+    CONTINUOUS_PROFILER_ENABLED = os.environ.get('CONTINUOUS_PROFILER_ENABLED', 'false').lower() in ['true', 'on', '1']
+    CONTINUOUS_PROFILER_HZ = int(os.environ.get('CONTINUOUS_PROFILER_HZ') or 100)
+    CONTINUOUS_PROFILER_MODE = os.environ.get('CONTINUOUS_PROFILER_MODE') or 'cpu'  # cpu (skips waiting threads) or wall
+    CONTINUOUS_PROFILER_WINDOW_SECONDS = int(os.environ.get('CONTINUOUS_PROFILER_WINDOW_SECONDS') or 60)
+    CONTINUOUS_PROFILER_MAX_FILES = int(os.environ.get('CONTINUOUS_PROFILER_MAX_FILES') or 1440)  # 24h of one-minute windows
+    CONTINUOUS_PROFILER_DIR = os.environ.get('CONTINUOUS_PROFILER_DIR')  # defaults to src/profiles/continuous
+    
+    # Tracing configuration (OTLP JSON spans for route, controller, repository, MongoDB and email calls)
+    TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'false').lower() in ['true', 'on', '1']
+    TRACING_SAMPLE_RATE = float(os.environ.get('TRACING_SAMPLE_RATE') or 0.01)  # share of new traces; incoming traceparent decides otherwise
+    TRACING_EXPORTER = os.environ.get('TRACING_EXPORTER') or 'file'  # file or otlp (OTLP/HTTP JSON)
+    TRACING_FILE = os.environ.get('TRACING_FILE')  # defaults to src/logs/traces.jsonl
+    TRACING_OTLP_ENDPOINT = os.environ.get('TRACING_OTLP_ENDPOINT') or 'http://localhost:4318/v1/traces'
+    TRACING_SERVICE_NAME = os.environ.get('TRACING_SERVICE_NAME') or 'ikenei-api'
+    TRACING_BATCH_SIZE = int(os.environ.get('TRACING_BATCH_SIZE') or 512)
+    TRACING_QUEUE_SIZE = int(os.environ.get('TRACING_QUEUE_SIZE') or 10000)
+    TRACING_FLUSH_SECONDS = int(os.environ.get('TRACING_FLUSH_SECONDS') or 5)
     
     # Pagination defaults
     DEFAULT_PAGE_SIZE = 20
@@ -44,6 +164,8 @@ class ProductionConfig(Config):
 
 class TestingConfig(Config):
     TESTING = True
+    SCHEDULER_ENABLED = False
+    RATE_LIMIT_ENABLED = False
     MONGODB_URI = os.environ.get('TEST_MONGODB_URI') or 'mongodb://localhost:27017/ikenei_test'
     MONGODB_DB_NAME = os.environ.get('TEST_MONGODB_DB_NAME') or 'ikenei_test'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=5)
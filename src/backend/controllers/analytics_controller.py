@@ -1,5 +1,9 @@
-from flask import jsonify
+import os
+from bson import ObjectId
+from flask import jsonify, Response, current_app, send_from_directory
 from datetime import datetime, timedelta
+from database.repositories.survey_response_repository import SurveyResponseRepository
+from utils.export_writers import EXPORT_FORMATS, write_export
 
 class AnalyticsController:
     """
@@ -151,27 +155,81 @@ class AnalyticsController:
     @staticmethod
     def export_analytics_data(data):
         """
-        Export analytics data
+        Export survey responses, streamed to the client or written to a file
         """
         try:
-            # TODO: Implement actual data export logic
-            # This should export real analytics data in requested format
             export_format = data.get('format', 'csv')
+            mimetype, extension = EXPORT_FORMATS[export_format]
             
-            export_result = {
-                "format": export_format,
-                "status": "initiated",
-                "timestamp": datetime.utcnow().isoformat() + "Z"
-            }
+            for field in ('survey_run_id', 'survey_id'):
+                if data.get(field) and not ObjectId.is_valid(str(data[field])):
+                    return jsonify({
+                        "success": False,
+                        "error": {"message": f"Invalid {field}"}
+                    }), 400
+            
+            chunks = SurveyResponseRepository.export_responses(
+                survey_run_id=data.get('survey_run_id'),
+                survey_id=data.get('survey_id'),
+                format=export_format,
+                anonymous=bool(data.get('anonymous', False))
+            )
+            
+            scope = data.get('survey_run_id') or data.get('survey_id')
+            filename = f"responses_{scope}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}{extension}"
+            
+            if data.get('destination', 'stream') == 'stream':
+                return Response(
+                    chunks,
+                    mimetype=mimetype,
+                    headers={"Content-Disposition": f"attachment; filename={filename}"}
+                )
+            
+            export_dir = os.path.abspath(current_app.config.get('EXPORT_DIR', 'exports'))
+            os.makedirs(export_dir, exist_ok=True)
+            size = write_export(chunks, os.path.join(export_dir, filename))
             
             return jsonify({
                 "success": True,
-                "data": export_result,
-                "message": f"Analytics data export initiated in {export_format} format"
+                "data": {
+                    "format": export_format,
+                    "filename": filename,
+                    "size": size,
+                    "download_url": f"/api/analytics/exports/{filename}",
+                    "timestamp": datetime.utcnow().isoformat() + "Z"
+                },
+                "message": f"Analytics data exported in {export_format} format"
             })
             
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": str(e)}
+            }), 400
         except Exception as e:
             return jsonify({
                 "success": False,
                 "error": {"message": f"Failed to export analytics data: {str(e)}"}
             }), 500
+    
+    @staticmethod
+    def download_export(filename):
+        """
+        Download a previously exported file
+        """
+        try:
+            export_dir = os.path.abspath(current_app.config.get('EXPORT_DIR', 'exports'))
+            
+            if not os.path.isfile(os.path.join(export_dir, os.path.basename(filename))):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Export not found"}
+                }), 404
+            
+            return send_from_directory(export_dir, os.path.basename(filename), as_attachment=True, conditional=True)
+            
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to download export: {str(e)}"}
+            }), 500
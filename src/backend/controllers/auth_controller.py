@@ -1,8 +1,9 @@
 from flask import jsonify, request
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt, decode_token
 from datetime import datetime, timedelta
-import bcrypt
 from database import AccountRepository
+from services.password_hasher import PasswordHasherBusy
+from services.token_revocation import token_revocation
 from utils.logger import get_logger, log_function_call
 
 class AuthController:
@@ -46,6 +47,9 @@ class AuthController:
             # Update last login
             account.update_last_login()
             
+            # Upgrade the stored hash if it was made at a different bcrypt cost
+            account.rehash_password_if_needed(password)
+            
             # Create JWT tokens
             access_token = create_access_token(
                 identity=str(account._id),
@@ -66,6 +70,8 @@ class AuthController:
                 "message": "Login successful"
             })
             
+        except PasswordHasherBusy as e:
+            return AuthController._busy_response(e)
         except Exception as e:
             logger.error(f"Login failed for {email}: {str(e)}")
             return jsonify({
@@ -74,12 +80,24 @@ class AuthController:
             }), 500
     
     @staticmethod
-    def logout():
+    def logout(refresh_token=None):
         """
-        Account logout
+        Account logout: revokes the presented token and, if given, its refresh token
         """
+        logger = get_logger(__name__)
+        
         try:
-            # In a real implementation, you might want to blacklist the token
+            claims = get_jwt()
+            token_revocation.revoke(claims, reason='logout')
+            
+            if refresh_token:
+                try:
+                    refresh_claims = decode_token(refresh_token, allow_expired=True)
+                    if refresh_claims.get('sub') == claims.get('sub'):
+                        token_revocation.revoke(refresh_claims, reason='logout')
+                except Exception as e:
+                    logger.warning(f"Ignoring invalid refresh token on logout: {str(e)}")
+            
             return jsonify({
                 "success": True,
                 "message": "Logout successful"
@@ -132,6 +150,8 @@ class AuthController:
                 "message": "Registration successful"
             }), 201
             
+        except PasswordHasherBusy as e:
+            return AuthController._busy_response(e)
         except Exception as e:
             logger.error(f"Registration failed for {data.get('email')}: {str(e)}")
             return jsonify({
@@ -222,21 +242,43 @@ class AuthController:
             }), 500
     
     @staticmethod
-    @jwt_required(refresh=True)
     def refresh_token():
         """
-        Token refresh
+        Token refresh with rotation: the presented refresh token is revoked
+        and a new access/refresh pair is issued, so each refresh token works once
         """
         try:
             current_user_id = get_jwt_identity()
             
-            # Create new access token
-            new_access_token = create_access_token(identity=current_user_id)
+            # Single use: a refresh token already rotated (possibly on another worker) is refused
+            if not token_revocation.revoke(get_jwt(), reason='rotated'):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Token has been revoked"}
+                }), 401
+            
+            account = AccountRepository.get_account_by_id(current_user_id)
+            if not account or not account.get_field('is_active', True):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Account is deactivated"}
+                }), 401
+            
+            # Create new access token (same claims as at login) and a new refresh token
+            new_access_token = create_access_token(
+                identity=current_user_id,
+                additional_claims={
+                    "email": account.get_field('email'),
+                    "role": account.get_field('role')
+                }
+            )
+            new_refresh_token = create_refresh_token(identity=current_user_id)
             
             return jsonify({
                 "success": True,
                 "data": {
-                    "token": new_access_token
+                    "token": new_access_token,
+                    "refresh_token": new_refresh_token
                 },
                 "message": "Token refreshed successfully"
             })
@@ -312,3 +354,13 @@ class AuthController:
                 "success": False,
                 "error": {"message": f"Password reset failed: {str(e)}"}
             }), 500
+    
+    @staticmethod
+    def _busy_response(error):
+        """503 telling the client when to retry, while the hashing pool sheds load"""
+        response = jsonify({
+            "success": False,
+            "error": {"message": str(error)}
+        })
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response, 503
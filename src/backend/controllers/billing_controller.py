@@ -1,5 +1,9 @@
 from flask import jsonify
-from datetime import datetime
+from datetime import datetime, timedelta
+from database.models.usage_counter_model import UsageCounter
+from database.repositories.billing_record_repository import BillingRecordRepository
+from database.repositories.usage_repository import UsageRepository
+from services.billing_service import billing_service
 
 class BillingController:
     """
@@ -12,23 +16,12 @@ class BillingController:
         Get all billing records with pagination and filtering
         """
         try:
-            # TODO: Implement actual billing records retrieval from database
-            # This should query billing_records collection with:
-            # - Pagination support
-            # - Filtering by account_id, status, billing_period
-            # - Sorting by created_at or due_date
-            
-            records = []
+            result = BillingRecordRepository.get_all_records(page=page, per_page=limit, filters=(filters or {}).get('filters'))
             
             return jsonify({
                 "success": True,
-                "data": records,
-                "pagination": {
-                    "page": page,
-                    "limit": limit,
-                    "total": 0,
-                    "pages": 0
-                }
+                "data": [record.to_public_dict() for record in result['documents']],
+                "pagination": result['pagination']
             })
             
         except Exception as e:
@@ -134,20 +127,12 @@ class BillingController:
         Get billing records for specific account
         """
         try:
-            # TODO: Implement actual account billing records retrieval
-            # This should query billing_records collection filtered by account_id
-            
-            records = []
+            result = BillingRecordRepository.get_records_by_account(account_id, page=page, per_page=limit)
             
             return jsonify({
                 "success": True,
-                "data": records,
-                "pagination": {
-                    "page": page,
-                    "limit": limit,
-                    "total": 0,
-                    "pages": 0
-                }
+                "data": [record.to_public_dict() for record in result['documents']],
+                "pagination": result['pagination']
             })
             
         except Exception as e:
@@ -159,19 +144,25 @@ class BillingController:
     @staticmethod
     def get_billing_summary():
         """
-        Get billing summary statistics
+        Get billing summary statistics: invoiced revenue plus the current
+        month's metered usage priced at today's rates
         """
         try:
-            # TODO: Implement actual billing summary calculation
-            # This should aggregate billing data from database:
-            # - Total revenue, monthly revenue
-            # - Active accounts, pending/overdue payments
-            # - Revenue trends by month
-            # - Top revenue-generating accounts
-            
-            summary = {
-                "timestamp": datetime.utcnow().isoformat() + "Z"
+            summary = BillingRecordRepository.get_summary()
+            
+            current_period = datetime.utcnow().strftime('%Y-%m')
+            estimates = billing_service.calculate_period(current_period)
+            summary['current_period'] = {
+                "period": current_period,
+                "active_accounts": len(estimates),
+                "usage": {
+                    metric: sum(estimate['usage'][metric] for estimate in estimates)
+                    for metric in UsageCounter.METRICS
+                },
+                "estimated_amount_cents": sum(estimate['amount_cents'] for estimate in estimates)
             }
+            summary['currency'] = billing_service.calculator.currency
+            summary['timestamp'] = datetime.utcnow().isoformat() + "Z"
             
             return jsonify({
                 "success": True,
@@ -187,34 +178,106 @@ class BillingController:
     @staticmethod
     def calculate_billing_amount(data):
         """
-        Calculate billing amount based on usage
+        Calculate billing amount based on usage: either for the given counts,
+        or for an account's metered usage in a period (account_id + period)
         """
         try:
-            # TODO: Implement actual billing calculation logic
-            # This should calculate billing based on:
-            # - Base subscription fee
-            # - Per-subject pricing
-            # - Per-respondent pricing
-            # - Any applicable discounts or promotions
-            
-            subjects_count = data.get('subjects_count', 0)
-            respondents_count = data.get('respondents_count', 0)
-            
-            calculation = {
-                "subjects_count": subjects_count,
-                "respondents_count": respondents_count,
-                "total_amount": 0.00,
-                "currency": "USD",
-                "timestamp": datetime.utcnow().isoformat() + "Z"
-            }
+            if data.get('period'):
+                estimates = billing_service.calculate_period(data['period'], account_ids=[data['account_id']])
+                calculation = estimates[0] if estimates else {
+                    "account_id": data['account_id'],
+                    "period": data['period'],
+                    "usage": {metric: 0 for metric in UsageCounter.METRICS},
+                    **billing_service.calculator.price({})
+                }
+            else:
+                usage = {
+                    "runs_launched": data.get('subjects_count', 0),
+                    "respondents_invited": data.get('respondents_count', 0),
+                    "responses_collected": data.get('responses_count', 0)
+                }
+                calculation = {
+                    "subjects_count": usage['runs_launched'],
+                    "respondents_count": usage['respondents_invited'],
+                    "usage": usage,
+                    **billing_service.calculator.price(usage)
+                }
+            
+            calculation = {key: value for key, value in calculation.items() if key not in ('period_start', 'period_end')}
+            if calculation.get('account_id'):
+                calculation['account_id'] = str(calculation['account_id'])
+            calculation['total_amount'] = round(calculation['amount_cents'] / 100, 2)
+            calculation['timestamp'] = datetime.utcnow().isoformat() + "Z"
             
             return jsonify({
                 "success": True,
                 "data": calculation
             })
             
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": str(e)}
+            }), 400
         except Exception as e:
             return jsonify({
                 "success": False,
                 "error": {"message": f"Failed to calculate billing: {str(e)}"}
             }), 500
+    
+    @staticmethod
+    def run_invoices(period):
+        """
+        Price every account's metered usage for a period and create or
+        refresh their pending invoices
+        """
+        try:
+            result = billing_service.run_invoices(period)
+            
+            return jsonify({
+                "success": True,
+                "data": result,
+                "message": f"Invoiced {result['accounts']} accounts for {period}"
+            })
+            
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": str(e)}
+            }), 400
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to run invoices: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def get_account_usage(account_id, start, end):
+        """
+        Get an account's daily usage counters in [start, end) with totals
+        and the amount they would be billed at current rates
+        """
+        try:
+            days = UsageRepository.get_daily_usage(account_id, start, end)
+            totals = {metric: sum(day.get(metric, 0) for day in days) for metric in UsageCounter.METRICS}
+            
+            return jsonify({
+                "success": True,
+                "data": {
+                    "account_id": str(account_id),
+                    "start": start.strftime('%Y-%m-%d'),
+                    "end": (end - timedelta(days=1)).strftime('%Y-%m-%d'),
+                    "daily": [
+                        {"day": day['day'].strftime('%Y-%m-%d'), **{metric: day.get(metric, 0) for metric in UsageCounter.METRICS}}
+                        for day in days
+                    ],
+                    "totals": totals,
+                    "estimate": billing_service.calculator.price(totals)
+                }
+            })
+            
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to retrieve usage: {str(e)}"}
+            }), 500
@@ -1,5 +1,9 @@
-from flask import jsonify
+from flask import jsonify, request, send_file
 from datetime import datetime
+from database.models.file_model import StoredFile
+from database.models.file_upload_model import FileUpload
+from middleware.auth_middleware import check_resource_ownership
+from services.file_storage import file_storage, UploadConflictError, FileTooLargeError
 
 class FilesController:
     """
@@ -7,27 +11,30 @@ class FilesController:
     """
     
     @staticmethod
-    def upload_file(file, file_type='document'):
+    def upload_file(file, file_type='document', owner_id=None):
         """
-        Upload a file
+        Upload a file in a single request (streamed to storage in chunks)
         """
         try:
-            # TODO: Implement actual file upload functionality
-            # This should:
-            # - Validate file type and size
-            # - Save file to storage (local filesystem, S3, etc.)
-            # - Create file record in database with metadata
-            # - Generate secure download URLs
-            # - Handle file type-specific processing (image resizing, etc.)
-            
-            file_id = "uploaded_file_id"  # This should be generated by system
+            stored_file = file_storage.save_stream(
+                file.stream,
+                owner_id=owner_id,
+                filename=file.filename,
+                content_type=file.mimetype,
+                file_type=file_type
+            )
             
             return jsonify({
                 "success": True,
-                "data": {"id": file_id},
+                "data": stored_file.to_public_dict(),
                 "message": "File uploaded successfully"
             }), 201
-            
+        
+        except FileTooLargeError as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": str(e)}
+            }), 413
         except Exception as e:
             return jsonify({
                 "success": False,
@@ -35,25 +42,166 @@ class FilesController:
             }), 500
     
     @staticmethod
-    def download_file(file_id):
+    def create_upload(data, owner_id=None):
         """
-        Download a file
+        Start a resumable, chunked upload session
         """
         try:
-            # TODO: Implement actual file download functionality
-            # This should:
-            # - Verify file exists in database
-            # - Check user permissions for file access
-            # - Generate secure download URL or serve file directly
-            # - Log download activity
-            # - Handle file streaming for large files
+            upload = file_storage.create_upload(
+                owner_id=owner_id,
+                filename=data['filename'],
+                size=int(data['size']),
+                content_type=data.get('content_type'),
+                file_type=data.get('type', 'document')
+            )
+            
+            response_data = upload.to_public_dict()
+            response_data['chunk_size'] = file_storage.chunk_size
+            response_data['upload_url'] = f"/api/files/uploads/{upload._id}"
             
             return jsonify({
                 "success": True,
-                "data": {"id": str(file_id)},
-                "message": "File download link generated"
+                "data": response_data,
+                "message": "Upload session created"
+            }), 201
+        
+        except FileTooLargeError as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": str(e)}
+            }), 413
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to create upload session: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def get_upload(upload_id):
+        """
+        Get upload session progress (the offset to resume from)
+        """
+        try:
+            upload = FileUpload.find_by_id(upload_id)
+            
+            if not upload or not check_resource_ownership(upload.get_field('owner_id')):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Upload session not found"}
+                }), 404
+            
+            response = jsonify({
+                "success": True,
+                "data": upload.to_public_dict()
             })
+            response.headers['Upload-Offset'] = str(upload.get_field('offset'))
+            return response
+        
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to retrieve upload session: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def upload_chunk(upload_id, offset, stream):
+        """
+        Append a chunk to an upload session
+        """
+        try:
+            upload = FileUpload.find_by_id(upload_id)
+            
+            if not upload or not check_resource_ownership(upload.get_field('owner_id')):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Upload session not found"}
+                }), 404
+            
+            if upload.get_field('status') == 'completed':
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Upload session is already completed"}
+                }), 409
+            
+            try:
+                new_offset, stored_file = file_storage.append_chunk(upload, offset, stream)
+            except UploadConflictError:
+                current = FileUpload.find_by_id(upload_id)
+                response = jsonify({
+                    "success": False,
+                    "error": {"message": "Chunk offset does not match the upload offset"},
+                    "data": current.to_public_dict()
+                })
+                response.headers['Upload-Offset'] = str(current.get_field('offset'))
+                return response, 409
+            
+            if stored_file is None:
+                response = jsonify({
+                    "success": True,
+                    "data": {"upload_id": str(upload_id), "offset": new_offset, "size": upload.get_field('size')},
+                    "message": "Chunk received"
+                })
+                response.headers['Upload-Offset'] = str(new_offset)
+                return response
+            
+            return jsonify({
+                "success": True,
+                "data": stored_file.to_public_dict(),
+                "message": "File uploaded successfully"
+            }), 201
+        
+        except FileTooLargeError as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": str(e)}
+            }), 413
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to upload chunk: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def download_file(file_id):
+        """
+        Download a file (supports HTTP Range requests)
+        """
+        try:
+            stored_file = StoredFile.find_by_id(file_id)
+            
+            if not stored_file or not check_resource_ownership(stored_file.get_field('owner_id')):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "File not found"}
+                }), 404
+            
+            content = file_storage.open_file(stored_file)
+            sha256 = stored_file.get_field('sha256')
+            
+            if isinstance(content, str):
+                # Local blob - the server can use sendfile/X-Sendfile
+                return send_file(
+                    content,
+                    mimetype=stored_file.get_field('content_type'),
+                    download_name=stored_file.get_field('filename'),
+                    as_attachment=True,
+                    etag=sha256,
+                    conditional=True
+                )
             
+            # GridFS stream - seekable, so ranges are served without reading the whole file
+            response = send_file(
+                content,
+                mimetype=stored_file.get_field('content_type'),
+                download_name=stored_file.get_field('filename'),
+                as_attachment=True,
+                etag=sha256,
+                last_modified=stored_file.get_field('created_at'),
+                conditional=False
+            )
+            response.content_length = content.length
+            return response.make_conditional(request.environ, accept_ranges=True, complete_length=content.length)
+        
         except Exception as e:
             return jsonify({
                 "success": False,
@@ -66,19 +214,21 @@ class FilesController:
         Delete a file
         """
         try:
-            # TODO: Implement actual file deletion functionality
-            # This should:
-            # - Verify file exists in database
-            # - Check user permissions for file deletion
-            # - Remove file from storage system
-            # - Remove file record from database
-            # - Handle cleanup of any references to the file
+            stored_file = StoredFile.find_by_id(file_id)
+            
+            if not stored_file or not check_resource_ownership(stored_file.get_field('owner_id')):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "File not found"}
+                }), 404
+            
+            file_storage.delete_file(stored_file)
             
             return jsonify({
                 "success": True,
                 "message": f"File {file_id} deleted successfully"
             })
-            
+        
         except Exception as e:
             return jsonify({
                 "success": False,
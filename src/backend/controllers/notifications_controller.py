@@ -1,5 +1,6 @@
-from flask import jsonify
+from flask import jsonify, current_app
 from datetime import datetime
+from database.repositories.notification_repository import NotificationRepository
 
 class NotificationsController:
     """
@@ -7,23 +8,23 @@ class NotificationsController:
     """
     
     @staticmethod
-    def get_account_notifications():
+    def get_account_notifications(account_id, limit=20, before=None, unread_only=False):
         """
-        Get all notifications for current user
+        Get notifications for current user, newest first
         """
         try:
-            # TODO: Implement actual notifications retrieval from database
-            # This should query notifications collection filtered by:
-            # - Current user/account ID
-            # - Ordered by created_at (newest first)
-            # - Include read/unread status
-            # - Support pagination if needed
-            
-            notifications = []
+            notifications = NotificationRepository.get_inbox(
+                account_id,
+                limit=limit,
+                before=before,
+                unread_only=unread_only
+            )
             
             return jsonify({
                 "success": True,
-                "data": notifications
+                "data": [notification.to_public_dict() for notification in notifications],
+                "unread_count": NotificationRepository.get_unread_count(account_id),
+                "next_before": str(notifications[-1]._id) if len(notifications) == limit else None
             })
             
         except Exception as e:
@@ -33,20 +34,39 @@ class NotificationsController:
             }), 500
     
     @staticmethod
-    def mark_notification_as_read(notification_id):
+    def get_unread_count(account_id):
+        """
+        Get the unread notification count (polled by the notification bell)
+        """
+        try:
+            return jsonify({
+                "success": True,
+                "data": {"unread_count": NotificationRepository.get_unread_count(account_id)}
+            })
+            
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to retrieve unread count: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def mark_notification_as_read(notification_id, account_id):
         """
         Mark notification as read
         """
         try:
-            # TODO: Implement actual notification read status update
-            # This should update notification in database:
-            # - Set is_read to True
-            # - Set read_at timestamp
-            # - Verify notification belongs to current user
+            notification = NotificationRepository.mark_read(notification_id, account_id)
+            
+            if not notification:
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Notification not found"}
+                }), 404
             
             return jsonify({
                 "success": True,
-                "data": {"id": str(notification_id), "is_read": True},
+                "data": notification.to_public_dict(),
                 "message": "Notification marked as read"
             })
             
@@ -57,26 +77,56 @@ class NotificationsController:
             }), 500
     
     @staticmethod
-    def create_notification(data):
+    def mark_all_as_read(account_id):
         """
-        Create a new notification
+        Mark all of the current user's notifications as read
         """
         try:
-            # TODO: Implement actual notification creation
-            # This should create new notification in database with:
-            # - Title, message, type, priority
-            # - Target user/account ID
-            # - Created timestamp
-            # - Additional data payload if needed
+            updated = NotificationRepository.mark_all_read(account_id)
             
-            notification_id = "new_notification_id"  # This should be generated by database
+            return jsonify({
+                "success": True,
+                "data": {"updated": updated, "unread_count": NotificationRepository.get_unread_count(account_id)},
+                "message": f"Marked {updated} notifications as read"
+            })
+            
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to mark notifications as read: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def create_notification(data, account_ids):
+        """
+        Create a notification in each target account's inbox
+        """
+        try:
+            notification_ids = NotificationRepository.notify_accounts(
+                account_ids,
+                title=data['title'],
+                message=data['message'],
+                notification_type=data['type'],
+                priority=data.get('priority', 'normal'),
+                data=data.get('data'),
+                batch_size=current_app.config.get('NOTIFICATION_FANOUT_BATCH_SIZE')
+            )
             
             return jsonify({
                 "success": True,
-                "data": {"id": notification_id},
+                "data": {
+                    "id": str(notification_ids[0]) if len(notification_ids) == 1 else None,
+                    "recipients": len(notification_ids),
+                    "created_at": datetime.utcnow().isoformat() + 'Z'
+                },
                 "message": "Notification created successfully"
             }), 201
             
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": str(e)}
+            }), 400
         except Exception as e:
             return jsonify({
                 "success": False,
@@ -84,15 +134,16 @@ class NotificationsController:
             }), 500
     
     @staticmethod
-    def delete_notification(notification_id):
+    def delete_notification(notification_id, account_id):
         """
         Delete notification
         """
         try:
-            # TODO: Implement actual notification deletion
-            # This should delete notification from database:
-            # - Verify notification belongs to current user
-            # - Remove from notifications collection
+            if not NotificationRepository.delete_notification(notification_id, account_id):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Notification not found"}
+                }), 404
             
             return jsonify({
                 "success": True,
@@ -0,0 +1,79 @@
+from flask import jsonify, send_file
+from services.profiling import request_profiler
+
+class ProfilingController:
+    """
+    Controller for saved request profiles
+    """
+
+    @staticmethod
+    def get_profiles(limit=50):
+        """
+        List the most recent request profiles, newest first
+        """
+        try:
+            profiles = request_profiler.list_profiles(limit=limit)
+
+            return jsonify({
+                "success": True,
+                "data": profiles,
+                "directory": request_profiler.directory
+            })
+
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to retrieve profiles: {str(e)}"}
+            }), 500
+
+    @staticmethod
+    def get_profile(profile_id):
+        """
+        Get one profile's summary (request, timing and hottest functions or stacks)
+        """
+        try:
+            profile = request_profiler.get_profile(profile_id)
+
+            if not profile:
+                return ProfilingController._not_found()
+
+            return jsonify({
+                "success": True,
+                "data": profile
+            })
+
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to retrieve profile: {str(e)}"}
+            }), 500
+
+    @staticmethod
+    def download_profile(profile_id):
+        """
+        Download a profile's pstats (.prof) or collapsed-stack (.collapsed) file
+        """
+        try:
+            path = request_profiler.get_profile_file(profile_id)
+
+            if not path:
+                return ProfilingController._not_found()
+
+            return send_file(
+                path,
+                mimetype='application/octet-stream' if path.endswith('.prof') else 'text/plain',
+                as_attachment=True
+            )
+
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to download profile: {str(e)}"}
+            }), 500
+
+    @staticmethod
+    def _not_found():
+        return jsonify({
+            "success": False,
+            "error": {"message": "Profile not found"}
+        }), 404
@@ -1,5 +1,10 @@
-from flask import jsonify
+import os
+from flask import jsonify, send_file
 from datetime import datetime
+from database.repositories.report_instance_repository import ReportInstanceRepository
+from database.repositories.subject_repository import SubjectRepository
+from database.repositories.survey_run_repository import SurveyRunRepository
+from services.report_service import report_service
 
 class ReportsController:
     """
@@ -115,20 +120,42 @@ class ReportsController:
             }), 500
     
     @staticmethod
-    def generate_report(report_id, data):
+    def generate_report(report_id, data, requested_by=None):
         """
-        Generate report instance
+        Queue report instance generation (runs in the report process pool)
         """
         try:
-            # TODO: Implement actual report generation logic
-            # This should generate report from data and create instance record
-            instance_id = "generated_instance_id"  # This should be generated by system
+            report_type = data.get('report_type')
+            
+            if report_type == 'subject':
+                target = SubjectRepository.get_subject_by_id(data.get('subject_id'))
+            else:
+                target = SurveyRunRepository.get_survey_run_by_id(data.get('survey_run_id'))
+            
+            if not target:
+                return jsonify({
+                    "success": False,
+                    "error": {"message": f"{report_type.replace('_', ' ').title()} not found"}
+                }), 404
+            
+            instance = report_service.submit(
+                report_id=report_id,
+                report_type=report_type,
+                target_id=target._id,
+                account_id=target.get_field('account_id'),
+                requested_by=requested_by,
+                params=data.get('params')
+            )
             
             return jsonify({
                 "success": True,
-                "data": {"instance_id": instance_id},
-                "message": "Report generated successfully"
-            })
+                "data": {
+                    "instance_id": str(instance._id),
+                    "status": instance.get_field('status'),
+                    "status_url": f"/api/reports/instances/{instance._id}"
+                },
+                "message": "Report generation queued"
+            }), 202
             
         except Exception as e:
             return jsonify({
@@ -142,18 +169,22 @@ class ReportsController:
         Get report instances
         """
         try:
-            # TODO: Implement actual report instances retrieval from database
-            # This should query report_instances table for specific report
-            instances = []
+            filters = (filters or {}).get('filters', {})
+            result = ReportInstanceRepository.get_instances_by_report(
+                report_id,
+                page=page,
+                per_page=limit,
+                status=filters.get('status')
+            )
             
             return jsonify({
                 "success": True,
-                "data": instances,
+                "data": [instance.to_dict() for instance in result['documents']],
                 "pagination": {
                     "page": page,
                     "limit": limit,
-                    "total": 0,
-                    "pages": 0
+                    "total": result['pagination']['total'],
+                    "pages": result['pagination']['pages']
                 }
             })
             
@@ -163,6 +194,66 @@ class ReportsController:
                 "error": {"message": f"Failed to retrieve report instances: {str(e)}"}
             }), 500
     
+    @staticmethod
+    def get_report_instance(instance_id):
+        """
+        Get a report instance (used to poll generation status)
+        """
+        try:
+            instance = ReportInstanceRepository.get_instance_by_id(instance_id)
+            
+            if not instance:
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Report instance not found"}
+                }), 404
+            
+            return jsonify({
+                "success": True,
+                "data": instance.to_dict()
+            })
+            
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to retrieve report instance: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def download_report_artifact(instance_id):
+        """
+        Download the generated artifact of a completed report instance
+        """
+        try:
+            instance = ReportInstanceRepository.get_instance_by_id(instance_id)
+            
+            if not instance:
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Report instance not found"}
+                }), 404
+            
+            artifact_path = instance.get_field('artifact_path')
+            if instance.get_field('status') != 'completed' or not artifact_path or not os.path.exists(artifact_path):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": f"Report artifact is not available (status: {instance.get_field('status')})"}
+                }), 409
+            
+            return send_file(
+                artifact_path,
+                mimetype='application/json',
+                as_attachment=True,
+                download_name=os.path.basename(artifact_path),
+                conditional=True
+            )
+            
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to download report artifact: {str(e)}"}
+            }), 500
+    
     @staticmethod
     def update_report_status(report_id, status):
         """
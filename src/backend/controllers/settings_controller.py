@@ -1,33 +1,46 @@
 from flask import jsonify
-from datetime import datetime
+from services.settings_store import settings_store, SYSTEM_SETTINGS, ACCOUNT_SETTINGS, SETTING_CATEGORIES
+from services.email_templates import template_registry
+from database.models.email_template_model import EmailTemplate
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class SettingsController:
     """
-    Controller for system settings management
+    Controller for system and account settings management
     """
     
     @staticmethod
-    def get_all_settings(page=1, limit=20, filters=None):
+    def get_all_settings(page=1, limit=20, filters=None, account_id=None):
         """
-        Get all settings with pagination and filtering
+        Get all settings with pagination and filtering (by category or key search)
         """
         try:
-            # TODO: Implement actual settings retrieval from database
-            # This should query settings collection with:
-            # - Pagination support
-            # - Filtering by category, type, or key
-            # - Sorting by category or updated_at
+            schema = ACCOUNT_SETTINGS if account_id else SYSTEM_SETTINGS
+            values = settings_store.get_all(account_id=account_id)
+            
+            filters = filters or {}
+            category = (filters.get('filters') or {}).get('category')
+            search = (filters.get('search') or '').lower()
+            
+            settings = [
+                SettingsController._describe(key, spec, values[key], account_id)
+                for key, spec in sorted(schema.items())
+                if (not category or spec.get('category') == category) and (not search or search in key.lower())
+            ]
             
-            settings = []
+            total = len(settings)
+            start = (page - 1) * limit
             
             return jsonify({
                 "success": True,
-                "data": settings,
+                "data": settings[start:start + limit],
                 "pagination": {
                     "page": page,
                     "limit": limit,
-                    "total": 0,
-                    "pages": 0
+                    "total": total,
+                    "pages": (total + limit - 1) // limit
                 }
             })
             
@@ -38,17 +51,13 @@ class SettingsController:
             }), 500
     
     @staticmethod
-    def update_setting(key, value):
+    def update_setting(key, value, account_id=None, updated_by=None):
         """
         Update a specific setting
         """
         try:
-            # TODO: Implement actual setting update in database
-            # This should:
-            # - Validate setting key exists
-            # - Validate value type matches setting type
-            # - Update setting in database
-            # - Log setting change activity
+            value = settings_store.set(key, value, account_id=account_id, updated_by=updated_by)
+            logger.info(f"Setting {key} set to {value!r} for {account_id or 'system'} by {updated_by}")
             
             return jsonify({
                 "success": True,
@@ -56,6 +65,13 @@ class SettingsController:
                 "message": f"Setting {key} updated successfully"
             })
             
+        except KeyError:
+            return SettingsController._not_found(key)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": str(e)}
+            }), 400
         except Exception as e:
             return jsonify({
                 "success": False,
@@ -63,22 +79,27 @@ class SettingsController:
             }), 500
     
     @staticmethod
-    def toggle_boolean_setting(key):
+    def toggle_boolean_setting(key, account_id=None, updated_by=None):
         """
         Toggle a boolean setting
         """
         try:
-            # TODO: Implement actual boolean setting toggle
-            # This should:
-            # - Validate setting exists and is boolean type
-            # - Get current value from database
-            # - Toggle the boolean value
-            # - Update setting in database
-            # - Log toggle activity
+            spec = (ACCOUNT_SETTINGS if account_id else SYSTEM_SETTINGS).get(key)
+            if spec is None:
+                return SettingsController._not_found(key)
+            if spec['type'] is not bool:
+                return jsonify({
+                    "success": False,
+                    "error": {"message": f"Setting {key} is not a boolean setting"}
+                }), 400
+            
+            current = settings_store.get_account(account_id, key) if account_id else settings_store.get(key)
+            value = settings_store.set(key, not current, account_id=account_id, updated_by=updated_by)
+            logger.info(f"Setting {key} toggled to {value} for {account_id or 'system'} by {updated_by}")
             
             return jsonify({
                 "success": True,
-                "data": {"key": key},
+                "data": {"key": key, "value": value},
                 "message": f"Setting {key} toggled successfully"
             })
             
@@ -89,24 +110,22 @@ class SettingsController:
             }), 500
     
     @staticmethod
-    def reset_setting_to_default(key):
+    def reset_setting_to_default(key, account_id=None, updated_by=None):
         """
         Reset setting to default value
         """
         try:
-            # TODO: Implement actual setting reset to default
-            # This should:
-            # - Validate setting exists
-            # - Get default value from settings schema/config
-            # - Update setting to default value in database
-            # - Log reset activity
+            value = settings_store.reset(key, account_id=account_id, updated_by=updated_by)
+            logger.info(f"Setting {key} reset for {account_id or 'system'} by {updated_by}")
             
             return jsonify({
                 "success": True,
-                "data": {"key": key},
+                "data": {"key": key, "value": value},
                 "message": f"Setting {key} reset to default value"
             })
             
+        except KeyError:
+            return SettingsController._not_found(key)
         except Exception as e:
             return jsonify({
                 "success": False,
@@ -119,14 +138,14 @@ class SettingsController:
         Get setting categories
         """
         try:
-            # TODO: Implement actual setting categories retrieval
-            # This should:
-            # - Query distinct categories from settings collection
-            # - Include category metadata (display names, descriptions)
-            # - Count settings per category
-            # - Return organized category structure
+            counts = {}
+            for spec in SYSTEM_SETTINGS.values():
+                counts[spec['category']] = counts.get(spec['category'], 0) + 1
             
-            categories = []
+            categories = [
+                {"id": category, **metadata, "settings_count": counts.get(category, 0)}
+                for category, metadata in SETTING_CATEGORIES.items()
+            ]
             
             return jsonify({
                 "success": True,
@@ -138,3 +157,137 @@ class SettingsController:
                 "success": False,
                 "error": {"message": f"Failed to retrieve setting categories: {str(e)}"}
             }), 500
+    
+    @staticmethod
+    def get_email_templates(account_id):
+        """
+        List the email templates and whether the account overrides each one
+        """
+        try:
+            overrides = EmailTemplate.find_overrides(account_id)
+            
+            return jsonify({
+                "success": True,
+                "data": [
+                    {
+                        "name": name,
+                        "overridden": name in overrides,
+                        "updated_at": overrides[name].isoformat() + "Z" if overrides.get(name) else None
+                    }
+                    for name in template_registry.TEMPLATE_NAMES
+                ]
+            })
+            
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to retrieve email templates: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def get_email_template(account_id, name):
+        """
+        Get the source the account uses for a template (its override, else the built-in)
+        """
+        try:
+            if name not in template_registry.TEMPLATE_NAMES:
+                return SettingsController._template_not_found(name)
+            
+            override = EmailTemplate.find_override(account_id, name)
+            updated_at = override.get_field('updated_at') if override else None
+            
+            return jsonify({
+                "success": True,
+                "data": {
+                    "name": name,
+                    "overridden": override is not None,
+                    "source": override.get_field('source') if override else template_registry.get_default_source(name),
+                    "default_source": template_registry.get_default_source(name),
+                    "updated_at": updated_at.isoformat() + "Z" if updated_at else None
+                }
+            })
+            
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to retrieve email template: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def update_email_template(account_id, name, source):
+        """
+        Validate, store and activate the account's override of a template
+        """
+        try:
+            if name not in template_registry.TEMPLATE_NAMES:
+                return SettingsController._template_not_found(name)
+            
+            version = template_registry.set_override(account_id, name, source)
+            logger.info(f"Email template {name} overridden for account {account_id}")
+            
+            return jsonify({
+                "success": True,
+                "data": {"name": name, "overridden": True, "updated_at": version.isoformat() + "Z"},
+                "message": f"Email template {name} updated successfully"
+            })
+            
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": str(e)}
+            }), 400
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to update email template: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def reset_email_template(account_id, name):
+        """
+        Remove the account's override so the built-in template is used again
+        """
+        try:
+            if name not in template_registry.TEMPLATE_NAMES:
+                return SettingsController._template_not_found(name)
+            
+            removed = template_registry.clear_override(account_id, name)
+            logger.info(f"Email template {name} reset to default for account {account_id}")
+            
+            return jsonify({
+                "success": True,
+                "data": {"name": name, "overridden": False},
+                "message": f"Email template {name} reset to default" if removed else f"Email template {name} was not overridden"
+            })
+            
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to reset email template: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def _template_not_found(name):
+        return jsonify({
+            "success": False,
+            "error": {"message": f"Unknown email template: {name}"}
+        }), 404
+    
+    @staticmethod
+    def _describe(key, spec, value, account_id=None):
+        return {
+            "key": key,
+            "value": value,
+            "default": spec['default'],
+            "type": spec['type'].__name__,
+            "category": spec.get('category', key.split('.')[0] if '.' in key else 'general'),
+            "description": spec.get('description'),
+            "overridden": settings_store.is_overridden(key, account_id=account_id)
+        }
+    
+    @staticmethod
+    def _not_found(key):
+        return jsonify({
+            "success": False,
+            "error": {"message": f"Unknown setting: {key}"}
+        }), 404
@@ -1,6 +1,8 @@
 from flask import jsonify
 from datetime import datetime
 from database import SubjectRepository
+from services.bulk_import import import_file
+from services.settings_store import settings_store
 from utils.logger import get_logger, log_function_call
 
 class SubjectsController:
@@ -171,3 +173,50 @@ class SubjectsController:
                 "success": False,
                 "error": {"message": f"Failed to delete subject: {str(e)}"}
             }), 500
+    
+    @staticmethod
+    @log_function_call
+    def import_subjects(file, account_id, batch_size=1000, on_duplicate='skip', dry_run=False):
+        """
+        Bulk import subjects from an uploaded CSV/XLSX file
+        """
+        logger = get_logger(__name__)
+        logger.info(f"Importing subjects from {file.filename} for account {account_id}")
+        
+        try:
+            if not settings_store.feature_enabled('bulk_import'):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Bulk import is disabled"}
+                }), 403
+            
+            result = import_file(
+                'subjects',
+                file.stream,
+                file.filename,
+                account_id,
+                batch_size=batch_size,
+                on_duplicate=on_duplicate,
+                dry_run=dry_run
+            )
+            
+            return jsonify({
+                "success": True,
+                "data": result,
+                "message": (
+                    f"Imported {result['inserted']} and updated {result['updated']} of "
+                    f"{result['total_rows']} rows ({result['error_count']} errors)"
+                )
+            })
+            
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {"message": str(e)}
+            }), 400
+        except Exception as e:
+            logger.error(f"Failed to import subjects: {str(e)}")
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to import subjects: {str(e)}"}
+            }), 500
@@ -3,14 +3,18 @@ Survey Response Controller
 Handles public survey response submission (no authentication required)
 """
 
-from flask import jsonify
+from flask import jsonify, Response
 from datetime import datetime
 from database.repositories.survey_response_repository import SurveyResponseRepository
 from database.repositories.survey_run_repository import SurveyRunRepository
 from database.repositories.survey_repository import SurveyRepository
 from database.repositories.subject_repository import SubjectRepository
 from database.repositories.respondent_repository import RespondentRepository
+from database.repositories.usage_repository import UsageRepository
 from services.email_service import email_service
+from services.progress_stream import progress_stream, progress_from_document
+from services.settings_store import settings_store
+from middleware.auth_middleware import check_resource_ownership
 from utils.logger import get_logger, log_function_call
 
 logger = get_logger(__name__)
@@ -19,7 +23,7 @@ class SurveyResponseController:
     """Controller for survey response management"""
     
     @staticmethod
-    @log_function_call
+    @log_function_call(hot=True)
     def get_survey_by_token(response_token):
         """Get survey form by response token (public endpoint)"""
         logger.info(f"Loading survey form for token: {response_token[:8]}...")
@@ -113,7 +117,7 @@ class SurveyResponseController:
             }), 500
     
     @staticmethod
-    @log_function_call
+    @log_function_call(hot=True)
     def submit_survey_response(response_token, data):
         """Submit survey response (public endpoint)"""
         logger.info(f"Submitting survey response for token: {response_token[:8]}...")
@@ -189,25 +193,39 @@ class SurveyResponseController:
             )
             
             # Update survey run respondent status
-            SurveyRunRepository.update_respondent_status(
+            updated_run = SurveyRunRepository.update_respondent_status(
                 survey_run_id=survey_run._id,
                 respondent_id=respondent['respondent_id'],
                 status='completed'
             )
             
-            # Send completion confirmation email
+            # Push the new progress to live viewers (in-process fallback; change streams need no help)
+            try:
+                progress_stream.publish_run(updated_run)
+            except Exception as e:
+                logger.warning(f"Failed to publish survey run progress: {str(e)}")
+            
+            # Meter the response for billing
             try:
-                # Get respondent and subject details for email
-                respondent_details = RespondentRepository.get_respondent_by_id(respondent['respondent_id'])
-                subject_details = SubjectRepository.get_subject_by_id(survey_run.get_field('subject_id'))
+                UsageRepository.record_usage(survey_run.get_field('account_id'), responses_collected=1)
+            except Exception as e:
+                logger.warning(f"Failed to record usage for survey run {survey_run._id}: {str(e)}")
+            
+            # Send completion confirmation email (unless switched off system-wide or for the account)
+            try:
+                if settings_store.email_enabled('survey_completions', survey_run.get_field('account_id')):
+                    # Get respondent and subject details for email
+                    respondent_details = RespondentRepository.get_respondent_by_id(respondent['respondent_id'])
+                    subject_details = SubjectRepository.get_subject_by_id(survey_run.get_field('subject_id'))
                 
-                if respondent_details and subject_details:
-                    email_service.send_completion_confirmation(
-                        respondent_email=respondent_details.get_field('email'),
-                        respondent_name=respondent_details.get_field('name'),
-                        subject_name=subject_details.get_field('name'),
-                        survey_title=survey.get_field('title')
-                    )
+                    if respondent_details and subject_details:
+                        email_service.send_completion_confirmation(
+                            respondent_email=respondent_details.get_field('email'),
+                            respondent_name=respondent_details.get_field('name'),
+                            subject_name=subject_details.get_field('name'),
+                            survey_title=survey.get_field('title'),
+                            account_id=survey_run.get_field('account_id')
+                        )
             except Exception as e:
                 logger.warning(f"Failed to send completion confirmation email: {str(e)}")
                 # Don't fail the response submission if email fails
@@ -338,3 +356,65 @@ class SurveyResponseController:
                 "success": False,
                 "error": {"message": f"Failed to retrieve analytics: {str(e)}"}
             }), 500
+    
+    @staticmethod
+    def stream_survey_run_progress(survey_run_id):
+        """Server-Sent Events stream of one survey run's progress (admin endpoint)"""
+        logger.info(f"Opening progress stream for survey run: {survey_run_id}")
+        
+        try:
+            if not settings_store.feature_enabled('live_progress'):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Live progress streams are disabled"}
+                }), 403
+            
+            documents = SurveyRunRepository.get_run_progress(survey_run_id=survey_run_id)
+            if not documents or not check_resource_ownership(documents[0].get('account_id')):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Survey run not found"}
+                }), 404
+            
+            subscription = progress_stream.subscribe(run_id=survey_run_id)
+            snapshots = [progress_from_document(document) for document in documents]
+            return SurveyResponseController._event_stream(subscription, snapshots)
+            
+        except Exception as e:
+            logger.error(f"Failed to open progress stream for survey run {survey_run_id}: {str(e)}")
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to open progress stream: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def stream_account_progress(account_id):
+        """Server-Sent Events stream of progress for all of an account's runs"""
+        logger.info(f"Opening progress stream for account: {account_id}")
+        
+        try:
+            if not settings_store.feature_enabled('live_progress'):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Live progress streams are disabled"}
+                }), 403
+            
+            subscription = progress_stream.subscribe(account_id=account_id)
+            documents = SurveyRunRepository.get_run_progress(account_id=account_id)
+            snapshots = [progress_from_document(document) for document in documents]
+            return SurveyResponseController._event_stream(subscription, snapshots)
+            
+        except Exception as e:
+            logger.error(f"Failed to open progress stream for account {account_id}: {str(e)}")
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to open progress stream: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def _event_stream(subscription, snapshots):
+        """Wrap a progress subscription in an SSE response"""
+        response = Response(progress_stream.stream(subscription, snapshots), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+        return response
@@ -1,10 +1,14 @@
 from flask import jsonify
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
 from database import SurveyRepository
 from database.repositories.survey_run_repository import SurveyRunRepository
 from database.repositories.subject_repository import SubjectRepository
 from database.repositories.respondent_repository import RespondentRepository
+from database.repositories.usage_repository import UsageRepository
 from services.email_service import email_service
+from services.settings_store import settings_store
+from services.scheduler_service import scheduler_service, OverdueRunExpiryJob
 from utils.logger import get_logger, log_function_call
 
 class SurveysController:
@@ -389,8 +393,10 @@ class SurveysController:
                     "error": {"message": "Survey must be approved to run"}
                 }), 400
             
-            # 3. Parse due date
+            # 3. Parse due date (stored as naive UTC, like every other date)
             due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
+            if due_date.tzinfo:
+                due_date = due_date.astimezone(timezone.utc).replace(tzinfo=None)
             
             # 4. Create survey run record
             survey_run = SurveyRunRepository.create_survey_run(
@@ -402,6 +408,19 @@ class SurveysController:
                 account_id=current_account_id or survey.get_field('account_id')  # TODO: Get from JWT token
             )
             
+            # Let the expiry scheduler re-plan if this run is due before its next wake-up
+            scheduler_service.wake(OverdueRunExpiryJob.name, at=due_date)
+            
+            # Meter the launch for billing (never fails the launch)
+            try:
+                UsageRepository.record_usage(
+                    survey_run.get_field('account_id'),
+                    runs_launched=1,
+                    respondents_invited=len(data['respondents'])
+                )
+            except Exception as e:
+                logger.warning(f"Failed to record usage for survey run {survey_run._id}: {str(e)}")
+            
             # 5. Send email invitations to respondents
             invitation_results = []
             
@@ -416,59 +435,64 @@ class SurveysController:
             subject_name = subject.get_field('name')
             survey_title = survey.get_field('title')
             
-            for respondent_data in data['respondents']:
-                try:
-                    # Get respondent details
-                    respondent = RespondentRepository.get_respondent_by_id(respondent_data['respondent_id'])
-                    if not respondent:
+            # Invitation emails can be switched off system-wide or per account
+            if not settings_store.email_enabled('survey_invitations', survey_run.get_field('account_id')):
+                logger.info(f"Survey invitations are disabled; not emailing respondents of run {survey_run._id}")
+            else:
+                for respondent_data in data['respondents']:
+                    try:
+                        # Get respondent details
+                        respondent = RespondentRepository.get_respondent_by_id(respondent_data['respondent_id'])
+                        if not respondent:
+                            invitation_results.append({
+                                'respondent_id': respondent_data['respondent_id'],
+                                'success': False,
+                                'message': 'Respondent not found'
+                            })
+                            continue
+                        
+                        # Find the response token for this respondent
+                        response_token = None
+                        for survey_respondent in survey_run.get_field('respondents', []):
+                            if str(survey_respondent['respondent_id']) == str(respondent_data['respondent_id']):
+                                response_token = survey_respondent['response_token']
+                                break
+                        
+                        if not response_token:
+                            invitation_results.append({
+                                'respondent_id': respondent_data['respondent_id'],
+                                'success': False,
+                                'message': 'Response token not found'
+                            })
+                            continue
+                        
+                        # Send email invitation
+                        email_result = email_service.send_survey_invitation(
+                            survey_run_id=str(survey_run._id),
+                            respondent_email=respondent.get_field('email'),
+                            respondent_name=respondent.get_field('name'),
+                            subject_name=subject_name,
+                            survey_title=survey_title,
+                            response_token=response_token,
+                            due_date=due_date,
+                            account_id=survey_run.get_field('account_id')
+                        )
+                        
                         invitation_results.append({
                             'respondent_id': respondent_data['respondent_id'],
-                            'success': False,
-                            'message': 'Respondent not found'
+                            'success': email_result['success'],
+                            'message': email_result.get('message', 'Email sent'),
+                            'email': respondent.get_field('email'),
+                            'simulated': email_result.get('simulated', False)
                         })
-                        continue
-                    
-                    # Find the response token for this respondent
-                    response_token = None
-                    for survey_respondent in survey_run.get_field('respondents', []):
-                        if str(survey_respondent['respondent_id']) == str(respondent_data['respondent_id']):
-                            response_token = survey_respondent['response_token']
-                            break
-                    
-                    if not response_token:
+                        
+                    except Exception as e:
+                        logger.error(f"Failed to send invitation to respondent {respondent_data['respondent_id']}: {str(e)}")
                         invitation_results.append({
                             'respondent_id': respondent_data['respondent_id'],
                             'success': False,
-                            'message': 'Response token not found'
+                            'message': f'Failed to send invitation: {str(e)}'
                         })
-                        continue
-                    
-                    # Send email invitation
-                    email_result = email_service.send_survey_invitation(
-                        survey_run_id=str(survey_run._id),
-                        respondent_email=respondent.get_field('email'),
-                        respondent_name=respondent.get_field('name'),
-                        subject_name=subject_name,
-                        survey_title=survey_title,
-                        response_token=response_token,
-                        due_date=due_date
-                    )
-                    
-                    invitation_results.append({
-                        'respondent_id': respondent_data['respondent_id'],
-                        'success': email_result['success'],
-                        'message': email_result.get('message', 'Email sent'),
-                        'email': respondent.get_field('email'),
-                        'simulated': email_result.get('simulated', False)
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"Failed to send invitation to respondent {respondent_data['respondent_id']}: {str(e)}")
-                    invitation_results.append({
-                        'respondent_id': respondent_data['respondent_id'],
-                        'success': False,
-                        'message': f'Failed to send invitation: {str(e)}'
-                    })
             
             # 6. Return success response
             return jsonify({
@@ -503,27 +527,215 @@ class SurveysController:
             }), 500
     
     @staticmethod
-    def _validate_run_survey_data(survey_id, data):
-        """Validate survey run data with business rules"""
-        errors = []
+    @log_function_call
+    def bulk_run_survey(survey_id, data, current_user_id=None, current_account_id=None):
+        """
+        Launch a survey for many subjects at once
         
-        # 1. Required fields validation
-        if not data.get('subject_id'):
-            errors.append("Subject ID is required")
+        All subjects are checked against existing active runs with one
+        aggregation, the runs are created with one insert_many and every
+        invitation is rendered and sent as one batch. Returns the outcome
+        for each subject: launched, skipped (already running) or failed.
+        """
+        logger = get_logger(__name__)
+        launches = data['subjects']
+        logger.info(f"Bulk launching survey {survey_id} for {len(launches)} subjects")
         
-        if not data.get('due_date'):
-            errors.append("Due date is required")
+        try:
+            if not settings_store.feature_enabled('bulk_launch'):
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Bulk survey launch is disabled"}
+                }), 403
+            
+            survey = SurveyRepository.get_survey_by_id(survey_id)
+            if not survey:
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Survey not found"}
+                }), 404
+            
+            if survey.get_field('status') != 'approved':
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Survey must be approved to run"}
+                }), 400
+            
+            due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
+            if due_date.tzinfo:
+                due_date = due_date.astimezone(timezone.utc).replace(tzinfo=None)
+            if due_date <= datetime.utcnow():
+                return jsonify({
+                    "success": False,
+                    "error": {"message": "Due date must be in the future"}
+                }), 400
+            
+            account_id = current_account_id or survey.get_field('account_id')
+            
+            # 1. Per-subject input validation (no database access)
+            progress = []
+            pending = []
+            seen_subjects = set()
+            for launch in launches:
+                subject_id = str(launch.get('subject_id') or '')
+                entry = {'subject_id': subject_id, 'status': 'failed'}
+                progress.append(entry)
+                
+                errors = SurveysController._validate_run_respondents(launch.get('respondents') or [])
+                if not ObjectId.is_valid(subject_id):
+                    errors.insert(0, "Valid subject ID is required")
+                elif subject_id in seen_subjects:
+                    errors.insert(0, "Subject appears more than once in this launch")
+                if any(not ObjectId.is_valid(str(r.get('respondent_id'))) for r in launch.get('respondents') or []):
+                    errors.append("Invalid respondent_id format")
+                
+                if errors:
+                    entry['errors'] = errors
+                    continue
+                
+                seen_subjects.add(subject_id)
+                pending.append((entry, ObjectId(subject_id), launch['respondents']))
+            
+            # 2. Resolve subjects, existing active runs and respondents - one query each.
+            #    Only the account's own subjects (and their respondents) are found; others fail as not found
+            subject_ids = [subject_id for _, subject_id, _ in pending]
+            subjects = SubjectRepository.get_subjects_by_ids(subject_ids, fields=['name'], account_id=account_id) if pending else {}
+            active_runs = SurveyRunRepository.find_active_runs_for_subjects(survey_id, subject_ids) if pending else {}
+            respondent_ids = {ObjectId(str(r['respondent_id'])) for _, _, respondents in pending for r in respondents}
+            respondents_by_id = RespondentRepository.get_respondents_by_ids(
+                respondent_ids, fields=['name', 'email'], subject_ids=list(subjects)
+            ) if subjects else {}
+            
+            # 3. Build the run documents
+            launchable = []
+            runs_data = []
+            for entry, subject_id, respondents in pending:
+                if subject_id not in subjects:
+                    entry['errors'] = ["Subject not found"]
+                    continue
+                
+                if subject_id in active_runs:
+                    entry['status'] = 'skipped'
+                    entry['message'] = "Survey is already running for this subject"
+                    entry['existing_run_id'] = str(active_runs[subject_id])
+                    continue
+                
+                missing = [str(r['respondent_id']) for r in respondents if ObjectId(str(r['respondent_id'])) not in respondents_by_id]
+                if missing:
+                    entry['errors'] = [f"Respondent not found: {respondent_id}" for respondent_id in missing]
+                    continue
+                
+                try:
+                    runs_data.append(SurveyRunRepository.build_run_data(
+                        survey_id=survey_id,
+                        subject_id=subject_id,
+                        respondents=respondents,
+                        due_date=due_date,
+                        launched_by=current_user_id or "system",
+                        account_id=account_id
+                    ))
+                    launchable.append(entry)
+                except ValueError as e:
+                    entry['errors'] = [str(e)]
+            
+            # 4. Create every run with one insert_many
+            run_ids = SurveyRunRepository.create_survey_runs(runs_data) if runs_data else []
+            
+            # 5. Render and send every invitation as one batch
+            invitations = []
+            owners = []
+            survey_title = survey.get_field('title')
+            for entry, run_data, run_id in zip(launchable, runs_data, run_ids):
+                if run_id is None:
+                    entry['errors'] = ["Failed to create survey run"]
+                    continue
+                
+                entry['status'] = 'launched'
+                entry['survey_run_id'] = str(run_id)
+                entry['respondent_count'] = len(run_data['respondents'])
+                entry['invitations_sent'] = 0
+                entry['invitations_failed'] = 0
+                
+                subject_name = subjects[run_data['subject_id']].get('name')
+                for run_respondent in run_data['respondents']:
+                    respondent = respondents_by_id[run_respondent['respondent_id']]
+                    invitations.append({
+                        'respondent_email': respondent.get('email'),
+                        'respondent_name': respondent.get('name'),
+                        'subject_name': subject_name,
+                        'survey_title': survey_title,
+                        'response_token': run_respondent['response_token'],
+                        'due_date': due_date
+                    })
+                    owners.append(entry)
+            
+            # Meter every launched run for billing with one bulk write (never fails the launch)
+            launched = [entry for entry in launchable if entry['status'] == 'launched']
+            if launched:
+                try:
+                    UsageRepository.record_usage_many([
+                        (account_id, {'runs_launched': 1, 'respondents_invited': entry['respondent_count']})
+                        for entry in launched
+                    ])
+                except Exception as e:
+                    logger.warning(f"Failed to record usage for bulk launch of survey {survey_id}: {str(e)}")
+            
+            if invitations:
+                # Let the expiry scheduler re-plan if these runs are due before its next wake-up
+                scheduler_service.wake(OverdueRunExpiryJob.name, at=due_date)
+                
+                if settings_store.email_enabled('survey_invitations', account_id):
+                    results = email_service.send_survey_invitations(invitations, account_id=account_id)
+                    for entry, result in zip(owners, results):
+                        entry['invitations_sent' if result['success'] else 'invitations_failed'] += 1
+                else:
+                    logger.info(f"Survey invitations are disabled; not emailing {len(invitations)} respondents")
+            
+            summary = {
+                status: len([entry for entry in progress if entry['status'] == status])
+                for status in ('launched', 'skipped', 'failed')
+            }
+            
+            return jsonify({
+                "success": True,
+                "data": {
+                    "survey_id": str(survey_id),
+                    "due_date": due_date.isoformat() + "Z",
+                    **summary,
+                    "invitations_sent": sum(entry.get('invitations_sent', 0) for entry in progress),
+                    "subjects": progress
+                },
+                "message": f"Survey launched for {summary['launched']} of {len(progress)} subjects"
+            }), 201 if summary['launched'] else 200
+            
+        except ValueError as e:
+            logger.error(f"Validation error bulk launching survey {survey_id}: {str(e)}")
+            return jsonify({
+                "success": False,
+                "error": {"message": str(e)}
+            }), 400
+            
+        except Exception as e:
+            logger.error(f"Failed to bulk launch survey {survey_id}: {str(e)}")
+            return jsonify({
+                "success": False,
+                "error": {"message": f"Failed to launch survey: {str(e)}"}
+            }), 500
+    
+    @staticmethod
+    def _validate_run_respondents(respondents):
+        """Validate a run's respondent list (weights must sum to 100)"""
+        errors = []
         
-        respondents = data.get('respondents', [])
         if not respondents:
             errors.append("At least one respondent is required")
         
-        # 2. Weight sum validation (must equal 100)
+        # Weight sum validation (must equal 100)
         total_weight = sum(r.get('weight', 0) for r in respondents)
         if total_weight != 100:
             errors.append(f"Respondent weights must sum to 100, got {total_weight}")
         
-        # 3. Respondent data validation
+        # Respondent data validation
         for i, respondent in enumerate(respondents):
             if not respondent.get('respondent_id'):
                 errors.append(f"Respondent {i+1}: respondent_id is required")
@@ -532,9 +744,28 @@ class SurveysController:
             if respondent.get('weight', 0) <= 0:
                 errors.append(f"Respondent {i+1}: weight must be greater than 0")
         
+        return errors
+    
+    @staticmethod
+    def _validate_run_survey_data(survey_id, data):
+        """Validate survey run data with business rules"""
+        errors = []
+        
+        # 1. Required fields validation
+        if not data.get('subject_id'):
+            errors.append("Subject ID is required")
+        
+        if not data.get('due_date'):
+            errors.append("Due date is required")
+        
+        # 2-3. Respondent and weight validation
+        errors.extend(SurveysController._validate_run_respondents(data.get('respondents', [])))
+        
         # 4. Due date validation
         try:
             due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
+            if due_date.tzinfo:
+                due_date = due_date.astimezone(timezone.utc).replace(tzinfo=None)
             if due_date <= datetime.utcnow():
                 errors.append("Due date must be in the future")
         except (ValueError, KeyError):
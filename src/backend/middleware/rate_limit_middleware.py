@@ -0,0 +1,64 @@
+from functools import wraps
+from flask import request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from services.rate_limiter import rate_limiter
+from utils.response_helpers import too_many_requests_response
+
+# Response tokens are random, so a short prefix identifies one while bounding key size
+TOKEN_PREFIX_LENGTH = 16
+
+def rate_limit(policy):
+    """
+    Decorator to apply a rate limit policy to an endpoint; over-limit
+    requests get 429 before the endpoint does any work
+    Usage: @rate_limit('auth_login')
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            allowed, retry_after = rate_limiter.check(policy, get_rate_limit_keys(rate_limiter.key_types(policy)))
+            if not allowed:
+                return too_many_requests_response(retry_after)
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def get_rate_limit_keys(key_types):
+    """
+    Resolve the request keys a policy needs: client IP, response token
+    prefix, and account (JWT identity, or the email being logged into)
+    """
+    keys = {}
+    if 'ip' in key_types:
+        keys['ip'] = get_client_ip()
+    if 'token' in key_types:
+        token = (request.view_args or {}).get('response_token')
+        keys['token'] = token[:TOKEN_PREFIX_LENGTH] if token else None
+    if 'account' in key_types:
+        keys['account'] = _get_account_key()
+    return keys
+
+def get_client_ip():
+    """
+    Client address, taken from X-Forwarded-For only as far as the
+    configured number of trusted proxies in front of the app
+    """
+    trusted = rate_limiter.trusted_proxies
+    if trusted:
+        forwarded = [ip.strip() for ip in request.headers.get('X-Forwarded-For', '').split(',') if ip.strip()]
+        route = forwarded + [request.remote_addr]
+        return route[max(0, len(route) - trusted - 1)]
+    return request.remote_addr
+
+def _get_account_key():
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+        if identity:
+            return str(identity)
+    except Exception:
+        pass
+
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
@@ -1,7 +1,7 @@
 from flask import Blueprint, request
 from controllers.analytics_controller import AnalyticsController
 from middleware.auth_middleware import require_system_admin_role
-from utils.response_helpers import handle_exception
+from utils.response_helpers import validation_error_response, handle_exception
 
 analytics_bp = Blueprint('analytics', __name__)
 
@@ -61,11 +61,38 @@ def export_analytics_data():
     """
     try:
         data = request.get_json() or {}
+        
+        errors = {}
+        valid_formats = ['csv', 'csv.gz', 'parquet', 'arrow']
+        if data.get('format', 'csv') not in valid_formats:
+            errors['format'] = f"Format must be one of: {', '.join(valid_formats)}"
+        
+        if not data.get('survey_run_id') and not data.get('survey_id'):
+            errors['survey_run_id'] = "Survey run ID or survey ID is required"
+        
+        if data.get('destination', 'stream') not in ['stream', 'file']:
+            errors['destination'] = "Destination must be one of: stream, file"
+        
+        if errors:
+            return validation_error_response(errors)
+        
         return AnalyticsController.export_analytics_data(data)
     
     except Exception as e:
         return handle_exception(e)
 
+@analytics_bp.route('/api/analytics/exports/<filename>', methods=['GET'])
+@require_system_admin_role
+def download_analytics_export(filename):
+    """
+    Download an exported analytics file
+    """
+    try:
+        return AnalyticsController.download_export(filename)
+    
+    except Exception as e:
+        return handle_exception(e)
+
 @analytics_bp.route('/api/analytics/overview', methods=['GET'])
 @require_system_admin_role
 def get_analytics_overview():
@@ -1,11 +1,14 @@
 from flask import Blueprint, request
+from flask_jwt_extended import jwt_required
 from controllers.auth_controller import AuthController
+from middleware.rate_limit_middleware import rate_limit
 from utils.response_helpers import validation_error_response, handle_exception
 from utils.logger import get_logger
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/api/auth/login', methods=['POST'])
+@rate_limit('auth_login')
 def login():
     """
     Account login with email/password
@@ -42,15 +45,17 @@ def login():
         return handle_exception(e)
 
 @auth_bp.route('/api/auth/logout', methods=['POST'])
+@jwt_required(verify_type=False)
 def logout():
     """
-    Account logout
+    Account logout (send the refresh token in the body to revoke it as well)
     """
     logger = get_logger(__name__)
     logger.info("=== ENTRY: POST /api/auth/logout ===")
     
     try:
-        result = AuthController.logout()
+        data = request.get_json(silent=True) or {}
+        result = AuthController.logout(refresh_token=data.get('refresh_token'))
         logger.info("=== EXIT: POST /api/auth/logout - SUCCESS ===")
         return result
     except Exception as e:
@@ -135,6 +140,7 @@ def update_profile():
         return handle_exception(e)
 
 @auth_bp.route('/api/auth/refresh', methods=['POST'])
+@jwt_required(refresh=True)
 def refresh_token():
     """
     Token refresh
@@ -1,7 +1,10 @@
 from flask import Blueprint, request
+from datetime import datetime, timedelta
+from bson import ObjectId
 from controllers.billing_controller import BillingController
-from middleware.auth_middleware import require_system_admin_role, require_auth
-from utils.response_helpers import validation_error_response, handle_exception
+from database.models.usage_counter_model import month_bounds
+from middleware.auth_middleware import require_system_admin_role, require_auth, get_current_user_id, check_resource_ownership
+from utils.response_helpers import validation_error_response, forbidden_response, handle_exception
 from utils.pagination import get_pagination_params, get_filter_params
 
 billing_bp = Blueprint('billing', __name__)
@@ -128,13 +131,19 @@ def update_billing_status(billing_id):
     except Exception as e:
         return handle_exception(e)
 
-@billing_bp.route('/api/billing/account/<int:account_id>', methods=['GET'])
+@billing_bp.route('/api/billing/account/<string:account_id>', methods=['GET'])
 @require_auth
 def get_account_billing_records(account_id):
     """
     Get billing records for specific account
     """
     try:
+        if not ObjectId.is_valid(account_id):
+            return validation_error_response({"account_id": "Invalid account ID"})
+        
+        if not check_resource_ownership(account_id):
+            return forbidden_response("You can only view your own billing records")
+        
         page, limit = get_pagination_params()
         return BillingController.get_account_billing_records(account_id, page, limit)
     
@@ -165,15 +174,34 @@ def calculate_billing_amount():
         if not data:
             return validation_error_response({"request": "Request body is required"})
         
-        required_fields = ['subjects_count', 'respondents_count']
         errors = {}
         
+        # Price an account's metered usage for a period instead of explicit counts
+        if data.get('period') is not None:
+            if not data.get('account_id') or not ObjectId.is_valid(str(data['account_id'])):
+                errors['account_id'] = "A valid account ID is required with a period"
+            try:
+                month_bounds(data['period'])
+            except ValueError as e:
+                errors['period'] = str(e)
+            
+            if errors:
+                return validation_error_response(errors)
+            
+            return BillingController.calculate_billing_amount(data)
+        
+        required_fields = ['subjects_count', 'respondents_count']
+        
         for field in required_fields:
             if data.get(field) is None:
                 errors[field] = f"{field.replace('_', ' ').title()} is required"
             elif not isinstance(data.get(field), int) or data.get(field) < 0:
                 errors[field] = f"{field.replace('_', ' ').title()} must be a non-negative integer"
         
+        responses_count = data.get('responses_count')
+        if responses_count is not None and (not isinstance(responses_count, int) or responses_count < 0):
+            errors['responses_count'] = "Responses Count must be a non-negative integer"
+        
         if errors:
             return validation_error_response(errors)
         
@@ -181,3 +209,49 @@ def calculate_billing_amount():
     
     except Exception as e:
         return handle_exception(e)
+
+@billing_bp.route('/api/billing/invoices/run', methods=['POST'])
+@require_system_admin_role
+def run_invoices():
+    """
+    Invoice every account's metered usage for a period (YYYY-MM, defaults to last month)
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        period = data.get('period') or (datetime.utcnow().replace(day=1) - timedelta(days=1)).strftime('%Y-%m')
+        
+        try:
+            month_bounds(period)
+        except ValueError as e:
+            return validation_error_response({"period": str(e)})
+        
+        return BillingController.run_invoices(period)
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@billing_bp.route('/api/billing/usage', methods=['GET'])
+@require_auth
+def get_account_usage():
+    """
+    Get daily usage for the current account (admins may pass ?account_id=)
+    in a period (?period=YYYY-MM, defaults to the current month)
+    """
+    try:
+        account_id = request.args.get('account_id') or get_current_user_id()
+        period = request.args.get('period') or datetime.utcnow().strftime('%Y-%m')
+        
+        if not ObjectId.is_valid(str(account_id)):
+            return validation_error_response({"account_id": "Invalid account ID"})
+        try:
+            start, end = month_bounds(period)
+        except ValueError as e:
+            return validation_error_response({"period": str(e)})
+        
+        if not check_resource_ownership(account_id):
+            return forbidden_response("You can only view your own usage")
+        
+        return BillingController.get_account_usage(account_id, start, end)
+    
+    except Exception as e:
+        return handle_exception(e)
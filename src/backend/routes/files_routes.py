@@ -1,6 +1,6 @@
-from flask import Blueprint, request
+from flask import Blueprint, request, current_app
 from controllers.files_controller import FilesController
-from middleware.auth_middleware import require_auth
+from middleware.auth_middleware import require_auth, get_current_user_id
 from utils.response_helpers import validation_error_response, handle_exception
 
 files_bp = Blueprint('files', __name__)
@@ -12,6 +12,9 @@ def upload_file():
     Upload files (avatars, documents)
     """
     try:
+        # Whole-file uploads may exceed the default request cap; the body is spooled and streamed, never buffered
+        request.max_content_length = current_app.config.get('FILE_MAX_SIZE')
+        
         if 'file' not in request.files:
             return validation_error_response({"file": "No file provided"})
         
@@ -21,12 +24,69 @@ def upload_file():
         
         file_type = request.form.get('type', 'document')  # avatar, document, etc.
         
-        return FilesController.upload_file(file, file_type)
+        return FilesController.upload_file(file, file_type, owner_id=get_current_user_id())
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@files_bp.route('/api/files/uploads', methods=['POST'])
+@require_auth
+def create_upload():
+    """
+    Start a resumable, chunked upload
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return validation_error_response({"request": "Request body is required"})
+        
+        errors = {}
+        if not data.get('filename'):
+            errors['filename'] = "Filename is required"
+        
+        size = data.get('size')
+        if not isinstance(size, int) or size <= 0:
+            errors['size'] = "Size must be a positive integer (bytes)"
+        
+        if errors:
+            return validation_error_response(errors)
+        
+        return FilesController.create_upload(data, owner_id=get_current_user_id())
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@files_bp.route('/api/files/uploads/<upload_id>', methods=['GET'])
+@require_auth
+def get_upload(upload_id):
+    """
+    Get upload progress (offset to resume from)
+    """
+    try:
+        return FilesController.get_upload(upload_id)
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@files_bp.route('/api/files/uploads/<upload_id>', methods=['PATCH'])
+@require_auth
+def upload_chunk(upload_id):
+    """
+    Append a chunk to an upload (raw body, Upload-Offset header)
+    """
+    try:
+        offset = request.headers.get('Upload-Offset', type=int)
+        
+        if offset is None or offset < 0:
+            return validation_error_response({"Upload-Offset": "Upload-Offset header is required"})
+        
+        return FilesController.upload_chunk(upload_id, offset, request.stream)
     
     except Exception as e:
         return handle_exception(e)
 
-@files_bp.route('/api/files/<int:file_id>', methods=['GET'])
+@files_bp.route('/api/files/<file_id>', methods=['GET'])
 @require_auth
 def download_file(file_id):
     """
@@ -38,7 +98,7 @@ def download_file(file_id):
     except Exception as e:
         return handle_exception(e)
 
-@files_bp.route('/api/files/<int:file_id>', methods=['DELETE'])
+@files_bp.route('/api/files/<file_id>', methods=['DELETE'])
 @require_auth
 def delete_file(file_id):
     """
@@ -1,7 +1,9 @@
 from flask import Blueprint, request
+from bson import ObjectId
 from controllers.notifications_controller import NotificationsController
-from middleware.auth_middleware import require_auth
-from utils.response_helpers import validation_error_response, handle_exception
+from database.models.notification_model import Notification
+from middleware.auth_middleware import require_auth, get_current_user_id, get_current_user_role
+from utils.response_helpers import validation_error_response, forbidden_response, handle_exception
 
 notifications_bp = Blueprint('notifications', __name__)
 
@@ -9,22 +11,63 @@ notifications_bp = Blueprint('notifications', __name__)
 @require_auth
 def get_notifications():
     """
-    Get account notifications
+    Get account notifications (newest first; pass ?before=<last id> for the next page)
     """
     try:
-        return NotificationsController.get_account_notifications()
+        limit = request.args.get('limit', 20, type=int)
+        before = request.args.get('before')
+        unread_only = request.args.get('unread', 'false').lower() in ('1', 'true', 'yes')
+        
+        if limit < 1 or limit > 100:
+            return validation_error_response({"limit": "Limit must be between 1 and 100"})
+        if before and not ObjectId.is_valid(before):
+            return validation_error_response({"before": "Invalid notification ID"})
+        
+        return NotificationsController.get_account_notifications(
+            get_current_user_id(),
+            limit=limit,
+            before=before,
+            unread_only=unread_only
+        )
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@notifications_bp.route('/api/notifications/unread-count', methods=['GET'])
+@require_auth
+def get_unread_count():
+    """
+    Get the unread notification count
+    """
+    try:
+        return NotificationsController.get_unread_count(get_current_user_id())
     
     except Exception as e:
         return handle_exception(e)
 
-@notifications_bp.route('/api/notifications/<int:notification_id>/read', methods=['PATCH'])
+@notifications_bp.route('/api/notifications/<string:notification_id>/read', methods=['PATCH'])
 @require_auth
 def mark_notification_read(notification_id):
     """
     Mark notification as read
     """
     try:
-        return NotificationsController.mark_notification_as_read(notification_id)
+        if not ObjectId.is_valid(notification_id):
+            return validation_error_response({"notification_id": "Invalid notification ID"})
+        
+        return NotificationsController.mark_notification_as_read(notification_id, get_current_user_id())
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@notifications_bp.route('/api/notifications/read-all', methods=['POST'])
+@require_auth
+def mark_all_notifications_read():
+    """
+    Mark all notifications as read
+    """
+    try:
+        return NotificationsController.mark_all_as_read(get_current_user_id())
     
     except Exception as e:
         return handle_exception(e)
@@ -33,7 +76,7 @@ def mark_notification_read(notification_id):
 @require_auth
 def create_notification():
     """
-    Create notification
+    Create notification (admins may target many accounts via account_ids)
     """
     try:
         data = request.get_json()
@@ -51,27 +94,48 @@ def create_notification():
         
         # Validate notification type
         notification_type = data.get('type')
-        valid_types = ['info', 'success', 'warning', 'error', 'survey_invitation', 'reminder']
+        valid_types = Notification.TYPES
         
         if notification_type and notification_type not in valid_types:
             errors['type'] = f"Notification type must be one of: {', '.join(valid_types)}"
         
+        priority = data.get('priority', 'normal')
+        if priority not in Notification.PRIORITIES:
+            errors['priority'] = f"Priority must be one of: {', '.join(Notification.PRIORITIES)}"
+        
+        account_ids = data.get('account_ids')
+        if account_ids is not None:
+            if not isinstance(account_ids, list) or not account_ids:
+                errors['account_ids'] = "Account IDs must be a non-empty list"
+            elif not all(ObjectId.is_valid(str(account_id)) for account_id in account_ids):
+                errors['account_ids'] = "Account IDs must be valid IDs"
+        
         if errors:
             return validation_error_response(errors)
         
-        return NotificationsController.create_notification(data)
+        current_user_id = get_current_user_id()
+        if account_ids is None:
+            account_ids = [current_user_id]
+        elif get_current_user_role() not in ('domain_admin', 'system_admin') and \
+                any(str(account_id) != str(current_user_id) for account_id in account_ids):
+            return forbidden_response("Only administrators can notify other accounts")
+        
+        return NotificationsController.create_notification(data, [str(account_id) for account_id in account_ids])
     
     except Exception as e:
         return handle_exception(e)
 
-@notifications_bp.route('/api/notifications/<int:notification_id>', methods=['DELETE'])
+@notifications_bp.route('/api/notifications/<string:notification_id>', methods=['DELETE'])
 @require_auth
 def delete_notification(notification_id):
     """
     Delete notification
     """
     try:
-        return NotificationsController.delete_notification(notification_id)
+        if not ObjectId.is_valid(notification_id):
+            return validation_error_response({"notification_id": "Invalid notification ID"})
+        
+        return NotificationsController.delete_notification(notification_id, get_current_user_id())
     
     except Exception as e:
         return handle_exception(e)
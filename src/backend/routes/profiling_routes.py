@@ -0,0 +1,47 @@
+from flask import Blueprint, request
+from controllers.profiling_controller import ProfilingController
+from middleware.auth_middleware import require_system_admin_role
+from utils.response_helpers import validation_error_response, handle_exception
+
+profiling_bp = Blueprint('profiling', __name__)
+
+@profiling_bp.route('/api/admin/profiles', methods=['GET'])
+@require_system_admin_role
+def get_profiles():
+    """
+    List recent request profiles (system admin)
+    """
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        
+        if limit < 1 or limit > 500:
+            return validation_error_response({"limit": "Limit must be between 1 and 500"})
+        
+        return ProfilingController.get_profiles(limit)
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@profiling_bp.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+@require_system_admin_role
+def get_profile(profile_id):
+    """
+    Get a request profile's summary (system admin)
+    """
+    try:
+        return ProfilingController.get_profile(profile_id)
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@profiling_bp.route('/api/admin/profiles/<profile_id>/download', methods=['GET'])
+@require_system_admin_role
+def download_profile(profile_id):
+    """
+    Download a request profile's pstats or collapsed-stack file (system admin)
+    """
+    try:
+        return ProfilingController.download_profile(profile_id)
+    
+    except Exception as e:
+        return handle_exception(e)
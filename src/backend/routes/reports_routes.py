@@ -1,6 +1,6 @@
 from flask import Blueprint, request
 from controllers.reports_controller import ReportsController
-from middleware.auth_middleware import require_domain_admin_role, require_admin_roles
+from middleware.auth_middleware import require_domain_admin_role, require_admin_roles, get_current_user_id
 from utils.response_helpers import validation_error_response, handle_exception
 from utils.pagination import get_pagination_params, get_filter_params
 
@@ -115,7 +115,22 @@ def generate_report(report_id):
     try:
         data = request.get_json() or {}
         
-        return ReportsController.generate_report(report_id, data)
+        # Validate report type and its target
+        report_type = data.get('report_type')
+        valid_types = ['subject', 'survey_run']
+        
+        if report_type not in valid_types:
+            return validation_error_response({
+                'report_type': f"Report type must be one of: {', '.join(valid_types)}"
+            })
+        
+        target_field = f"{report_type}_id"
+        if not data.get(target_field):
+            return validation_error_response({
+                target_field: f"{target_field.replace('_', ' ').title()} is required"
+            })
+        
+        return ReportsController.generate_report(report_id, data, requested_by=get_current_user_id())
     
     except Exception as e:
         return handle_exception(e)
@@ -128,8 +143,33 @@ def get_report_instances(report_id):
     """
     try:
         page, limit = get_pagination_params()
+        filters = get_filter_params()
         
-        return ReportsController.get_report_instances(report_id, page, limit)
+        return ReportsController.get_report_instances(report_id, page, limit, filters)
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@reports_bp.route('/api/reports/instances/<instance_id>', methods=['GET'])
+@require_admin_roles
+def get_report_instance(instance_id):
+    """
+    Get report instance generation status
+    """
+    try:
+        return ReportsController.get_report_instance(instance_id)
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@reports_bp.route('/api/reports/instances/<instance_id>/artifact', methods=['GET'])
+@require_admin_roles
+def download_report_artifact(instance_id):
+    """
+    Download a generated report artifact
+    """
+    try:
+        return ReportsController.download_report_artifact(instance_id)
     
     except Exception as e:
         return handle_exception(e)
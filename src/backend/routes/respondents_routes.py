@@ -1,5 +1,7 @@
-from flask import Blueprint, request
+from flask import Blueprint, request, current_app
+from flask_jwt_extended import get_jwt_identity
 from controllers.respondents_controller import RespondentsController
+from database.models.respondent_model import RespondentModel
 from middleware.auth_middleware import require_auth
 from utils.response_helpers import validation_error_response, handle_exception
 
@@ -46,10 +48,7 @@ def create_respondent():
         
         # Validate relationship
         relationship = data.get('relationship')
-        valid_relationships = [
-            'Peer', 'Subordinate', 'Boss', 'Customer', 'Previous Employer', 
-            'Super Boss', 'Parent', 'Teacher', 'Counseller', 'Third Party', 'other'
-        ]
+        valid_relationships = RespondentModel.VALID_RELATIONSHIPS
         
         if relationship and relationship not in valid_relationships:
             errors['relationship'] = f"Relationship must be one of: {', '.join(valid_relationships)}"
@@ -116,3 +115,37 @@ def delete_respondent(respondent_id):
     
     except Exception as e:
         return handle_exception(e)
+
+@respondents_bp.route('/api/respondents/import', methods=['POST'])
+@require_auth
+def import_respondents():
+    """
+    Bulk import respondents from a CSV/XLSX file (multipart field "file")
+    """
+    try:
+        # Import files may exceed the default request cap; the body is spooled to disk and parsed as a stream
+        request.max_content_length = current_app.config.get('IMPORT_MAX_SIZE')
+        
+        if 'file' not in request.files:
+            return validation_error_response({"file": "No file provided"})
+        
+        file = request.files['file']
+        if not file.filename.lower().endswith(('.csv', '.xlsx', '.xlsm')):
+            return validation_error_response({"file": "File must be a .csv or .xlsx file"})
+        
+        on_duplicate = request.form.get('on_duplicate', 'skip')
+        if on_duplicate not in ('skip', 'update'):
+            return validation_error_response({"on_duplicate": "On duplicate must be one of: skip, update"})
+        
+        dry_run = request.form.get('dry_run', 'false').lower() in ('1', 'true', 'yes')
+        
+        return RespondentsController.import_respondents(
+            file,
+            get_jwt_identity(),
+            batch_size=current_app.config.get('IMPORT_BATCH_SIZE'),
+            on_duplicate=on_duplicate,
+            dry_run=dry_run
+        )
+    
+    except Exception as e:
+        return handle_exception(e)
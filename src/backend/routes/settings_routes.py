@@ -1,6 +1,6 @@
 from flask import Blueprint, request
 from controllers.settings_controller import SettingsController
-from middleware.auth_middleware import require_system_admin_role
+from middleware.auth_middleware import require_system_admin_role, require_auth, get_current_user_id
 from utils.response_helpers import validation_error_response, handle_exception
 from utils.pagination import get_pagination_params, get_filter_params
 
@@ -33,7 +33,7 @@ def update_setting(setting_key):
         if not data or 'value' not in data:
             return validation_error_response({"value": "Setting value is required"})
         
-        return SettingsController.update_setting(setting_key, data.get('value'))
+        return SettingsController.update_setting(setting_key, data.get('value'), updated_by=get_current_user_id())
     
     except Exception as e:
         return handle_exception(e)
@@ -45,7 +45,7 @@ def toggle_setting(setting_key):
     Toggle boolean settings
     """
     try:
-        return SettingsController.toggle_boolean_setting(setting_key)
+        return SettingsController.toggle_boolean_setting(setting_key, updated_by=get_current_user_id())
     
     except Exception as e:
         return handle_exception(e)
@@ -57,7 +57,7 @@ def reset_setting(setting_key):
     Reset setting to default
     """
     try:
-        return SettingsController.reset_setting_to_default(setting_key)
+        return SettingsController.reset_setting_to_default(setting_key, updated_by=get_current_user_id())
     
     except Exception as e:
         return handle_exception(e)
@@ -73,3 +73,115 @@ def get_setting_categories():
     
     except Exception as e:
         return handle_exception(e)
+
+@settings_bp.route('/api/settings/account', methods=['GET'])
+@require_auth
+def get_account_settings():
+    """
+    Get the current account's settings
+    """
+    try:
+        page, limit = get_pagination_params()
+        filters = get_filter_params()
+        
+        return SettingsController.get_all_settings(page, limit, filters, account_id=get_current_user_id())
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@settings_bp.route('/api/settings/account/<string:setting_key>', methods=['PUT'])
+@require_auth
+def update_account_setting(setting_key):
+    """
+    Update one of the current account's settings
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'value' not in data:
+            return validation_error_response({"value": "Setting value is required"})
+        
+        current_user_id = get_current_user_id()
+        return SettingsController.update_setting(setting_key, data.get('value'), account_id=current_user_id, updated_by=current_user_id)
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@settings_bp.route('/api/settings/account/<string:setting_key>/toggle', methods=['PATCH'])
+@require_auth
+def toggle_account_setting(setting_key):
+    """
+    Toggle one of the current account's boolean settings
+    """
+    try:
+        current_user_id = get_current_user_id()
+        return SettingsController.toggle_boolean_setting(setting_key, account_id=current_user_id, updated_by=current_user_id)
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@settings_bp.route('/api/settings/account/reset/<string:setting_key>', methods=['POST'])
+@require_auth
+def reset_account_setting(setting_key):
+    """
+    Reset one of the current account's settings to default
+    """
+    try:
+        current_user_id = get_current_user_id()
+        return SettingsController.reset_setting_to_default(setting_key, account_id=current_user_id, updated_by=current_user_id)
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@settings_bp.route('/api/settings/account/email-templates', methods=['GET'])
+@require_auth
+def get_account_email_templates():
+    """
+    List the email templates and the current account's overrides
+    """
+    try:
+        return SettingsController.get_email_templates(get_current_user_id())
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@settings_bp.route('/api/settings/account/email-templates/<string:template_name>', methods=['GET'])
+@require_auth
+def get_account_email_template(template_name):
+    """
+    Get the template source the current account uses
+    """
+    try:
+        return SettingsController.get_email_template(get_current_user_id(), template_name)
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@settings_bp.route('/api/settings/account/email-templates/<string:template_name>', methods=['PUT'])
+@require_auth
+def update_account_email_template(template_name):
+    """
+    Override an email template for the current account
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('source'), str) or not data['source'].strip():
+            return validation_error_response({"source": "Template source is required"})
+        
+        return SettingsController.update_email_template(get_current_user_id(), template_name, data['source'])
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@settings_bp.route('/api/settings/account/email-templates/<string:template_name>', methods=['DELETE'])
+@require_auth
+def reset_account_email_template(template_name):
+    """
+    Remove the current account's override of an email template
+    """
+    try:
+        return SettingsController.reset_email_template(get_current_user_id(), template_name)
+    
+    except Exception as e:
+        return handle_exception(e)
@@ -1,4 +1,4 @@
-from flask import Blueprint, request
+from flask import Blueprint, request, current_app
 from flask_jwt_extended import get_jwt_identity
 from controllers.subjects_controller import SubjectsController
 from middleware.auth_middleware import require_auth
@@ -122,3 +122,37 @@ def delete_subject(subject_id):
     
     except Exception as e:
         return handle_exception(e)
+
+@subjects_bp.route('/api/subjects/import', methods=['POST'])
+@require_auth
+def import_subjects():
+    """
+    Bulk import subjects from a CSV/XLSX file (multipart field "file")
+    """
+    try:
+        # Import files may exceed the default request cap; the body is spooled to disk and parsed as a stream
+        request.max_content_length = current_app.config.get('IMPORT_MAX_SIZE')
+        
+        if 'file' not in request.files:
+            return validation_error_response({"file": "No file provided"})
+        
+        file = request.files['file']
+        if not file.filename.lower().endswith(('.csv', '.xlsx', '.xlsm')):
+            return validation_error_response({"file": "File must be a .csv or .xlsx file"})
+        
+        on_duplicate = request.form.get('on_duplicate', 'skip')
+        if on_duplicate not in ('skip', 'update'):
+            return validation_error_response({"on_duplicate": "On duplicate must be one of: skip, update"})
+        
+        dry_run = request.form.get('dry_run', 'false').lower() in ('1', 'true', 'yes')
+        
+        return SubjectsController.import_subjects(
+            file,
+            get_jwt_identity(),
+            batch_size=current_app.config.get('IMPORT_BATCH_SIZE'),
+            on_duplicate=on_duplicate,
+            dry_run=dry_run
+        )
+    
+    except Exception as e:
+        return handle_exception(e)
@@ -5,7 +5,9 @@ Public routes for survey response submission (no authentication required)
 
 from flask import Blueprint, request
 from controllers.survey_response_controller import SurveyResponseController
-from middleware.auth_middleware import require_auth
+from bson import ObjectId
+from middleware.auth_middleware import require_auth, get_current_user_id
+from middleware.rate_limit_middleware import rate_limit
 from utils.response_helpers import validation_error_response, handle_exception
 from utils.logger import get_logger
 from utils.route_logger import log_route
@@ -13,12 +15,13 @@ from utils.route_logger import log_route
 survey_response_bp = Blueprint('survey_response', __name__)
 
 @survey_response_bp.route('/api/survey/respond/<response_token>', methods=['GET'])
+@rate_limit('survey_respond')
+@log_route(hot=True)
 def get_survey_by_token(response_token):
     """
     Get survey form by response token (PUBLIC - no authentication required)
     """
     logger = get_logger(__name__)
-    logger.info(f"=== ENTRY: GET /api/survey/respond/{response_token[:8]}... ===")
     
     try:
         if not response_token:
@@ -26,20 +29,20 @@ def get_survey_by_token(response_token):
             return validation_error_response({"token": "Response token is required"})
         
         result = SurveyResponseController.get_survey_by_token(response_token)
-        logger.info(f"=== EXIT: GET /api/survey/respond/{response_token[:8]}... - SUCCESS ===")
         return result
     
     except Exception as e:
-        logger.error(f"=== EXIT: GET /api/survey/respond/{response_token[:8]}... - ERROR: {str(e)} ===")
+        logger.error("=== EXIT: GET /api/survey/respond/%s... - ERROR: %s ===", response_token[:8], e)
         return handle_exception(e)
 
 @survey_response_bp.route('/api/survey/respond/<response_token>', methods=['POST'])
+@rate_limit('survey_respond')
+@log_route(hot=True)
 def submit_survey_response(response_token):
     """
     Submit survey response (PUBLIC - no authentication required)
     """
     logger = get_logger(__name__)
-    logger.info(f"=== ENTRY: POST /api/survey/respond/{response_token[:8]}... ===")
     
     try:
         if not response_token:
@@ -47,7 +50,6 @@ def submit_survey_response(response_token):
             return validation_error_response({"token": "Response token is required"})
         
         data = request.get_json()
-        logger.debug(f"Survey response data: {data}")
         
         # Basic validation
         if not data:
@@ -58,13 +60,38 @@ def submit_survey_response(response_token):
             logger.warning("Submit survey response failed: No responses provided")
             return validation_error_response({"responses": "Survey responses are required"})
         
-        logger.info(f"Submitting survey response for token: {response_token[:8]}...")
         result = SurveyResponseController.submit_survey_response(response_token, data)
-        logger.info(f"=== EXIT: POST /api/survey/respond/{response_token[:8]}... - SUCCESS ===")
         return result
     
     except Exception as e:
-        logger.error(f"=== EXIT: POST /api/survey/respond/{response_token[:8]}... - ERROR: {str(e)} ===")
+        logger.error("=== EXIT: POST /api/survey/respond/%s... - ERROR: %s ===", response_token[:8], e)
+        return handle_exception(e)
+
+@survey_response_bp.route('/api/survey-runs/progress/stream', methods=['GET'])
+@require_auth
+def stream_account_progress():
+    """
+    Live progress of the current account's active survey runs (Server-Sent Events)
+    """
+    try:
+        return SurveyResponseController.stream_account_progress(get_current_user_id())
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@survey_response_bp.route('/api/survey-runs/<survey_run_id>/progress/stream', methods=['GET'])
+@require_auth
+def stream_survey_run_progress(survey_run_id):
+    """
+    Live progress of a survey run (Server-Sent Events)
+    """
+    try:
+        if not ObjectId.is_valid(survey_run_id):
+            return validation_error_response({"survey_run_id": "Invalid survey run ID"})
+        
+        return SurveyResponseController.stream_survey_run_progress(survey_run_id)
+    
+    except Exception as e:
         return handle_exception(e)
 
 @survey_response_bp.route('/api/survey-runs/<survey_run_id>/responses', methods=['GET'])
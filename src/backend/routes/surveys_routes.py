@@ -1,6 +1,7 @@
-from flask import Blueprint, request
+from datetime import datetime
+from flask import Blueprint, request, current_app
 from controllers.surveys_controller import SurveysController
-from middleware.auth_middleware import require_domain_admin_role, require_admin_roles, require_auth
+from middleware.auth_middleware import require_domain_admin_role, require_admin_roles, require_auth, get_current_user_id, get_current_user_role
 from utils.response_helpers import validation_error_response, handle_exception
 from utils.pagination import get_pagination_params, get_filter_params
 from utils.logger import get_logger
@@ -236,7 +237,54 @@ def run_survey(survey_id):
     try:
         data = request.get_json()
         
-        return SurveysController.run_survey(survey_id, data)
+        current_user_id = get_current_user_id()
+        return SurveysController.run_survey(survey_id, data, current_user_id=current_user_id)
+    
+    except Exception as e:
+        return handle_exception(e)
+
+@surveys_bp.route('/api/surveys/<string:survey_id>/run/bulk', methods=['POST'])
+@require_auth
+@log_route
+def bulk_run_survey(survey_id):
+    """
+    Launch a survey for many subjects in one operation
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return validation_error_response({"request": "Request body is required"})
+        
+        errors = {}
+        if not data.get('due_date'):
+            errors['due_date'] = "Due date is required"
+        else:
+            try:
+                datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
+            except (ValueError, AttributeError):
+                errors['due_date'] = "Invalid due date format. Use ISO format."
+        
+        subjects = data.get('subjects')
+        max_subjects = current_app.config.get('BULK_LAUNCH_MAX_SUBJECTS')
+        if not subjects or not isinstance(subjects, list):
+            errors['subjects'] = "At least one subject is required"
+        elif len(subjects) > max_subjects:
+            errors['subjects'] = f"At most {max_subjects} subjects can be launched at once"
+        elif not all(isinstance(subject, dict) for subject in subjects):
+            errors['subjects'] = "Each subject must be an object with subject_id and respondents"
+        
+        if errors:
+            return validation_error_response(errors)
+        
+        current_user_id = get_current_user_id()
+        # Account users launch into their own account; admins launch into the survey's account
+        current_account_id = current_user_id if get_current_user_role() == 'account' else None
+        return SurveysController.bulk_run_survey(
+            survey_id, data,
+            current_user_id=current_user_id,
+            current_account_id=current_account_id
+        )
     
     except Exception as e:
         return handle_exception(e)
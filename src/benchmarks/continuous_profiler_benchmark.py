@@ -0,0 +1,110 @@
+"""
+Overhead benchmark for the continuous sampling profiler
+Serializes synthetic survey documents (to_dict + JSON, the typical list
+endpoint work) on several threads, with idle threads alongside as in a
+threaded worker, and compares throughput with the profiler off and on.
+Rounds alternate so drift affects both sides equally; the median is used.
+
+Usage (from src/):
+    python benchmarks/continuous_profiler_benchmark.py [--hz 100] [--rounds 5] [--seconds 3] [--max-overhead 2]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+# Add the src and backend directories to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from database.base_model import BaseModel
+from services.profiling import ContinuousProfiler
+
+def build_documents(count):
+    """Build synthetic survey documents"""
+    now = datetime.utcnow()
+    return [
+        BaseModel(
+            _id=ObjectId(),
+            account_id=ObjectId(),
+            title=f'360 Leadership Review {i}',
+            status='Active',
+            traits=[str(ObjectId()) for _ in range(5)],
+            due_date=now + timedelta(days=14),
+            respondents_count=i % 40
+        )
+        for i in range(count)
+    ]
+
+def run_workload(documents, threads, seconds):
+    """Serialize documents on several threads for a fixed time; returns documents per second"""
+    done = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def work(slot):
+        while time.perf_counter() < deadline:
+            json.dumps([document.to_dict() for document in documents])
+            done[slot] += len(documents)
+
+    workers = [threading.Thread(target=work, args=(slot,)) for slot in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(done) / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description='Continuous profiler overhead benchmark')
+    parser.add_argument('--hz', type=int, default=100, help='Sampling rate')
+    parser.add_argument('--mode', default='cpu', choices=['cpu', 'wall'], help='Profiler mode')
+    parser.add_argument('--threads', type=int, default=4, help='Busy worker threads')
+    parser.add_argument('--idle-threads', type=int, default=16, help='Idle threads (as in a threaded worker)')
+    parser.add_argument('--rounds', type=int, default=5, help='Alternating off/on rounds')
+    parser.add_argument('--seconds', type=float, default=3, help='Seconds per measurement')
+    parser.add_argument('--max-overhead', type=float, default=2.0, help='Fail if the overhead exceeds this (percent)')
+    args = parser.parse_args()
+
+    documents = build_documents(200)
+    stop_idle = threading.Event()
+    for _ in range(args.idle_threads):
+        threading.Thread(target=stop_idle.wait, daemon=True).start()
+
+    profiler = ContinuousProfiler()
+    profiler.configure(hz=args.hz, mode=args.mode, window_seconds=3600, directory=tempfile.mkdtemp(prefix='profiler-bench-'))
+
+    # Warm up
+    run_workload(documents, args.threads, 0.5)
+
+    baseline, profiled, sampling_share = [], [], []
+    for round_number in range(args.rounds):
+        baseline.append(run_workload(documents, args.threads, args.seconds))
+
+        profiler.start()
+        profiled.append(run_workload(documents, args.threads, args.seconds))
+        sampling_share.append(profiler.get_metrics()['overhead_percent'])
+        samples = profiler.get_metrics()['samples']
+        profiler.stop()
+
+        print(f"round {round_number + 1}: off {baseline[-1]:,.0f} docs/s, on {profiled[-1]:,.0f} docs/s "
+              f"({samples} samples, sampler busy {sampling_share[-1]:.2f}% of wall time)")
+    stop_idle.set()
+
+    overhead = (1 - statistics.median(profiled) / statistics.median(baseline)) * 100
+    print(f"\nthroughput overhead at {args.hz}Hz ({args.mode} mode): {overhead:.2f}% (median of {args.rounds} rounds)")
+    print(f"sampler time share: {statistics.median(sampling_share):.2f}%")
+
+    if overhead > args.max_overhead:
+        print(f"FAIL: overhead above {args.max_overhead}%")
+        sys.exit(1)
+    print(f"OK: overhead within {args.max_overhead}%")
+
+if __name__ == '__main__':
+    main()
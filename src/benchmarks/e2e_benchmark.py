@@ -0,0 +1,267 @@
+"""
+End-to-end benchmark for the hot API endpoints
+Seeds a synthetic dataset into a dedicated database on a local mongod, then
+drives the app in-process (Flask test client, full middleware stack) through
+list surveys, token form load, response submit, run launch, run statistics,
+run analytics and CSV export. Reports throughput, latency percentiles and
+MongoDB commands per request as JSON, so runs can be diffed.
+
+The target database is emptied before seeding; never point it at real data.
+
+Usage (from src/):
+    python benchmarks/e2e_benchmark.py [--accounts 10] [--subjects 50] [--workers 4] [--requests 200] [--output report.json]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pymongo import monitoring
+
+# Add the src and backend directories to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from benchmarks.reporting import QueryCounter, summarize_latencies, summarize_counts, environment_info, write_report
+from config import Config
+
+SCENARIOS = ['list_surveys', 'form_load', 'response_submit', 'run_launch', 'run_statistics', 'run_analytics', 'export_csv']
+
+def build_app(args, query_counter):
+    """Create the app against the benchmark database, with background work switched off"""
+    Config.MONGO_URI = args.mongo_uri
+    Config.MONGODB_DB_NAME = args.db
+    Config.SCHEDULER_ENABLED = False
+    Config.RATE_LIMIT_ENABLED = False
+    Config.LOG_LEVEL = args.log_level
+    Config.LOG_DIR = tempfile.mkdtemp(prefix='e2e-bench-logs-')
+    Config.EXPORT_DIR = tempfile.mkdtemp(prefix='e2e-bench-exports-')
+    Config.TRACING_ENABLED = False
+    Config.PROFILING_SAMPLE_RATE = 0
+
+    # Registered before the app creates its MongoClient so every command is seen
+    monitoring.register(query_counter)
+
+    from app import create_app
+    return create_app()
+
+def collect_handles(db, rng, count):
+    """Pick the ids and tokens each scenario needs from the seeded data"""
+    surveys = {survey['_id']: survey for survey in db.surveys.find({'status': 'approved'}, {'questions.id': 1, 'account_id': 1})}
+
+    pending = list(db.survey_runs.aggregate([
+        {'$match': {'status': 'active'}},
+        {'$unwind': '$respondents'},
+        {'$match': {'respondents.status': 'pending'}},
+        {'$project': {'survey_id': 1, 'token': '$respondents.response_token'}},
+        {'$limit': count * 20}
+    ]))
+    rng.shuffle(pending)
+    form_tokens = [entry['token'] for entry in pending[:count]]
+    submissions = [
+        (entry['token'], {question['id']: rng.randint(1, 5) for question in surveys[entry['survey_id']]['questions']})
+        for entry in pending[count:2 * count]
+    ]
+
+    runs = [run['_id'] for run in db.survey_runs.find({}, {'_id': 1}).limit(count * 20)]
+    rng.shuffle(runs)
+    survey_ids = sorted(surveys)
+
+    # (survey, subject) pairs without a run, with the subject's respondents weighted to 100
+    launches = []
+    for survey_id in rng.sample(survey_ids, len(survey_ids)):
+        if len(launches) >= count:
+            break
+        running = set(db.survey_runs.distinct('subject_id', {'survey_id': survey_id}))
+        for subject in db.subjects.find({'account_id': surveys[survey_id]['account_id']}, {'_id': 1}):
+            if subject['_id'] in running:
+                continue
+            respondents = [respondent['_id'] for respondent in db.respondents.find({'subject_id': subject['_id']}, {'_id': 1})]
+            if not respondents or len(respondents) >= 100:
+                continue
+            weights = [100 // len(respondents)] * len(respondents)
+            weights[0] += 100 - sum(weights)
+            launches.append((survey_id, subject['_id'], surveys[survey_id]['account_id'], [
+                {'respondent_id': str(respondent_id), 'weight': weight, 'relationship': 'Peer'}
+                for respondent_id, weight in zip(respondents, weights)
+            ]))
+            if len(launches) >= count:
+                break
+
+    return {
+        'survey_pages': max(1, len(survey_ids) // 20),
+        'form_tokens': form_tokens,
+        'submissions': submissions,
+        'launches': launches,
+        'runs': runs[:count],
+        'export_surveys': survey_ids
+    }
+
+def build_requests(scenario, handles, tokens, count, rng):
+    """The (method, path, options) list a scenario replays"""
+    admin = {'Authorization': f"Bearer {tokens['admin']}"}
+    if scenario == 'list_surveys':
+        return [('GET', f"/api/surveys?page={rng.randint(1, handles['survey_pages'])}&limit=20", {'headers': admin}) for _ in range(count)]
+    if scenario == 'form_load':
+        return [('GET', f'/api/survey/respond/{token}', {}) for token in handles['form_tokens'][:count]]
+    if scenario == 'response_submit':
+        return [
+            ('POST', f'/api/survey/respond/{token}', {'json': {'responses': responses}})
+            for token, responses in handles['submissions'][:count]
+        ]
+    if scenario == 'run_launch':
+        due_date = (datetime.utcnow() + timedelta(days=21)).replace(microsecond=0).isoformat()
+        return [
+            ('POST', f'/api/surveys/{survey_id}/run', {
+                'headers': {'Authorization': f"Bearer {tokens['accounts'][str(account_id)]}"},
+                'json': {'subject_id': str(subject_id), 'due_date': due_date, 'respondents': respondents}
+            })
+            for survey_id, subject_id, account_id, respondents in handles['launches'][:count]
+        ]
+    if scenario == 'run_statistics':
+        return [('GET', f'/api/survey-runs/{run_id}/responses', {'headers': admin}) for run_id in handles['runs'][:count]]
+    if scenario == 'run_analytics':
+        return [('GET', f'/api/survey-runs/{run_id}/analytics', {'headers': admin}) for run_id in handles['runs'][:count]]
+    if scenario == 'export_csv':
+        surveys = handles['export_surveys']
+        return [
+            ('POST', '/api/analytics/export', {'headers': admin, 'json': {'survey_id': str(surveys[i % len(surveys)]), 'format': 'csv'}})
+            for i in range(min(count, len(surveys)))
+        ]
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+def run_scenario(client, query_counter, requests, warmup):
+    """Replay requests one at a time; the first `warmup` are not measured"""
+    latencies, queries, statuses = [], [], {}
+    errors = 0
+    started = time.perf_counter()
+    for i, (method, path, options) in enumerate(requests):
+        query_counter.reset()
+        request_started = time.perf_counter()
+        response = client.open(path, method=method, **options)
+        response.get_data()  # drain streamed bodies (exports)
+        elapsed = time.perf_counter() - request_started
+        response.close()
+        if i < warmup:
+            started = time.perf_counter()
+            continue
+        latencies.append(elapsed)
+        queries.append(query_counter.count)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        if response.status_code >= 400:
+            errors += 1
+    duration = time.perf_counter() - started
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'status_codes': statuses,
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(len(latencies) / duration, 2) if duration > 0 and latencies else 0,
+        'latency': summarize_latencies(latencies),
+        'queries_per_request': summarize_counts(queries)
+    }
+
+def run(app, args, scenarios, query_counter):
+    """Seed (unless skipped), replay every scenario and build the report"""
+    from flask_jwt_extended import create_access_token
+    from database.connection import get_db
+    from database.seeds.synthetic_data import make_scale, seed_synthetic_data, generate_synthetic_data
+    from services.password_hasher import password_hasher
+
+    scale = make_scale(
+        accounts=args.accounts,
+        subjects_per_account=args.subjects,
+        respondents_per_subject=args.respondents,
+        surveys_per_account=args.surveys,
+        runs_per_subject=args.runs,
+        questions_per_survey=args.questions,
+        response_rate=args.response_rate
+    )
+    rng = random.Random(args.seed)
+    total = args.requests + args.warmup
+
+    with app.app_context():
+        db = get_db()
+        seeded = None
+        if not args.skip_seed:
+            started = time.perf_counter()
+            password_hash = password_hasher.hash('benchmark-password')
+            if args.workers > 1:
+                counts = generate_synthetic_data(args.mongo_uri, args.db, scale, password_hash, seed=args.seed, workers=args.workers, drop=True)
+            else:
+                counts = seed_synthetic_data(db, scale, password_hash, seed=args.seed, drop=True)
+            seeded = {'documents': counts, 'seconds': round(time.perf_counter() - started, 2)}
+            print(f"seeded {sum(counts.values()):,} documents in {seeded['seconds']}s")
+
+        handles = collect_handles(db, rng, total)
+        tokens = {
+            'admin': create_access_token(identity='benchmark-admin', additional_claims={'role': 'system_admin', 'email': 'admin@synthetic.example.com'}),
+            'accounts': {
+                str(account['_id']): create_access_token(identity=str(account['_id']), additional_claims={'role': 'account', 'email': account['email']})
+                for account in db.accounts.find({'_id': {'$in': list({launch[2] for launch in handles['launches']})}}, {'email': 1})
+            }
+        }
+        environment = environment_info(db)
+
+    client = app.test_client()
+    results = {}
+    for scenario in scenarios:
+        requests = build_requests(scenario, handles, tokens, total, rng)
+        if len(requests) <= args.warmup:
+            print(f"{scenario:16} skipped: not enough data for {total} requests")
+            results[scenario] = {'skipped': 'not enough data'}
+            continue
+        results[scenario] = result = run_scenario(client, query_counter, requests, args.warmup)
+        latency = result['latency']
+        print(f"{scenario:16} {result['throughput_rps']:>8.1f} req/s  p50 {latency['p50_ms']:>8.2f}ms  "
+              f"p95 {latency['p95_ms']:>8.2f}ms  p99 {latency['p99_ms']:>8.2f}ms  "
+              f"queries {result['queries_per_request']['mean']:>6.1f}  errors {result['errors']}")
+
+    return {
+        'benchmark': 'e2e',
+        'scale': scale,
+        'seed': args.seed,
+        'seeding': seeded,
+        'requests_per_scenario': args.requests,
+        'warmup': args.warmup,
+        'environment': environment,
+        'scenarios': results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end API benchmark on a synthetic dataset')
+    parser.add_argument('--mongo-uri', default=os.environ.get('BENCHMARK_MONGODB_URI', 'mongodb://localhost:27017'), help='Local mongod')
+    parser.add_argument('--db', default='ikenei_benchmark', help='Benchmark database (emptied before seeding)')
+    parser.add_argument('--accounts', type=int, default=10, help='Accounts to generate')
+    parser.add_argument('--subjects', type=int, default=50, help='Subjects per account')
+    parser.add_argument('--respondents', type=int, default=8, help='Respondents per subject')
+    parser.add_argument('--surveys', type=int, default=4, help='Approved surveys per account')
+    parser.add_argument('--runs', type=int, default=1, help='Survey runs per subject')
+    parser.add_argument('--questions', type=int, default=20, help='Questions per survey')
+    parser.add_argument('--response-rate', type=float, default=0.6, help='Share of run respondents who already responded')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (same seed and scale = same data)')
+    parser.add_argument('--skip-seed', action='store_true', help='Reuse the data already in --db')
+    parser.add_argument('--workers', type=int, default=1, help='Generator processes for seeding (large scales)')
+    parser.add_argument('--requests', type=int, default=200, help='Measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per scenario')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated subset of: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--log-level', default='WARNING', help='App log level during the run')
+    parser.add_argument('--output', default='e2e-benchmark.json', help='JSON report path')
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    query_counter = QueryCounter()
+    app = build_app(args, query_counter)
+    report = run(app, args, scenarios, query_counter)
+    print(f"\nreport written to {write_report(report, args.output)}")
+
+if __name__ == '__main__':
+    main()
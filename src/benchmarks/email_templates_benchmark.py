@@ -0,0 +1,75 @@
+"""
+Micro-benchmark for email template rendering
+Renders 10k survey invitations per-recipient and in bulk
+
+Usage (from src/):
+    python benchmarks/email_templates_benchmark.py [--count 10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add the src and backend directories to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.email_service import EmailService
+
+def build_invitations(count):
+    """Build synthetic invitation payloads"""
+    due_date = datetime.utcnow() + timedelta(days=14)
+    return [
+        {
+            'respondent_email': f'respondent{i}@example.com',
+            'respondent_name': f'Respondent {i}',
+            'subject_name': f'Subject {i % 250}',
+            'survey_title': '360 Leadership Review',
+            'response_token': f'token-{i:08d}',
+            'due_date': due_date
+        }
+        for i in range(count)
+    ]
+
+def bench_single(service, invitations):
+    """Render each invitation through the per-recipient helpers"""
+    start = time.perf_counter()
+    for invitation in invitations:
+        link = service._survey_link(invitation['response_token'])
+        due_date = service._format_due_date(invitation['due_date'])
+        service._create_invitation_html(
+            invitation['respondent_name'], invitation['subject_name'],
+            invitation['survey_title'], link, due_date
+        )
+        service._create_invitation_text(
+            invitation['respondent_name'], invitation['subject_name'],
+            invitation['survey_title'], link, due_date
+        )
+    return time.perf_counter() - start
+
+def bench_bulk(service, invitations):
+    """Render all invitations with one bulk call"""
+    start = time.perf_counter()
+    service.render_survey_invitations(invitations)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Email template rendering benchmark')
+    parser.add_argument('--count', type=int, default=10000, help='Number of invitations to render')
+    args = parser.parse_args()
+
+    service = EmailService()
+    invitations = build_invitations(args.count)
+
+    # Warm up
+    service.render_survey_invitations(invitations[:100])
+
+    for name, bench in [('per-recipient', bench_single), ('bulk', bench_bulk)]:
+        elapsed = bench(service, invitations)
+        print(f"{name:>14}: {args.count} invitations in {elapsed:.3f}s "
+              f"({args.count / elapsed:,.0f} msg/s, {elapsed / args.count * 1e6:.1f} us/msg)")
+
+if __name__ == '__main__':
+    main()
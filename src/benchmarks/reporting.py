@@ -0,0 +1,101 @@
+"""
+Shared helpers for the benchmark scripts: latency percentiles, per-thread
+MongoDB command counting and JSON reports that diff cleanly between runs
+"""
+
+import json
+import math
+import os
+import platform
+import subprocess
+import threading
+from datetime import datetime
+from pymongo import monitoring
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize_latencies(seconds):
+    """min/mean/p50/p95/p99/max in milliseconds"""
+    values = sorted(seconds)
+    if not values:
+        return {}
+    return {
+        'min_ms': round(values[0] * 1000, 3),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3),
+        'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3)
+    }
+
+def summarize_counts(counts):
+    """min/mean/max/total of per-request counts"""
+    if not counts:
+        return {}
+    return {
+        'min': min(counts),
+        'mean': round(sum(counts) / len(counts), 2),
+        'max': max(counts),
+        'total': sum(counts)
+    }
+
+class QueryCounter(monitoring.CommandListener):
+    """
+    Counts MongoDB commands issued by the current thread. Register it with
+    pymongo.monitoring.register() before the app creates its MongoClient.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def reset(self):
+        self._local.count = 0
+
+    @property
+    def count(self):
+        return getattr(self._local, 'count', 0)
+
+    def started(self, event):
+        self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def environment_info(db=None):
+    """Where the numbers came from (kept short so reports diff well)"""
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(terse=True),
+        'cpus': os.cpu_count()
+    }
+    try:
+        info['git_commit'] = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except Exception:
+        info['git_commit'] = None
+    if db is not None:
+        try:
+            info['mongodb'] = db.client.server_info().get('version')
+        except Exception:
+            info['mongodb'] = None
+    return info
+
+def write_report(report, path):
+    """Write a report as sorted, indented JSON"""
+    report = {'generated_at': datetime.utcnow().replace(microsecond=0).isoformat() + 'Z', **report}
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as output:
+        json.dump(report, output, indent=2, sort_keys=True, default=str)
+        output.write('\n')
+    return path
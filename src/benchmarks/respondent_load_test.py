@@ -0,0 +1,289 @@
+"""
+Load test for the public respondent flow
+Replays the respondent journey against a running server over HTTP: load the
+form by token (GET), think, submit ratings for every question on the form
+(POST), think, then take the next invitation. Virtual users ramp up at
+--spawn-rate until --users are active and run until --duration elapses or
+the tokens run out (each submission consumes one).
+
+Reports per-step throughput, latency percentiles, status codes, error rates
+and MongoDB commands per request as JSON. Query counts need the server to
+run with METRICS_QUERY_COUNT_HEADER=true. The public endpoints are rate
+limited per client IP. Either run the server with RATE_LIMIT_ENABLED=false,
+or give each virtual user its own address with --spoof-clients and
+RATE_LIMIT_TRUSTED_PROXIES=1.
+
+Tokens come from --tokens-file (one per line) or straight from the
+database's pending invitations (--mongo-uri/--db), e.g. after
+`flask seed-synthetic`.
+
+Usage (from src/):
+    python benchmarks/respondent_load_test.py --base-url http://localhost:5000 --db ikenei_benchmark \\
+        [--users 200] [--spawn-rate 20] [--duration 300] [--think-time 5,30] [--output load-test.json]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.reporting import summarize_latencies, summarize_counts, environment_info, write_report
+
+STEPS = ['form_load', 'response_submit']
+
+class StepStats:
+    """Thread-safe latency, status and query samples per journey step"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {step: {'latencies': [], 'queries': [], 'statuses': {}, 'errors': 0} for step in STEPS}
+        self.journeys = 0
+
+    def record(self, step, elapsed, status, queries):
+        """status is the HTTP status, or an exception name for transport failures"""
+        with self._lock:
+            sample = self.samples[step]
+            sample['latencies'].append(elapsed)
+            if queries is not None:
+                sample['queries'].append(queries)
+            sample['statuses'][str(status)] = sample['statuses'].get(str(status), 0) + 1
+            if not isinstance(status, int) or status >= 400:
+                sample['errors'] += 1
+
+    def journey_done(self):
+        with self._lock:
+            self.journeys += 1
+
+    def summary(self, duration):
+        with self._lock:
+            steps = {}
+            for step, sample in self.samples.items():
+                count = len(sample['latencies'])
+                steps[step] = {
+                    'requests': count,
+                    'errors': sample['errors'],
+                    'error_rate': round(sample['errors'] / count, 4) if count else 0,
+                    'status_codes': dict(sample['statuses']),
+                    'throughput_rps': round(count / duration, 2) if duration > 0 else 0,
+                    'latency': summarize_latencies(sample['latencies']),
+                    'queries_per_request': summarize_counts(sample['queries']) or None
+                }
+            return steps, self.journeys
+
+class RespondentUser(threading.Thread):
+    """One virtual respondent working through invitations on a keep-alive connection"""
+
+    def __init__(self, number, args, tokens, stats, stop):
+        super().__init__(name=f'respondent-{number}', daemon=True)
+        self.args = args
+        self.tokens = tokens
+        self.stats = stats
+        self.stop = stop
+        self.rng = random.Random(args.seed * 100003 + number)
+        self.headers = {'Accept': 'application/json'}
+        if args.spoof_clients:
+            self.headers['X-Forwarded-For'] = f'10.{number // 65536 % 256}.{number // 256 % 256}.{number % 256}'
+        target = urlsplit(args.base_url)
+        self.connection_class = http.client.HTTPSConnection if target.scheme == 'https' else http.client.HTTPConnection
+        self.host = target.netloc
+        self.prefix = target.path.rstrip('/')
+        self.connection = None
+
+    def run(self):
+        try:
+            while not self.stop.is_set():
+                try:
+                    token = self.tokens.get_nowait()
+                except queue.Empty:
+                    return
+                self.journey(token)
+                self.think()
+        finally:
+            if self.connection:
+                self.connection.close()
+
+    def journey(self, token):
+        path = f'{self.prefix}/api/survey/respond/{token}'
+        status, body = self.request('form_load', 'GET', path)
+        if status != 200 or self.stop.is_set():
+            return
+
+        questions = (body.get('data') or {}).get('survey', {}).get('questions') or []
+        self.think()
+        if self.stop.is_set():
+            return
+        responses = {question['id']: self.rng.randint(1, 5) for question in questions}
+        status, _ = self.request('response_submit', 'POST', path, {'responses': responses})
+        # Failed submits are already counted as step errors
+        if status is not None and status < 400:
+            self.stats.journey_done()
+
+    def think(self):
+        low, high = self.args.think_time
+        self.stop.wait(self.rng.uniform(low, high))
+
+    def request(self, step, method, path, payload=None):
+        """Send one request, reconnecting once if the kept-alive connection was dropped"""
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = dict(self.headers, **({'Content-Type': 'application/json'} if body else {}))
+        started = time.perf_counter()
+        for attempt in range(2):
+            try:
+                if self.connection is None:
+                    self.connection = self.connection_class(self.host, timeout=self.args.timeout)
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                data = response.read()
+                elapsed = time.perf_counter() - started
+                queries = response.getheader('X-DB-Query-Count')
+                self.stats.record(step, elapsed, response.status, int(queries) if queries is not None else None)
+                try:
+                    return response.status, json.loads(data) if data else {}
+                except ValueError:
+                    return response.status, {}
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                self.connection.close()
+                self.connection = None
+                if attempt == 0:
+                    continue
+                self.stats.record(step, time.perf_counter() - started, type(e).__name__, None)
+                return None, {}
+            except (OSError, http.client.HTTPException) as e:
+                if self.connection:
+                    self.connection.close()
+                self.connection = None
+                self.stats.record(step, time.perf_counter() - started, type(e).__name__, None)
+                return None, {}
+
+def load_tokens(args):
+    """Pending invitation tokens from a file or from the database"""
+    if args.tokens_file:
+        with open(args.tokens_file) as source:
+            tokens = [line.strip() for line in source if line.strip()]
+    else:
+        from pymongo import MongoClient
+        client = MongoClient(args.mongo_uri)
+        try:
+            tokens = [entry['token'] for entry in client[args.db].survey_runs.aggregate([
+                {'$match': {'status': 'active', 'due_date': {'$gt': datetime.utcnow()}}},
+                {'$unwind': '$respondents'},
+                {'$match': {'respondents.status': 'pending'}},
+                {'$project': {'_id': 0, 'token': '$respondents.response_token'}},
+                {'$limit': args.max_tokens}
+            ], allowDiskUse=True)]
+        finally:
+            client.close()
+    random.Random(args.seed).shuffle(tokens)
+    return tokens[:args.max_tokens]
+
+def parse_think_time(value):
+    low, _, high = value.partition(',')
+    low, high = float(low), float(high or low)
+    if low < 0 or high < low:
+        raise argparse.ArgumentTypeError('think time must be "min,max" seconds with 0 <= min <= max')
+    return low, high
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the public respondent flow (form load, then submit)')
+    parser.add_argument('--base-url', default='http://localhost:5000', help='Server under test')
+    parser.add_argument('--tokens-file', help='Response tokens, one per line (default: read pending ones from --db)')
+    parser.add_argument('--mongo-uri', default=os.environ.get('BENCHMARK_MONGODB_URI', 'mongodb://localhost:27017'), help='Where to read tokens from')
+    parser.add_argument('--db', default='ikenei_benchmark', help='Database to read pending tokens from')
+    parser.add_argument('--max-tokens', type=int, default=100000, help='Tokens to load (one is used per journey)')
+    parser.add_argument('--users', type=int, default=50, help='Concurrent virtual respondents')
+    parser.add_argument('--spawn-rate', type=float, default=10, help='Virtual users started per second')
+    parser.add_argument('--duration', type=float, default=120, help='Seconds to run (also stops when tokens run out)')
+    parser.add_argument('--think-time', type=parse_think_time, default=(2.0, 10.0), help='"min,max" seconds between steps')
+    parser.add_argument('--timeout', type=float, default=30, help='Request timeout in seconds')
+    parser.add_argument('--spoof-clients', action='store_true', help='Send a distinct X-Forwarded-For per virtual user')
+    parser.add_argument('--report-interval', type=float, default=10, help='Seconds between progress lines')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for token order, ratings and think times')
+    parser.add_argument('--max-error-rate', type=float, help='Exit 1 if any step errors more often than this (e.g. 0.01)')
+    parser.add_argument('--max-p95-ms', type=float, help='Exit 1 if any step has a higher p95 latency')
+    parser.add_argument('--output', default='respondent-load-test.json', help='JSON report path')
+    args = parser.parse_args()
+
+    tokens = load_tokens(args)
+    if not tokens:
+        parser.error('no pending response tokens found (seed data with `flask seed-synthetic` or pass --tokens-file)')
+    print(f"{len(tokens):,} tokens, {args.users} users at {args.spawn_rate}/s, think time {args.think_time[0]}-{args.think_time[1]}s, "
+          f"up to {args.duration}s against {args.base_url}")
+
+    token_queue = queue.Queue()
+    for token in tokens:
+        token_queue.put(token)
+    stats = StepStats()
+    stop = threading.Event()
+    users = []
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    next_report = started + args.report_interval
+    while time.perf_counter() < deadline:
+        now = time.perf_counter()
+        # Ramp up: spawn-rate users per second until all are running
+        while len(users) < min(args.users, int((now - started) * args.spawn_rate) + 1):
+            user = RespondentUser(len(users), args, token_queue, stats, stop)
+            user.start()
+            users.append(user)
+        if len(users) == args.users and not any(user.is_alive() for user in users):
+            break
+        if now >= next_report:
+            steps, journeys = stats.summary(now - started)
+            print(f"[{now - started:6.0f}s] users {sum(user.is_alive() for user in users):>5}  journeys {journeys:>7}  " + '  '.join(
+                f"{step} {s['requests']} req p95 {s['latency'].get('p95_ms', 0):.0f}ms err {s['error_rate']:.1%}" for step, s in steps.items()
+            ))
+            next_report += args.report_interval
+        time.sleep(0.05)
+
+    stop.set()
+    for user in users:
+        user.join(timeout=args.timeout)
+    duration = time.perf_counter() - started
+
+    steps, journeys = stats.summary(duration)
+    report = {
+        'benchmark': 'respondent_load_test',
+        'target': args.base_url,
+        'users': args.users,
+        'spawn_rate': args.spawn_rate,
+        'think_time_s': list(args.think_time),
+        'seed': args.seed,
+        'duration_s': round(duration, 2),
+        'tokens_available': len(tokens),
+        'journeys_completed': journeys,
+        'journeys_per_second': round(journeys / duration, 2) if duration > 0 else 0,
+        'environment': environment_info(),
+        'steps': steps
+    }
+    print(f"\n{journeys:,} journeys in {duration:.0f}s ({report['journeys_per_second']}/s)")
+    for step, result in steps.items():
+        latency = result['latency']
+        queries = result['queries_per_request']
+        print(f"{step:16} {result['requests']:>7} req  p50 {latency.get('p50_ms', 0):>8.1f}ms  p95 {latency.get('p95_ms', 0):>8.1f}ms  "
+              f"p99 {latency.get('p99_ms', 0):>8.1f}ms  errors {result['error_rate']:.2%}  "
+              f"queries {queries['mean'] if queries else 'n/a (enable METRICS_QUERY_COUNT_HEADER)'}")
+    print(f"report written to {write_report(report, args.output)}")
+
+    failures = []
+    for step, result in steps.items():
+        if args.max_error_rate is not None and result['error_rate'] > args.max_error_rate:
+            failures.append(f"{step} error rate {result['error_rate']:.2%} > {args.max_error_rate:.2%}")
+        if args.max_p95_ms is not None and result['latency'].get('p95_ms', 0) > args.max_p95_ms:
+            failures.append(f"{step} p95 {result['latency']['p95_ms']}ms > {args.max_p95_ms}ms")
+    if failures:
+        print('FAIL: ' + '; '.join(failures))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
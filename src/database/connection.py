@@ -7,12 +7,17 @@ import os
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from flask import current_app
+from services.metrics import mongo_command_metrics, mongo_pool_metrics
+from services.tracing import mongo_command_tracing
 from utils.logger import get_logger
 import time
 from functools import wraps
 
 logger = get_logger(__name__)
 
+# Case-insensitive comparison for email lookups (queries must use a matching index)
+EMAIL_COLLATION = {'locale': 'en', 'strength': 2}
+
 class DatabaseConnection:
     """MongoDB connection manager with connection pooling and error handling"""
     
@@ -50,7 +55,8 @@ class DatabaseConnection:
                 connectTimeoutMS=10000,  # Timeout for initial connection
                 socketTimeoutMS=20000,   # Timeout for socket operations
                 retryWrites=True,        # Enable retryable writes
-                w='majority'             # Write concern
+                w='majority',            # Write concern
+                event_listeners=[mongo_command_metrics, mongo_pool_metrics, mongo_command_tracing]  # Metrics and command spans
             )
             
             # Get database instance
@@ -116,6 +122,13 @@ class DatabaseConnection:
             subjects.create_index([("account_id", 1), ("is_active", 1)])
             subjects.create_index([("email", 1)])
             subjects.create_index([("account_id", 1), ("name", 1)])
+            subjects.create_index([("account_id", 1), ("email", 1)])
+            subjects.create_index([("account_id", 1), ("email", 1)], collation=EMAIL_COLLATION, name="account_id_1_email_1_ci")
+            
+            # Respondent indexes (bulk import duplicate lookups, case-insensitive)
+            respondents = db.respondents
+            respondents.create_index([("subject_id", 1), ("email", 1)])
+            respondents.create_index([("subject_id", 1), ("email", 1)], collation=EMAIL_COLLATION, name="subject_id_1_email_1_ci")
             
             # Survey indexes
             surveys = db.surveys
@@ -123,6 +136,62 @@ class DatabaseConnection:
             surveys.create_index([("created_at", -1)])
             surveys.create_index([("status", 1), ("due_date", 1)])
             
+            # Survey run indexes
+            survey_runs = db.survey_runs
+            survey_runs.create_index([("status", 1), ("is_active", 1), ("due_date", 1)])
+            survey_runs.create_index([("survey_id", 1), ("subject_id", 1), ("status", 1)])
+            
+            # Survey response indexes (per-run/per-survey reads and exports)
+            survey_responses = db.survey_responses
+            survey_responses.create_index([("survey_run_id", 1), ("_id", 1)])
+            survey_responses.create_index([("survey_id", 1), ("_id", 1)])
+            
+            # Scheduler audit indexes (records kept for 30 days)
+            scheduler_runs = db.scheduler_runs
+            scheduler_runs.create_index([("job", 1), ("started_at", -1)])
+            scheduler_runs.create_index([("finished_at", 1)], expireAfterSeconds=30 * 24 * 3600)
+            
+            # Reminder throttles (stale entries dropped after 30 days)
+            reminder_throttles = db.reminder_throttles
+            reminder_throttles.create_index([("last_sent_at", 1)], expireAfterSeconds=30 * 24 * 3600)
+            
+            # Report instance indexes
+            report_instances = db.report_instances
+            report_instances.create_index([("report_id", 1), ("queued_at", -1)])
+            report_instances.create_index([("status", 1), ("queued_at", 1)])
+            
+            # File indexes (blobs are shared by SHA-256; upload sessions expire)
+            files = db.files
+            files.create_index([("sha256", 1)])
+            files.create_index([("owner_id", 1), ("created_at", -1)])
+            file_uploads = db.file_uploads
+            file_uploads.create_index([("expires_at", 1)], expireAfterSeconds=0)
+            
+            # Notification inbox indexes (newest-first reads, unread filters; counters are keyed by account _id)
+            notifications = db.notifications
+            notifications.create_index([("account_id", 1), ("_id", -1)])
+            notifications.create_index([("account_id", 1), ("is_read", 1), ("_id", -1)])
+            
+            # Usage metering and billing indexes (counters by account or by day for invoice runs)
+            usage_daily = db.usage_daily
+            usage_daily.create_index([("account_id", 1), ("day", 1)], unique=True)
+            usage_daily.create_index([("day", 1), ("account_id", 1)])
+            billing_records = db.billing_records
+            billing_records.create_index([("account_id", 1), ("period", -1)], unique=True)
+            billing_records.create_index([("status", 1), ("period", -1)])
+            
+            # Revoked JWT indexes (entries expire with the token; workers sync by revocation time)
+            revoked_tokens = db.revoked_tokens
+            revoked_tokens.create_index([("expires_at", 1)], expireAfterSeconds=0)
+            revoked_tokens.create_index([("revoked_at", 1)])
+            
+            # Shared rate limit buckets (dropped once idle long enough to have refilled)
+            db.rate_limit_buckets.create_index([("expires_at", 1)], expireAfterSeconds=0)
+            
+            # Email template override indexes
+            email_templates = db.email_templates
+            email_templates.create_index([("account_id", 1), ("name", 1)], unique=True)
+            
             logger.info("Database indexes created successfully")
             
         except Exception as e:
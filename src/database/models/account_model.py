@@ -3,10 +3,10 @@ Account Model for MongoDB
 Handles user accounts, authentication, and account management
 """
 
-import bcrypt
 from datetime import datetime
 from bson import ObjectId
 from database.base_model import BaseModel
+from services.password_hasher import password_hasher, PasswordHasherBusy
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -101,6 +101,7 @@ class Account(BaseModel):
         if cls._verify_password(password, account.get_field('password_hash')):
             # Update last login
             account.update_last_login()
+            account.rehash_password_if_needed(password)
             logger.info(f"Successful authentication: {email}")
             return account
         else:
@@ -117,6 +118,24 @@ class Account(BaseModel):
         """Verify password against stored hash"""
         return self._verify_password(password, self.get_field('password_hash'))
     
+    def rehash_password_if_needed(self, password):
+        """Upgrade a just-verified password's hash to the configured bcrypt cost in the background"""
+        password_hash = self.get_field('password_hash')
+        if not password_hasher.needs_rehash(password_hash):
+            return False
+        
+        account_id = self._id
+        
+        def store(new_hash):
+            # Only replace the hash that was verified, in case the password changed meanwhile
+            self.get_collection().update_one(
+                {'_id': account_id, 'password_hash': password_hash},
+                {'$set': {'password_hash': new_hash, 'updated_at': datetime.utcnow()}}
+            )
+            logger.info(f"Rehashed password for account {account_id}")
+        
+        return password_hasher.rehash_later(password, store)
+    
     def update_last_login(self):
         """Update last login timestamp"""
         self.set_field('last_login_at', datetime.utcnow())
@@ -271,15 +290,16 @@ class Account(BaseModel):
     
     @staticmethod
     def _hash_password(password):
-        """Hash password using bcrypt"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        """Hash password using bcrypt (on the bounded hashing pool, at the configured cost)"""
+        return password_hasher.hash(password)
     
     @staticmethod
     def _verify_password(password, password_hash):
-        """Verify password against hash"""
+        """Verify password against hash (PasswordHasherBusy propagates so callers can shed load)"""
         try:
-            return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+            return password_hasher.verify(password, password_hash)
+        except PasswordHasherBusy:
+            raise
         except Exception as e:
             logger.error(f"Password verification error: {str(e)}")
             return False
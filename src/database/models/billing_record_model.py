@@ -0,0 +1,107 @@
+"""
+Billing Record Model for MongoDB
+One invoice per account per billing period, priced from usage counters
+"""
+
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from database.base_model import BaseModel
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class BillingRecord(BaseModel):
+    """Billing record model (unique per account and period)"""
+
+    collection_name = 'billing_records'
+
+    required_fields = ['account_id', 'period', 'amount_cents', 'currency', 'status']
+
+    STATUSES = ['pending', 'paid', 'failed', 'cancelled', 'refunded']
+
+    @classmethod
+    def upsert_invoices(cls, invoices, now=None):
+        """
+        Write a period's invoices with one unordered bulk write. Re-running
+        a period refreshes pending invoices and leaves settled ones alone.
+        """
+        if not invoices:
+            return {'created': 0, 'updated': 0}
+
+        now = now or datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {'account_id': invoice['account_id'], 'period': invoice['period'], 'status': 'pending'},
+                {
+                    '$set': {**invoice, 'updated_at': now},
+                    '$setOnInsert': {'status': 'pending', 'created_at': now, 'is_active': True}
+                },
+                upsert=True
+            )
+            for invoice in invoices
+        ]
+        try:
+            result = cls.get_collection().bulk_write(operations, ordered=False)
+            return {'created': result.upserted_count, 'updated': result.modified_count}
+        except BulkWriteError as e:
+            # Settled invoices make their upsert collide with the unique index - expected, not a failure
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+            return {'created': e.details.get('nUpserted', 0), 'updated': e.details.get('nModified', 0)}
+
+    @classmethod
+    def find_by_account(cls, account_id, page=1, per_page=20):
+        """Paginate an account's invoices, newest period first"""
+        account_id = ObjectId(account_id) if isinstance(account_id, str) else account_id
+        return cls.paginate({'account_id': account_id}, page=page, per_page=per_page, sort=[('period', -1)])
+
+    @classmethod
+    def summarize(cls, months=12, top=10):
+        """Revenue totals, per-status and per-month breakdowns and top accounts in one aggregation"""
+        pipeline = [
+            {'$facet': {
+                'totals': [
+                    {'$group': {
+                        '_id': None,
+                        'invoiced_cents': {'$sum': '$amount_cents'},
+                        'paid_cents': {'$sum': {'$cond': [{'$eq': ['$status', 'paid']}, '$amount_cents', 0]}},
+                        'invoices': {'$sum': 1},
+                        'accounts': {'$addToSet': '$account_id'}
+                    }},
+                    {'$project': {'_id': 0, 'invoiced_cents': 1, 'paid_cents': 1, 'invoices': 1, 'accounts': {'$size': '$accounts'}}}
+                ],
+                'by_status': [
+                    {'$group': {'_id': '$status', 'count': {'$sum': 1}, 'amount_cents': {'$sum': '$amount_cents'}}},
+                    {'$sort': {'_id': 1}}
+                ],
+                'by_period': [
+                    {'$group': {'_id': '$period', 'amount_cents': {'$sum': '$amount_cents'}, 'invoices': {'$sum': 1}}},
+                    {'$sort': {'_id': -1}},
+                    {'$limit': months}
+                ],
+                'top_accounts': [
+                    {'$group': {'_id': '$account_id', 'amount_cents': {'$sum': '$amount_cents'}}},
+                    {'$sort': {'amount_cents': -1}},
+                    {'$limit': top}
+                ]
+            }}
+        ]
+        result = next(cls.get_collection().aggregate(pipeline), {})
+        totals = (result.get('totals') or [{}])[0]
+        return {
+            'invoiced_cents': totals.get('invoiced_cents', 0),
+            'paid_cents': totals.get('paid_cents', 0),
+            'invoices': totals.get('invoices', 0),
+            'accounts': totals.get('accounts', 0),
+            'by_status': {row['_id']: {'count': row['count'], 'amount_cents': row['amount_cents']} for row in result.get('by_status', [])},
+            'by_period': [{'period': row['_id'], 'amount_cents': row['amount_cents'], 'invoices': row['invoices']} for row in result.get('by_period', [])],
+            'top_accounts': [{'account_id': str(row['_id']), 'amount_cents': row['amount_cents']} for row in result.get('top_accounts', [])]
+        }
+
+    def to_public_dict(self):
+        """Convert to public dictionary (safe for API responses)"""
+        data = self.to_dict()
+        data['total_amount'] = round(self.get_field('amount_cents', 0) / 100, 2)
+        return data
@@ -0,0 +1,93 @@
+"""
+Email Template Model for MongoDB
+Handles per-account overrides of the built-in email templates
+"""
+
+from datetime import datetime
+from bson import ObjectId
+from database.base_model import BaseModel
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class EmailTemplate(BaseModel):
+    """Email template override model (one document per account + template name)"""
+
+    collection_name = 'email_templates'
+
+    required_fields = ['account_id', 'name', 'source']
+
+    @classmethod
+    def find_override(cls, account_id, name):
+        """Find the active override of a template for an account"""
+        if isinstance(account_id, str):
+            try:
+                account_id = ObjectId(account_id)
+            except Exception:
+                raise ValueError("Invalid account_id format")
+
+        return cls.find_one({'account_id': account_id, 'name': name, 'is_active': True})
+
+    @classmethod
+    def find_overrides(cls, account_id):
+        """Map template name -> updated_at for an account's active overrides"""
+        if isinstance(account_id, str):
+            try:
+                account_id = ObjectId(account_id)
+            except Exception:
+                raise ValueError("Invalid account_id format")
+
+        cursor = cls.get_collection().find({'account_id': account_id, 'is_active': True}, {'name': 1, 'updated_at': 1})
+        return {document['name']: document.get('updated_at') for document in cursor}
+
+    @classmethod
+    def get_override_version(cls, account_id, name):
+        """Get only the updated_at stamp of an override (cheap revalidation check)"""
+        if isinstance(account_id, str):
+            try:
+                account_id = ObjectId(account_id)
+            except Exception:
+                raise ValueError("Invalid account_id format")
+
+        document = cls.get_collection().find_one(
+            {'account_id': account_id, 'name': name, 'is_active': True},
+            {'updated_at': 1}
+        )
+        return document['updated_at'] if document else None
+
+    @classmethod
+    def upsert_override(cls, account_id, name, source):
+        """Create or replace the override of a template for an account"""
+        if isinstance(account_id, str):
+            try:
+                account_id = ObjectId(account_id)
+            except Exception:
+                raise ValueError("Invalid account_id format")
+
+        now = datetime.utcnow()
+        cls.get_collection().update_one(
+            {'account_id': account_id, 'name': name},
+            {
+                '$set': {'source': source, 'is_active': True, 'updated_at': now},
+                '$setOnInsert': {'created_at': now}
+            },
+            upsert=True
+        )
+
+        logger.info(f"Saved email template override {name} for account {account_id}")
+        return now
+
+    @classmethod
+    def remove_override(cls, account_id, name):
+        """Deactivate the override of a template for an account"""
+        if isinstance(account_id, str):
+            try:
+                account_id = ObjectId(account_id)
+            except Exception:
+                raise ValueError("Invalid account_id format")
+
+        result = cls.get_collection().update_one(
+            {'account_id': account_id, 'name': name, 'is_active': True},
+            {'$set': {'is_active': False, 'updated_at': datetime.utcnow()}}
+        )
+        return result.modified_count > 0
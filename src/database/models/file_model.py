@@ -0,0 +1,53 @@
+"""
+File Model for MongoDB
+Handles metadata of stored files (the content lives in file storage, keyed by its SHA-256)
+"""
+
+from database.base_model import BaseModel
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class StoredFile(BaseModel):
+    """Stored file model (many records may share one deduplicated blob)"""
+
+    collection_name = 'files'
+
+    required_fields = ['owner_id', 'filename', 'size', 'sha256', 'storage']
+
+    @classmethod
+    def create_file(cls, owner_id, filename, size, sha256, storage, content_type=None, file_type='document', **kwargs):
+        """Create a file record for stored content"""
+        stored_file = cls(
+            owner_id=str(owner_id) if owner_id else None,
+            filename=filename,
+            size=size,
+            sha256=sha256,
+            storage=storage,
+            content_type=content_type or 'application/octet-stream',
+            file_type=file_type,
+            **kwargs
+        )
+        stored_file.save()
+
+        logger.info(f"Created file record {stored_file._id} ({filename}, {size} bytes, sha256 {sha256[:12]})")
+        return stored_file
+
+    @classmethod
+    def count_by_sha256(cls, sha256):
+        """Count the records that reference a blob"""
+        return cls.get_collection().count_documents({'sha256': sha256})
+
+    def to_public_dict(self):
+        """Convert to public dictionary (safe for API responses)"""
+        return {
+            'id': str(self._id) if self._id else None,
+            'filename': self.get_field('filename'),
+            'content_type': self.get_field('content_type'),
+            'file_type': self.get_field('file_type'),
+            'size': self.get_field('size'),
+            'sha256': self.get_field('sha256'),
+            'deduplicated': self.get_field('deduplicated', False),
+            'download_url': f"/api/files/{self._id}" if self._id else None,
+            'created_at': self.get_field('created_at').isoformat() + 'Z' if self.get_field('created_at') else None
+        }
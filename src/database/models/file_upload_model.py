@@ -0,0 +1,87 @@
+"""
+File Upload Model for MongoDB
+Tracks resumable, chunked upload sessions
+"""
+
+from datetime import datetime, timedelta
+from bson import ObjectId
+from database.base_model import BaseModel
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class FileUpload(BaseModel):
+    """Resumable upload session (one document per file being uploaded)"""
+
+    collection_name = 'file_uploads'
+
+    required_fields = ['owner_id', 'filename', 'size', 'offset', 'status']
+
+    @classmethod
+    def create_session(cls, owner_id, filename, size, content_type=None, file_type='document', expiry_hours=24):
+        """Start an upload session at offset 0"""
+        now = datetime.utcnow()
+        upload = cls(
+            owner_id=str(owner_id) if owner_id else None,
+            filename=filename,
+            size=size,
+            content_type=content_type or 'application/octet-stream',
+            file_type=file_type,
+            offset=0,
+            status='uploading',
+            expires_at=now + timedelta(hours=expiry_hours)
+        )
+        upload.save()
+
+        logger.info(f"Started upload session {upload._id} for {filename} ({size} bytes)")
+        return upload
+
+    @classmethod
+    def claim_chunk(cls, upload_id, offset, stale_after_seconds=600):
+        """
+        Atomically claim the right to append at offset (so two concurrent
+        requests cannot write the same range); returns the session or None.
+        A claim left behind by a crashed writer is taken over once stale.
+        """
+        now = datetime.utcnow()
+        document = cls.get_collection().find_one_and_update(
+            {
+                '_id': ObjectId(upload_id),
+                'offset': offset,
+                '$or': [
+                    {'status': 'uploading'},
+                    {'status': 'writing', 'updated_at': {'$lt': now - timedelta(seconds=stale_after_seconds)}}
+                ]
+            },
+            {'$set': {'status': 'writing', 'updated_at': now}},
+            return_document=True
+        )
+        return cls(**document) if document else None
+
+    @classmethod
+    def release_chunk(cls, upload_id, offset, status='uploading'):
+        """Record the new offset after a chunk was written (or restore it after a failure)"""
+        cls.get_collection().update_one(
+            {'_id': ObjectId(upload_id), 'status': 'writing'},
+            {'$set': {'offset': offset, 'status': status, 'updated_at': datetime.utcnow()}}
+        )
+
+    @classmethod
+    def mark_completed(cls, upload_id, file_id):
+        """Close the session and link it to the stored file"""
+        cls.get_collection().update_one(
+            {'_id': ObjectId(upload_id)},
+            {'$set': {'status': 'completed', 'file_id': file_id, 'updated_at': datetime.utcnow()}}
+        )
+
+    def to_public_dict(self):
+        """Convert to public dictionary (safe for API responses)"""
+        return {
+            'upload_id': str(self._id) if self._id else None,
+            'filename': self.get_field('filename'),
+            'size': self.get_field('size'),
+            'offset': self.get_field('offset'),
+            'status': self.get_field('status'),
+            'file_id': str(self.get_field('file_id')) if self.get_field('file_id') else None,
+            'expires_at': self.get_field('expires_at').isoformat() + 'Z' if self.get_field('expires_at') else None
+        }
@@ -0,0 +1,63 @@
+"""
+Notification Counter Model for MongoDB
+Denormalized unread notification count per account (one document per account)
+"""
+
+from collections import Counter
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+from database.base_model import BaseModel
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class NotificationCounter(BaseModel):
+    """Unread counter keyed by account ID, so the count is a single _id point read"""
+
+    collection_name = 'notification_counters'
+
+    required_fields = ['unread']
+
+    @classmethod
+    def get_unread(cls, account_id):
+        """Unread notification count for an account"""
+        document = cls.get_collection().find_one({'_id': _object_id(account_id)}, {'unread': 1})
+        return max(0, document['unread']) if document else 0
+
+    @classmethod
+    def increment(cls, account_ids):
+        """Add one unread notification per occurrence of each account ID (one bulk write)"""
+        counts = Counter(_object_id(account_id) for account_id in account_ids)
+        if not counts:
+            return 0
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne({'_id': account_id}, {'$inc': {'unread': count}, '$set': {'updated_at': now}}, upsert=True)
+            for account_id, count in counts.items()
+        ]
+        result = cls.get_collection().bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    @classmethod
+    def decrement(cls, account_id, count=1):
+        """Remove read/deleted notifications from the unread count"""
+        if count <= 0:
+            return
+        cls.get_collection().update_one(
+            {'_id': _object_id(account_id)},
+            {'$inc': {'unread': -count}, '$set': {'updated_at': datetime.utcnow()}}
+        )
+
+    @classmethod
+    def reset(cls, account_id, unread):
+        """Overwrite the count (used to repair drift from a recount)"""
+        cls.get_collection().update_one(
+            {'_id': _object_id(account_id)},
+            {'$set': {'unread': unread, 'updated_at': datetime.utcnow()}},
+            upsert=True
+        )
+
+def _object_id(value):
+    return ObjectId(value) if isinstance(value, str) else value
@@ -0,0 +1,150 @@
+"""
+Notification Model for MongoDB
+Per-account notification inbox. Every write that changes a notification's
+read state also adjusts the account's NotificationCounter.
+"""
+
+from datetime import datetime
+from itertools import islice
+from bson import ObjectId
+from database.base_model import BaseModel
+from database.models.notification_counter_model import NotificationCounter
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class Notification(BaseModel):
+    """Notification model (one document per recipient account)"""
+
+    collection_name = 'notifications'
+
+    required_fields = ['account_id', 'title', 'message', 'type']
+
+    TYPES = ['info', 'success', 'warning', 'error', 'survey_invitation', 'reminder']
+
+    PRIORITIES = ['low', 'normal', 'high']
+
+    @classmethod
+    def fan_out(cls, account_ids, title, message, notification_type='info', priority='normal', data=None, batch_size=1000):
+        """
+        Deliver one event to many inboxes: each batch of recipients is one
+        insert_many plus one counter bulk write. Returns the inserted IDs.
+        """
+        if notification_type not in cls.TYPES:
+            raise ValueError(f"Notification type must be one of: {', '.join(cls.TYPES)}")
+        if priority not in cls.PRIORITIES:
+            raise ValueError(f"Priority must be one of: {', '.join(cls.PRIORITIES)}")
+
+        collection = cls.get_collection()
+        recipients = iter([ObjectId(a) if isinstance(a, str) else a for a in dict.fromkeys(account_ids)])
+        inserted_ids = []
+
+        while True:
+            batch = list(islice(recipients, batch_size))
+            if not batch:
+                break
+
+            now = datetime.utcnow()
+            documents = [
+                {
+                    'account_id': account_id,
+                    'title': title,
+                    'message': message,
+                    'type': notification_type,
+                    'priority': priority,
+                    'data': data or {},
+                    'is_read': False,
+                    'read_at': None,
+                    'created_at': now
+                }
+                for account_id in batch
+            ]
+            result = collection.insert_many(documents, ordered=False)
+            NotificationCounter.increment(batch)
+            inserted_ids.extend(result.inserted_ids)
+
+        logger.info(f"Delivered '{notification_type}' notification to {len(inserted_ids)} accounts")
+        return inserted_ids
+
+    @classmethod
+    def find_inbox(cls, account_id, limit=20, before=None, unread_only=False):
+        """Newest-first page of an account's inbox; pass the last ID seen as before for the next page"""
+        query = {'account_id': ObjectId(account_id) if isinstance(account_id, str) else account_id}
+        if before:
+            query['_id'] = {'$lt': ObjectId(before)}
+        if unread_only:
+            query['is_read'] = False
+
+        cursor = cls.get_collection().find(query).sort('_id', -1).limit(limit)
+        return [cls(**document) for document in cursor]
+
+    @classmethod
+    def mark_read(cls, notification_id, account_id):
+        """
+        Mark one notification read. Returns the notification, or None if it
+        does not exist in this account's inbox.
+        """
+        account_id = ObjectId(account_id) if isinstance(account_id, str) else account_id
+        now = datetime.utcnow()
+        document = cls.get_collection().find_one_and_update(
+            {'_id': ObjectId(notification_id), 'account_id': account_id, 'is_read': False},
+            {'$set': {'is_read': True, 'read_at': now}}
+        )
+        if document:
+            # Only the request that flipped is_read adjusts the counter
+            NotificationCounter.decrement(account_id)
+            document.update({'is_read': True, 'read_at': now})
+            return cls(**document)
+
+        return cls.find_one({'_id': ObjectId(notification_id), 'account_id': account_id})
+
+    @classmethod
+    def mark_all_read(cls, account_id):
+        """Mark every unread notification read; returns the number changed"""
+        account_id = ObjectId(account_id) if isinstance(account_id, str) else account_id
+        result = cls.get_collection().update_many(
+            {'account_id': account_id, 'is_read': False},
+            {'$set': {'is_read': True, 'read_at': datetime.utcnow()}}
+        )
+        # Decrement by what was changed rather than zeroing, so notifications
+        # delivered while the update ran stay counted
+        NotificationCounter.decrement(account_id, result.modified_count)
+        return result.modified_count
+
+    @classmethod
+    def delete_for_account(cls, notification_id, account_id):
+        """Delete a notification from an account's inbox; returns False if not found"""
+        account_id = ObjectId(account_id) if isinstance(account_id, str) else account_id
+        document = cls.get_collection().find_one_and_delete(
+            {'_id': ObjectId(notification_id), 'account_id': account_id},
+            projection={'is_read': 1}
+        )
+        if not document:
+            return False
+        if not document.get('is_read'):
+            NotificationCounter.decrement(account_id)
+        return True
+
+    @classmethod
+    def recount_unread(cls, account_id):
+        """Recount unread notifications from the inbox and repair the counter"""
+        account_id = ObjectId(account_id) if isinstance(account_id, str) else account_id
+        unread = cls.count_documents({'account_id': account_id, 'is_read': False})
+        NotificationCounter.reset(account_id, unread)
+        return unread
+
+    def to_public_dict(self):
+        """Convert to public dictionary (safe for API responses)"""
+        created_at = self.get_field('created_at')
+        read_at = self.get_field('read_at')
+        return {
+            'id': str(self._id) if self._id else None,
+            'title': self.get_field('title'),
+            'message': self.get_field('message'),
+            'type': self.get_field('type'),
+            'priority': self.get_field('priority', 'normal'),
+            'data': self.get_field('data') or {},
+            'is_read': self.get_field('is_read', False),
+            'read_at': read_at.isoformat() + 'Z' if read_at else None,
+            'created_at': created_at.isoformat() + 'Z' if created_at else None
+        }
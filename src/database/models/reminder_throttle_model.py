@@ -0,0 +1,45 @@
+"""
+Reminder Throttle Model for MongoDB
+Tracks when each respondent (by email) was last sent a reminder digest
+"""
+
+from datetime import datetime
+from pymongo import UpdateOne
+from database.base_model import BaseModel
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class ReminderThrottle(BaseModel):
+    """Per-respondent reminder throttle (one document per lower-cased email)"""
+
+    collection_name = 'reminder_throttles'
+
+    required_fields = ['last_sent_at']
+
+    @classmethod
+    def record_sent(cls, digests, now=None):
+        """Stamp last_sent_at for every emailed digest with a single bulk write"""
+        if not digests:
+            return 0
+
+        now = now or datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {'_id': digest['_id']},
+                {
+                    '$set': {
+                        'email': digest['email'],
+                        'last_sent_at': now,
+                        'last_survey_run_ids': [survey['survey_run_id'] for survey in digest['surveys']]
+                    },
+                    '$inc': {'sent_count': 1},
+                    '$setOnInsert': {'created_at': now}
+                },
+                upsert=True
+            )
+            for digest in digests
+        ]
+
+        result = cls.get_collection().bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
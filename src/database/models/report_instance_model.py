@@ -0,0 +1,120 @@
+"""
+Report Instance Model for MongoDB
+Tracks asynchronously generated reports and their artifacts
+"""
+
+from datetime import datetime
+from bson import ObjectId
+from database.base_model import BaseModel
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class ReportInstance(BaseModel):
+    """Report instance model (one document per generation request)"""
+
+    collection_name = 'report_instances'
+
+    required_fields = ['report_id', 'report_type', 'target_id', 'status']
+
+    # Supported report types and the collection their target lives in
+    REPORT_TYPES = {
+        'subject': 'subjects',
+        'survey_run': 'survey_runs'
+    }
+
+    STATUSES = ['queued', 'running', 'completed', 'failed']
+
+    @classmethod
+    def create_instance(cls, report_id, report_type, target_id, account_id=None, requested_by=None, params=None):
+        """Create a queued report instance"""
+        if report_type not in cls.REPORT_TYPES:
+            raise ValueError(f"Report type must be one of: {', '.join(cls.REPORT_TYPES)}")
+
+        if isinstance(target_id, str):
+            try:
+                target_id = ObjectId(target_id)
+            except Exception:
+                raise ValueError("Invalid target_id format")
+
+        if isinstance(account_id, str):
+            try:
+                account_id = ObjectId(account_id)
+            except Exception:
+                raise ValueError("Invalid account_id format")
+
+        instance = cls(
+            report_id=report_id,
+            report_type=report_type,
+            target_id=target_id,
+            account_id=account_id,
+            requested_by=requested_by,
+            params=params or {},
+            status='queued',
+            queued_at=datetime.utcnow()
+        )
+        instance.save()
+
+        logger.info(f"Queued {report_type} report instance {instance._id} for {target_id}")
+        return instance
+
+    @classmethod
+    def find_by_report(cls, report_id, page=1, per_page=20, account_id=None, status=None):
+        """Paginate the instances generated for a report, newest first"""
+        query = {'report_id': report_id}
+        if account_id:
+            query['account_id'] = ObjectId(account_id) if isinstance(account_id, str) else account_id
+        if status:
+            query['status'] = status
+
+        return cls.paginate(query, page=page, per_page=per_page, sort=[('queued_at', -1)])
+
+    @classmethod
+    def mark_running(cls, instance_id):
+        """Move a queued instance to running"""
+        now = datetime.utcnow()
+        result = cls.get_collection().update_one(
+            {'_id': ObjectId(instance_id), 'status': 'queued'},
+            {'$set': {'status': 'running', 'started_at': now, 'updated_at': now}}
+        )
+        return result.modified_count > 0
+
+    @classmethod
+    def mark_completed(cls, instance_id, summary, artifact_path, artifact_size):
+        """Record a finished instance and its artifact"""
+        now = datetime.utcnow()
+        cls.get_collection().update_one(
+            {'_id': ObjectId(instance_id)},
+            {'$set': {
+                'status': 'completed',
+                'summary': summary,
+                'artifact_path': artifact_path,
+                'artifact_size': artifact_size,
+                'completed_at': now,
+                'updated_at': now
+            }}
+        )
+
+    @classmethod
+    def mark_failed(cls, instance_id, error):
+        """Record a failed instance"""
+        now = datetime.utcnow()
+        cls.get_collection().update_one(
+            {'_id': ObjectId(instance_id)},
+            {'$set': {'status': 'failed', 'error': error, 'completed_at': now, 'updated_at': now}}
+        )
+
+    def to_dict(self, include_id=True):
+        """Convert to dictionary"""
+        result = super().to_dict(include_id=include_id)
+
+        # Artifacts are served through the API, never by filesystem path
+        result.pop('artifact_path', None)
+        result['has_artifact'] = bool(self.get_field('artifact_path'))
+
+        started_at = self.get_field('started_at')
+        completed_at = self.get_field('completed_at')
+        if started_at and completed_at:
+            result['duration_ms'] = round((completed_at - started_at).total_seconds() * 1000, 2)
+
+        return result
@@ -7,6 +7,11 @@ class RespondentModel(BaseModel):
     Respondent model for managing survey respondents
     """
     
+    VALID_RELATIONSHIPS = [
+        'Peer', 'Subordinate', 'Boss', 'Customer', 'Previous Employer',
+        'Super Boss', 'Parent', 'Teacher', 'Counseller', 'Third Party', 'other'
+    ]
+    
     def __init__(self, subject_id=None, name=None, email=None, phone=None, 
                  address=None, relationship=None, other_info=None, 
                  status='invited', response_status='pending', **kwargs):
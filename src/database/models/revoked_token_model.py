@@ -0,0 +1,47 @@
+"""
+Revoked Token Model for MongoDB
+One document per revoked JWT (keyed by jti), dropped by a TTL index once
+the token would have expired anyway
+"""
+
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from database.base_model import BaseModel
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class RevokedToken(BaseModel):
+    """Revoked JWT: {_id: jti, token_type, account_id, expires_at, revoked_at, reason}"""
+
+    collection_name = 'revoked_tokens'
+
+    required_fields = ['expires_at', 'revoked_at']
+
+    @classmethod
+    def revoke(cls, jti, expires_at, token_type=None, account_id=None, reason=None):
+        """Record a revoked token; returns False if it was already revoked"""
+        try:
+            cls.get_collection().insert_one({
+                '_id': jti,
+                'token_type': token_type,
+                'account_id': account_id,
+                'expires_at': expires_at,
+                'revoked_at': datetime.utcnow(),
+                'reason': reason
+            })
+            return True
+        except DuplicateKeyError:
+            return False
+
+    @classmethod
+    def find_unexpired(cls, now=None):
+        """{jti: expires_at} of every revoked token that has not expired yet"""
+        cursor = cls.get_collection().find({'expires_at': {'$gt': now or datetime.utcnow()}}, {'expires_at': 1})
+        return {doc['_id']: doc['expires_at'] for doc in cursor}
+
+    @classmethod
+    def find_revoked_since(cls, since):
+        """{jti: expires_at} of tokens revoked at or after a time (incremental sync)"""
+        cursor = cls.get_collection().find({'revoked_at': {'$gte': since}}, {'expires_at': 1})
+        return {doc['_id']: doc['expires_at'] for doc in cursor}
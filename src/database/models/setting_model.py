@@ -0,0 +1,91 @@
+"""
+Setting Model for MongoDB
+System-wide and per-account setting overrides, one document per scope,
+with per-scope versions and a global change counter for cheap revalidation
+"""
+
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument
+from database.base_model import BaseModel
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class Setting(BaseModel):
+    """Settings scope document: {_id: 'system' | account ObjectId, values, version}"""
+
+    collection_name = 'settings'
+
+    required_fields = ['values', 'version']
+
+    SYSTEM_SCOPE = 'system'
+
+    # _id of the document holding the global change counter
+    VERSION_ID = 'version'
+
+    @classmethod
+    def get_global_version(cls):
+        """Current global change counter (a single point read)"""
+        doc = cls.get_collection().find_one({'_id': cls.VERSION_ID}, {'version': 1})
+        return doc['version'] if doc else 0
+
+    @classmethod
+    def get_scope_versions(cls, scopes):
+        """{scope: version} for the scopes that have overrides"""
+        cursor = cls.get_collection().find(
+            {'_id': {'$in': [_scope_id(scope) for scope in scopes]}},
+            {'version': 1}
+        )
+        return {str(doc['_id']): doc['version'] for doc in cursor}
+
+    @classmethod
+    def load_scopes(cls, scopes):
+        """{scope: (version, flat values)} for the scopes that have overrides"""
+        cursor = cls.get_collection().find({'_id': {'$in': [_scope_id(scope) for scope in scopes]}})
+        return {str(doc['_id']): (doc['version'], flatten_values(doc.get('values') or {})) for doc in cursor}
+
+    @classmethod
+    def write(cls, scope, values=None, unset_keys=None, updated_by=None):
+        """
+        Set and/or clear overrides in one scope, bumping its version
+        atomically with the values. The global counter is bumped after the
+        scope write, so any reader that sees the new global version also
+        sees this write. Returns (version, flat values) after the write.
+        """
+        now = datetime.utcnow()
+        update = {
+            '$set': {'updated_at': now, 'updated_by': updated_by},
+            '$setOnInsert': {'created_at': now},
+            '$inc': {'version': 1}
+        }
+        for key, value in (values or {}).items():
+            update['$set'][f'values.{key}'] = value
+        if unset_keys:
+            update['$unset'] = {f'values.{key}': '' for key in unset_keys}
+
+        doc = cls.get_collection().find_one_and_update(
+            {'_id': _scope_id(scope)},
+            update,
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        cls.get_collection().update_one({'_id': cls.VERSION_ID}, {'$inc': {'version': 1}}, upsert=True)
+        return doc['version'], flatten_values(doc.get('values') or {})
+
+def _scope_id(scope):
+    """'system' stays a string; account scopes are keyed by the account ObjectId"""
+    if scope == Setting.SYSTEM_SCOPE or isinstance(scope, ObjectId):
+        return scope
+    return ObjectId(scope)
+
+def flatten_values(values, prefix=''):
+    """{'email': {'survey_reminders': True}} -> {'email.survey_reminders': True}"""
+    flat = {}
+    for key, value in values.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten_values(value, prefix=f'{path}.'))
+        else:
+            flat[path] = value
+    return flat
@@ -124,6 +124,31 @@ class SurveyResponse(BaseModel):
         query = {'respondent_id': respondent_id}
         return cls.find_many(query, sort=[('submitted_at', -1)])
     
+    @classmethod
+    def iter_export_documents(cls, query, batch_size=5000):
+        """Stream raw response documents for export (one server round trip per batch)"""
+        projection = {
+            'survey_run_id': 1,
+            'survey_id': 1,
+            'respondent_id': 1,
+            'responses': 1,
+            'submitted_at': 1,
+            'status': 1
+        }
+        return cls.get_collection().find(query, projection, batch_size=batch_size).sort('_id', 1)
+    
+    @classmethod
+    def get_question_ids(cls, query):
+        """Get every question ID answered by the matching responses (computed in the database)"""
+        pipeline = [
+            {'$match': query},
+            {'$project': {'answers': {'$objectToArray': '$responses'}}},
+            {'$unwind': '$answers'},
+            {'$group': {'_id': '$answers.k'}},
+            {'$sort': {'_id': 1}}
+        ]
+        return [document['_id'] for document in cls.get_collection().aggregate(pipeline, allowDiskUse=True)]
+    
     @classmethod
     def get_response_statistics(cls, survey_run_id=None, survey_id=None):
         """Get response statistics"""
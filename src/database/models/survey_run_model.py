@@ -5,6 +5,7 @@ Handles survey execution with subjects and respondents
 
 from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import BulkWriteError
 from database.base_model import BaseModel
 from utils.logger import get_logger
 
@@ -40,6 +41,40 @@ class SurveyRun(BaseModel):
     @classmethod
     def create_survey_run(cls, survey_id, subject_id, respondents, due_date, launched_by, account_id, **kwargs):
         """Create a new survey run"""
+        survey_run_data = cls.build_run_data(survey_id, subject_id, respondents, due_date, launched_by, account_id, **kwargs)
+        
+        survey_run = cls(**survey_run_data)
+        survey_run.save()
+        
+        logger.info(f"Created new survey run: {survey_run._id} for survey {survey_run_data['survey_id']}, subject {survey_run_data['subject_id']}")
+        return survey_run
+    
+    @classmethod
+    def create_survey_runs(cls, runs_data):
+        """
+        Insert many validated runs (from build_run_data) with one unordered
+        insert_many. Returns the inserted IDs in input order, None for runs
+        that failed to insert.
+        """
+        documents = [cls(**run_data).data for run_data in runs_data]
+        if not documents:
+            return []
+        
+        try:
+            result = cls.get_collection().insert_many(documents, ordered=False)
+            inserted_ids = list(result.inserted_ids)
+        except BulkWriteError as e:
+            failed = {error['index'] for error in e.details.get('writeErrors', [])}
+            # insert_many assigns _id client-side before sending
+            inserted_ids = [None if i in failed else document['_id'] for i, document in enumerate(documents)]
+            logger.error(f"Failed to insert {len(failed)} of {len(documents)} survey runs")
+        
+        logger.info(f"Created {len([i for i in inserted_ids if i])} survey runs in bulk")
+        return inserted_ids
+    
+    @classmethod
+    def build_run_data(cls, survey_id, subject_id, respondents, due_date, launched_by, account_id, **kwargs):
+        """Validate run input and build the run document (without saving it)"""
         # Validate IDs are ObjectId
         if isinstance(survey_id, str):
             try:
@@ -128,11 +163,7 @@ class SurveyRun(BaseModel):
             **kwargs
         }
         
-        survey_run = cls(**survey_run_data)
-        survey_run.save()
-        
-        logger.info(f"Created new survey run: {survey_run._id} for survey {survey_id}, subject {subject_id}")
-        return survey_run
+        return survey_run_data
     
     @staticmethod
     def _generate_response_token():
@@ -164,6 +195,47 @@ class SurveyRun(BaseModel):
         
         return cls.find_one(query)
     
+    @classmethod
+    def find_active_runs_for_subjects(cls, survey_id, subject_ids):
+        """Map subject ID -> active run ID for the subjects already running this survey (one aggregation)"""
+        if isinstance(survey_id, str):
+            survey_id = ObjectId(survey_id)
+        
+        pipeline = [
+            {'$match': {
+                'survey_id': survey_id,
+                'subject_id': {'$in': [ObjectId(subject_id) for subject_id in subject_ids]},
+                'status': {'$in': ['active', 'pending']},
+                'is_active': True
+            }},
+            {'$group': {'_id': '$subject_id', 'run_id': {'$first': '$_id'}}}
+        ]
+        
+        return {document['_id']: document['run_id'] for document in cls.get_collection().aggregate(pipeline)}
+    
+    # Projection for progress views (counts only, no response tokens)
+    PROGRESS_PROJECTION = {
+        'account_id': 1,
+        'response_count': 1,
+        'completion_rate': 1,
+        'status': 1,
+        'respondents.status': 1
+    }
+    
+    @classmethod
+    def find_progress(cls, survey_run_id=None, account_id=None, limit=500):
+        """Raw progress documents for one run, or an account's active runs"""
+        if survey_run_id:
+            query = {'_id': ObjectId(survey_run_id)}
+        else:
+            query = {
+                'account_id': ObjectId(account_id) if isinstance(account_id, str) else account_id,
+                'status': 'active',
+                'is_active': True
+            }
+        
+        return list(cls.get_collection().find(query, cls.PROGRESS_PROJECTION).sort('_id', -1).limit(limit))
+    
     @classmethod
     def find_by_survey(cls, survey_id, active_only=True):
         """Find survey runs by survey ID"""
@@ -250,6 +322,127 @@ class SurveyRun(BaseModel):
         
         return cls.find_many(query, sort=[('due_date', 1)])
     
+    @classmethod
+    def expire_overdue_batch(cls, batch_size=500, now=None):
+        """Expire one batch of overdue runs with a single update_many, returning their IDs"""
+        now = now or datetime.utcnow()
+        collection = cls.get_collection()
+        
+        query = {
+            'status': 'active',
+            'due_date': {'$lt': now},
+            'is_active': True
+        }
+        
+        run_ids = [
+            document['_id']
+            for document in collection.find(query, {'_id': 1}).sort('due_date', 1).limit(batch_size)
+        ]
+        if not run_ids:
+            return []
+        
+        result = collection.update_many(
+            {'_id': {'$in': run_ids}, **query},
+            {'$set': {'status': 'expired', 'expired_at': now, 'updated_at': now}}
+        )
+        
+        if result.modified_count != len(run_ids):
+            # Some runs completed between the read and the write - report only what we expired
+            run_ids = [
+                document['_id']
+                for document in collection.find(
+                    {'_id': {'$in': run_ids}, 'status': 'expired', 'expired_at': now},
+                    {'_id': 1}
+                )
+            ]
+        
+        return run_ids
+    
+    @classmethod
+    def aggregate_reminder_digests(cls, days_ahead=3, throttle_since=None, now=None):
+        """
+        Collect pending respondents across all due-soon runs in one aggregation
+        
+        Returns one document per respondent email: {_id (lower-cased email),
+        email, respondent_name, surveys: [{survey_run_id, account_id,
+        survey_title, subject_name, response_token, due_date}]}. Respondents
+        reminded at or after throttle_since are left out.
+        """
+        from datetime import timedelta
+        from database.models.reminder_throttle_model import ReminderThrottle
+        
+        now = now or datetime.utcnow()
+        pipeline = [
+            {'$match': {
+                'status': 'active',
+                'is_active': True,
+                'due_date': {'$gte': now, '$lte': now + timedelta(days=days_ahead)}
+            }},
+            {'$sort': {'due_date': 1}},
+            {'$project': {
+                'survey_id': 1,
+                'subject_id': 1,
+                'account_id': 1,
+                'due_date': 1,
+                'respondents': {'$filter': {
+                    'input': '$respondents',
+                    'as': 'r',
+                    'cond': {'$eq': ['$$r.status', 'pending']}
+                }}
+            }},
+            {'$match': {'respondents.0': {'$exists': True}}},
+            # Titles are resolved once per run, before fanning out to respondents
+            {'$lookup': {'from': 'surveys', 'localField': 'survey_id', 'foreignField': '_id', 'as': 'survey'}},
+            {'$lookup': {'from': 'subjects', 'localField': 'subject_id', 'foreignField': '_id', 'as': 'subject'}},
+            {'$unwind': '$respondents'},
+            {'$lookup': {
+                'from': 'respondents',
+                'localField': 'respondents.respondent_id',
+                'foreignField': '_id',
+                'as': 'respondent'
+            }},
+            {'$unwind': '$respondent'},
+            {'$match': {'respondent.email': {'$nin': [None, '']}}},
+            {'$group': {
+                '_id': {'$toLower': '$respondent.email'},
+                'email': {'$first': '$respondent.email'},
+                'respondent_name': {'$first': '$respondent.name'},
+                'surveys': {'$push': {
+                    'survey_run_id': '$_id',
+                    'account_id': '$account_id',
+                    'survey_title': {'$ifNull': [{'$arrayElemAt': ['$survey.title', 0]}, 'Survey']},
+                    'subject_name': {'$ifNull': [{'$arrayElemAt': ['$subject.name', 0]}, 'Subject']},
+                    'response_token': '$respondents.response_token',
+                    'due_date': '$due_date'
+                }}
+            }}
+        ]
+        
+        if throttle_since is not None:
+            pipeline.extend([
+                {'$lookup': {
+                    'from': ReminderThrottle.collection_name,
+                    'localField': '_id',
+                    'foreignField': '_id',
+                    'as': 'throttle'
+                }},
+                {'$match': {'throttle': {'$not': {'$elemMatch': {'last_sent_at': {'$gte': throttle_since}}}}}},
+                {'$project': {'throttle': 0}}
+            ])
+        
+        pipeline.append({'$sort': {'_id': 1}})
+        return list(cls.get_collection().aggregate(pipeline, allowDiskUse=True))
+    
+    @classmethod
+    def find_next_due_date(cls):
+        """Get the earliest due date among active runs (None if there are none)"""
+        document = cls.get_collection().find_one(
+            {'status': 'active', 'is_active': True},
+            {'due_date': 1},
+            sort=[('due_date', 1)]
+        )
+        return document['due_date'] if document else None
+    
     def update_status(self, status):
         """Update survey run status"""
         valid_statuses = ['active', 'completed', 'cancelled', 'expired']
@@ -273,6 +466,7 @@ class SurveyRun(BaseModel):
     def expire(self):
         """Mark survey run as expired"""
         self.set_field('status', 'expired')
+        self.set_field('expired_at', datetime.utcnow())
         return self.save()
     
     def update_respondent_status(self, respondent_id, status, completed_at=None):
@@ -369,7 +563,7 @@ class SurveyRun(BaseModel):
                     respondent['respondent_id'] = str(respondent['respondent_id'])
         
         # Convert dates to ISO strings
-        for date_field in ['due_date', 'launched_at', 'completed_at']:
+        for date_field in ['due_date', 'launched_at', 'completed_at', 'expired_at']:
             if date_field in result and result[date_field]:
                 if isinstance(result[date_field], datetime):
                     result[date_field] = result[date_field].isoformat() + 'Z'
@@ -0,0 +1,105 @@
+"""
+Usage Counter Model for MongoDB
+Per-account, per-day usage counters maintained with $inc upserts, so
+metering never scans runs or responses
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import UpdateOne
+from database.base_model import BaseModel
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class UsageCounter(BaseModel):
+    """Daily usage counters (one document per account per UTC day)"""
+
+    collection_name = 'usage_daily'
+
+    required_fields = ['account_id', 'day']
+
+    METRICS = ['runs_launched', 'respondents_invited', 'responses_collected']
+
+    @classmethod
+    def record(cls, account_id, when=None, **increments):
+        """Add to one account's counters for the day (a single upsert)"""
+        return cls.record_many([(account_id, increments)], when=when)
+
+    @classmethod
+    def record_many(cls, entries, when=None):
+        """
+        Add to many accounts' counters with one bulk write. Entries are
+        (account_id, {metric: amount}) pairs; repeated accounts are summed.
+        """
+        day = _day(when or datetime.utcnow())
+        totals = defaultdict(lambda: defaultdict(int))
+        for account_id, increments in entries:
+            if account_id is None:
+                continue
+            account_id = ObjectId(account_id) if isinstance(account_id, str) else account_id
+            for metric, amount in increments.items():
+                if metric not in cls.METRICS:
+                    raise ValueError(f"Unknown usage metric: {metric}")
+                if amount:
+                    totals[account_id][metric] += amount
+
+        if not totals:
+            return 0
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {'account_id': account_id, 'day': day},
+                {'$inc': dict(increments), '$set': {'updated_at': now}},
+                upsert=True
+            )
+            for account_id, increments in totals.items()
+        ]
+        result = cls.get_collection().bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    @classmethod
+    def find_daily(cls, account_id, start, end):
+        """An account's daily counters in [start, end), oldest first"""
+        account_id = ObjectId(account_id) if isinstance(account_id, str) else account_id
+        cursor = cls.get_collection().find(
+            {'account_id': account_id, 'day': {'$gte': _day(start), '$lt': end}},
+            {'_id': 0, 'day': 1, **{metric: 1 for metric in cls.METRICS}}
+        ).sort('day', 1)
+        return list(cursor)
+
+    @classmethod
+    def aggregate_period(cls, start, end, account_ids=None):
+        """
+        Total every account's usage in [start, end) with one aggregation
+        (served by the day-first index). Returns one row per account.
+        """
+        match = {'day': {'$gte': _day(start), '$lt': end}}
+        if account_ids:
+            match['account_id'] = {'$in': [ObjectId(a) if isinstance(a, str) else a for a in account_ids]}
+
+        pipeline = [
+            {'$match': match},
+            {'$group': {
+                '_id': '$account_id',
+                **{metric: {'$sum': {'$ifNull': [f'${metric}', 0]}} for metric in cls.METRICS},
+                'active_days': {'$sum': 1}
+            }},
+            {'$sort': {'_id': 1}}
+        ]
+        return list(cls.get_collection().aggregate(pipeline, allowDiskUse=True))
+
+def _day(value):
+    """Midnight (UTC) of a datetime's day"""
+    return datetime(value.year, value.month, value.day)
+
+def month_bounds(period):
+    """'YYYY-MM' -> (first day, first day of the next month)"""
+    try:
+        start = datetime.strptime(period, '%Y-%m')
+    except (TypeError, ValueError):
+        raise ValueError("Billing period must be in YYYY-MM format")
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
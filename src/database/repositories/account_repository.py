@@ -4,10 +4,12 @@ Handles database operations for Account model
 """
 
 from database.models.account_model import Account
+from services.tracing import traced
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+@traced('repository')
 class AccountRepository:
     """Repository for Account database operations"""
     
@@ -0,0 +1,54 @@
+"""
+Billing Record Repository
+Handles database operations for BillingRecord model
+"""
+
+from database.models.billing_record_model import BillingRecord
+from services.tracing import traced
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+@traced('repository')
+class BillingRecordRepository:
+    """Repository for BillingRecord database operations"""
+
+    @staticmethod
+    def upsert_invoices(invoices):
+        """Create or refresh a period's pending invoices in one bulk write"""
+        try:
+            return BillingRecord.upsert_invoices(invoices)
+        except Exception as e:
+            logger.error(f"Failed to write {len(invoices)} invoices: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_all_records(page=1, per_page=20, filters=None):
+        """Paginate billing records, newest period first"""
+        try:
+            query = {}
+            for field in ('status', 'period'):
+                if filters and filters.get(field):
+                    query[field] = filters[field]
+            return BillingRecord.paginate(query, page=page, per_page=per_page, sort=[('period', -1), ('_id', 1)])
+        except Exception as e:
+            logger.error(f"Failed to get billing records: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_records_by_account(account_id, page=1, per_page=20):
+        """Paginate an account's billing records"""
+        try:
+            return BillingRecord.find_by_account(account_id, page=page, per_page=per_page)
+        except Exception as e:
+            logger.error(f"Failed to get billing records for account {account_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_summary():
+        """Revenue summary across all billing records"""
+        try:
+            return BillingRecord.summarize()
+        except Exception as e:
+            logger.error(f"Failed to summarize billing records: {str(e)}")
+            raise
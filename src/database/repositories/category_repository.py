@@ -4,10 +4,12 @@ Handles database operations for Category model
 """
 
 from database.models.category_model import Category
+from services.tracing import traced
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+@traced('repository')
 class CategoryRepository:
     """Repository for Category database operations"""
     
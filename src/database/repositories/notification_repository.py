@@ -0,0 +1,86 @@
+"""
+Notification Repository
+Handles database operations for Notification model and unread counters
+"""
+
+from database.models.notification_model import Notification
+from database.models.notification_counter_model import NotificationCounter
+from services.tracing import traced
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+@traced('repository')
+class NotificationRepository:
+    """Repository for Notification database operations"""
+
+    @staticmethod
+    def notify_accounts(account_ids, title, message, notification_type='info', priority='normal', data=None, batch_size=1000):
+        """Deliver a notification to many accounts in batches; returns the inserted IDs"""
+        try:
+            return Notification.fan_out(
+                account_ids,
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                priority=priority,
+                data=data,
+                batch_size=batch_size
+            )
+        except Exception as e:
+            logger.error(f"Failed to deliver notification to {len(account_ids)} accounts: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_inbox(account_id, limit=20, before=None, unread_only=False):
+        """Get a newest-first page of an account's notifications"""
+        try:
+            return Notification.find_inbox(account_id, limit=limit, before=before, unread_only=unread_only)
+        except Exception as e:
+            logger.error(f"Failed to get notifications for account {account_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_unread_count(account_id):
+        """Get an account's unread notification count (single point read)"""
+        try:
+            return NotificationCounter.get_unread(account_id)
+        except Exception as e:
+            logger.error(f"Failed to get unread count for account {account_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def mark_read(notification_id, account_id):
+        """Mark one notification read"""
+        try:
+            return Notification.mark_read(notification_id, account_id)
+        except Exception as e:
+            logger.error(f"Failed to mark notification {notification_id} as read: {str(e)}")
+            raise
+
+    @staticmethod
+    def mark_all_read(account_id):
+        """Mark all of an account's notifications read"""
+        try:
+            return Notification.mark_all_read(account_id)
+        except Exception as e:
+            logger.error(f"Failed to mark notifications read for account {account_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def delete_notification(notification_id, account_id):
+        """Delete a notification from an account's inbox"""
+        try:
+            return Notification.delete_for_account(notification_id, account_id)
+        except Exception as e:
+            logger.error(f"Failed to delete notification {notification_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def recount_unread(account_id):
+        """Recount and repair an account's unread counter"""
+        try:
+            return Notification.recount_unread(account_id)
+        except Exception as e:
+            logger.error(f"Failed to recount notifications for account {account_id}: {str(e)}")
+            raise
@@ -0,0 +1,63 @@
+"""
+Report Instance Repository
+Handles database operations for ReportInstance model
+"""
+
+from database.models.report_instance_model import ReportInstance
+from services.tracing import traced
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+@traced('repository')
+class ReportInstanceRepository:
+    """Repository for ReportInstance database operations"""
+
+    @staticmethod
+    def create_instance(report_id, report_type, target_id, account_id=None, requested_by=None, params=None):
+        """Create a queued report instance"""
+        try:
+            return ReportInstance.create_instance(
+                report_id=report_id,
+                report_type=report_type,
+                target_id=target_id,
+                account_id=account_id,
+                requested_by=requested_by,
+                params=params
+            )
+        except Exception as e:
+            logger.error(f"Failed to create report instance: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_instance_by_id(instance_id):
+        """Get report instance by ID"""
+        try:
+            return ReportInstance.find_by_id(instance_id)
+        except Exception as e:
+            logger.error(f"Failed to get report instance by ID {instance_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_instances_by_report(report_id, page=1, per_page=20, account_id=None, status=None):
+        """Get paginated report instances for a report"""
+        try:
+            return ReportInstance.find_by_report(
+                report_id,
+                page=page,
+                per_page=per_page,
+                account_id=account_id,
+                status=status
+            )
+        except Exception as e:
+            logger.error(f"Failed to get instances for report {report_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def mark_failed(instance_id, error):
+        """Mark a report instance as failed"""
+        try:
+            ReportInstance.mark_failed(instance_id, error)
+        except Exception as e:
+            logger.error(f"Failed to mark report instance {instance_id} as failed: {str(e)}")
+            raise
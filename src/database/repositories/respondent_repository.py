@@ -1,8 +1,10 @@
 from bson import ObjectId
 from database.connection import get_db
 from database.models.respondent_model import RespondentModel
+from services.tracing import traced
 from utils.logger import get_logger
 
+@traced('repository')
 class RespondentRepository:
     """
     Repository for respondent data operations
@@ -190,3 +192,24 @@ class RespondentRepository:
         except Exception as e:
             logger.error(f"Failed to retrieve respondents for subject {subject_id}: {str(e)}")
             raise
+    
+    @staticmethod
+    def get_respondents_by_ids(respondent_ids, fields=None, subject_ids=None):
+        """
+        Map respondent ID -> raw respondent document for many respondents with one query
+        
+        With subject_ids, only respondents of those subjects are returned.
+        """
+        logger = get_logger(__name__)
+        
+        try:
+            query = {'_id': {'$in': list(respondent_ids)}}
+            if subject_ids is not None:
+                query['subject_id'] = {'$in': list(subject_ids)}
+            projection = {field: 1 for field in fields} if fields else None
+            cursor = RespondentRepository.get_collection().find(query, projection)
+            return {document['_id']: document for document in cursor}
+            
+        except Exception as e:
+            logger.error(f"Failed to retrieve respondents by IDs: {str(e)}")
+            raise
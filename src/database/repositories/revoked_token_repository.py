@@ -0,0 +1,41 @@
+"""
+Revoked Token Repository
+Handles database operations for RevokedToken model
+"""
+
+from database.models.revoked_token_model import RevokedToken
+from services.tracing import traced
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+@traced('repository')
+class RevokedTokenRepository:
+    """Repository for RevokedToken database operations"""
+
+    @staticmethod
+    def revoke(jti, expires_at, token_type=None, account_id=None, reason=None):
+        """Revoke a token by jti"""
+        try:
+            return RevokedToken.revoke(jti, expires_at, token_type=token_type, account_id=account_id, reason=reason)
+        except Exception as e:
+            logger.error(f"Failed to revoke token {jti}: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_unexpired():
+        """Get every revoked token that has not expired yet"""
+        try:
+            return RevokedToken.find_unexpired()
+        except Exception as e:
+            logger.error(f"Failed to load revoked tokens: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_revoked_since(since):
+        """Get tokens revoked at or after a time"""
+        try:
+            return RevokedToken.find_revoked_since(since)
+        except Exception as e:
+            logger.error(f"Failed to load tokens revoked since {since}: {str(e)}")
+            raise
@@ -0,0 +1,50 @@
+"""
+Setting Repository
+Handles database operations for Setting model
+"""
+
+from database.models.setting_model import Setting
+from services.tracing import traced
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+@traced('repository')
+class SettingRepository:
+    """Repository for Setting database operations"""
+
+    @staticmethod
+    def get_global_version():
+        """Get the global settings change counter"""
+        try:
+            return Setting.get_global_version()
+        except Exception as e:
+            logger.error(f"Failed to get settings version: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_scope_versions(scopes):
+        """Get the versions of settings scopes"""
+        try:
+            return Setting.get_scope_versions(scopes)
+        except Exception as e:
+            logger.error(f"Failed to get versions of {len(scopes)} settings scopes: {str(e)}")
+            raise
+
+    @staticmethod
+    def load_scopes(scopes):
+        """Load the overrides of settings scopes"""
+        try:
+            return Setting.load_scopes(scopes)
+        except Exception as e:
+            logger.error(f"Failed to load {len(scopes)} settings scopes: {str(e)}")
+            raise
+
+    @staticmethod
+    def write(scope, values=None, unset_keys=None, updated_by=None):
+        """Set and/or clear overrides in a settings scope"""
+        try:
+            return Setting.write(scope, values=values, unset_keys=unset_keys, updated_by=updated_by)
+        except Exception as e:
+            logger.error(f"Failed to write settings for scope {scope}: {str(e)}")
+            raise
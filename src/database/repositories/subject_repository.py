@@ -3,11 +3,14 @@ Subject Repository
 Handles database operations for Subject model
 """
 
+from bson import ObjectId
 from database.models.subject_model import Subject
+from services.tracing import traced
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+@traced('repository')
 class SubjectRepository:
     """Repository for Subject database operations"""
     
@@ -36,6 +39,23 @@ class SubjectRepository:
             logger.error(f"Failed to get subject by ID {subject_id}: {str(e)}")
             raise
     
+    @staticmethod
+    def get_subjects_by_ids(subject_ids, fields=None, account_id=None):
+        """Map subject ID -> raw subject document for many subjects with one query
+        
+        With account_id, subjects of other accounts are left out.
+        """
+        try:
+            query = {'_id': {'$in': list(subject_ids)}}
+            if account_id:
+                query['account_id'] = ObjectId(account_id) if isinstance(account_id, str) else account_id
+            projection = {field: 1 for field in fields} if fields else None
+            cursor = Subject.get_collection().find(query, projection)
+            return {document['_id']: document for document in cursor}
+        except Exception as e:
+            logger.error(f"Failed to get subjects by IDs: {str(e)}")
+            raise
+    
     @staticmethod
     def get_subjects_by_account(account_id, active_only=True):
         """Get subjects by account ID"""
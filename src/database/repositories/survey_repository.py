@@ -4,10 +4,12 @@ Handles database operations for Survey model
 """
 
 from database.models.survey_model import Survey
+from services.tracing import traced
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+@traced('repository')
 class SurveyRepository:
     """Repository for Survey database operations"""
     
@@ -4,10 +4,13 @@ Handles database operations for Survey Response model
 """
 
 from database.models.survey_response_model import SurveyResponse
+from utils.export_writers import EXPORT_FORMATS, DEFAULT_CHUNK_ROWS, iter_export
+from services.tracing import traced
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+@traced('repository')
 class SurveyResponseRepository:
     """Repository for Survey Response database operations"""
     
@@ -275,9 +278,19 @@ class SurveyResponseRepository:
             raise
     
     @staticmethod
-    def export_responses(survey_run_id, format='json'):
-        """Export responses for a survey run"""
+    def export_responses(survey_run_id=None, format='json', survey_id=None, anonymous=False, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """Export responses for a survey run (or a whole survey)
+        
+        'json' and 'anonymous' return lists of dicts. 'csv', 'csv.gz',
+        'parquet' and 'arrow' return an iterator of encoded byte chunks,
+        streamed from a cursor with one column per question.
+        """
         try:
+            if format in EXPORT_FORMATS:
+                return SurveyResponseRepository._stream_export(
+                    survey_run_id, survey_id, format, anonymous, chunk_rows
+                )
+            
             responses = SurveyResponse.find_by_survey_run(survey_run_id)
             
             if format == 'json':
@@ -291,6 +304,57 @@ class SurveyResponseRepository:
             logger.error(f"Failed to export responses for survey run {survey_run_id}: {str(e)}")
             raise
     
+    @staticmethod
+    def _stream_export(survey_run_id, survey_id, export_format, anonymous, chunk_rows):
+        """Build the column layout and return the encoded chunk iterator"""
+        from bson import ObjectId
+        from database.models.survey_model import Survey
+        
+        query = {}
+        if survey_run_id:
+            query['survey_run_id'] = ObjectId(survey_run_id) if isinstance(survey_run_id, str) else survey_run_id
+        if survey_id:
+            query['survey_id'] = ObjectId(survey_id) if isinstance(survey_id, str) else survey_id
+        if not query:
+            raise ValueError("survey_run_id or survey_id is required")
+        
+        # Question columns come from the survey definition; fall back to the answered keys
+        if not survey_id and survey_run_id:
+            from database.models.survey_run_model import SurveyRun
+            run = SurveyRun.get_collection().find_one({'_id': query['survey_run_id']}, {'survey_id': 1})
+            survey_id = run['survey_id'] if run else None
+        
+        survey = Survey.get_collection().find_one(
+            {'_id': ObjectId(survey_id) if isinstance(survey_id, str) else survey_id},
+            {'questions.id': 1}
+        ) if survey_id else None
+        question_ids = [question['id'] for question in (survey or {}).get('questions', [])]
+        if not question_ids:
+            question_ids = SurveyResponse.get_question_ids(query)
+        
+        base_columns = ['response_id', 'survey_run_id', 'survey_id']
+        if not anonymous:
+            base_columns.append('respondent_id')
+        base_columns.extend(['submitted_at', 'status'])
+        
+        def rows():
+            for document in SurveyResponse.iter_export_documents(query, batch_size=chunk_rows):
+                answers = document.get('responses') or {}
+                row = [str(document['_id']), str(document.get('survey_run_id')), str(document.get('survey_id'))]
+                if not anonymous:
+                    row.append(str(document.get('respondent_id')))
+                row.append(document.get('submitted_at'))
+                row.append(document.get('status'))
+                row.extend(answers.get(question_id) for question_id in question_ids)
+                yield row
+        
+        # Answers are free-form in the stored documents, so they are exported as text
+        return iter_export(
+            rows(), base_columns + question_ids, export_format,
+            chunk_rows=chunk_rows,
+            column_types={'submitted_at': 'timestamp'}
+        )
+    
     @staticmethod
     def validate_response_data(responses, required_questions):
         """Validate response data format and completeness"""
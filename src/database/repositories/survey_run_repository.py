@@ -4,10 +4,12 @@ Handles database operations for Survey Run model
 """
 
 from database.models.survey_run_model import SurveyRun
+from services.tracing import traced
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+@traced('repository')
 class SurveyRunRepository:
     """Repository for Survey Run database operations"""
     
@@ -28,6 +30,20 @@ class SurveyRunRepository:
             logger.error(f"Failed to create survey run: {str(e)}")
             raise
     
+    @staticmethod
+    def build_run_data(survey_id, subject_id, respondents, due_date, launched_by, account_id, **kwargs):
+        """Validate run input and build the run document without saving it"""
+        return SurveyRun.build_run_data(survey_id, subject_id, respondents, due_date, launched_by, account_id, **kwargs)
+    
+    @staticmethod
+    def create_survey_runs(runs_data):
+        """Insert many validated runs at once; returns inserted IDs (None for failures)"""
+        try:
+            return SurveyRun.create_survey_runs(runs_data)
+        except Exception as e:
+            logger.error(f"Failed to create survey runs in bulk: {str(e)}")
+            raise
+    
     @staticmethod
     def get_survey_run_by_id(survey_run_id):
         """Get survey run by ID"""
@@ -91,6 +107,24 @@ class SurveyRunRepository:
             logger.error(f"Failed to find active run for survey {survey_id}, subject {subject_id}: {str(e)}")
             raise
     
+    @staticmethod
+    def find_active_runs_for_subjects(survey_id, subject_ids):
+        """Map subject ID -> active run ID for subjects already running the survey"""
+        try:
+            return SurveyRun.find_active_runs_for_subjects(survey_id, subject_ids)
+        except Exception as e:
+            logger.error(f"Failed to find active runs for survey {survey_id}: {str(e)}")
+            raise
+    
+    @staticmethod
+    def get_run_progress(survey_run_id=None, account_id=None):
+        """Progress documents for one run, or an account's active runs"""
+        try:
+            return SurveyRun.find_progress(survey_run_id=survey_run_id, account_id=account_id)
+        except Exception as e:
+            logger.error(f"Failed to get survey run progress: {str(e)}")
+            raise
+    
     @staticmethod
     def get_runs_by_survey(survey_id, active_only=True):
         """Get survey runs by survey ID"""
@@ -313,6 +347,21 @@ class SurveyRunRepository:
             logger.error(f"Failed to get due soon runs: {str(e)}")
             raise
     
+    @staticmethod
+    def get_reminder_digests(days_ahead=3, throttle_hours=None):
+        """Get pending respondents of due-soon runs grouped into one digest per email"""
+        try:
+            from datetime import datetime, timedelta
+            
+            throttle_since = None
+            if throttle_hours:
+                throttle_since = datetime.utcnow() - timedelta(hours=throttle_hours)
+            
+            return SurveyRun.aggregate_reminder_digests(days_ahead=days_ahead, throttle_since=throttle_since)
+        except Exception as e:
+            logger.error(f"Failed to get reminder digests: {str(e)}")
+            raise
+    
     @staticmethod
     def get_overdue_runs():
         """Get overdue survey runs"""
@@ -422,29 +471,42 @@ class SurveyRunRepository:
             raise
     
     @staticmethod
-    def bulk_expire_overdue_runs():
-        """Bulk expire all overdue survey runs"""
+    def bulk_expire_overdue_runs(batch_size=500, max_batches=None):
+        """Bulk expire all overdue survey runs, one update_many per batch
+        
+        Returns the list of expired survey run IDs.
+        """
         try:
             from datetime import datetime
             
-            # Find all overdue active runs
-            overdue_runs = SurveyRun.find_overdue()
+            now = datetime.utcnow()
+            expired_ids = []
+            batches = 0
             
-            expired_count = 0
-            for run in overdue_runs:
-                try:
-                    run.expire()
-                    expired_count += 1
-                except Exception as e:
-                    logger.error(f"Failed to expire survey run {run._id}: {str(e)}")
+            while max_batches is None or batches < max_batches:
+                batch_ids = SurveyRun.expire_overdue_batch(batch_size=batch_size, now=now)
+                expired_ids.extend(batch_ids)
+                batches += 1
+                
+                if len(batch_ids) < batch_size:
+                    break
             
-            logger.info(f"Bulk expired {expired_count} overdue survey runs")
-            return expired_count
+            logger.info(f"Bulk expired {len(expired_ids)} overdue survey runs in {batches} batch(es)")
+            return expired_ids
             
         except Exception as e:
             logger.error(f"Failed to bulk expire overdue runs: {str(e)}")
             raise
     
+    @staticmethod
+    def get_next_due_date():
+        """Get the earliest due date among active survey runs"""
+        try:
+            return SurveyRun.find_next_due_date()
+        except Exception as e:
+            logger.error(f"Failed to get next due date: {str(e)}")
+            raise
+    
     @staticmethod
     def get_response_rate_by_account(account_id):
         """Get response rate statistics for an account"""
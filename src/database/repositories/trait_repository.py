@@ -4,10 +4,12 @@ Handles database operations for Trait model
 """
 
 from database.models.trait_model import Trait
+from services.tracing import traced
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+@traced('repository')
 class TraitRepository:
     """Repository for Trait database operations"""
     
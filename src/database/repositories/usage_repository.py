@@ -0,0 +1,50 @@
+"""
+Usage Repository
+Handles database operations for the daily UsageCounter model
+"""
+
+from database.models.usage_counter_model import UsageCounter
+from services.tracing import traced
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+@traced('repository')
+class UsageRepository:
+    """Repository for usage metering operations"""
+
+    @staticmethod
+    def record_usage(account_id, **increments):
+        """Add to an account's usage counters for today"""
+        try:
+            return UsageCounter.record(account_id, **increments)
+        except Exception as e:
+            logger.error(f"Failed to record usage for account {account_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def record_usage_many(entries):
+        """Add to many accounts' usage counters with one bulk write"""
+        try:
+            return UsageCounter.record_many(entries)
+        except Exception as e:
+            logger.error(f"Failed to record usage for {len(entries)} accounts: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_daily_usage(account_id, start, end):
+        """Get an account's daily usage in [start, end)"""
+        try:
+            return UsageCounter.find_daily(account_id, start, end)
+        except Exception as e:
+            logger.error(f"Failed to get usage for account {account_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_period_usage(start, end, account_ids=None):
+        """Get every account's usage totals in [start, end) (one aggregation)"""
+        try:
+            return UsageCounter.aggregate_period(start, end, account_ids=account_ids)
+        except Exception as e:
+            logger.error(f"Failed to aggregate usage for {start:%Y-%m-%d}..{end:%Y-%m-%d}: {str(e)}")
+            raise
@@ -0,0 +1,396 @@
+"""
+Synthetic Data for IkeNei Application
+Builds realistic, linked accounts, subjects, respondents, approved surveys,
+survey runs and responses at a configurable scale for benchmarks and
+performance environments
+
+Output is deterministic for a given seed and scale: ids, names, tokens and
+ratings come from per-account random generators, so two runs produce the
+same dataset (dates are relative to the day of generation). Because ids are
+deterministic, re-running an interrupted generation skips what is already
+there. generate_synthetic_data spreads accounts over a process pool for
+production-sized datasets (flask seed-synthetic).
+"""
+
+import base64
+import multiprocessing
+import random
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+from database.models.account_model import Account
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Scale used when none is given (about 10k documents)
+DEFAULT_SCALE = {
+    'accounts': 10,
+    'subjects_per_account': 50,
+    'respondents_per_subject': 8,
+    'surveys_per_account': 4,
+    'runs_per_subject': 1,
+    'questions_per_survey': 20,
+    'traits': 12,
+    'response_rate': 0.6
+}
+
+# Insert order (parents before children)
+COLLECTIONS = ['traits', 'accounts', 'subjects', 'respondents', 'surveys', 'survey_runs', 'survey_responses']
+
+FIRST_NAMES = ['Amara', 'Ben', 'Chen', 'Dara', 'Elif', 'Femi', 'Grace', 'Hiro', 'Ines', 'Jonas',
+               'Kofi', 'Lena', 'Mateo', 'Nadia', 'Omar', 'Priya', 'Quinn', 'Rosa', 'Sami', 'Tara']
+LAST_NAMES = ['Adeyemi', 'Becker', 'Costa', 'Dubois', 'Eriksen', 'Fischer', 'Garcia', 'Haddad', 'Ito', 'Jensen',
+              'Kowalski', 'Larsen', 'Mensah', 'Novak', 'Okafor', 'Petrov', 'Rossi', 'Silva', 'Tanaka', 'Weber']
+POSITIONS = ['Team Lead', 'Engineering Manager', 'Sales Director', 'Product Owner', 'HR Partner', 'Analyst']
+DEPARTMENTS = ['Engineering', 'Sales', 'Product', 'People', 'Finance', 'Operations']
+RELATIONSHIPS = ['Peer', 'Subordinate', 'Boss', 'Customer', 'Super Boss', 'Third Party']
+TRAIT_NAMES = ['Communication', 'Leadership', 'Teamwork', 'Adaptability', 'Ownership', 'Decision Making',
+               'Coaching', 'Customer Focus', 'Integrity', 'Innovation', 'Planning', 'Resilience']
+CATEGORIES = ['Leadership', 'Collaboration', 'Execution', 'Character']
+LEVELS = ['basic', 'medium', 'advanced']
+
+# ObjectId kinds (byte 5 of generated ids), so ids never collide across collections
+_KINDS = {name: index + 1 for index, name in enumerate(COLLECTIONS)}
+
+# Timestamp part of generated ObjectIds (2024-01-01T00:00:00Z)
+_EPOCH = 1704067200
+
+def make_scale(**overrides):
+    """DEFAULT_SCALE with the given (non-None) values replaced"""
+    scale = dict(DEFAULT_SCALE)
+    for key, value in overrides.items():
+        if key not in scale:
+            raise ValueError(f"Unknown scale setting: {key}")
+        if value is not None:
+            scale[key] = value
+    # Each subject's respondent weights are positive integers summing to 100
+    if not 1 <= scale['respondents_per_subject'] <= 99:
+        raise ValueError("respondents_per_subject must be between 1 and 99")
+    return scale
+
+def expected_counts(scale):
+    """Approximate document counts per collection for a scale"""
+    subjects = scale['accounts'] * scale['subjects_per_account']
+    runs = subjects * min(scale['runs_per_subject'], scale['surveys_per_account'])
+    return {
+        'traits': scale['traits'],
+        'accounts': scale['accounts'],
+        'subjects': subjects,
+        'respondents': subjects * scale['respondents_per_subject'],
+        'surveys': scale['accounts'] * scale['surveys_per_account'],
+        'survey_runs': runs,
+        'survey_responses': int(runs * scale['respondents_per_subject'] * scale['response_rate'])
+    }
+
+def synthetic_id(kind, account_index, number):
+    """Deterministic ObjectId: fixed timestamp, collection kind, account index and a per-account sequence"""
+    return ObjectId(struct.pack('>IBI', _EPOCH, _KINDS[kind], account_index) + number.to_bytes(3, 'big'))
+
+def _token(rng):
+    """A response token shaped like secrets.token_urlsafe(32)"""
+    return base64.urlsafe_b64encode(rng.getrandbits(256).to_bytes(32, 'big')).rstrip(b'=').decode('ascii')
+
+def _split_weights(count, rng):
+    """count positive integer weights that sum to 100"""
+    if count >= 100:
+        raise ValueError("At most 99 respondents per subject are supported (weights must sum to 100)")
+    cuts = sorted(rng.sample(range(1, 100), count - 1))
+    return [b - a for a, b in zip([0] + cuts, cuts + [100])]
+
+def build_traits(scale, seed=0):
+    """Shared trait library"""
+    rng = random.Random(f'{seed}:traits')
+    traits = []
+    for i in range(scale['traits']):
+        name = TRAIT_NAMES[i % len(TRAIT_NAMES)] + (f' {i // len(TRAIT_NAMES) + 1}' if i >= len(TRAIT_NAMES) else '')
+        traits.append({
+            '_id': synthetic_id('traits', 0, i),
+            'name': name,
+            'category': rng.choice(CATEGORIES),
+            'description': f'How consistently the subject shows {name.lower()}',
+            'items': [
+                {'id': f'item_{j + 1}', 'question': f'{name}: statement {j + 1}', 'level': LEVELS[j % 3], 'type': 'rating_1_5'}
+                for j in range(4)
+            ],
+            'created_at': datetime(2024, 1, 1),
+            'updated_at': datetime(2024, 1, 1),
+            'is_active': True
+        })
+    return traits
+
+def build_account(index, scale, traits, password_hash, seed=0, now=None):
+    """
+    All documents owned by one account, keyed by collection. Independent of
+    every other account, so accounts can be built in any order or in parallel.
+    """
+    rng = random.Random(f'{seed}:account:{index}')
+    now = now or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    account_id = synthetic_id('accounts', index, 0)
+    counters = dict.fromkeys(COLLECTIONS, 0)
+
+    def next_id(kind):
+        counters[kind] += 1
+        return synthetic_id(kind, index, counters[kind])
+
+    def person():
+        return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+    created_at = now - timedelta(days=rng.randint(90, 720))
+    documents = {name: [] for name in COLLECTIONS}
+    documents['accounts'].append({
+        '_id': account_id,
+        'email': f'account{index}@synthetic.example.com',
+        'password_hash': password_hash,
+        'account_name': f'Synthetic Account {index}',
+        'role': 'account',
+        'settings': Account.DEFAULT_SETTINGS.copy(),
+        'email_verified': True,
+        'created_at': created_at,
+        'updated_at': created_at,
+        'is_active': True
+    })
+
+    # Approved surveys, each on a weighted subset of the trait library
+    surveys = []
+    for s in range(scale['surveys_per_account']):
+        chosen = rng.sample(traits, min(len(traits), rng.randint(3, 5)))
+        weights = _split_weights(len(chosen), rng)
+        survey = {
+            '_id': next_id('surveys'),
+            'account_id': account_id,
+            'title': f'{rng.choice(["360", "Leadership", "Quarterly", "Onboarding"])} Review {s + 1}',
+            'survey_type': '360_feedback',
+            'description': 'Synthetic survey',
+            'questions': [
+                {'id': f'q{q + 1}', 'text': f'{chosen[q % len(chosen)]["name"]}: question {q + 1}', 'type': 'rating_1_5', 'required': True}
+                for q in range(scale['questions_per_survey'])
+            ],
+            'traits': [
+                {'id': str(trait['_id']), 'name': trait['name'], 'weightage': weight}
+                for trait, weight in zip(chosen, weights)
+            ],
+            'status': 'approved',
+            'approved_at': created_at + timedelta(days=1),
+            'response_count': 0,
+            'completion_rate': 0.0,
+            'created_at': created_at,
+            'updated_at': created_at,
+            'is_active': True
+        }
+        surveys.append(survey)
+        documents['surveys'].append(survey)
+
+    for _ in range(scale['subjects_per_account']):
+        subject_id = next_id('subjects')
+        name = person()
+        documents['subjects'].append({
+            '_id': subject_id,
+            'account_id': account_id,
+            'name': name,
+            'email': f'{name.lower().replace(" ", ".")}.{counters["subjects"]}@a{index}.synthetic.example.com',
+            'position': rng.choice(POSITIONS),
+            'department': rng.choice(DEPARTMENTS),
+            'status': 'active',
+            'surveys_count': 0,
+            'created_at': created_at,
+            'updated_at': created_at,
+            'is_active': True
+        })
+
+        respondents = []
+        for _ in range(scale['respondents_per_subject']):
+            respondent_name = person()
+            respondent = {
+                '_id': next_id('respondents'),
+                'subject_id': subject_id,
+                'name': respondent_name,
+                'email': f'{respondent_name.lower().replace(" ", ".")}.{counters["respondents"]}@r{index}.synthetic.example.com',
+                'phone': None,
+                'address': None,
+                'relationship': rng.choice(RELATIONSHIPS),
+                'other_info': None,
+                'status': 'invited',
+                'response_status': 'pending',
+                'invited_at': created_at,
+                'responded_at': None,
+                'created_at': created_at,
+                'updated_at': created_at,
+                'is_active': True
+            }
+            respondents.append(respondent)
+            documents['respondents'].append(respondent)
+
+        for survey in rng.sample(surveys, min(scale['runs_per_subject'], len(surveys))):
+            launched_at = now - timedelta(days=rng.randint(1, 20))
+            run_id = next_id('survey_runs')
+            run_respondents = []
+            for respondent, weight in zip(respondents, _split_weights(len(respondents), rng)):
+                entry = {
+                    'respondent_id': respondent['_id'],
+                    'weight': weight,
+                    'relationship': respondent['relationship'],
+                    'status': 'pending',
+                    'invited_at': launched_at,
+                    'completed_at': None,
+                    'response_token': _token(rng)
+                }
+                if rng.random() < scale['response_rate']:
+                    entry['status'] = 'completed'
+                    entry['completed_at'] = launched_at + timedelta(hours=rng.randint(1, 24 * 7))
+                    documents['survey_responses'].append({
+                        '_id': next_id('survey_responses'),
+                        'survey_run_id': run_id,
+                        'survey_id': survey['_id'],
+                        'respondent_id': respondent['_id'],
+                        'response_token': entry['response_token'],
+                        'responses': {question['id']: rng.randint(1, 5) for question in survey['questions']},
+                        'status': 'completed',
+                        'submitted_at': entry['completed_at'],
+                        'created_at': entry['completed_at'],
+                        'updated_at': entry['completed_at'],
+                        'is_active': True
+                    })
+                run_respondents.append(entry)
+
+            completed = sum(1 for entry in run_respondents if entry['status'] == 'completed')
+            documents['survey_runs'].append({
+                '_id': run_id,
+                'survey_id': survey['_id'],
+                'subject_id': subject_id,
+                'respondents': run_respondents,
+                'due_date': now + timedelta(days=rng.randint(7, 30)),
+                'launched_by': account_id,
+                'account_id': account_id,
+                'total_weight': 100,
+                'status': 'completed' if completed == len(run_respondents) else 'active',
+                'response_count': completed,
+                'completion_rate': completed / len(run_respondents) * 100 if run_respondents else 0.0,
+                'launched_at': launched_at,
+                'created_at': launched_at,
+                'updated_at': launched_at,
+                'is_active': True
+            })
+
+    return documents
+
+def insert_documents(db, documents, batch_size=1000):
+    """
+    Insert documents keyed by collection with unordered insert_many batches.
+    Returns counts of new documents; ones that already exist are skipped.
+    """
+    counts = {}
+    for name in COLLECTIONS:
+        batch = documents.get(name) or []
+        inserted = 0
+        for start in range(0, len(batch), batch_size):
+            chunk = batch[start:start + batch_size]
+            try:
+                inserted += len(db[name].insert_many(chunk, ordered=False).inserted_ids)
+            except BulkWriteError as e:
+                errors = e.details.get('writeErrors', [])
+                if any(error.get('code') != 11000 for error in errors):
+                    raise
+                inserted += e.details.get('nInserted', len(chunk) - len(errors))
+        counts[name] = inserted
+    return counts
+
+def seed_synthetic_data(db, scale=None, password_hash=None, seed=0, batch_size=1000, drop=False):
+    """
+    Generate and insert a synthetic dataset into db. Accounts share one
+    precomputed password_hash (bcrypt per account would dominate the run).
+    Returns document counts per collection.
+    """
+    scale = scale or dict(DEFAULT_SCALE)
+    if drop:
+        for name in COLLECTIONS:
+            db[name].delete_many({})
+
+    now = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    traits = build_traits(scale, seed)
+    totals = insert_documents(db, {'traits': traits}, batch_size)
+
+    for index in range(scale['accounts']):
+        counts = insert_documents(db, build_account(index, scale, traits, password_hash, seed, now), batch_size)
+        for name, count in counts.items():
+            totals[name] = totals.get(name, 0) + count
+
+    logger.info(f"Seeded synthetic data: {totals}")
+    return totals
+
+# Per-process state for the generator pool
+_worker_client = None
+_worker_db = None
+
+def _init_worker(mongo_uri, db_name):
+    """Process pool initializer: one MongoDB client per worker process"""
+    global _worker_client, _worker_db
+    _worker_client = MongoClient(mongo_uri)
+    _worker_db = _worker_client[db_name]
+
+def _generate_accounts(indexes, scale, traits, password_hash, seed, now, batch_size):
+    """Build and insert a chunk of accounts inside a worker; returns counts"""
+    totals = dict.fromkeys(COLLECTIONS, 0)
+    for index in indexes:
+        counts = insert_documents(_worker_db, build_account(index, scale, traits, password_hash, seed, now), batch_size)
+        for name, count in counts.items():
+            totals[name] += count
+    return len(indexes), totals
+
+def generate_synthetic_data(mongo_uri, db_name, scale=None, password_hash=None, seed=0, workers=None,
+                            batch_size=1000, accounts_per_task=None, drop=False, progress=None):
+    """
+    Generate a synthetic dataset on a pool of spawned worker processes, each
+    building whole accounts and inserting them over its own connection.
+    Accounts share one precomputed password_hash. progress(accounts_done,
+    counts) is called as chunks finish. Returns counts of new documents.
+    """
+    scale = scale or dict(DEFAULT_SCALE)
+    workers = workers or multiprocessing.cpu_count()
+    started = time.perf_counter()
+
+    client = MongoClient(mongo_uri)
+    try:
+        db = client[db_name]
+        if drop:
+            for name in COLLECTIONS:
+                db[name].delete_many({})
+        now = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        traits = build_traits(scale, seed)
+        totals = dict.fromkeys(COLLECTIONS, 0)
+        totals.update(insert_documents(db, {'traits': traits}, batch_size))
+    finally:
+        client.close()
+
+    # Enough chunks to keep every worker busy, small enough to report progress
+    accounts_per_task = accounts_per_task or max(1, min(100, scale['accounts'] // (workers * 4) or 1))
+    chunks = [
+        list(range(start, min(start + accounts_per_task, scale['accounts'])))
+        for start in range(0, scale['accounts'], accounts_per_task)
+    ]
+
+    done = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(mongo_uri, db_name)
+    ) as executor:
+        futures = [
+            executor.submit(_generate_accounts, chunk, scale, traits, password_hash, seed, now, batch_size)
+            for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            accounts, counts = future.result()
+            done += accounts
+            for name, count in counts.items():
+                totals[name] += count
+            if progress:
+                progress(done, totals)
+
+    logger.info(f"Generated synthetic data with {workers} workers in {time.perf_counter() - started:.1f}s: {totals}")
+    return totals
@@ -0,0 +1,138 @@
+"""
+Billing Service
+Prices metered usage. An invoice run totals every account's daily usage
+counters with one aggregation, prices all accounts in a single columnar
+pass and writes the invoices with one bulk write.
+
+Amounts are integer cents throughout, so no float rounding is involved.
+"""
+
+import time
+from database.repositories.usage_repository import UsageRepository
+from database.repositories.billing_record_repository import BillingRecordRepository
+from database.models.usage_counter_model import UsageCounter, month_bounds
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class BillingCalculator:
+    """Prices usage rows: base fee plus per-run, per-respondent and per-response rates"""
+
+    def __init__(self, base_fee_cents=0, run_price_cents=0, respondent_price_cents=0, response_price_cents=0, currency='USD'):
+        self.base_fee_cents = base_fee_cents
+        self.unit_prices = {
+            'runs_launched': run_price_cents,
+            'respondents_invited': respondent_price_cents,
+            'responses_collected': response_price_cents
+        }
+        self.currency = currency
+
+    def price(self, usage):
+        """Price one usage dict; returns the line items and total in cents"""
+        return self.price_all([usage])[0]
+
+    def price_all(self, usage_rows):
+        """
+        Price many usage rows in one pass: each metric column is multiplied
+        by its unit price, then the columns are summed per row
+        """
+        columns = {
+            metric: [row.get(metric, 0) or 0 for row in usage_rows]
+            for metric in UsageCounter.METRICS
+        }
+        line_totals = {
+            metric: [quantity * unit_price for quantity in columns[metric]]
+            for metric, unit_price in self.unit_prices.items()
+        }
+        amounts = [
+            self.base_fee_cents + sum(values)
+            for values in zip(*(line_totals[metric] for metric in UsageCounter.METRICS))
+        ]
+
+        return [
+            {
+                'line_items': [
+                    {
+                        'metric': metric,
+                        'quantity': columns[metric][i],
+                        'unit_price_cents': self.unit_prices[metric],
+                        'amount_cents': line_totals[metric][i]
+                    }
+                    for metric in UsageCounter.METRICS
+                ],
+                'base_fee_cents': self.base_fee_cents,
+                'amount_cents': amounts[i],
+                'currency': self.currency
+            }
+            for i in range(len(usage_rows))
+        ]
+
+class BillingService:
+    """Builds invoices from usage counters"""
+
+    def __init__(self):
+        self.calculator = BillingCalculator()
+
+    def configure(self, base_fee_cents=None, run_price_cents=None, respondent_price_cents=None,
+                  response_price_cents=None, currency=None):
+        """Apply pricing configuration"""
+        self.calculator = BillingCalculator(
+            base_fee_cents=base_fee_cents or 0,
+            run_price_cents=run_price_cents or 0,
+            respondent_price_cents=respondent_price_cents or 0,
+            response_price_cents=response_price_cents or 0,
+            currency=currency or 'USD'
+        )
+
+    def calculate_period(self, period, account_ids=None):
+        """Price every account's usage for a 'YYYY-MM' period (no writes)"""
+        start, end = month_bounds(period)
+        usage_rows = UsageRepository.get_period_usage(start, end, account_ids=account_ids)
+        priced = self.calculator.price_all(usage_rows)
+
+        return [
+            {
+                'account_id': row['_id'],
+                'period': period,
+                'period_start': start,
+                'period_end': end,
+                'usage': {metric: row.get(metric, 0) for metric in UsageCounter.METRICS},
+                **pricing
+            }
+            for row, pricing in zip(usage_rows, priced)
+        ]
+
+    def run_invoices(self, period):
+        """Create or refresh the pending invoices of every account with usage in the period"""
+        started = time.perf_counter()
+        invoices = self.calculate_period(period)
+        written = BillingRecordRepository.upsert_invoices(invoices)
+
+        result = {
+            'period': period,
+            'accounts': len(invoices),
+            'created': written['created'],
+            'updated': written['updated'],
+            'amount_cents': sum(invoice['amount_cents'] for invoice in invoices),
+            'currency': self.calculator.currency,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+        logger.info(
+            f"Invoice run {period}: {result['accounts']} accounts, {result['created']} created, "
+            f"{result['updated']} updated in {result['duration_ms']}ms"
+        )
+        return result
+
+# Global billing service instance
+billing_service = BillingService()
+
+def init_billing_service(app):
+    """Configure pricing from the app config"""
+    billing_service.configure(
+        base_fee_cents=app.config.get('BILLING_BASE_FEE_CENTS'),
+        run_price_cents=app.config.get('BILLING_RUN_PRICE_CENTS'),
+        respondent_price_cents=app.config.get('BILLING_RESPONDENT_PRICE_CENTS'),
+        response_price_cents=app.config.get('BILLING_RESPONSE_PRICE_CENTS'),
+        currency=app.config.get('BILLING_CURRENCY')
+    )
+    return billing_service
@@ -0,0 +1,382 @@
+"""
+Bulk Import Service
+Stream-parses CSV/XLSX files of subjects or respondents, validates each
+row, resolves duplicate emails with one query per batch and inserts each
+batch with a single unordered bulk_write. Errors are reported per row.
+Emails are matched case-insensitively against existing records.
+
+XLSX input requires the optional openpyxl package.
+"""
+
+import csv
+import io
+import time
+from datetime import datetime
+from itertools import islice
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from database.connection import EMAIL_COLLATION
+from database.models.subject_model import Subject
+from database.models.respondent_model import RespondentModel
+from database.repositories.respondent_repository import RespondentRepository
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Relationship names are matched case-insensitively
+RELATIONSHIPS_BY_NAME = {name.lower(): name for name in RespondentModel.VALID_RELATIONSHIPS}
+
+# Per-row error details kept in the result (the counts always cover every row)
+MAX_REPORTED_ERRORS = 1000
+
+def iter_csv_rows(stream, encoding='utf-8-sig'):
+    """Yield row dicts (normalized headers) from a binary CSV stream"""
+    text = io.TextIOWrapper(stream, encoding=encoding, newline='')
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if not header:
+        return
+    header = [_normalize_header(name) for name in header]
+    for values in reader:
+        if any(value.strip() for value in values):
+            yield dict(zip(header, values))
+        else:
+            yield None  # blank line - keeps row numbers aligned with the file
+
+def iter_xlsx_rows(stream):
+    """Yield row dicts (normalized headers) from the first sheet of an XLSX file"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX import requires the openpyxl package")
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            return
+        header = [_normalize_header(str(name or '')) for name in header]
+        for values in rows:
+            values = ['' if value is None else str(value) for value in values]
+            yield dict(zip(header, values)) if any(value.strip() for value in values) else None
+    finally:
+        workbook.close()
+
+def iter_rows(stream, filename):
+    """Pick the parser from the file extension"""
+    if filename.lower().endswith(('.xlsx', '.xlsm')):
+        return iter_xlsx_rows(stream)
+    if filename.lower().endswith('.csv'):
+        return iter_csv_rows(stream)
+    raise ValueError("Unsupported file type: expected .csv or .xlsx")
+
+def _normalize_header(name):
+    """'Email Address ' -> 'email_address'"""
+    return name.strip().lower().replace(' ', '_').replace('-', '_')
+
+class BulkImporter:
+    """Batched importer; subclasses define validation, duplicate keys and documents"""
+
+    entity = None
+
+    def __init__(self, account_id, batch_size=1000, on_duplicate='skip', dry_run=False):
+        if on_duplicate not in ('skip', 'update'):
+            raise ValueError("on_duplicate must be 'skip' or 'update'")
+        if isinstance(account_id, str) and not ObjectId.is_valid(account_id):
+            raise ValueError(f"Invalid account ID: {account_id}")
+        self.account_id = ObjectId(account_id) if isinstance(account_id, str) else account_id
+        self.batch_size = max(1, batch_size)
+        self.on_duplicate = on_duplicate
+        self.dry_run = dry_run
+
+    def run(self, rows):
+        """Import an iterable of row dicts (None = blank line); returns the result summary"""
+        started = time.perf_counter()
+        result = {
+            'entity': self.entity,
+            'total_rows': 0,
+            'inserted': 0,
+            'updated': 0,
+            'skipped': 0,
+            'error_count': 0,
+            'errors': [],
+            'dry_run': self.dry_run
+        }
+
+        # Row 1 is the header, so data starts at row 2; blank lines are skipped
+        numbered = ((number, row) for number, row in enumerate(rows, start=2) if row is not None)
+        while True:
+            batch = list(islice(numbered, self.batch_size))
+            if not batch:
+                break
+
+            result['total_rows'] += len(batch)
+            self._import_batch(batch, result)
+
+        result['errors'].sort(key=lambda error: error['row'])
+        result['duration_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(
+            f"Imported {self.entity}: {result['inserted']} inserted, {result['updated']} updated, "
+            f"{result['skipped']} skipped, {result['error_count']} errors out of {result['total_rows']} rows "
+            f"in {result['duration_ms']}ms"
+        )
+        return result
+
+    def _import_batch(self, batch, result):
+        """Validate, resolve duplicates with one query and write the batch"""
+        valid = []
+        for number, row in batch:
+            record, errors = self.validate(row)
+            if errors:
+                self._add_error(result, number, row, errors)
+            else:
+                valid.append((number, record))
+
+        valid = self.resolve(valid, result)
+
+        # Rows repeating an earlier row of the same batch
+        unique = []
+        seen = {}
+        for number, record in valid:
+            key = self.duplicate_key(record)
+            if key in seen:
+                self._add_error(result, number, record, [f"Duplicate of row {seen[key]} in this file"])
+            else:
+                seen[key] = number
+                unique.append((number, record))
+        if not unique:
+            return
+
+        existing = self.find_existing([record for _, record in unique])
+
+        operations = []
+        outcomes = []
+        for number, record in unique:
+            key = self.duplicate_key(record)
+            if key in existing:
+                if self.on_duplicate == 'update':
+                    operations.append(UpdateOne({'_id': existing[key]}, {'$set': self.update_fields(record)}))
+                    outcomes.append((number, 'updated'))
+                else:
+                    result['skipped'] += 1
+            else:
+                operations.append(InsertOne(self.build_document(record)))
+                outcomes.append((number, 'inserted'))
+
+        if not operations:
+            return
+
+        failed = set()
+        if not self.dry_run:
+            try:
+                self.get_collection().bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # Unordered: the other operations were applied, map failures back to rows
+                for write_error in e.details.get('writeErrors', []):
+                    failed.add(write_error['index'])
+                    number = outcomes[write_error['index']][0]
+                    self._add_error(result, number, None, [write_error.get('errmsg', 'Write failed')])
+
+        for index, (_, outcome) in enumerate(outcomes):
+            if index not in failed:
+                result[outcome] += 1
+
+    def resolve(self, valid, result):
+        """Hook to resolve references for the whole batch (returns the rows that remain valid)"""
+        return valid
+
+    @staticmethod
+    def _add_error(result, number, row, errors):
+        result['error_count'] += 1
+        if len(result['errors']) < MAX_REPORTED_ERRORS:
+            entry = {'row': number, 'errors': errors}
+            if row and row.get('email'):
+                entry['email'] = row['email']
+            result['errors'].append(entry)
+
+    def get_collection(self):
+        raise NotImplementedError("get_collection must be implemented in subclass")
+
+    def validate(self, row):
+        raise NotImplementedError("validate must be implemented in subclass")
+
+    def duplicate_key(self, record):
+        raise NotImplementedError("duplicate_key must be implemented in subclass")
+
+    def find_existing(self, records):
+        raise NotImplementedError("find_existing must be implemented in subclass")
+
+    def build_document(self, record):
+        raise NotImplementedError("build_document must be implemented in subclass")
+
+    def update_fields(self, record):
+        raise NotImplementedError("update_fields must be implemented in subclass")
+
+class SubjectImporter(BulkImporter):
+    """Imports subjects into an account (duplicates: same email in the account)"""
+
+    entity = 'subjects'
+
+    def get_collection(self):
+        return Subject.get_collection()
+
+    def validate(self, row):
+        record = {
+            'name': (row.get('name') or '').strip(),
+            'email': (row.get('email') or '').strip().lower(),
+            'position': (row.get('position') or '').strip(),
+            'department': (row.get('department') or '').strip()
+        }
+        errors = []
+        if not record['name']:
+            errors.append("Name is required")
+        if not record['email']:
+            errors.append("Email is required")
+        elif '@' not in record['email']:
+            errors.append("Invalid email format")
+        return record, errors
+
+    def duplicate_key(self, record):
+        return record['email']
+
+    def find_existing(self, records):
+        cursor = self.get_collection().find(
+            {'account_id': self.account_id, 'email': {'$in': [record['email'] for record in records]}},
+            {'email': 1},
+            collation=EMAIL_COLLATION
+        )
+        return {document['email'].lower(): document['_id'] for document in cursor}
+
+    def build_document(self, record):
+        return Subject(account_id=self.account_id, **record).data
+
+    def update_fields(self, record):
+        return {
+            'name': record['name'],
+            'position': record['position'],
+            'department': record['department'],
+            'updated_at': datetime.utcnow()
+        }
+
+class RespondentImporter(BulkImporter):
+    """
+    Imports respondents for the account's subjects. Each row names its
+    subject by subject_id or subject_email; duplicates are the same email
+    for the same subject.
+    """
+
+    entity = 'respondents'
+
+    def get_collection(self):
+        return RespondentRepository.get_collection()
+
+    def validate(self, row):
+        relationship = (row.get('relationship') or '').strip()
+        record = {
+            'subject_id': (row.get('subject_id') or '').strip(),
+            'subject_email': (row.get('subject_email') or '').strip().lower(),
+            'name': (row.get('name') or '').strip(),
+            'email': (row.get('email') or '').strip().lower(),
+            'relationship': RELATIONSHIPS_BY_NAME.get(relationship.lower(), relationship),
+            'phone': (row.get('phone') or '').strip() or None,
+            'address': (row.get('address') or '').strip() or None
+        }
+        errors = []
+        if not record['subject_id'] and not record['subject_email']:
+            errors.append("Subject ID or subject email is required")
+        elif record['subject_id'] and not ObjectId.is_valid(record['subject_id']):
+            errors.append("Invalid subject_id format")
+        if not record['name']:
+            errors.append("Name is required")
+        if not record['email']:
+            errors.append("Email is required")
+        elif '@' not in record['email']:
+            errors.append("Invalid email format")
+        if not record['relationship']:
+            errors.append("Relationship is required")
+        elif record['relationship'] not in RespondentModel.VALID_RELATIONSHIPS:
+            errors.append(f"Relationship must be one of: {', '.join(RespondentModel.VALID_RELATIONSHIPS)}")
+        return record, errors
+
+    def duplicate_key(self, record):
+        # Only called after resolve(), when subject_id is the subject's ObjectId
+        return (record['subject_id'], record['email'])
+
+    def resolve(self, valid, result):
+        """Map subject IDs/emails to the account's subjects with one query"""
+        ids = {ObjectId(record['subject_id']) for _, record in valid if record['subject_id']}
+        emails = {record['subject_email'] for _, record in valid if not record['subject_id']}
+
+        clauses = []
+        if ids:
+            clauses.append({'_id': {'$in': list(ids)}})
+        if emails:
+            clauses.append({'email': {'$in': list(emails)}})
+
+        by_id = {}
+        by_email = {}
+        if clauses:
+            subjects = Subject.get_collection().find(
+                {'account_id': self.account_id, '$or': clauses}, {'email': 1}, collation=EMAIL_COLLATION
+            )
+        else:
+            subjects = []
+        for subject in subjects:
+            by_id[str(subject['_id'])] = subject['_id']
+            if subject.get('email'):
+                by_email[subject['email'].lower()] = subject['_id']
+
+        resolved = []
+        for number, record in valid:
+            subject_id = by_id.get(record['subject_id']) if record['subject_id'] else by_email.get(record['subject_email'])
+            if subject_id is None:
+                self._add_error(result, number, record, ["Subject not found in this account"])
+                continue
+            record['subject_id'] = subject_id
+            resolved.append((number, record))
+        return resolved
+
+    def find_existing(self, records):
+        cursor = self.get_collection().find(
+            {
+                'subject_id': {'$in': list({record['subject_id'] for record in records})},
+                'email': {'$in': list({record['email'] for record in records})}
+            },
+            {'subject_id': 1, 'email': 1},
+            collation=EMAIL_COLLATION
+        )
+        return {(document['subject_id'], document['email'].lower()): document['_id'] for document in cursor}
+
+    def build_document(self, record):
+        respondent = RespondentModel(
+            subject_id=record['subject_id'],
+            name=record['name'],
+            email=record['email'],
+            phone=record['phone'],
+            address=record['address'],
+            relationship=record['relationship']
+        )
+        return respondent.to_dict()
+
+    def update_fields(self, record):
+        return {
+            'name': record['name'],
+            'relationship': record['relationship'],
+            'phone': record['phone'],
+            'address': record['address'],
+            'updated_at': datetime.utcnow()
+        }
+
+IMPORTERS = {
+    'subjects': SubjectImporter,
+    'respondents': RespondentImporter
+}
+
+def import_file(entity, stream, filename, account_id, **options):
+    """Import a CSV/XLSX stream of subjects or respondents"""
+    importer_class = IMPORTERS.get(entity)
+    if importer_class is None:
+        raise ValueError(f"Unknown import entity: {entity}")
+    return importer_class(account_id, **options).run(iter_rows(stream, filename))
@@ -0,0 +1,82 @@
+"""
+Distributed Lock
+Lease-based lock stored in MongoDB so only one app worker runs a job at a time
+"""
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from database.connection import get_collection
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+LOCKS_COLLECTION = 'distributed_locks'
+
+class DistributedLock:
+    """
+    Mongo-backed lease lock
+
+    The lock document is {_id: name, owner, expires_at}. A holder that dies
+    simply lets its lease expire, after which any other worker can take it.
+    """
+
+    def __init__(self, name, ttl_seconds=300, owner=None):
+        """Create a lock handle (nothing is acquired until acquire() is called)"""
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.acquired = False
+
+    def acquire(self):
+        """Try to take (or renew) the lease; returns True if this worker holds it"""
+        now = datetime.utcnow()
+        collection = get_collection(LOCKS_COLLECTION)
+
+        try:
+            collection.find_one_and_update(
+                {
+                    '_id': self.name,
+                    '$or': [
+                        {'expires_at': {'$lt': now}},
+                        {'owner': self.owner}
+                    ]
+                },
+                {
+                    '$set': {
+                        'owner': self.owner,
+                        'acquired_at': now,
+                        'expires_at': now + timedelta(seconds=self.ttl_seconds)
+                    }
+                },
+                upsert=True
+            )
+            self.acquired = True
+        except DuplicateKeyError:
+            # Another worker holds an unexpired lease
+            self.acquired = False
+
+        return self.acquired
+
+    def release(self):
+        """Release the lease if this worker still holds it"""
+        if not self.acquired:
+            return False
+
+        result = get_collection(LOCKS_COLLECTION).delete_one({'_id': self.name, 'owner': self.owner})
+        self.acquired = False
+        return result.deleted_count > 0
+
+    def __enter__(self):
+        """Context manager entry - yields whether the lock was acquired"""
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Context manager exit - always release"""
+        try:
+            self.release()
+        except Exception as e:
+            logger.warning(f"Failed to release lock {self.name}: {str(e)}")
+        return False
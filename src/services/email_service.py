@@ -1,10 +1,18 @@
 """
 Email Service for sending survey invitations and notifications
-Uses SendGrid for email delivery
+Uses our SMTP relay (pooled sessions) or SendGrid for email delivery
 """
 
 import os
+import time
 from datetime import datetime
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+from config import Config
+from services.email_templates import template_registry
+from services.smtp_transport import SMTPConnectionPool, parse_domain_limits
+from services.metrics import metrics
+from services.tracing import tracer, SPAN_KIND_CLIENT
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -13,14 +21,39 @@ class EmailService:
     """Email service for survey notifications"""
     
     def __init__(self):
-        """Initialize email service with SendGrid configuration"""
+        """Initialize email service with SMTP or SendGrid configuration"""
         self.sendgrid_api_key = os.getenv('SENDGRID_API_KEY')
         self.from_email = os.getenv('FROM_EMAIL', 'noreply@ikenei.com')
         self.from_name = os.getenv('FROM_NAME', 'IkeNei Survey System')
         self.base_url = os.getenv('BASE_URL', 'http://localhost:3000')
         
+        # Templates are compiled once at startup and shared by every send
+        self.templates = template_registry
+        
+        # Our own relay takes precedence over SendGrid when configured
+        self.smtp_enabled = bool(Config.MAIL_SERVER)
+        self.smtp_transport = None
+        if self.smtp_enabled:
+            self.smtp_transport = SMTPConnectionPool(
+                host=Config.MAIL_SERVER,
+                port=Config.MAIL_PORT,
+                username=Config.MAIL_USERNAME,
+                password=Config.MAIL_PASSWORD,
+                use_tls=Config.MAIL_USE_TLS,
+                use_ssl=Config.MAIL_USE_SSL,
+                pool_size=Config.MAIL_POOL_SIZE,
+                max_messages_per_connection=Config.MAIL_MAX_MESSAGES_PER_CONNECTION,
+                max_idle_seconds=Config.MAIL_MAX_IDLE_SECONDS,
+                timeout=Config.MAIL_TIMEOUT,
+                domain_limits=parse_domain_limits(Config.MAIL_DOMAIN_LIMITS),
+                default_domain_limit=Config.MAIL_DEFAULT_DOMAIN_LIMIT or None
+            )
+            logger.info(f"SMTP email transport configured for {Config.MAIL_SERVER}:{Config.MAIL_PORT}")
+        
         # Check if SendGrid is configured
-        if not self.sendgrid_api_key:
+        if self.smtp_enabled:
+            self.sendgrid_enabled = False
+        elif not self.sendgrid_api_key:
             logger.warning("SENDGRID_API_KEY not configured. Email sending will be simulated.")
             self.sendgrid_enabled = False
         else:
@@ -42,17 +75,14 @@ class EmailService:
                 logger.error(f"Failed to initialize SendGrid: {str(e)}")
                 self.sendgrid_enabled = False
     
-    def send_survey_invitation(self, survey_run_id, respondent_email, respondent_name, subject_name, survey_title, response_token, due_date):
+    def send_survey_invitation(self, survey_run_id, respondent_email, respondent_name, subject_name, survey_title, response_token, due_date, account_id=None):
         """Send survey invitation email to respondent"""
         try:
             # Generate survey link
-            survey_link = f"{self.base_url}/survey/respond/{response_token}"
+            survey_link = self._survey_link(response_token)
             
             # Format due date
-            if isinstance(due_date, str):
-                due_date_formatted = due_date
-            else:
-                due_date_formatted = due_date.strftime("%B %d, %Y at %I:%M %p")
+            due_date_formatted = self._format_due_date(due_date)
             
             # Create email content
             subject = f"Survey Invitation: Feedback for {subject_name}"
@@ -62,7 +92,8 @@ class EmailService:
                 subject_name=subject_name,
                 survey_title=survey_title,
                 survey_link=survey_link,
-                due_date=due_date_formatted
+                due_date=due_date_formatted,
+                account_id=account_id
             )
             
             text_content = self._create_invitation_text(
@@ -70,7 +101,8 @@ class EmailService:
                 subject_name=subject_name,
                 survey_title=survey_title,
                 survey_link=survey_link,
-                due_date=due_date_formatted
+                due_date=due_date_formatted,
+                account_id=account_id
             )
             
             # Send email
@@ -93,7 +125,7 @@ class EmailService:
                 'email': respondent_email
             }
     
-    def send_completion_confirmation(self, respondent_email, respondent_name, subject_name, survey_title):
+    def send_completion_confirmation(self, respondent_email, respondent_name, subject_name, survey_title, account_id=None):
         """Send survey completion confirmation email"""
         try:
             subject = f"Thank you for your feedback on {subject_name}"
@@ -101,13 +133,15 @@ class EmailService:
             html_content = self._create_completion_html(
                 respondent_name=respondent_name,
                 subject_name=subject_name,
-                survey_title=survey_title
+                survey_title=survey_title,
+                account_id=account_id
             )
             
             text_content = self._create_completion_text(
                 respondent_name=respondent_name,
                 subject_name=subject_name,
-                survey_title=survey_title
+                survey_title=survey_title,
+                account_id=account_id
             )
             
             result = self._send_email(
@@ -129,9 +163,170 @@ class EmailService:
                 'email': respondent_email
             }
     
+    def render_survey_invitations(self, invitations, account_id=None):
+        """
+        Render invitation messages for a list of recipients in one pass
+        
+        Each invitation is a dict with respondent_email, respondent_name,
+        subject_name, survey_title, response_token and due_date. Returns a
+        list of dicts with to_email, to_name, subject, html_content and
+        text_content, in the same order.
+        """
+        contexts = []
+        for invitation in invitations:
+            contexts.append({
+                'respondent_name': invitation['respondent_name'],
+                'subject_name': invitation['subject_name'],
+                'survey_title': invitation['survey_title'],
+                'survey_link': self._survey_link(invitation['response_token']),
+                'due_date': self._format_due_date(invitation['due_date'])
+            })
+        
+        html_bodies = self.templates.render_bulk('survey_invitation.html', contexts, account_id=account_id)
+        text_bodies = self.templates.render_bulk('survey_invitation.txt', contexts, account_id=account_id)
+        
+        return [
+            {
+                'to_email': invitation['respondent_email'],
+                'to_name': invitation['respondent_name'],
+                'subject': f"Survey Invitation: Feedback for {invitation['subject_name']}",
+                'html_content': html_content,
+                'text_content': text_content
+            }
+            for invitation, html_content, text_content in zip(invitations, html_bodies, text_bodies)
+        ]
+    
+    def send_survey_invitations(self, invitations, account_id=None):
+        """Render and send survey invitations for a list of recipients"""
+        try:
+            messages = self.render_survey_invitations(invitations, account_id=account_id)
+        except Exception as e:
+            logger.error(f"Failed to render survey invitations: {str(e)}")
+            return [
+                {'success': False, 'error': str(e), 'email': invitation.get('respondent_email')}
+                for invitation in invitations
+            ]
+        
+        results = self.send_messages(messages)
+        
+        sent_count = len([r for r in results if r['success']])
+        logger.info(f"Sent {sent_count}/{len(results)} survey invitations")
+        return results
+    
+    def render_reminder_digests(self, digests):
+        """
+        Render one reminder digest per respondent
+        
+        Each digest is a dict with email, respondent_name and surveys (a list
+        of dicts with survey_title, subject_name, response_token and due_date).
+        Returns rendered message dicts in the same order.
+        """
+        contexts = []
+        for digest in digests:
+            contexts.append({
+                'respondent_name': digest.get('respondent_name') or 'there',
+                'surveys': [
+                    {
+                        'survey_title': survey['survey_title'],
+                        'subject_name': survey['subject_name'],
+                        'survey_link': self._survey_link(survey['response_token']),
+                        'due_date': self._format_due_date(survey['due_date'])
+                    }
+                    for survey in digest['surveys']
+                ]
+            })
+        
+        html_bodies = self.templates.render_bulk('survey_reminder_digest.html', contexts)
+        text_bodies = self.templates.render_bulk('survey_reminder_digest.txt', contexts)
+        
+        messages = []
+        for digest, html_content, text_content in zip(digests, html_bodies, text_bodies):
+            surveys = digest['surveys']
+            if len(surveys) == 1:
+                subject = f"Reminder: Feedback for {surveys[0]['subject_name']} is due soon"
+            else:
+                subject = f"Reminder: {len(surveys)} feedback surveys are due soon"
+            
+            messages.append({
+                'to_email': digest['email'],
+                'to_name': digest.get('respondent_name') or '',
+                'subject': subject,
+                'html_content': html_content,
+                'text_content': text_content
+            })
+        return messages
+    
+    def send_reminder_digests(self, digests):
+        """Render and send reminder digests for a list of respondents"""
+        try:
+            messages = self.render_reminder_digests(digests)
+        except Exception as e:
+            logger.error(f"Failed to render reminder digests: {str(e)}")
+            return [
+                {'success': False, 'error': str(e), 'email': digest.get('email')}
+                for digest in digests
+            ]
+        
+        return self.send_messages(messages)
+    
+    def send_messages(self, messages):
+        """Send a batch of rendered messages, returning one result per message"""
+        if self.smtp_enabled:
+            # Fan the batch out over the pooled relay sessions
+            return self.smtp_transport.send_many([self._build_mime_message(**message) for message in messages])
+        return [self._send_email(**message) for message in messages]
+    
+    def _survey_link(self, response_token):
+        """Build the public survey link for a response token"""
+        return f"{self.base_url}/survey/respond/{response_token}"
+    
+    @staticmethod
+    def _format_due_date(due_date):
+        """Format a due date for display in emails"""
+        if isinstance(due_date, str):
+            return due_date
+        return due_date.strftime("%B %d, %Y at %I:%M %p")
+    
+    def _build_mime_message(self, to_email, to_name, subject, html_content, text_content):
+        """Build a multipart/alternative message for the SMTP transport"""
+        message = EmailMessage()
+        message['From'] = formataddr((self.from_name, self.from_email))
+        message['To'] = formataddr((to_name, to_email)) if to_name else to_email
+        message['Subject'] = subject
+        message['Message-ID'] = make_msgid(domain=self.from_email.rsplit('@', 1)[-1])
+        message.set_content(text_content)
+        message.add_alternative(html_content, subtype='html')
+        return message
+    
     def _send_email(self, to_email, to_name, subject, html_content, text_content):
-        """Send email using SendGrid or simulate if not configured"""
+        """Send email using SMTP, SendGrid or simulate if not configured"""
+        if self.smtp_enabled:
+            # The SMTP pool times its own sends
+            return self._deliver_email(to_email, to_name, subject, html_content, text_content)
+        
+        transport = 'sendgrid' if self.sendgrid_enabled else 'simulated'
+        started = time.perf_counter()
+        with tracer.span('email.send', SPAN_KIND_CLIENT, {'email.transport': transport}) as span:
+            result = self._deliver_email(to_email, to_name, subject, html_content, text_content)
+            if span is not None and not result['success']:
+                span.set_error(result.get('error'))
+        metrics.observe(
+            'email_send_duration_seconds',
+            time.perf_counter() - started,
+            (transport, 'sent' if result['success'] else 'failed')
+        )
+        return result
+    
+    def _deliver_email(self, to_email, to_name, subject, html_content, text_content):
+        """Deliver one email over the configured transport"""
         try:
+            if self.smtp_enabled:
+                result = self.smtp_transport.send(
+                    self._build_mime_message(to_email, to_name, subject, html_content, text_content)
+                )
+                result['email'] = to_email
+                return result
+            
             if not self.sendgrid_enabled:
                 # Simulate email sending for development
                 logger.info(f"SIMULATED EMAIL SEND:")
@@ -184,156 +379,57 @@ class EmailService:
                 'email': to_email
             }
     
-    def _create_invitation_html(self, respondent_name, subject_name, survey_title, survey_link, due_date):
+    def _create_invitation_html(self, respondent_name, subject_name, survey_title, survey_link, due_date, account_id=None):
         """Create HTML content for survey invitation"""
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Survey Invitation</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background-color: #007bff; color: white; padding: 20px; text-align: center; }}
-                .content {{ padding: 20px; background-color: #f9f9f9; }}
-                .button {{ 
-                    display: inline-block; 
-                    background-color: #007bff; 
-                    color: white; 
-                    padding: 12px 24px; 
-                    text-decoration: none; 
-                    border-radius: 5px; 
-                    margin: 20px 0;
-                }}
-                .footer {{ padding: 20px; text-align: center; font-size: 12px; color: #666; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>360-Degree Feedback Survey</h1>
-                </div>
-                <div class="content">
-                    <p>Hello {respondent_name},</p>
-                    
-                    <p>You have been invited to provide feedback for <strong>{subject_name}</strong> as part of our 360-degree feedback process.</p>
-                    
-                    <p><strong>Survey:</strong> {survey_title}</p>
-                    <p><strong>Due Date:</strong> {due_date}</p>
-                    
-                    <p>Your feedback is valuable and will help {subject_name} in their professional development. The survey should take approximately 5-10 minutes to complete.</p>
-                    
-                    <p>Please click the button below to complete the survey:</p>
-                    
-                    <p style="text-align: center;">
-                        <a href="{survey_link}" class="button">Complete Survey</a>
-                    </p>
-                    
-                    <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
-                    <p style="word-break: break-all; background-color: #eee; padding: 10px;">{survey_link}</p>
-                    
-                    <p>Thank you for your participation!</p>
-                </div>
-                <div class="footer">
-                    <p>This is an automated message from the IkeNei Survey System.</p>
-                    <p>Please do not reply to this email.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        return self.templates.render('survey_invitation.html', {
+            'respondent_name': respondent_name,
+            'subject_name': subject_name,
+            'survey_title': survey_title,
+            'survey_link': survey_link,
+            'due_date': due_date
+        }, account_id=account_id)
     
-    def _create_invitation_text(self, respondent_name, subject_name, survey_title, survey_link, due_date):
+    def _create_invitation_text(self, respondent_name, subject_name, survey_title, survey_link, due_date, account_id=None):
         """Create plain text content for survey invitation"""
-        return f"""
-360-Degree Feedback Survey
-
-Hello {respondent_name},
-
-You have been invited to provide feedback for {subject_name} as part of our 360-degree feedback process.
-
-Survey: {survey_title}
-Due Date: {due_date}
-
-Your feedback is valuable and will help {subject_name} in their professional development. The survey should take approximately 5-10 minutes to complete.
-
-Please click the link below to complete the survey:
-{survey_link}
-
-Thank you for your participation!
-
----
-This is an automated message from the IkeNei Survey System.
-Please do not reply to this email.
-        """
+        return self.templates.render('survey_invitation.txt', {
+            'respondent_name': respondent_name,
+            'subject_name': subject_name,
+            'survey_title': survey_title,
+            'survey_link': survey_link,
+            'due_date': due_date
+        }, account_id=account_id)
     
-    def _create_completion_html(self, respondent_name, subject_name, survey_title):
+    def _create_completion_html(self, respondent_name, subject_name, survey_title, account_id=None):
         """Create HTML content for completion confirmation"""
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Survey Completed</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background-color: #28a745; color: white; padding: 20px; text-align: center; }}
-                .content {{ padding: 20px; background-color: #f9f9f9; }}
-                .footer {{ padding: 20px; text-align: center; font-size: 12px; color: #666; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Survey Completed Successfully</h1>
-                </div>
-                <div class="content">
-                    <p>Hello {respondent_name},</p>
-                    
-                    <p>Thank you for completing the feedback survey for <strong>{subject_name}</strong>.</p>
-                    
-                    <p><strong>Survey:</strong> {survey_title}</p>
-                    
-                    <p>Your feedback has been successfully submitted and will contribute to {subject_name}'s professional development.</p>
-                    
-                    <p>We appreciate the time you took to provide thoughtful feedback.</p>
-                </div>
-                <div class="footer">
-                    <p>This is an automated message from the IkeNei Survey System.</p>
-                    <p>Please do not reply to this email.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        return self.templates.render('survey_completion.html', {
+            'respondent_name': respondent_name,
+            'subject_name': subject_name,
+            'survey_title': survey_title
+        }, account_id=account_id)
     
-    def _create_completion_text(self, respondent_name, subject_name, survey_title):
+    def _create_completion_text(self, respondent_name, subject_name, survey_title, account_id=None):
         """Create plain text content for completion confirmation"""
-        return f"""
-Survey Completed Successfully
-
-Hello {respondent_name},
-
-Thank you for completing the feedback survey for {subject_name}.
-
-Survey: {survey_title}
-
-Your feedback has been successfully submitted and will contribute to {subject_name}'s professional development.
-
-We appreciate the time you took to provide thoughtful feedback.
-
----
-This is an automated message from the IkeNei Survey System.
-Please do not reply to this email.
-        """
+        return self.templates.render('survey_completion.txt', {
+            'respondent_name': respondent_name,
+            'subject_name': subject_name,
+            'survey_title': survey_title
+        }, account_id=account_id)
     
     def test_email_configuration(self):
         """Test email configuration"""
         try:
+            if self.smtp_enabled:
+                self.smtp_transport.check()
+                return {
+                    'success': True,
+                    'message': 'SMTP relay configuration is valid',
+                    'configured': True,
+                    'transport': 'smtp',
+                    'mail_server': Config.MAIL_SERVER,
+                    'from_email': self.from_email,
+                    'from_name': self.from_name
+                }
+            
             if not self.sendgrid_enabled:
                 return {
                     'success': False,
@@ -360,7 +456,7 @@ Please do not reply to this email.
         except Exception as e:
             return {
                 'success': False,
-                'message': f'SendGrid configuration error: {str(e)}',
+                'message': f'Email configuration error: {str(e)}',
                 'configured': False
             }
 
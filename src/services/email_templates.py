@@ -0,0 +1,173 @@
+"""
+Email Template Registry
+Compiles the built-in email templates once at startup and caches
+per-account overrides so bulk sends never re-parse template source
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+from jinja2.exceptions import TemplateError
+from services.metrics import metrics
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), 'templates', 'email')
+
+class EmailTemplateRegistry:
+    """Registry of compiled email templates with per-account overrides"""
+
+    # Templates shipped with the application (file names under templates/email)
+    TEMPLATE_NAMES = [
+        'survey_invitation.html',
+        'survey_invitation.txt',
+        'survey_completion.html',
+        'survey_completion.txt',
+        'survey_reminder_digest.html',
+        'survey_reminder_digest.txt'
+    ]
+
+    def __init__(self, templates_dir=TEMPLATES_DIR, override_ttl=None, max_cached_overrides=None):
+        """Create the Jinja environment and compile the built-in templates"""
+        self.override_ttl = override_ttl if override_ttl is not None else int(
+            os.getenv('EMAIL_TEMPLATE_OVERRIDE_TTL', 60)
+        )
+        self.max_cached_overrides = max_cached_overrides or int(
+            os.getenv('EMAIL_TEMPLATE_OVERRIDE_CACHE_SIZE', 2000)
+        )
+        self.env = Environment(
+            loader=FileSystemLoader(templates_dir),
+            autoescape=select_autoescape(['html']),
+            undefined=StrictUndefined,
+            auto_reload=False,
+            cache_size=-1,
+            keep_trailing_newline=True
+        )
+        # from_string() has no file name to pick autoescaping from, so overrides
+        # compile in an overlay that escapes exactly like the built-in file would
+        self._override_envs = {
+            True: self.env.overlay(autoescape=True),
+            False: self.env.overlay(autoescape=False)
+        }
+        self._templates = {}
+        self._overrides = OrderedDict()
+        self._lock = threading.Lock()
+        self.preload()
+
+    def preload(self):
+        """Compile every built-in template (called once at startup)"""
+        for name in self.TEMPLATE_NAMES:
+            self._templates[name] = self.env.get_template(name)
+        logger.info(f"Compiled {len(self._templates)} email templates")
+
+    def get_template(self, name, account_id=None):
+        """Get a compiled template, preferring the account's override if one exists"""
+        if account_id:
+            override = self._get_override(str(account_id), name)
+            if override is not None:
+                return override
+
+        template = self._templates.get(name)
+        if template is None:
+            raise ValueError(f"Unknown email template: {name}")
+        return template
+
+    def render(self, name, context, account_id=None):
+        """Render a single template"""
+        return self.get_template(name, account_id).render(context)
+
+    def render_bulk(self, name, contexts, account_id=None):
+        """Render one template for a list of recipient contexts"""
+        template = self.get_template(name, account_id)
+        render = template.render
+        return [render(context) for context in contexts]
+
+    def get_default_source(self, name):
+        """Source of a built-in template (the starting point for an override)"""
+        if name not in self.TEMPLATE_NAMES:
+            raise ValueError(f"Unknown email template: {name}")
+        return self.env.loader.get_source(self.env, name)[0]
+
+    def compile_source(self, name, source):
+        """Compile template source, raising ValueError if it is invalid"""
+        if name not in self.TEMPLATE_NAMES:
+            raise ValueError(f"Unknown email template: {name}")
+        try:
+            return self._override_envs[bool(self.env.autoescape(name))].from_string(source)
+        except TemplateError as e:
+            raise ValueError(f"Invalid template {name}: {str(e)}")
+
+    def set_override(self, account_id, name, source):
+        """Validate, store and immediately activate an account override"""
+        from database.models.email_template_model import EmailTemplate
+
+        template = self.compile_source(name, source)
+        version = EmailTemplate.upsert_override(account_id, name, source)
+
+        self._store_override((str(account_id), name), (template, version, time.monotonic()))
+        return version
+
+    def clear_override(self, account_id, name):
+        """Remove an account override and fall back to the built-in template"""
+        from database.models.email_template_model import EmailTemplate
+
+        removed = EmailTemplate.remove_override(account_id, name)
+        self._store_override((str(account_id), name), (None, None, time.monotonic()))
+        return removed
+
+    def invalidate(self, account_id=None):
+        """Drop cached overrides so they are revalidated on next use"""
+        with self._lock:
+            if account_id is None:
+                self._overrides.clear()
+            else:
+                for key in [k for k in self._overrides if k[0] == str(account_id)]:
+                    del self._overrides[key]
+
+    def _get_override(self, account_id, name):
+        """Return the cached override template, revalidating it once per TTL"""
+        key = (account_id, name)
+        cached = self._overrides.get(key)
+        now = time.monotonic()
+
+        if cached is not None and now - cached[2] < self.override_ttl:
+            metrics.inc('cache_requests_total', ('email_template_override', 'hit'))
+            with self._lock:
+                if key in self._overrides:
+                    self._overrides.move_to_end(key)
+            return cached[0]
+        metrics.inc('cache_requests_total', ('email_template_override', 'miss'))
+
+        from database.models.email_template_model import EmailTemplate
+
+        try:
+            version = EmailTemplate.get_override_version(account_id, name)
+            if cached is not None and version == cached[1]:
+                template = cached[0]
+            elif version is None:
+                template = None
+            else:
+                document = EmailTemplate.find_override(account_id, name)
+                template = self.compile_source(name, document.get_field('source')) if document else None
+                version = document.get_field('updated_at') if document else None
+        except Exception as e:
+            logger.warning(f"Failed to load email template override {name} for account {account_id}: {str(e)}")
+            template = cached[0] if cached is not None else None
+            version = cached[1] if cached is not None else None
+
+        self._store_override(key, (template, version, now))
+        return template
+
+    def _store_override(self, key, entry):
+        """Cache an override entry, evicting the least recently used beyond the limit"""
+        with self._lock:
+            self._overrides[key] = entry
+            self._overrides.move_to_end(key)
+            while len(self._overrides) > self.max_cached_overrides:
+                self._overrides.popitem(last=False)
+
+# Global template registry (templates are compiled at import time)
+template_registry = EmailTemplateRegistry()
@@ -0,0 +1,333 @@
+"""
+File Storage Service
+Streams uploads to local disk or GridFS in fixed-size chunks, hashing the
+content on the way so identical files are stored once. Supports resumable
+chunked uploads; partial uploads are staged under UPLOAD_FOLDER, so a
+session's chunks must reach workers that share that directory.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from database.connection import get_db
+from database.models.file_model import StoredFile
+from database.models.file_upload_model import FileUpload
+from services.distributed_lock import DistributedLock
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+COPY_BUFFER_SIZE = 1024 * 1024
+BLOB_LOCK_TTL_SECONDS = 60
+BLOB_LOCK_WAIT_SECONDS = 30
+
+class UploadConflictError(Exception):
+    """Raised when a chunk does not start at the session's current offset"""
+
+class FileTooLargeError(ValueError):
+    """Raised when an upload exceeds its declared or maximum size"""
+
+class LocalBlobStore:
+    """Content-addressed blobs on the local filesystem (served with sendfile)"""
+
+    name = 'local'
+
+    def __init__(self, root):
+        self.root = os.path.join(root, 'blobs')
+
+    def path(self, sha256):
+        """Blob path, fanned out over two directory levels"""
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256):
+        return os.path.exists(self.path(sha256))
+
+    def put(self, sha256, part_path):
+        """Move a completed part file into place (a rename, no copy)"""
+        path = self.path(sha256)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(part_path, path)
+
+    def open(self, sha256):
+        return self.path(sha256)
+
+    def delete(self, sha256):
+        try:
+            os.remove(self.path(sha256))
+        except FileNotFoundError:
+            pass
+
+class GridFSBlobStore:
+    """Content-addressed blobs in a GridFS bucket (file name = SHA-256)"""
+
+    name = 'gridfs'
+
+    def __init__(self, bucket_name='file_blobs', chunk_size=255 * 1024):
+        self.bucket_name = bucket_name
+        self.chunk_size = chunk_size
+        self._bucket = None
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            from gridfs import GridFSBucket
+            self._bucket = GridFSBucket(get_db(), bucket_name=self.bucket_name, chunk_size_bytes=self.chunk_size)
+        return self._bucket
+
+    def exists(self, sha256):
+        return get_db()[f"{self.bucket_name}.files"].find_one({'filename': sha256}, {'_id': 1}) is not None
+
+    def put(self, sha256, part_path):
+        """Stream a completed part file into GridFS, then drop it"""
+        with open(part_path, 'rb') as source:
+            self.bucket.upload_from_stream(sha256, source, metadata={'sha256': sha256})
+        os.remove(part_path)
+
+    def open(self, sha256):
+        """Seekable GridOut stream (supports range requests)"""
+        return self.bucket.open_download_stream_by_name(sha256)
+
+    def delete(self, sha256):
+        for grid_file in self.bucket.find({'filename': sha256}):
+            self.bucket.delete(grid_file._id)
+
+class FileStorageService:
+    """Stores uploaded content and tracks resumable upload sessions"""
+
+    def __init__(self):
+        self.root = os.path.abspath('uploads')
+        self.backend = 'local'
+        self.chunk_size = 8 * 1024 * 1024
+        self.max_size = 2 * 1024 * 1024 * 1024
+        self.upload_expiry_hours = 24
+        self._store = None
+        self._hashers = {}
+        self._lock = threading.Lock()
+
+    def configure(self, root=None, backend=None, chunk_size=None, max_size=None, upload_expiry_hours=None):
+        """Apply storage configuration"""
+        if root:
+            self.root = os.path.abspath(root)
+        if backend:
+            if backend not in ('local', 'gridfs'):
+                raise ValueError(f"Unsupported file storage backend: {backend}")
+            self.backend = backend
+        if chunk_size:
+            self.chunk_size = chunk_size
+        if max_size:
+            self.max_size = max_size
+        if upload_expiry_hours:
+            self.upload_expiry_hours = upload_expiry_hours
+        self._store = None
+
+    @property
+    def store(self):
+        """The configured blob store"""
+        if self._store is None:
+            self._store = GridFSBlobStore() if self.backend == 'gridfs' else LocalBlobStore(self.root)
+        return self._store
+
+    @property
+    def partial_dir(self):
+        return os.path.join(self.root, 'partial')
+
+    def save_stream(self, stream, owner_id, filename, content_type=None, file_type='document'):
+        """Store a whole upload from a stream in one pass; returns the StoredFile"""
+        os.makedirs(self.partial_dir, exist_ok=True)
+        part_path = os.path.join(self.partial_dir, f"{os.urandom(12).hex()}.part")
+        hasher = hashlib.sha256()
+
+        try:
+            with open(part_path, 'wb') as output:
+                size = self._copy_stream(stream, output, hasher, self.max_size)
+            return self._finalize(part_path, hasher.hexdigest(), size, owner_id, filename, content_type, file_type)
+        except Exception:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+    def create_upload(self, owner_id, filename, size, content_type=None, file_type='document'):
+        """Start a resumable upload session"""
+        if size > self.max_size:
+            raise FileTooLargeError(f"File exceeds the maximum size of {self.max_size} bytes")
+
+        return FileUpload.create_session(
+            owner_id, filename, size,
+            content_type=content_type,
+            file_type=file_type,
+            expiry_hours=self.upload_expiry_hours
+        )
+
+    def append_chunk(self, upload, offset, stream):
+        """
+        Append a chunk at offset; returns (new offset, StoredFile or None).
+        The StoredFile is returned once the last byte has arrived.
+        """
+        upload_id = str(upload._id)
+        size = upload.get_field('size')
+
+        if not FileUpload.claim_chunk(upload_id, offset):
+            raise UploadConflictError(f"Upload is not at offset {offset}")
+
+        part_path = os.path.join(self.partial_dir, f"{upload_id}.part")
+        try:
+            os.makedirs(self.partial_dir, exist_ok=True)
+            hasher = self._resume_hasher(upload_id, part_path, offset)
+
+            with open(part_path, 'r+b' if os.path.exists(part_path) else 'wb') as output:
+                # Drop anything a crashed writer left past the committed offset
+                output.truncate(offset)
+                output.seek(offset)
+                written = self._copy_stream(stream, output, hasher, size - offset)
+        except Exception:
+            with self._lock:
+                self._hashers.pop(upload_id, None)
+            FileUpload.release_chunk(upload_id, offset)
+            raise
+
+        new_offset = offset + written
+        if new_offset < size:
+            with self._lock:
+                self._hashers[upload_id] = (new_offset, hasher)
+            FileUpload.release_chunk(upload_id, new_offset)
+            return new_offset, None
+
+        try:
+            stored_file = self._finalize(
+                part_path, hasher.hexdigest(), size,
+                upload.get_field('owner_id'),
+                upload.get_field('filename'),
+                upload.get_field('content_type'),
+                upload.get_field('file_type')
+            )
+        except Exception:
+            # Reopen the session at the last chunk so the client can retry it
+            FileUpload.release_chunk(upload_id, offset)
+            raise
+        FileUpload.mark_completed(upload_id, stored_file._id)
+        return new_offset, stored_file
+
+    def open_file(self, stored_file):
+        """Local path (for sendfile) or a seekable GridFS stream"""
+        return self.store.open(stored_file.get_field('sha256'))
+
+    def delete_file(self, stored_file):
+        """Delete a file record, and its blob once nothing else references it"""
+        sha256 = stored_file.get_field('sha256')
+        with self._blob_lock(sha256):
+            stored_file.delete()
+            if StoredFile.count_by_sha256(sha256) == 0:
+                self.store.delete(sha256)
+                logger.info(f"Deleted blob {sha256[:12]}")
+
+    def cleanup_stale_parts(self, max_age_hours=None):
+        """Remove part files of abandoned uploads; returns the number removed"""
+        max_age = (max_age_hours or self.upload_expiry_hours) * 3600
+        cutoff = time.time() - max_age
+        removed = 0
+
+        if not os.path.isdir(self.partial_dir):
+            return 0
+
+        for entry in os.scandir(self.partial_dir):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        return removed
+
+    def _finalize(self, part_path, sha256, size, owner_id, filename, content_type, file_type):
+        """
+        Deduplicate the content by hash and create the file record. The
+        existence check and the insert share delete_file's per-blob lock, so
+        once the record exists no delete can drop a blob it relies on.
+        """
+        with self._blob_lock(sha256):
+            deduplicated = self.store.exists(sha256)
+            stored_file = StoredFile.create_file(
+                owner_id=owner_id,
+                filename=filename,
+                size=size,
+                sha256=sha256,
+                storage=self.store.name,
+                content_type=content_type,
+                file_type=file_type,
+                deduplicated=deduplicated
+            )
+
+        if deduplicated:
+            os.remove(part_path)
+            return stored_file
+
+        try:
+            self.store.put(sha256, part_path)
+        except Exception:
+            stored_file.delete()
+            raise
+        return stored_file
+
+    @contextmanager
+    def _blob_lock(self, sha256):
+        """Hold the cross-worker lock for one blob, waiting for other holders"""
+        lock = DistributedLock(f"file_blob:{sha256}", ttl_seconds=BLOB_LOCK_TTL_SECONDS)
+        deadline = time.monotonic() + BLOB_LOCK_WAIT_SECONDS
+        while not lock.acquire():
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for blob lock {sha256[:12]}")
+            time.sleep(0.05)
+        try:
+            yield
+        finally:
+            try:
+                lock.release()
+            except Exception as e:
+                logger.warning(f"Failed to release blob lock {sha256[:12]}: {str(e)}")
+
+    def _resume_hasher(self, upload_id, part_path, offset):
+        """Reuse this worker's running hash, or rebuild it from the bytes on disk"""
+        with self._lock:
+            cached = self._hashers.pop(upload_id, None)
+        if cached and cached[0] == offset:
+            return cached[1]
+
+        hasher = hashlib.sha256()
+        if offset:
+            with open(part_path, 'rb') as existing:
+                remaining = offset
+                while remaining:
+                    block = existing.read(min(COPY_BUFFER_SIZE, remaining))
+                    if not block:
+                        raise ValueError("Partial upload data is missing")
+                    hasher.update(block)
+                    remaining -= len(block)
+        return hasher
+
+    @staticmethod
+    def _copy_stream(stream, output, hasher, limit):
+        """Copy a stream in fixed-size blocks, hashing as it goes; returns bytes written"""
+        written = 0
+        while True:
+            block = stream.read(COPY_BUFFER_SIZE)
+            if not block:
+                break
+            written += len(block)
+            if written > limit:
+                raise FileTooLargeError(f"Upload exceeds the expected size of {limit} bytes")
+            hasher.update(block)
+            output.write(block)
+        return written
+
+# Global file storage instance
+file_storage = FileStorageService()
+
+def init_file_storage(app):
+    """Configure file storage from the app config"""
+    file_storage.configure(
+        root=app.config.get('UPLOAD_FOLDER'),
+        backend=app.config.get('FILE_STORAGE_BACKEND'),
+        chunk_size=app.config.get('FILE_UPLOAD_CHUNK_SIZE'),
+        max_size=app.config.get('FILE_MAX_SIZE'),
+        upload_expiry_hours=app.config.get('FILE_UPLOAD_EXPIRY_HOURS')
+    )
+    return file_storage
@@ -0,0 +1,539 @@
+"""
+Metrics
+Prometheus-style request, MongoDB, email and cache metrics for /metrics.
+
+Observations go into per-thread shards without taking a lock; a scrape
+merges the shards. Under gunicorn each worker also writes its totals to a
+file in METRICS_DIR every few seconds, and the worker that serves /metrics
+adds every worker's file to its own live numbers. Counters and histograms
+of workers that have exited are folded into an archive file so totals
+never go backwards; gauges only count live workers. METRICS_DIR should be
+emptied when the server (not each worker) starts.
+"""
+
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from pymongo import monitoring
+from utils.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = get_logger(__name__)
+
+# Latency buckets (seconds): requests and email sends, and the faster MongoDB operations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+# Recorded metrics: name -> (type, help, label names, buckets)
+METRICS = {
+    'http_request_duration_seconds': (
+        'histogram', 'HTTP request latency by blueprint, route, method and status',
+        ('blueprint', 'route', 'method', 'status'), DEFAULT_BUCKETS
+    ),
+    'mongodb_command_duration_seconds': (
+        'histogram', 'MongoDB command latency by collection and command',
+        ('collection', 'command'), FAST_BUCKETS
+    ),
+    'mongodb_command_failures_total': (
+        'counter', 'Failed MongoDB commands by collection and command',
+        ('collection', 'command'), None
+    ),
+    'mongodb_pool_checkout_duration_seconds': (
+        'histogram', 'Time spent waiting for a MongoDB connection from the pool',
+        (), FAST_BUCKETS
+    ),
+    'mongodb_pool_checkout_failures_total': (
+        'counter', 'Failed MongoDB connection checkouts by reason',
+        ('reason',), None
+    ),
+    'email_send_duration_seconds': (
+        'histogram', 'Email send latency by transport and outcome',
+        ('transport', 'outcome'), DEFAULT_BUCKETS
+    ),
+    'cache_requests_total': (
+        'counter', 'Cache lookups by cache and result (hit or miss)',
+        ('cache', 'result'), None
+    )
+}
+
+class _Shard:
+    """One thread's counters and histograms"""
+
+    __slots__ = ('thread', 'counters', 'histograms')
+
+    def __init__(self, thread):
+        self.thread = thread
+        self.counters = {}
+        self.histograms = {}
+
+class MetricsRegistry:
+    """Lock-free per-thread recording, merged across threads and worker processes on read"""
+
+    def __init__(self):
+        self.enabled = True
+        self.directory = None
+        self.flush_seconds = 5
+        self._gauges = {}
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            # Forked workers start from zero instead of repeating the parent's numbers
+            os.register_at_fork(after_in_child=self._reset)
+
+    def configure(self, enabled=None, directory=None, flush_seconds=None):
+        """Apply metrics configuration"""
+        if enabled is not None:
+            self.enabled = enabled
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.directory = directory
+        if flush_seconds:
+            self.flush_seconds = flush_seconds
+
+    def inc(self, name, labels=(), amount=1):
+        """Increment a counter"""
+        if not self.enabled:
+            return
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name, value, labels=()):
+        """Record a histogram observation (seconds)"""
+        if not self.enabled:
+            return
+        histograms = self._shard().histograms
+        key = (name, labels)
+        buckets = METRICS[name][3]
+        counts = histograms.get(key)
+        if counts is None:
+            # One count per bucket plus +Inf, then the sum
+            counts = histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(buckets, value)] += 1
+        counts[-1] += value
+
+    def register_gauge(self, name, help_text, label_names, callback):
+        """
+        Register a gauge read at collection time; callback returns a number,
+        or a dict of label tuples to numbers
+        """
+        self._gauges[name] = (help_text, tuple(label_names), callback)
+
+    def snapshot(self):
+        """Every worker's counters, histograms and gauges"""
+        data = self._collect_local()
+        if not self.directory:
+            return data
+
+        dead = []
+        with self._file_lock(exclusive=False):
+            for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+                if path == self._path:
+                    continue
+                other = _read_json(path)
+                if other is None:
+                    continue
+                alive = path.endswith('archive.json') or _pid_alive(other.get('pid'))
+                _merge(data, other, gauges=alive)
+                if not alive:
+                    dead.append(path)
+
+        if dead:
+            self._archive(dead)
+        return data
+
+    def render(self):
+        """Prometheus text exposition format (0.0.4)"""
+        data = self.snapshot()
+        lines = []
+
+        for name, (kind, help_text, label_names, buckets) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'histogram':
+                for labels, counts in sorted(data['histograms'].get(name, {}).items()):
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), counts):
+                        cumulative += count
+                        le = bound if bound == '+Inf' else repr(float(bound))
+                        lines.append(f'{name}_bucket{_labels(label_names + ("le",), labels + (le,))} {cumulative}')
+                    lines.append(f'{name}_sum{_labels(label_names, labels)} {counts[-1]}')
+                    lines.append(f'{name}_count{_labels(label_names, labels)} {cumulative}')
+            else:
+                for labels, value in sorted(data['counters'].get(name, {}).items()):
+                    lines.append(f'{name}{_labels(label_names, labels)} {value}')
+
+        # Hit ratios derived from the merged cache counters
+        ratios = {}
+        for (cache, result), value in data['counters'].get('cache_requests_total', {}).items():
+            ratios.setdefault(cache, {'hit': 0, 'miss': 0})[result] = value
+        lines.append('# HELP cache_hit_ratio Share of cache lookups served from cache')
+        lines.append('# TYPE cache_hit_ratio gauge')
+        for cache, counts in sorted(ratios.items()):
+            total = counts['hit'] + counts['miss']
+            lines.append(f'cache_hit_ratio{_labels(("cache",), (cache,))} {counts["hit"] / total if total else 0}')
+
+        for name, (help_text, label_names, _) in sorted(self._gauges.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            for labels, value in sorted(data['gauges'].get(name, {}).items()):
+                lines.append(f'{name}{_labels(label_names, labels)} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def flush(self):
+        """Write this worker's totals to its file in the metrics directory"""
+        if not self.directory:
+            return
+        data = self._collect_local()
+        payload = {
+            'pid': os.getpid(),
+            'counters': _encode(data['counters']),
+            'histograms': _encode(data['histograms']),
+            'gauges': _encode(data['gauges'])
+        }
+        temp_path = f'{self._path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(payload, f)
+        os.replace(temp_path, self._path)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard(None)
+        self._path = None
+        self._flusher = None
+        if self.directory:
+            self._path = os.path.join(self.directory, f'metrics-{os.getpid()}-{uuid.uuid4().hex[:8]}.json')
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+                if self.directory and self._flusher is None:
+                    self._start_flusher()
+            return shard
+
+    def _collect_local(self):
+        """Merge this process's shards, folding those of finished threads into the retired totals"""
+        counters, histograms = {}, {}
+        with self._lock:
+            for shard in list(self._shards):
+                if not shard.thread.is_alive():
+                    _fold(self._retired, shard)
+                    self._shards.remove(shard)
+            for shard in [self._retired] + self._shards:
+                for (name, labels), value in list(shard.counters.items()):
+                    series = counters.setdefault(name, {})
+                    series[labels] = series.get(labels, 0) + value
+                for (name, labels), counts in list(shard.histograms.items()):
+                    series = histograms.setdefault(name, {})
+                    series[labels] = _add_counts(series.get(labels), counts)
+
+        gauges = {}
+        for name, (_, label_names, callback) in list(self._gauges.items()):
+            try:
+                value = callback()
+            except Exception as e:
+                logger.debug(f"Metrics gauge {name} failed: {str(e)}")
+                continue
+            gauges[name] = value if isinstance(value, dict) else {(): value}
+        return {'counters': counters, 'histograms': histograms, 'gauges': gauges}
+
+    def _start_flusher(self):
+        if self._path is None:
+            self._path = os.path.join(self.directory, f'metrics-{os.getpid()}-{uuid.uuid4().hex[:8]}.json')
+
+        def _run():
+            while True:
+                time.sleep(self.flush_seconds)
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.warning(f"Failed to write worker metrics: {str(e)}")
+
+        self._flusher = threading.Thread(target=_run, name='metrics-flusher', daemon=True)
+        self._flusher.start()
+
+    def _archive(self, paths):
+        """Fold the counters and histograms of exited workers into the archive file"""
+        archive_path = os.path.join(self.directory, 'metrics-archive.json')
+        with self._file_lock(exclusive=True):
+            archive = _read_json(archive_path) or {'pid': None, 'counters': [], 'histograms': [], 'gauges': []}
+            data = {'counters': {}, 'histograms': {}, 'gauges': {}}
+            _merge(data, archive, gauges=False)
+            folded = []
+            for path in paths:
+                other = _read_json(path)
+                if other is not None:
+                    _merge(data, other, gauges=False)
+                    folded.append(path)
+            payload = {'pid': None, 'counters': _encode(data['counters']), 'histograms': _encode(data['histograms']), 'gauges': []}
+            with open(f'{archive_path}.tmp', 'w') as f:
+                json.dump(payload, f)
+            os.replace(f'{archive_path}.tmp', archive_path)
+            for path in folded:
+                os.remove(path)
+
+    def _file_lock(self, exclusive):
+        return _FileLock(os.path.join(self.directory, '.lock'), exclusive)
+
+class _FileLock:
+    """flock on the metrics directory's lock file (a no-op where flock is unavailable)"""
+
+    def __init__(self, path, exclusive):
+        self.path = path
+        self.exclusive = exclusive
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+
+def _fold(target, shard):
+    for key, value in list(shard.counters.items()):
+        target.counters[key] = target.counters.get(key, 0) + value
+    for key, counts in list(shard.histograms.items()):
+        target.histograms[key] = _add_counts(target.histograms.get(key), counts)
+
+def _add_counts(current, counts):
+    if current is None:
+        return list(counts)
+    return [a + b for a, b in zip(current, counts)]
+
+def _encode(series_by_name):
+    return [[name, list(labels), value] for name, series in series_by_name.items() for labels, value in series.items()]
+
+def _merge(data, other, gauges):
+    for name, labels, value in other.get('counters', []):
+        series = data['counters'].setdefault(name, {})
+        series[tuple(labels)] = series.get(tuple(labels), 0) + value
+    for name, labels, counts in other.get('histograms', []):
+        if name in METRICS and len(counts) == len(METRICS[name][3]) + 2:
+            series = data['histograms'].setdefault(name, {})
+            series[tuple(labels)] = _add_counts(series.get(tuple(labels)), counts)
+    if gauges:
+        for name, labels, value in other.get('gauges', []):
+            series = data['gauges'].setdefault(name, {})
+            series[tuple(labels)] = series.get(tuple(labels), 0) + value
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _pid_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command by collection and command name"""
+
+    def __init__(self):
+        self._collections = {}
+        self._local = threading.local()
+
+    def begin_count(self):
+        """Start counting the commands issued by this thread (one request)"""
+        self._local.count = 0
+
+    def end_count(self):
+        """Commands issued by this thread since begin_count (None if not counting)"""
+        count = getattr(self._local, 'count', None)
+        self._local.count = None
+        return count
+
+    def started(self, event):
+        if getattr(self._local, 'count', None) is not None:
+            self._local.count += 1
+        if not metrics.enabled:
+            return
+        target = event.command.get('collection') if event.command_name == 'getMore' else event.command.get(event.command_name)
+        self._collections[(event.connection_id, event.request_id)] = target if isinstance(target, str) else ''
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        labels = self._record(event)
+        if labels:
+            metrics.inc('mongodb_command_failures_total', labels)
+
+    def _record(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), None)
+        if collection is None:
+            return None
+        labels = (collection, event.command_name)
+        metrics.observe('mongodb_command_duration_seconds', event.duration_micros / 1e6, labels)
+        return labels
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Tracks open and checked-out connections per server, and checkout waits"""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def get_counts(self):
+        with self._lock:
+            return {
+                (address, state): value
+                for address, counts in self._counts.items()
+                for state, value in counts.items()
+            }
+
+    def _adjust(self, address, state, delta):
+        address = '%s:%s' % address if isinstance(address, tuple) else str(address)
+        with self._lock:
+            counts = self._counts.setdefault(address, {'open': 0, 'checked_out': 0})
+            counts[state] += delta
+
+    def connection_created(self, event):
+        self._adjust(event.address, 'open', 1)
+
+    def connection_closed(self, event):
+        self._adjust(event.address, 'open', -1)
+
+    def connection_checked_out(self, event):
+        self._adjust(event.address, 'checked_out', 1)
+        if getattr(event, 'duration', None) is not None:
+            metrics.observe('mongodb_pool_checkout_duration_seconds', event.duration)
+
+    def connection_checked_in(self, event):
+        self._adjust(event.address, 'checked_out', -1)
+
+    def connection_check_out_failed(self, event):
+        metrics.inc('mongodb_pool_checkout_failures_total', (str(event.reason),))
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._counts.pop('%s:%s' % event.address if isinstance(event.address, tuple) else str(event.address), None)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+# Global metrics registry and MongoDB listeners (passed to the MongoClient)
+metrics = MetricsRegistry()
+mongo_command_metrics = MongoCommandMetrics()
+mongo_pool_metrics = MongoPoolMetrics()
+
+def init_metrics(app):
+    """Configure metrics, time every request and register the service gauges"""
+    from flask import g, request
+
+    metrics.configure(
+        enabled=app.config.get('METRICS_ENABLED'),
+        directory=app.config.get('METRICS_DIR'),
+        flush_seconds=app.config.get('METRICS_FLUSH_SECONDS')
+    )
+    if app.config.get('METRICS_QUERY_COUNT_HEADER'):
+        @app.before_request
+        def start_query_count():
+            mongo_command_metrics.begin_count()
+
+        @app.after_request
+        def add_query_count_header(response):
+            count = mongo_command_metrics.end_count()
+            if count is not None:
+                response.headers['X-DB-Query-Count'] = str(count)
+            return response
+
+    if not metrics.enabled:
+        return metrics
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_duration(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            # The route template, not the URL, keeps label cardinality bounded
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.observe(
+                'http_request_duration_seconds',
+                time.perf_counter() - started,
+                (request.blueprint or '', route, request.method, str(response.status_code))
+            )
+        return response
+
+    metrics.register_gauge(
+        'mongodb_pool_connections', 'MongoDB pool connections by server and state (open or checked_out)',
+        ('address', 'state'), mongo_pool_metrics.get_counts
+    )
+    metrics.register_gauge('email_queue_depth', 'Emails waiting for an SMTP session', (), _email_queue_depth)
+    metrics.register_gauge('password_hash_queue_depth', 'Password hashes waiting for the bcrypt pool', (), _password_hash_queue_depth)
+    metrics.register_gauge('log_queue_depth', 'Log records waiting for the log writer thread', (), _log_queue_depth)
+    metrics.register_gauge('cache_entries', 'Entries held by in-process caches', ('cache',), _cache_entries)
+
+    logger.info(f"Metrics enabled ({'shared across workers in ' + metrics.directory if metrics.directory else 'this process only'})")
+    return metrics
+
+def _email_queue_depth():
+    from services.email_service import email_service
+    return email_service.smtp_transport.get_stats()['queued'] if email_service.smtp_transport else 0
+
+def _password_hash_queue_depth():
+    from services.password_hasher import password_hasher
+    return password_hasher.get_metrics()['queued']
+
+def _log_queue_depth():
+    from utils.logger import get_logging_stats
+    return get_logging_stats()['queued']
+
+def _cache_entries():
+    from services.settings_store import settings_store
+    from services.token_revocation import token_revocation
+    return {
+        ('settings_account',): settings_store.get_metrics()['cached_accounts'],
+        ('revoked_tokens',): token_revocation.get_metrics()['revoked_tokens']
+    }
@@ -0,0 +1,220 @@
+"""
+Password Hasher
+Runs bcrypt on a dedicated, bounded pool so a burst of logins can only
+occupy a fixed number of cores instead of every request thread. bcrypt
+releases the GIL while hashing, so the default thread pool already runs
+hashes in parallel; a spawned process pool is available as well.
+
+Callers still wait for their own hash, but the queue in front of the pool
+is bounded: when it is full, or the estimated wait exceeds the limit, new
+work is shed with PasswordHasherBusy so callers can answer 503 quickly
+instead of piling up. Queue metrics are exposed for health checks.
+"""
+
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_COST_PATTERN = re.compile(r'^\$2[abxy]?\$(\d{2})\$')
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the hashing queue is full; retry after retry_after seconds"""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+def _verify(password, password_hash):
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+def hash_cost(password_hash):
+    """bcrypt cost factor of a stored hash (None if it is not a bcrypt hash)"""
+    match = _COST_PATTERN.match(password_hash or '')
+    return int(match.group(1)) if match else None
+
+class PasswordHasher:
+    """Bounded bcrypt pool with load shedding and rehash-on-login"""
+
+    def __init__(self):
+        self.rounds = 12
+        self.pool = 'thread'
+        self.max_workers = max(1, (os.cpu_count() or 2) // 2)
+        self.max_queue = 64
+        self.max_wait_seconds = 5
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {'completed': 0, 'rejected': 0, 'rehashed': 0, 'timeouts': 0}
+        # Exponential moving averages (ms) of queue wait and hash time
+        self._avg_wait_ms = 0.0
+        self._avg_hash_ms = 0.0
+
+    def configure(self, rounds=None, pool=None, max_workers=None, max_queue=None, max_wait_seconds=None):
+        """Apply cost and pool configuration"""
+        if rounds:
+            if not 4 <= rounds <= 31:
+                raise ValueError(f"bcrypt rounds must be between 4 and 31, got {rounds}")
+            self.rounds = rounds
+        if pool:
+            if pool not in ('thread', 'process'):
+                raise ValueError(f"Unsupported password hash pool: {pool}")
+            self.pool = pool
+        if max_workers:
+            self.max_workers = max_workers
+        if max_queue:
+            self.max_queue = max_queue
+        if max_wait_seconds:
+            self.max_wait_seconds = max_wait_seconds
+
+    def hash(self, password, rounds=None):
+        """Hash a password at the configured cost (blocks until the pool is done)"""
+        return self._run(_hash, password, rounds or self.rounds)
+
+    def verify(self, password, password_hash):
+        """Check a password against a stored hash (False for malformed hashes)"""
+        if not password_hash or hash_cost(password_hash) is None:
+            return False
+        return self._run(_verify, password, password_hash)
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made at a different cost than configured"""
+        cost = hash_cost(password_hash)
+        return cost is not None and cost != self.rounds
+
+    def rehash_later(self, password, on_done):
+        """
+        Rehash a verified password at the configured cost in the background
+        and pass the new hash to on_done. Skipped when the pool is busy -
+        it is retried on a later login.
+        """
+        if self.is_overloaded(extra=self.max_workers):
+            return False
+
+        def _done(future):
+            with self._lock:
+                self._pending -= 1
+            try:
+                on_done(future.result())
+                with self._lock:
+                    self._stats['rehashed'] += 1
+            except Exception as e:
+                logger.warning(f"Password rehash failed: {str(e)}")
+
+        with self._lock:
+            self._pending += 1
+        try:
+            self._get_executor().submit(_hash, password, self.rounds).add_done_callback(_done)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return True
+
+    def estimated_wait_seconds(self, extra=0):
+        """Expected queueing delay for new work, from queue depth and recent hash times"""
+        with self._lock:
+            queued = max(0, self._pending + extra - self.max_workers)
+            return queued * (self._avg_hash_ms or 250) / 1000 / self.max_workers
+
+    def is_overloaded(self, extra=0):
+        """Whether new work should be shed"""
+        with self._lock:
+            pending = self._pending
+        return pending + extra >= self.max_workers + self.max_queue or \
+            self.estimated_wait_seconds(extra) > self.max_wait_seconds
+
+    def get_metrics(self):
+        """Queue depth, throughput and latency figures"""
+        with self._lock:
+            return {
+                'pool': self.pool,
+                'workers': self.max_workers,
+                'rounds': self.rounds,
+                'pending': self._pending,
+                'queued': max(0, self._pending - self.max_workers),
+                'max_queue': self.max_queue,
+                'avg_wait_ms': round(self._avg_wait_ms, 2),
+                'avg_hash_ms': round(self._avg_hash_ms, 2),
+                **self._stats
+            }
+
+    def shutdown(self, wait=True):
+        """Stop the pool"""
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=wait, cancel_futures=not wait)
+                self._executor = None
+
+    def _run(self, fn, *args):
+        if self.is_overloaded(extra=1):
+            with self._lock:
+                self._stats['rejected'] += 1
+            retry_after = max(1, int(self.estimated_wait_seconds() + 0.5))
+            raise PasswordHasherBusy("Password hashing is overloaded, please retry", retry_after=retry_after)
+
+        with self._lock:
+            self._pending += 1
+        submitted = time.perf_counter()
+        try:
+            future = self._get_executor().submit(_timed, fn, *args)
+            # Waiting past the shedding limit means the estimate was wrong; give up rather than pile on
+            result, started, finished = future.result(timeout=self.max_wait_seconds + 30)
+        except FutureTimeoutError:
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise PasswordHasherBusy("Password hashing timed out, please retry")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        with self._lock:
+            self._stats['completed'] += 1
+            # perf_counter is not comparable across processes, so only durations are used
+            hash_ms = (finished - started) * 1000
+            wait_ms = max(0.0, (time.perf_counter() - submitted) * 1000 - hash_ms)
+            self._avg_hash_ms = hash_ms if not self._avg_hash_ms else 0.9 * self._avg_hash_ms + 0.1 * hash_ms
+            self._avg_wait_ms = 0.9 * self._avg_wait_ms + 0.1 * wait_ms
+        return result
+
+    def _get_executor(self):
+        """Lazily start the pool"""
+        with self._lock:
+            if self._executor is None:
+                if self.pool == 'process':
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bcrypt')
+                logger.info(f"Started password hashing {self.pool} pool with {self.max_workers} workers (cost {self.rounds})")
+            return self._executor
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, started, time.perf_counter()
+
+# Global password hasher instance
+password_hasher = PasswordHasher()
+
+def init_password_hasher(app):
+    """Configure the hashing pool from the app config (the pool starts on first use)"""
+    password_hasher.configure(
+        rounds=app.config.get('BCRYPT_ROUNDS'),
+        pool=app.config.get('PASSWORD_HASH_POOL'),
+        max_workers=app.config.get('PASSWORD_HASH_WORKERS'),
+        max_queue=app.config.get('PASSWORD_HASH_MAX_QUEUE'),
+        max_wait_seconds=app.config.get('PASSWORD_HASH_MAX_WAIT_SECONDS')
+    )
+    return password_hasher
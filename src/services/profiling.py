@@ -0,0 +1,541 @@
+"""
+Profiling
+On-demand profiles of single requests, without redeploying.
+
+A request is profiled when it carries the X-Profile header and is
+authorized - by X-Profile-Token matching PROFILING_TOKEN, or by a system
+admin access token - or when PROFILING_SAMPLE_RATE picks it. The header
+value chooses the profiler: cProfile (deterministic, pstats output) or a
+stack sampler (collapsed stacks, for flamegraph.pl / speedscope). Output
+goes to PROFILING_DIR next to a JSON summary, the response carries an
+X-Profile-Id header, and system admins list profiles under
+/api/admin/profiles.
+
+The continuous profiler is a separate, optional thread that samples every
+thread's stack about 100 times a second for the life of the worker and
+writes one collapsed-stack file per window, so CPU hot spots across all
+requests can be compared over time.
+"""
+
+import cProfile
+import glob
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_TOKEN_HEADER = 'X-Profile-Token'
+PROFILE_MODES = ('cprofile', 'sampling')
+
+# File extension per output format
+PROFILE_FORMATS = {'pstats': '.prof', 'collapsed': '.collapsed'}
+
+def frame_name(frame):
+    """module:qualified.function for one stack frame"""
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+def collapse_stack(frame, max_depth=128):
+    """A frame's stack as 'outer;...;inner' (the collapsed-stack format)"""
+    names = []
+    while frame is not None and len(names) < max_depth:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+def write_collapsed(path, counts):
+    """Write stack counts as 'stack count' lines, busiest first"""
+    with open(path, 'w') as f:
+        for stack, count in sorted(counts.items(), key=lambda item: -item[1]):
+            f.write(f"{stack} {count}\n")
+
+class StackSampler:
+    """Samples one thread's stack on a timer into collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval=0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            stack = collapse_stack(frame)
+            self.counts[stack] = self.counts.get(stack, 0) + 1
+            self.samples += 1
+
+class ProfileSession:
+    """One request being profiled"""
+
+    def __init__(self, mode, trigger, sample_interval):
+        self.mode = mode
+        self.trigger = trigger
+        self.started = time.perf_counter()
+        self.created_at = datetime.utcnow()
+        if mode == 'cprofile':
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.profiler = StackSampler(threading.get_ident(), sample_interval).start()
+
+    def stop(self):
+        self.duration_ms = (time.perf_counter() - self.started) * 1000
+        if self.mode == 'cprofile':
+            self.profiler.disable()
+        else:
+            self.profiler.stop()
+
+class RequestProfiler:
+    """Decides which requests to profile and stores their profiles"""
+
+    def __init__(self):
+        self.enabled = True
+        self.directory = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'profiles')
+        self.token = None
+        self.sample_rate = 0.0
+        self.default_mode = 'cprofile'
+        self.sample_interval = 0.001
+        self.max_profiles = 200
+        self.max_concurrent = 2
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+
+    def configure(self, enabled=None, directory=None, token=None, sample_rate=None, mode=None,
+                  sample_interval_ms=None, max_profiles=None, max_concurrent=None):
+        """Apply profiling configuration"""
+        if enabled is not None:
+            self.enabled = enabled
+        if directory:
+            self.directory = directory
+        if token:
+            self.token = token
+        if sample_rate is not None:
+            self.sample_rate = float(sample_rate)
+        if mode:
+            if mode not in PROFILE_MODES:
+                raise ValueError(f"Unsupported profiling mode: {mode}")
+            self.default_mode = mode
+        if sample_interval_ms:
+            self.sample_interval = sample_interval_ms / 1000
+        if max_profiles:
+            self.max_profiles = max_profiles
+        if max_concurrent:
+            self.max_concurrent = max_concurrent
+            self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def start(self, headers, is_system_admin):
+        """
+        Start profiling the current request if it asked to be (and may) or was
+        sampled; returns the session or None. is_system_admin is only called
+        for requests that send the header.
+        """
+        if not self.enabled:
+            return None
+
+        requested = headers.get(PROFILE_HEADER)
+        if requested:
+            token = headers.get(PROFILE_TOKEN_HEADER, '')
+            authorized = bool(self.token) and hmac.compare_digest(token.encode(), self.token.encode())
+            if not authorized and not is_system_admin():
+                return None
+            trigger = 'header'
+            mode = requested.lower() if requested.lower() in PROFILE_MODES else self.default_mode
+        elif self.sample_rate > 0 and random.random() < self.sample_rate:
+            trigger, mode = 'sampled', self.default_mode
+        else:
+            return None
+
+        # Profiling is expensive; never run more than a few at once
+        if not self._slots.acquire(blocking=False):
+            logger.info(f"Skipping {trigger} profile: {self.max_concurrent} already running")
+            return None
+        try:
+            return ProfileSession(mode, trigger, self.sample_interval)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def finish(self, session, method, path, route, status):
+        """Stop the session and write its profile; returns the profile id"""
+        try:
+            session.stop()
+            profile_id = f"{session.created_at.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+            os.makedirs(self.directory, exist_ok=True)
+            summary = {
+                'id': profile_id,
+                'created_at': session.created_at.isoformat() + 'Z',
+                'method': method,
+                'path': path,
+                'route': route,
+                'status': status,
+                'duration_ms': round(session.duration_ms, 2),
+                'mode': session.mode,
+                'trigger': session.trigger,
+                'pid': os.getpid()
+            }
+
+            if session.mode == 'cprofile':
+                session.profiler.dump_stats(self._path(profile_id, 'pstats'))
+                summary['format'] = 'pstats'
+                summary['top'] = _top_functions(session.profiler)
+            else:
+                counts = session.profiler.counts
+                write_collapsed(self._path(profile_id, 'collapsed'), counts)
+                summary['format'] = 'collapsed'
+                summary['samples'] = session.profiler.samples
+                summary['top'] = [
+                    {'stack': stack, 'samples': count}
+                    for stack, count in sorted(counts.items(), key=lambda item: -item[1])[:10]
+                ]
+
+            with open(self._path(profile_id, 'summary'), 'w') as f:
+                json.dump(summary, f)
+            logger.info(f"Saved {session.mode} profile {profile_id} for {method} {path} ({summary['duration_ms']}ms)")
+            self._prune()
+            return profile_id
+        finally:
+            self._slots.release()
+
+    def discard(self, session):
+        """Stop a session without saving it (the request never reached after_request)"""
+        try:
+            session.stop()
+        finally:
+            self._slots.release()
+
+    def list_profiles(self, limit=50):
+        """Summaries of the most recent profiles, newest first"""
+        paths = sorted(glob.glob(os.path.join(self.directory, '*.json')), key=_mtime, reverse=True)
+        profiles = []
+        for path in paths[:limit]:
+            try:
+                with open(path) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def get_profile(self, profile_id):
+        """A profile's summary, or None"""
+        path = self._path(profile_id, 'summary')
+        if not path or not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def get_profile_file(self, profile_id):
+        """Path of a profile's pstats or collapsed-stack file, or None"""
+        summary = self.get_profile(profile_id)
+        if not summary:
+            return None
+        path = self._path(profile_id, summary['format'])
+        return path if os.path.exists(path) else None
+
+    def _path(self, profile_id, kind):
+        # Ids are generated here; anything else could escape the directory
+        if not profile_id or os.sep in profile_id or '/' in profile_id or profile_id.startswith('.'):
+            return None
+        extension = '.json' if kind == 'summary' else PROFILE_FORMATS[kind]
+        return os.path.join(self.directory, profile_id + extension)
+
+    def _prune(self):
+        """Keep only the newest max_profiles profiles"""
+        with self._lock:
+            summaries = sorted(glob.glob(os.path.join(self.directory, '*.json')), key=_mtime)
+            for path in summaries[:max(0, len(summaries) - self.max_profiles)]:
+                stem = path[:-len('.json')]
+                for extension in ['.json'] + list(PROFILE_FORMATS.values()):
+                    try:
+                        os.remove(stem + extension)
+                    except FileNotFoundError:
+                        pass
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+def _top_functions(profiler, limit=15):
+    """The functions with the most cumulative time in a cProfile run"""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:limit]
+    return [
+        {
+            'function': f"{os.path.basename(filename)}:{line}({name})",
+            'calls': calls,
+            'total_ms': round(total_time * 1000, 3),
+            'cumulative_ms': round(cumulative_time * 1000, 3)
+        }
+        for (filename, line, name), (_, calls, total_time, cumulative_time, _) in rows
+    ]
+
+# Innermost frames of threads parked waiting (locks, queues, sockets, MongoDB replies), skipped in cpu mode
+IDLE_FRAMES = {
+    ('threading', 'wait'),
+    ('threading', '_wait_for_tstate_lock'),
+    ('queue', 'get'),
+    ('selectors', 'select'),
+    ('socket', 'accept'),
+    ('socket', 'readinto'),
+    ('ssl', 'read'),
+    ('ssl', 'recv_into'),
+    ('socketserver', 'serve_forever'),
+    ('concurrent.futures.thread', '_worker'),
+    ('pymongo.network_layer', 'receive_data'),
+    ('pymongo.network_layer', 'wait_for_read'),
+    ('pymongo.periodic_executor', '_run')
+}
+
+_THREAD_NUMBER = re.compile(r'\d+')
+
+class ContinuousProfiler:
+    """
+    Samples every thread's stack at a fixed rate and writes the counts as a
+    collapsed-stack file per window. In cpu mode, threads whose innermost
+    frame is a known wait are skipped, so the output shows where CPU goes
+    rather than where threads sleep; wall mode keeps everything.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.hz = 100
+        self.window_seconds = 60
+        self.max_files = 1440
+        self.mode = 'cpu'
+        self.directory = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'profiles', 'continuous')
+        self._thread = None
+        self._stop = threading.Event()
+        self._counts = {}
+        self._samples = 0
+        self._sampling_seconds = 0.0
+        self._running_since = None
+        if hasattr(os, 'register_at_fork'):
+            # Threads do not survive fork; each worker samples itself
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def configure(self, enabled=None, hz=None, window_seconds=None, max_files=None, mode=None, directory=None):
+        """Apply sampling configuration"""
+        if enabled is not None:
+            self.enabled = enabled
+        if hz:
+            self.hz = hz
+        if window_seconds:
+            self.window_seconds = window_seconds
+        if max_files:
+            self.max_files = max_files
+        if mode:
+            if mode not in ('cpu', 'wall'):
+                raise ValueError(f"Unsupported continuous profiler mode: {mode}")
+            self.mode = mode
+        if directory:
+            self.directory = directory
+
+    def start(self):
+        """Start the sampling thread (no-op if it is running)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._counts = {}
+        self._samples = 0
+        self._sampling_seconds = 0.0
+        self._running_since = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='continuous-profiler', daemon=True)
+        self._thread.start()
+        logger.info(f"Continuous profiler sampling at {self.hz}Hz ({self.mode} mode), writing to {self.directory}")
+
+    def stop(self):
+        """Stop sampling and write the current window"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def get_metrics(self):
+        """Sample counts and the share of wall time spent sampling"""
+        running = self._thread is not None and self._thread.is_alive()
+        elapsed = time.perf_counter() - self._running_since if running else 0
+        return {
+            'running': running,
+            'hz': self.hz,
+            'mode': self.mode,
+            'samples': self._samples,
+            'overhead_percent': round(self._sampling_seconds / elapsed * 100, 3) if elapsed else 0
+        }
+
+    def _run(self):
+        interval = 1 / self.hz
+        next_tick = time.monotonic()
+        window_end = next_tick + self.window_seconds
+        own_ident = threading.get_ident()
+
+        while True:
+            next_tick += interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                if self._stop.wait(delay):
+                    break
+            else:
+                # Fell behind (e.g. a long GIL hold); skip the missed ticks rather than burst
+                next_tick = time.monotonic()
+                if self._stop.is_set():
+                    break
+
+            started = time.perf_counter()
+            try:
+                self._sample(own_ident)
+            except Exception as e:
+                logger.debug(f"Continuous profiler sample failed: {str(e)}")
+            self._sampling_seconds += time.perf_counter() - started
+
+            if time.monotonic() >= window_end:
+                self._rotate()
+                window_end = time.monotonic() + self.window_seconds
+
+        self._rotate()
+
+    def _sample(self, own_ident):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        counts = self._counts
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            if self.mode == 'cpu':
+                code = frame.f_code
+                if (frame.f_globals.get('__name__'), code.co_name) in IDLE_FRAMES:
+                    continue
+            # Thread names group the stacks (request threads, bcrypt, smtp-pool, ...)
+            group = _THREAD_NUMBER.sub('N', names.get(ident, 'unknown')).replace(' ', '_').replace(';', '_')
+            stack = group + ';' + collapse_stack(frame)
+            counts[stack] = counts.get(stack, 0) + 1
+        self._samples += 1
+
+    def _rotate(self):
+        """Write the finished window and delete the oldest files beyond max_files"""
+        counts, self._counts = self._counts, {}
+        if not counts:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            name = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}.collapsed"
+            write_collapsed(os.path.join(self.directory, name), counts)
+
+            files = sorted(glob.glob(os.path.join(self.directory, '*.collapsed')), key=_mtime)
+            for path in files[:max(0, len(files) - self.max_files)]:
+                os.remove(path)
+        except Exception as e:
+            logger.warning(f"Failed to write continuous profile: {str(e)}")
+
+    def _after_fork(self):
+        was_running = self._thread is not None
+        self._thread = None
+        self._stop = threading.Event()
+        if was_running:
+            self.start()
+
+# Global request and continuous profiler instances
+request_profiler = RequestProfiler()
+continuous_profiler = ContinuousProfiler()
+
+def init_request_profiler(app):
+    """Configure request profiling and hook it into every request"""
+    from flask import g, request
+    from flask_jwt_extended import verify_jwt_in_request, get_jwt
+
+    request_profiler.configure(
+        enabled=app.config.get('PROFILING_ENABLED'),
+        directory=app.config.get('PROFILING_DIR'),
+        token=app.config.get('PROFILING_TOKEN'),
+        sample_rate=app.config.get('PROFILING_SAMPLE_RATE'),
+        mode=app.config.get('PROFILING_MODE'),
+        sample_interval_ms=app.config.get('PROFILING_SAMPLE_INTERVAL_MS'),
+        max_profiles=app.config.get('PROFILING_MAX_PROFILES'),
+        max_concurrent=app.config.get('PROFILING_MAX_CONCURRENT')
+    )
+    if not request_profiler.enabled:
+        return request_profiler
+
+    def is_system_admin():
+        try:
+            verify_jwt_in_request(optional=True)
+            return get_jwt().get('role') == 'system_admin'
+        except Exception:
+            return False
+
+    @app.before_request
+    def start_request_profile():
+        try:
+            session = request_profiler.start(request.headers, is_system_admin)
+        except Exception as e:
+            logger.warning(f"Failed to start request profile: {str(e)}")
+            return
+        if session is not None:
+            g.profile_session = session
+
+    @app.after_request
+    def finish_request_profile(response):
+        session = g.pop('profile_session', None)
+        if session is not None:
+            try:
+                profile_id = request_profiler.finish(
+                    session,
+                    request.method,
+                    request.path,
+                    request.url_rule.rule if request.url_rule else None,
+                    response.status_code
+                )
+                response.headers['X-Profile-Id'] = profile_id
+            except Exception as e:
+                logger.warning(f"Failed to save request profile: {str(e)}")
+        return response
+
+    @app.teardown_request
+    def discard_request_profile(error):
+        session = g.pop('profile_session', None)
+        if session is not None:
+            request_profiler.discard(session)
+
+    logger.info(f"Request profiling available (sample rate {request_profiler.sample_rate}, output in {request_profiler.directory})")
+    return request_profiler
+
+def init_continuous_profiler(app):
+    """Start the always-on sampling profiler if it is enabled"""
+    continuous_profiler.configure(
+        enabled=app.config.get('CONTINUOUS_PROFILER_ENABLED'),
+        hz=app.config.get('CONTINUOUS_PROFILER_HZ'),
+        window_seconds=app.config.get('CONTINUOUS_PROFILER_WINDOW_SECONDS'),
+        max_files=app.config.get('CONTINUOUS_PROFILER_MAX_FILES'),
+        mode=app.config.get('CONTINUOUS_PROFILER_MODE'),
+        directory=app.config.get('CONTINUOUS_PROFILER_DIR')
+    )
+    if continuous_profiler.enabled:
+        continuous_profiler.start()
+    return continuous_profiler
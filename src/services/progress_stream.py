@@ -0,0 +1,262 @@
+"""
+Survey Run Progress Stream
+Fans survey run progress (response count, completion rate, status) out to
+Server-Sent Events subscribers, per run or per account.
+
+Events come from a MongoDB change stream on survey_runs when the server is
+a replica set or sharded cluster, so every worker sees every write. On a
+standalone server the stream falls back to in-process pub/sub fed by the
+response submission path, which only reaches viewers connected to the same
+worker process.
+"""
+
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from bson import ObjectId
+from database.connection import get_db
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Fields pushed to viewers; deltas only carry the ones that changed
+PROGRESS_FIELDS = ['response_count', 'completion_rate', 'status', 'respondent_count']
+
+class ProgressSubscription:
+    """One viewer's bounded event queue plus the last values it was sent"""
+
+    def __init__(self, run_id=None, account_id=None, queue_size=100):
+        self.run_id = run_id
+        self.account_id = account_id
+        self.events = queue.Queue(maxsize=queue_size)
+        self.last_sent = {}
+
+    def matches(self, progress):
+        if self.run_id:
+            return progress['survey_run_id'] == self.run_id
+        return progress.get('account_id') == self.account_id
+
+    def offer(self, progress):
+        """Queue an event, dropping the oldest when a slow viewer falls behind"""
+        while True:
+            try:
+                self.events.put_nowait(progress)
+                return
+            except queue.Full:
+                try:
+                    self.events.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def delta(self, progress):
+        """Fields that changed since the last event sent for this run (None if nothing did)"""
+        run_id = progress['survey_run_id']
+        previous = self.last_sent.get(run_id, {})
+        changed = {
+            field: progress[field] for field in PROGRESS_FIELDS
+            if field in progress and previous.get(field) != progress[field]
+        }
+        if not changed:
+            return None
+
+        self.last_sent[run_id] = {**previous, **changed}
+        return {'survey_run_id': run_id, **changed}
+
+class ProgressStreamService:
+    """Progress pub/sub with a change stream or in-process source"""
+
+    def __init__(self):
+        self.backend = 'auto'
+        self.heartbeat_seconds = 15
+        self.max_stream_seconds = 600
+        self.queue_size = 100
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self._source = None
+        self._watcher = None
+        self._stop_event = threading.Event()
+
+    def configure(self, backend=None, heartbeat_seconds=None, max_stream_seconds=None, queue_size=None):
+        """Apply stream configuration"""
+        if backend:
+            if backend not in ('auto', 'change_stream', 'local'):
+                raise ValueError(f"Unsupported progress stream backend: {backend}")
+            self.backend = backend
+        if heartbeat_seconds:
+            self.heartbeat_seconds = heartbeat_seconds
+        if max_stream_seconds:
+            self.max_stream_seconds = max_stream_seconds
+        if queue_size:
+            self.queue_size = queue_size
+
+    @property
+    def source(self):
+        """'change_stream' or 'local', resolved on first use"""
+        if self._source is None:
+            if self.backend == 'auto':
+                self._source = 'change_stream' if self._supports_change_streams() else 'local'
+            else:
+                self._source = self.backend
+            logger.info(f"Survey run progress stream source: {self._source}")
+        return self._source
+
+    def subscribe(self, run_id=None, account_id=None):
+        """Register a viewer for one run or for every run of an account"""
+        if self.source == 'change_stream':
+            self._ensure_watcher()
+
+        subscription = ProgressSubscription(
+            run_id=str(run_id) if run_id else None,
+            account_id=str(account_id) if account_id else None,
+            queue_size=self.queue_size
+        )
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, progress):
+        """Deliver a progress event to the matching subscribers"""
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if s.matches(progress)]
+        for subscription in subscriptions:
+            subscription.offer(progress)
+
+    def publish_run(self, survey_run):
+        """
+        Publish a run's progress after a write in this process. A no-op when
+        the change stream is the source, since it sees the write itself.
+        """
+        if survey_run is None or self.source != 'local':
+            return
+        with self._lock:
+            if not self._subscriptions:
+                return
+        self.publish(progress_from_document({'_id': survey_run._id, **survey_run.data}))
+
+    def stream(self, subscription, snapshots=None):
+        """
+        SSE generator: initial snapshots, then deltas as they arrive, with
+        heartbeat comments while idle. Ends after max_stream_seconds so the
+        client reconnects (EventSource does so automatically) and no worker
+        stays pinned to one viewer forever.
+        """
+        deadline = time.monotonic() + self.max_stream_seconds
+        try:
+            yield f"retry: {self.heartbeat_seconds * 1000}\n\n"
+            for progress in snapshots or []:
+                delta = subscription.delta(progress)
+                if delta:
+                    yield format_event('progress', delta)
+
+            while time.monotonic() < deadline:
+                try:
+                    progress = subscription.events.get(timeout=self.heartbeat_seconds)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+
+                delta = subscription.delta(progress)
+                if delta:
+                    yield format_event('progress', delta)
+        finally:
+            self.unsubscribe(subscription)
+
+    def shutdown(self):
+        """Stop the change stream watcher"""
+        self._stop_event.set()
+        if self._watcher:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _supports_change_streams(self):
+        """Change streams need a replica set or a mongos"""
+        try:
+            hello = get_db().client.admin.command('hello')
+            return bool(hello.get('setName')) or hello.get('msg') == 'isdbgrid'
+        except Exception as e:
+            logger.warning(f"Could not detect replica set, using in-process progress events: {str(e)}")
+            return False
+
+    def _ensure_watcher(self):
+        with self._lock:
+            if self._watcher is None or not self._watcher.is_alive():
+                self._stop_event.clear()
+                self._watcher = threading.Thread(target=self._watch, name='progress-change-stream', daemon=True)
+                self._watcher.start()
+
+    def _watch(self):
+        """Tail survey_runs updates, resuming from the last token after errors"""
+        pipeline = [
+            {'$match': {'operationType': {'$in': ['insert', 'update', 'replace']}}},
+            {'$project': {
+                'fullDocument._id': 1,
+                'fullDocument.account_id': 1,
+                'fullDocument.response_count': 1,
+                'fullDocument.completion_rate': 1,
+                'fullDocument.status': 1,
+                'fullDocument.respondents.status': 1
+            }}
+        ]
+        resume_token = None
+
+        while not self._stop_event.is_set():
+            try:
+                with get_db().survey_runs.watch(
+                    pipeline,
+                    full_document='updateLookup',
+                    resume_after=resume_token,
+                    max_await_time_ms=1000
+                ) as change_stream:
+                    while not self._stop_event.is_set() and change_stream.alive:
+                        change = change_stream.try_next()
+                        if change is None:
+                            continue
+                        resume_token = change_stream.resume_token
+                        if change.get('fullDocument') and self._subscriptions:
+                            self.publish(progress_from_document(change['fullDocument']))
+            except Exception as e:
+                logger.error(f"Progress change stream failed, reconnecting: {str(e)}")
+                self._stop_event.wait(5)
+
+def progress_from_document(document):
+    """Compact progress event from a survey run document"""
+    respondents = document.get('respondents') or []
+    account_id = document.get('account_id')
+    return {
+        'survey_run_id': str(document['_id']),
+        'account_id': str(account_id) if account_id else None,
+        'response_count': document.get('response_count', 0),
+        'completion_rate': round(document.get('completion_rate') or 0, 2),
+        'status': document.get('status'),
+        'respondent_count': len(respondents)
+    }
+
+def format_event(event, data):
+    """Encode one SSE message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=_json_default)}\n\n"
+
+def _json_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat() + 'Z'
+    return str(value)
+
+# Global progress stream instance
+progress_stream = ProgressStreamService()
+
+def init_progress_stream(app):
+    """Configure the progress stream from the app config (the watcher starts with the first viewer)"""
+    progress_stream.configure(
+        backend=app.config.get('PROGRESS_STREAM_BACKEND'),
+        heartbeat_seconds=app.config.get('PROGRESS_STREAM_HEARTBEAT_SECONDS'),
+        max_stream_seconds=app.config.get('PROGRESS_STREAM_MAX_SECONDS'),
+        queue_size=app.config.get('PROGRESS_STREAM_QUEUE_SIZE')
+    )
+    return progress_stream
@@ -0,0 +1,222 @@
+"""
+Rate Limiter
+Token buckets keyed by client IP, response token prefix or account, with
+per-route policies. Buckets live in process memory by default; a shared
+backend (a MongoDB collection, or any Redis-protocol server) makes a
+limit hold across all gunicorn workers. Should the shared backend fail,
+checks fall back to the in-process buckets rather than failing requests.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from database.connection import get_db
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Default per-route policies: each limit is a bucket refilled at `rate` tokens per second up to `burst`
+DEFAULT_POLICIES = {
+    'survey_respond': [
+        {'key': 'ip', 'rate': 2, 'burst': 30},
+        {'key': 'token', 'rate': 0.5, 'burst': 10}
+    ],
+    'auth_login': [
+        {'key': 'ip', 'rate': 1, 'burst': 10},
+        {'key': 'account', 'rate': 0.1, 'burst': 5}
+    ]
+}
+
+class MemoryBucketStore:
+    """In-process buckets (per worker), least recently used evicted beyond max_keys"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, cost=1):
+        """Take tokens from a bucket; returns (allowed, tokens left)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+class MongoBucketStore:
+    """
+    Shared buckets in a MongoDB collection. Refill and take happen in one
+    pipeline update on the server clock, so concurrent workers never race;
+    idle buckets are dropped by a TTL index.
+    """
+
+    collection_name = 'rate_limit_buckets'
+
+    def take(self, key, rate, burst, cost=1):
+        refilled = {'$min': [burst, {'$add': [
+            {'$ifNull': ['$tokens', burst]},
+            {'$multiply': [rate, {'$divide': [{'$subtract': ['$$NOW', {'$ifNull': ['$updated_at', '$$NOW']}]}, 1000]}]}
+        ]}]}
+        pipeline = [
+            {'$set': {'tokens': refilled, 'updated_at': '$$NOW'}},
+            {'$set': {
+                'allowed': {'$gte': ['$tokens', cost]},
+                'tokens': {'$cond': [{'$gte': ['$tokens', cost]}, {'$subtract': ['$tokens', cost]}, '$tokens']},
+                'expires_at': {'$add': ['$$NOW', int(math.ceil(burst / rate) + 1) * 1000]}
+            }}
+        ]
+        collection = get_db()[self.collection_name]
+        for attempt in range(2):
+            try:
+                doc = collection.find_one_and_update(
+                    {'_id': key},
+                    pipeline,
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                    projection={'allowed': 1, 'tokens': 1}
+                )
+                return doc['allowed'], doc['tokens']
+            except DuplicateKeyError:
+                # Two workers created the same bucket at once; the retry updates the winner's
+                if attempt:
+                    raise
+
+class RedisBucketStore:
+    """Shared buckets on a Redis-protocol server, updated atomically by a Lua script"""
+
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    local allowed = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis package is required for RATE_LIMIT_BACKEND=redis. Run: pip install redis")
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.script = self.client.register_script(self.SCRIPT)
+
+    def take(self, key, rate, burst, cost=1):
+        allowed, tokens = self.script(keys=[f'ratelimit:{key}'], args=[rate, burst, cost])
+        return bool(allowed), float(tokens)
+
+class RateLimiter:
+    """Checks requests against per-route policies"""
+
+    def __init__(self):
+        self.enabled = True
+        self.policies = {name: list(limits) for name, limits in DEFAULT_POLICIES.items()}
+        self.local = MemoryBucketStore()
+        self.shared = None
+        self.backend = 'memory'
+        self.trusted_proxies = 0
+        self._stats = {'allowed': 0, 'limited': 0, 'backend_errors': 0}
+
+    def configure(self, enabled=None, backend=None, redis_url=None, policies=None, max_keys=None, trusted_proxies=None):
+        """Apply backend and policy configuration"""
+        if enabled is not None:
+            self.enabled = enabled
+        if trusted_proxies is not None:
+            self.trusted_proxies = trusted_proxies
+        if max_keys:
+            self.local = MemoryBucketStore(max_keys=max_keys)
+        if policies:
+            if isinstance(policies, str):
+                policies = json.loads(policies)
+            for name, limits in policies.items():
+                for limit in limits:
+                    if limit.get('key') not in ('ip', 'token', 'account') or not limit.get('rate') or not limit.get('burst'):
+                        raise ValueError(f"Invalid rate limit for policy {name}: {limit}")
+                self.policies[name] = limits
+        if backend:
+            if backend == 'memory':
+                self.shared = None
+            elif backend == 'mongo':
+                self.shared = MongoBucketStore()
+            elif backend == 'redis':
+                self.shared = RedisBucketStore(redis_url or 'redis://localhost:6379/0')
+            else:
+                raise ValueError(f"Unsupported rate limit backend: {backend}")
+            self.backend = backend
+
+    def key_types(self, policy):
+        """Which request keys (ip, token, account) a policy needs"""
+        return {limit['key'] for limit in self.policies.get(policy, [])}
+
+    def check(self, policy, keys):
+        """
+        Take one token from each of the policy's buckets whose key is known.
+        Returns (allowed, retry_after_seconds); every bucket is charged so a
+        client hammering one dimension cannot dodge the others.
+        """
+        if not self.enabled:
+            return True, 0
+
+        allowed, retry_after = True, 0
+        for limit in self.policies.get(policy, []):
+            value = keys.get(limit['key'])
+            if not value:
+                continue
+
+            bucket_key = f"{policy}:{limit['key']}:{value}"
+            bucket_allowed, tokens = self._take(bucket_key, limit['rate'], limit['burst'])
+            if not bucket_allowed:
+                allowed = False
+                retry_after = max(retry_after, (1 - tokens) / limit['rate'])
+
+        self._stats['allowed' if allowed else 'limited'] += 1
+        return allowed, int(math.ceil(retry_after))
+
+    def get_metrics(self):
+        return {'backend': self.backend, 'enabled': self.enabled, **self._stats}
+
+    def _take(self, key, rate, burst):
+        if self.shared is not None:
+            try:
+                return self.shared.take(key, rate, burst)
+            except Exception as e:
+                self._stats['backend_errors'] += 1
+                logger.warning(f"Shared rate limit backend failed, using in-process buckets: {str(e)}")
+        return self.local.take(key, rate, burst)
+
+# Global rate limiter instance
+rate_limiter = RateLimiter()
+
+def init_rate_limiter(app):
+    """Configure rate limiting from the app config"""
+    rate_limiter.configure(
+        enabled=app.config.get('RATE_LIMIT_ENABLED'),
+        backend=app.config.get('RATE_LIMIT_BACKEND'),
+        redis_url=app.config.get('RATE_LIMIT_REDIS_URL'),
+        policies=app.config.get('RATE_LIMIT_POLICIES'),
+        max_keys=app.config.get('RATE_LIMIT_MAX_KEYS'),
+        trusted_proxies=app.config.get('RATE_LIMIT_TRUSTED_PROXIES')
+    )
+    logger.info(f"Rate limiting {'enabled' if rate_limiter.enabled else 'disabled'} ({rate_limiter.backend} buckets)")
+    return rate_limiter
@@ -0,0 +1,149 @@
+"""
+Reminder Service
+Sends one reminder digest per respondent covering all of their pending,
+due-soon surveys, through a batched and rate-limited dispatcher with
+per-respondent throttling stored in MongoDB. Each run stops within a time
+budget (kept below the scheduler lock TTL); unsent digests are picked up by
+the next run.
+"""
+
+import time
+from database.repositories.survey_run_repository import SurveyRunRepository
+from database.models.reminder_throttle_model import ReminderThrottle
+from services.email_service import email_service
+from services.settings_store import settings_store
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class ReminderDispatcher:
+    """Sends digests in fixed-size batches, pacing batches to a maximum send rate"""
+
+    def __init__(self, email_service, batch_size=100, rate_per_second=10):
+        self.email_service = email_service
+        self.batch_size = max(1, batch_size)
+        self.rate_per_second = rate_per_second
+
+    def dispatch(self, digests, time_budget=None):
+        """
+        Send digests until done or until the next batch would overrun
+        time_budget seconds, returning (sent digests, failed results,
+        number of digests left unsent)
+        """
+        sent = []
+        failed = []
+        dispatch_started = time.monotonic()
+
+        for start in range(0, len(digests), self.batch_size):
+            batch = digests[start:start + self.batch_size]
+            started_at = time.monotonic()
+            if time_budget is not None and start:
+                batch_seconds = len(batch) / self.rate_per_second if self.rate_per_second else 0
+                if started_at - dispatch_started + batch_seconds > time_budget:
+                    return sent, failed, len(digests) - start
+
+            results = self.email_service.send_reminder_digests(batch)
+            batch_sent = [digest for digest, result in zip(batch, results) if result['success']]
+            failed.extend(result for result in results if not result['success'])
+
+            # Stamp throttles per batch so a crash mid-campaign never re-sends what already went out
+            if batch_sent:
+                try:
+                    ReminderThrottle.record_sent(batch_sent)
+                except Exception as e:
+                    logger.error(f"Failed to record reminder throttles: {str(e)}")
+            sent.extend(batch_sent)
+
+            if self.rate_per_second and start + self.batch_size < len(digests):
+                remaining = len(batch) / self.rate_per_second - (time.monotonic() - started_at)
+                if remaining > 0:
+                    time.sleep(remaining)
+
+        return sent, failed, 0
+
+class ReminderService:
+    """Finds due-soon pending respondents and sends them reminder digests"""
+
+    def __init__(self, email_service=email_service):
+        self.email_service = email_service
+        self.days_ahead = 3
+        self.throttle_hours = 24
+        self.batch_size = 100
+        self.rate_per_second = 10
+        self.max_run_seconds = 240
+        self.has_backlog = False
+
+    def configure(self, days_ahead=None, throttle_hours=None, batch_size=None, rate_per_second=None, max_run_seconds=None):
+        """Apply campaign configuration"""
+        if days_ahead is not None:
+            self.days_ahead = days_ahead
+        if throttle_hours is not None:
+            self.throttle_hours = throttle_hours
+        if batch_size is not None:
+            self.batch_size = batch_size
+        if rate_per_second is not None:
+            self.rate_per_second = rate_per_second
+        if max_run_seconds is not None:
+            self.max_run_seconds = max_run_seconds
+
+    def get_pending_digests(self):
+        """Get one digest per unthrottled respondent with pending due-soon surveys"""
+        digests = SurveyRunRepository.get_reminder_digests(
+            days_ahead=self.days_ahead,
+            throttle_hours=self.throttle_hours
+        )
+        return self._filter_disabled_accounts(digests)
+
+    @staticmethod
+    def _filter_disabled_accounts(digests):
+        """Drop surveys of accounts that turned reminders off, and digests left empty"""
+        enabled = {}
+        filtered = []
+        for digest in digests:
+            surveys = []
+            for survey in digest['surveys']:
+                account_id = str(survey['account_id']) if survey.get('account_id') else None
+                if account_id not in enabled:
+                    enabled[account_id] = settings_store.email_enabled('survey_reminders', account_id)
+                if enabled[account_id]:
+                    surveys.append(survey)
+            if surveys:
+                filtered.append({**digest, 'surveys': surveys})
+        return filtered
+
+    def send_reminders(self):
+        """Run one reminder campaign and summarize the outcome"""
+        if not settings_store.email_enabled('survey_reminders'):
+            logger.info("Survey reminders are disabled; skipping reminder campaign")
+            return {'affected_count': 0, 'surveys_count': 0, 'failed_count': 0, 'skipped': True}
+
+        self.has_backlog = False
+        digests = self.get_pending_digests()
+        if not digests:
+            return {'affected_count': 0, 'surveys_count': 0, 'failed_count': 0}
+
+        dispatcher = ReminderDispatcher(
+            self.email_service,
+            batch_size=self.batch_size,
+            rate_per_second=self.rate_per_second
+        )
+        sent, failed, deferred = dispatcher.dispatch(digests, time_budget=self.max_run_seconds)
+        # Deferred digests were never throttled, so the next run picks them up
+        self.has_backlog = deferred > 0
+
+        surveys_count = sum(len(digest['surveys']) for digest in sent)
+        logger.info(
+            f"Reminder campaign sent {len(sent)}/{len(digests)} digests "
+            f"covering {surveys_count} pending surveys"
+            + (f"; {deferred} deferred to the next run" if deferred else "")
+        )
+        return {
+            'affected_count': len(sent),
+            'surveys_count': surveys_count,
+            'failed_count': len(failed),
+            'deferred_count': deferred,
+            'failed_emails': [result.get('email') for result in failed]
+        }
+
+# Global reminder service instance
+reminder_service = ReminderService()
@@ -0,0 +1,108 @@
+"""
+Report Service
+Queues report generation onto a process pool so computing a report never
+blocks a Flask worker and many reports run in parallel across all cores
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from database.repositories.report_instance_repository import ReportInstanceRepository
+from services.report_worker import init_worker, run_report_instance
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class ReportService:
+    """Submits report instances to a lazily started process pool"""
+
+    def __init__(self):
+        self.max_workers = os.cpu_count() or 1
+        self.artifacts_dir = os.path.abspath('reports')
+        self.mongo_uri = 'mongodb://localhost:27017/ikenei'
+        self.db_name = 'ikenei'
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def configure(self, max_workers=None, artifacts_dir=None, mongo_uri=None, db_name=None):
+        """Apply pool and storage configuration"""
+        if max_workers:
+            self.max_workers = max_workers
+        if artifacts_dir:
+            self.artifacts_dir = os.path.abspath(artifacts_dir)
+        if mongo_uri:
+            self.mongo_uri = mongo_uri
+        if db_name:
+            self.db_name = db_name
+
+    def submit(self, report_id, report_type, target_id, account_id=None, requested_by=None, params=None):
+        """Queue a report instance and hand it to the pool; returns the instance"""
+        instance = ReportInstanceRepository.create_instance(
+            report_id=report_id,
+            report_type=report_type,
+            target_id=target_id,
+            account_id=account_id,
+            requested_by=requested_by,
+            params=params
+        )
+
+        instance_id = str(instance._id)
+        try:
+            future = self._get_executor().submit(run_report_instance, instance_id, self.artifacts_dir)
+        except Exception as e:
+            ReportInstanceRepository.mark_failed(instance_id, f"Failed to queue report: {str(e)}")
+            raise
+
+        future.add_done_callback(lambda f: self._on_done(instance_id, f))
+        return instance
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=wait, cancel_futures=not wait)
+                self._executor = None
+
+    def _get_executor(self):
+        """Lazily start the process pool (spawned, so no parent sockets or threads are inherited)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_worker,
+                    initargs=(self.mongo_uri, self.db_name)
+                )
+                logger.info(f"Started report process pool with {self.max_workers} workers")
+            return self._executor
+
+    def _on_done(self, instance_id, future):
+        """Record instances whose worker process died before reporting back"""
+        error = future.exception()
+        if error is None:
+            return
+
+        logger.error(f"Report worker crashed on instance {instance_id}: {str(error)}")
+        try:
+            ReportInstanceRepository.mark_failed(instance_id, f"Report worker crashed: {str(error)}")
+        except Exception:
+            pass
+
+        # A broken pool cannot accept new work - the next submit starts a fresh one
+        with self._lock:
+            if self._executor is not None and getattr(self._executor, '_broken', False):
+                self._executor = None
+
+# Global report service instance
+report_service = ReportService()
+
+def init_report_service(app):
+    """Configure the report pool from the app config (workers start on first use)"""
+    report_service.configure(
+        max_workers=app.config.get('REPORT_WORKERS'),
+        artifacts_dir=app.config.get('REPORT_ARTIFACTS_DIR'),
+        mongo_uri=app.config.get('MONGO_URI'),
+        db_name=app.config.get('MONGODB_DB_NAME')
+    )
+    return report_service
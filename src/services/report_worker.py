@@ -0,0 +1,218 @@
+"""
+Report Worker
+Entry points executed inside the report process pool. Each worker process
+opens its own MongoDB connection (clients must not be shared across
+processes), computes the report from survey responses and writes a JSON
+artifact plus the instance status back to MongoDB.
+"""
+
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from bson import ObjectId
+from flask import Flask
+import database.connection as connection
+from database.connection import DatabaseConnection, get_collection
+from database.models.report_instance_model import ReportInstance
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RATINGS = ['1', '2', '3', '4', '5']
+
+def init_worker(mongo_uri, db_name):
+    """Process pool initializer: connect this worker process to MongoDB"""
+    app = Flask('report_worker')
+    app.config['MONGO_URI'] = mongo_uri
+    app.config['MONGODB_DB_NAME'] = db_name
+
+    with app.app_context():
+        connection.db_connection = DatabaseConnection()
+
+def run_report_instance(instance_id, artifacts_dir):
+    """Generate one queued report instance; returns its final status"""
+    started = time.perf_counter()
+    try:
+        if not ReportInstance.mark_running(instance_id):
+            logger.warning(f"Report instance {instance_id} is no longer queued, skipping")
+            return 'skipped'
+
+        instance = get_collection(ReportInstance.collection_name).find_one({'_id': ObjectId(instance_id)})
+        if instance['report_type'] == 'subject':
+            report = build_subject_report(instance['target_id'], instance.get('account_id'))
+        else:
+            report = build_survey_run_report(instance['target_id'])
+
+        report['report_id'] = instance['report_id']
+        report['instance_id'] = instance_id
+        report['generated_at'] = datetime.utcnow().isoformat() + 'Z'
+
+        artifact_path, artifact_size = write_artifact(report, artifacts_dir, instance_id)
+        ReportInstance.mark_completed(instance_id, report['summary'], artifact_path, artifact_size)
+
+        logger.info(f"Generated report instance {instance_id} in {time.perf_counter() - started:.2f}s")
+        return 'completed'
+
+    except Exception as e:
+        logger.error(f"Report instance {instance_id} failed: {str(e)}")
+        try:
+            ReportInstance.mark_failed(instance_id, str(e))
+        except Exception as mark_error:
+            logger.error(f"Failed to mark report instance {instance_id} as failed: {str(mark_error)}")
+        return 'failed'
+
+def build_survey_run_report(survey_run_id):
+    """Build the report for a single survey run"""
+    run = get_collection('survey_runs').find_one({'_id': ObjectId(survey_run_id)})
+    if not run:
+        raise ValueError(f"Survey run {survey_run_id} not found")
+
+    subject = get_collection('subjects').find_one({'_id': run['subject_id']}, {'name': 1}) or {}
+    survey = get_collection('surveys').find_one({'_id': run['survey_id']}, {'title': 1, 'questions': 1}) or {}
+
+    report = _build_report([run], {run['survey_id']: survey})
+    report['report_type'] = 'survey_run'
+    report['survey_run_id'] = str(run['_id'])
+    report['subject'] = {'id': str(run['subject_id']), 'name': subject.get('name')}
+    return report
+
+def build_subject_report(subject_id, account_id=None):
+    """Build the report for a subject across all of their survey runs"""
+    subject = get_collection('subjects').find_one({'_id': ObjectId(subject_id)}, {'name': 1})
+    if not subject:
+        raise ValueError(f"Subject {subject_id} not found")
+
+    query = {'subject_id': subject['_id']}
+    if account_id:
+        query['account_id'] = account_id
+    runs = list(get_collection('survey_runs').find(query).sort('launched_at', 1))
+
+    survey_ids = list({run['survey_id'] for run in runs})
+    surveys = {
+        survey['_id']: survey
+        for survey in get_collection('surveys').find({'_id': {'$in': survey_ids}}, {'title': 1, 'questions': 1})
+    }
+
+    report = _build_report(runs, surveys)
+    report['report_type'] = 'subject'
+    report['subject'] = {'id': str(subject['_id']), 'name': subject.get('name')}
+    return report
+
+def _build_report(runs, surveys):
+    """Aggregate rating counts for the runs and fold them into a report"""
+    respondent_meta = {}
+    run_summaries = []
+    for run in runs:
+        respondents = run.get('respondents', [])
+        for respondent in respondents:
+            respondent_meta[(run['_id'], respondent['respondent_id'])] = respondent
+        run_summaries.append({
+            'survey_run_id': str(run['_id']),
+            'survey_title': surveys.get(run['survey_id'], {}).get('title'),
+            'status': run.get('status'),
+            'due_date': run['due_date'].isoformat() + 'Z' if run.get('due_date') else None,
+            'respondents_total': len(respondents),
+            'responses_received': len([r for r in respondents if r.get('status') == 'completed'])
+        })
+
+    question_text = {}
+    for survey in surveys.values():
+        for question in survey.get('questions', []):
+            question_text.setdefault(question['id'], question.get('text'))
+
+    # One row per (run, respondent, question, rating) - the database does the fan-out
+    pipeline = [
+        {'$match': {'survey_run_id': {'$in': [run['_id'] for run in runs]}}},
+        {'$project': {'survey_run_id': 1, 'respondent_id': 1, 'answers': {'$objectToArray': '$responses'}}},
+        {'$unwind': '$answers'},
+        {'$group': {
+            '_id': {
+                'survey_run_id': '$survey_run_id',
+                'respondent_id': '$respondent_id',
+                'question_id': '$answers.k',
+                'rating': '$answers.v'
+            },
+            'count': {'$sum': 1}
+        }}
+    ]
+    rows = get_collection('survey_responses').aggregate(pipeline, allowDiskUse=True)
+
+    questions = defaultdict(lambda: {
+        'count': 0, 'total': 0, 'weighted_total': 0, 'weight': 0,
+        'distribution': dict.fromkeys(RATINGS, 0),
+        'by_relationship': defaultdict(lambda: {'count': 0, 'total': 0})
+    })
+    for row in rows:
+        key = row['_id']
+        rating = key['rating']
+        if not isinstance(rating, (int, float)):
+            continue
+
+        count = row['count']
+        meta = respondent_meta.get((key['survey_run_id'], key['respondent_id']), {})
+        weight = meta.get('weight', 0) * count
+
+        stats = questions[key['question_id']]
+        stats['count'] += count
+        stats['total'] += rating * count
+        stats['weighted_total'] += rating * weight
+        stats['weight'] += weight
+        stats['distribution'][str(int(rating))] = stats['distribution'].get(str(int(rating)), 0) + count
+
+        relationship = stats['by_relationship'][meta.get('relationship') or 'unspecified']
+        relationship['count'] += count
+        relationship['total'] += rating * count
+
+    question_results = {}
+    overall_count = overall_total = overall_weighted = overall_weight = 0
+    for question_id, stats in sorted(questions.items()):
+        question_results[question_id] = {
+            'text': question_text.get(question_id),
+            'responses': stats['count'],
+            'average_rating': _ratio(stats['total'], stats['count']),
+            'weighted_average_rating': _ratio(stats['weighted_total'], stats['weight']),
+            'ratings_distribution': stats['distribution'],
+            'by_relationship': {
+                name: {'responses': rel['count'], 'average_rating': _ratio(rel['total'], rel['count'])}
+                for name, rel in sorted(stats['by_relationship'].items())
+            }
+        }
+        overall_count += stats['count']
+        overall_total += stats['total']
+        overall_weighted += stats['weighted_total']
+        overall_weight += stats['weight']
+
+    respondents_total = sum(run['respondents_total'] for run in run_summaries)
+    responses_received = sum(run['responses_received'] for run in run_summaries)
+
+    return {
+        'summary': {
+            'survey_runs': len(run_summaries),
+            'respondents_total': respondents_total,
+            'responses_received': responses_received,
+            'completion_rate': _ratio(responses_received * 100, respondents_total),
+            'questions': len(question_results),
+            'average_rating': _ratio(overall_total, overall_count),
+            'weighted_average_rating': _ratio(overall_weighted, overall_weight)
+        },
+        'survey_runs': run_summaries,
+        'questions': question_results
+    }
+
+def write_artifact(report, artifacts_dir, instance_id):
+    """Write the report JSON atomically; returns (path, size in bytes)"""
+    os.makedirs(artifacts_dir, exist_ok=True)
+    path = os.path.join(artifacts_dir, f"report_{instance_id}.json")
+    temp_path = f"{path}.tmp"
+
+    with open(temp_path, 'w', encoding='utf-8') as artifact:
+        json.dump(report, artifact, default=str)
+    os.replace(temp_path, path)
+
+    return path, os.path.getsize(path)
+
+def _ratio(numerator, denominator):
+    """Rounded ratio, or None when there is nothing to divide"""
+    return round(numerator / denominator, 2) if denominator else None
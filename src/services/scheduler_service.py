@@ -0,0 +1,262 @@
+"""
+Scheduler Service
+Runs periodic background jobs (e.g. expiring overdue survey runs) in a
+single thread per worker, with a distributed lock so only one worker
+executes each job
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from database.connection import get_collection
+from database.repositories.survey_run_repository import SurveyRunRepository
+from services.distributed_lock import DistributedLock
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEDULER_RUNS_COLLECTION = 'scheduler_runs'
+
+class ScheduledJob:
+    """Base class for scheduler jobs"""
+
+    # Unique job name (also used as the lock name)
+    name = None
+
+    def run(self):
+        """Execute the job and return a result dict to record"""
+        raise NotImplementedError("run must be implemented in subclass")
+
+    def next_due_at(self):
+        """Return when the job next has work to do (None = nothing scheduled)"""
+        return None
+
+class OverdueRunExpiryJob(ScheduledJob):
+    """Expire overdue survey runs in set-based batches"""
+
+    name = 'expire_overdue_runs'
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+
+    def run(self):
+        """Expire all overdue runs and report their IDs"""
+        expired_ids = SurveyRunRepository.bulk_expire_overdue_runs(batch_size=self.batch_size)
+        return {
+            'affected_count': len(expired_ids),
+            'affected_ids': expired_ids
+        }
+
+    def next_due_at(self):
+        """The next run expires when the earliest active due date passes"""
+        return SurveyRunRepository.get_next_due_date()
+
+class ReminderCampaignJob(ScheduledJob):
+    """Send reminder digests to respondents with pending due-soon surveys"""
+
+    name = 'survey_reminders'
+
+    def __init__(self, reminder_service):
+        self.reminder_service = reminder_service
+
+    def run(self):
+        """Run one reminder campaign (throttling makes repeated runs safe)"""
+        return self.reminder_service.send_reminders()
+
+    def next_due_at(self):
+        """Continue straight away when the last run hit its time budget"""
+        return datetime.utcnow() if self.reminder_service.has_backlog else None
+
+class StaleUploadCleanupJob(ScheduledJob):
+    """Remove staged chunks of abandoned resumable uploads"""
+
+    name = 'cleanup_stale_uploads'
+
+    def __init__(self, file_storage):
+        self.file_storage = file_storage
+
+    def run(self):
+        """Delete part files older than the upload session expiry"""
+        return {'affected_count': self.file_storage.cleanup_stale_parts()}
+
+class SchedulerService:
+    """Single-threaded scheduler that wakes when the next job is due"""
+
+    def __init__(self):
+        self.jobs = {}
+        self.min_interval = 30
+        self.max_interval = 3600
+        self.lock_ttl = 300
+        self._next_run = {}
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def configure(self, min_interval=None, max_interval=None, lock_ttl=None):
+        """Apply timing configuration"""
+        if min_interval is not None:
+            self.min_interval = min_interval
+        if max_interval is not None:
+            self.max_interval = max_interval
+        if lock_ttl is not None:
+            self.lock_ttl = lock_ttl
+
+    def register(self, job):
+        """Register a job (it first runs on the next scheduler tick)"""
+        self.jobs[job.name] = job
+        self._next_run[job.name] = datetime.utcnow()
+        self._wake_event.set()
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, name='scheduler', daemon=True)
+        self._thread.start()
+        logger.info(f"Scheduler started with jobs: {', '.join(self.jobs)}")
+
+    def stop(self, timeout=5):
+        """Stop the scheduler thread"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        logger.info("Scheduler stopped")
+
+    def wake(self, job_name=None, at=None):
+        """
+        Pull a job's next run forward (e.g. when a run with an earlier due
+        date is launched) and wake the scheduler to re-plan
+        """
+        at = at or datetime.utcnow()
+        if at.tzinfo:
+            # Plans are naive UTC; aware datetimes would not compare
+            at = at.astimezone(timezone.utc).replace(tzinfo=None)
+        names = [job_name] if job_name else list(self.jobs)
+        for name in names:
+            if name in self._next_run and at < self._next_run[name]:
+                self._next_run[name] = at
+        self._wake_event.set()
+
+    def run_job(self, job):
+        """Run one job under its distributed lock and record the outcome"""
+        lock = DistributedLock(f"scheduler:{job.name}", ttl_seconds=self.lock_ttl)
+
+        try:
+            if not lock.acquire():
+                logger.debug(f"Skipping job {job.name}: lock held by another worker")
+                return None
+        except Exception as e:
+            logger.warning(f"Failed to acquire lock for job {job.name}: {str(e)}")
+            return None
+
+        started_at = datetime.utcnow()
+        try:
+            result = job.run() or {}
+            status = 'success'
+        except Exception as e:
+            logger.error(f"Scheduled job {job.name} failed: {str(e)}")
+            result = {'error': str(e)}
+            status = 'failed'
+        finally:
+            try:
+                lock.release()
+            except Exception as e:
+                logger.warning(f"Failed to release lock for job {job.name}: {str(e)}")
+
+        finished_at = datetime.utcnow()
+        self._record_run(job, lock.owner, status, started_at, finished_at, result)
+
+        if status == 'success':
+            logger.info(f"Scheduled job {job.name} completed: {result.get('affected_count', 0)} affected")
+        return result
+
+    def _plan_next_run(self, job, now):
+        """Compute the next wake-up from the job's own due time, clamped to the interval bounds"""
+        earliest = now + timedelta(seconds=self.min_interval)
+        latest = now + timedelta(seconds=self.max_interval)
+
+        try:
+            due_at = job.next_due_at()
+        except Exception as e:
+            logger.warning(f"Failed to compute next due time for job {job.name}: {str(e)}")
+            due_at = None
+
+        if due_at is None:
+            return latest
+        return min(max(due_at, earliest), latest)
+
+    def _run_loop(self):
+        """Main loop: sleep until the earliest job is due, run it, re-plan"""
+        while not self._stop_event.is_set():
+            # Clear before planning so a wake() that arrives mid-iteration is not lost
+            self._wake_event.clear()
+            now = datetime.utcnow()
+
+            for name, job in list(self.jobs.items()):
+                if self._next_run.get(name, now) <= now:
+                    self.run_job(job)
+                    self._next_run[name] = self._plan_next_run(job, datetime.utcnow())
+
+            if not self._next_run:
+                wait_seconds = self.max_interval
+            else:
+                next_at = min(self._next_run.values())
+                wait_seconds = max((next_at - datetime.utcnow()).total_seconds(), 0)
+
+            self._wake_event.wait(timeout=wait_seconds)
+
+    @staticmethod
+    def _record_run(job, owner, status, started_at, finished_at, result):
+        """Store a job execution record (including affected IDs) for auditing"""
+        try:
+            get_collection(SCHEDULER_RUNS_COLLECTION).insert_one({
+                'job': job.name,
+                'owner': owner,
+                'status': status,
+                'started_at': started_at,
+                'finished_at': finished_at,
+                'duration_ms': round((finished_at - started_at).total_seconds() * 1000, 2),
+                **result
+            })
+        except Exception as e:
+            logger.warning(f"Failed to record run of job {job.name}: {str(e)}")
+
+# Global scheduler instance
+scheduler_service = SchedulerService()
+
+def init_scheduler(app):
+    """Register the background jobs and start the scheduler thread"""
+    if not app.config.get('SCHEDULER_ENABLED', True):
+        logger.info("Scheduler disabled by configuration")
+        return scheduler_service
+
+    scheduler_service.configure(
+        min_interval=app.config.get('SCHEDULER_MIN_INTERVAL_SECONDS', 30),
+        max_interval=app.config.get('SCHEDULER_MAX_INTERVAL_SECONDS', 3600),
+        lock_ttl=app.config.get('SCHEDULER_LOCK_TTL_SECONDS', 300)
+    )
+    scheduler_service.register(
+        OverdueRunExpiryJob(batch_size=app.config.get('RUN_EXPIRY_BATCH_SIZE', 500))
+    )
+
+    if app.config.get('REMINDERS_ENABLED', True):
+        from services.reminder_service import reminder_service
+
+        reminder_service.configure(
+            days_ahead=app.config.get('REMINDER_DAYS_AHEAD', 3),
+            throttle_hours=app.config.get('REMINDER_THROTTLE_HOURS', 24),
+            batch_size=app.config.get('REMINDER_BATCH_SIZE', 100),
+            rate_per_second=app.config.get('REMINDER_RATE_PER_SECOND', 10),
+            # Finish well inside the job's lease so no other worker can start a parallel campaign
+            max_run_seconds=scheduler_service.lock_ttl * 0.8
+        )
+        scheduler_service.register(ReminderCampaignJob(reminder_service))
+
+    from services.file_storage import file_storage
+
+    scheduler_service.register(StaleUploadCleanupJob(file_storage))
+    scheduler_service.start()
+    return scheduler_service
@@ -0,0 +1,273 @@
+"""
+Settings Store
+System-wide and per-account settings held in memory by every worker.
+
+Reads never touch the database on the request path. At most once per
+revalidation interval a reader does one point read of the global change
+counter; only when it moved are the cached scopes' versions compared and
+the changed scopes reloaded. A worker sees its own writes immediately and
+other workers' writes within one interval.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from database.models.account_model import Account
+from database.models.setting_model import Setting, flatten_values
+from database.repositories.setting_repository import SettingRepository
+from database.repositories.account_repository import AccountRepository
+from services.metrics import metrics
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Setting categories (display metadata)
+SETTING_CATEGORIES = {
+    'email': {'name': 'Email', 'description': 'Which emails the platform sends'},
+    'features': {'name': 'Features', 'description': 'Feature switches'}
+}
+
+# System settings: key -> type, default, category and description
+SYSTEM_SETTINGS = {
+    'email.survey_invitations': {
+        'type': bool, 'default': True, 'category': 'email',
+        'description': 'Send invitation emails when a survey run is launched'
+    },
+    'email.survey_reminders': {
+        'type': bool, 'default': True, 'category': 'email',
+        'description': 'Send reminder digests for pending surveys'
+    },
+    'email.survey_completions': {
+        'type': bool, 'default': True, 'category': 'email',
+        'description': 'Send confirmation emails when a respondent completes a survey'
+    },
+    'features.bulk_import': {
+        'type': bool, 'default': True, 'category': 'features',
+        'description': 'Allow CSV/XLSX imports of subjects and respondents'
+    },
+    'features.bulk_launch': {
+        'type': bool, 'default': True, 'category': 'features',
+        'description': 'Allow launching a survey for many subjects at once'
+    },
+    'features.live_progress': {
+        'type': bool, 'default': True, 'category': 'features',
+        'description': 'Allow live survey run progress streams'
+    }
+}
+
+# Account settings: the flattened account defaults (e.g. email_notifications.survey_reminders)
+ACCOUNT_SETTINGS = {
+    key: {'type': type(default), 'default': default}
+    for key, default in flatten_values(Account.DEFAULT_SETTINGS).items()
+}
+
+class _CachedScope:
+    """One scope's overrides at a known version, over its base values"""
+
+    __slots__ = ('version', 'values', 'base')
+
+    def __init__(self, version, values, base):
+        self.version = version
+        self.values = values
+        self.base = base
+
+    def get(self, key, default=None):
+        if key in self.values:
+            return self.values[key]
+        return self.base.get(key, default)
+
+class SettingsStore:
+    """In-memory settings cache with versioned revalidation"""
+
+    def __init__(self):
+        self.revalidate_seconds = 5
+        self.max_cached_accounts = 5000
+        self._system = None
+        self._accounts = OrderedDict()
+        self._version = None
+        self._next_check = 0
+        self._lock = threading.Lock()
+
+    def configure(self, revalidate_seconds=None, max_cached_accounts=None):
+        """Apply cache configuration"""
+        if revalidate_seconds is not None:
+            self.revalidate_seconds = revalidate_seconds
+        if max_cached_accounts:
+            self.max_cached_accounts = max_cached_accounts
+
+    def get(self, key, default=None):
+        """System setting value (from memory)"""
+        self._revalidate()
+        spec = SYSTEM_SETTINGS.get(key)
+        return self._system_scope().get(key, spec['default'] if spec else default)
+
+    def get_account(self, account_id, key, default=None):
+        """Account setting value (from memory once the account is cached)"""
+        self._revalidate()
+        spec = ACCOUNT_SETTINGS.get(key)
+        return self._account_scope(str(account_id)).get(key, spec['default'] if spec else default)
+
+    def get_all(self, account_id=None):
+        """Every effective value of the system or an account scope"""
+        self._revalidate()
+        if account_id:
+            scope, schema = self._account_scope(str(account_id)), ACCOUNT_SETTINGS
+        else:
+            scope, schema = self._system_scope(), SYSTEM_SETTINGS
+        return {key: scope.get(key, spec['default']) for key, spec in schema.items()}
+
+    def is_overridden(self, key, account_id=None):
+        scope = self._account_scope(str(account_id)) if account_id else self._system_scope()
+        return key in scope.values
+
+    def email_enabled(self, kind, account_id=None):
+        """Whether an email kind (survey_invitations, survey_reminders, survey_completions) is on"""
+        if not self.get(f'email.{kind}', True):
+            return False
+        if account_id:
+            return bool(self.get_account(account_id, f'email_notifications.{kind}', True))
+        return True
+
+    def feature_enabled(self, name):
+        return bool(self.get(f'features.{name}', True))
+
+    def set(self, key, value, account_id=None, updated_by=None):
+        """Validate and store an override; returns the stored value"""
+        value = validate_setting(key, value, account=bool(account_id))
+        self._write(account_id, values={key: value}, updated_by=updated_by)
+        return value
+
+    def reset(self, key, account_id=None, updated_by=None):
+        """Drop an override so the default applies again; returns the default"""
+        schema = ACCOUNT_SETTINGS if account_id else SYSTEM_SETTINGS
+        if key not in schema:
+            raise KeyError(key)
+        self._write(account_id, unset_keys=[key], updated_by=updated_by)
+        return self.get_account(account_id, key) if account_id else self.get(key)
+
+    def get_metrics(self):
+        return {'cached_accounts': len(self._accounts), 'version': self._version}
+
+    def invalidate(self):
+        """Drop every cached scope (the next read reloads)"""
+        with self._lock:
+            self._system = None
+            self._accounts.clear()
+            self._version = None
+            self._next_check = 0
+
+    def _write(self, account_id, values=None, unset_keys=None, updated_by=None):
+        scope = str(account_id) if account_id else Setting.SYSTEM_SCOPE
+        version, stored = SettingRepository.write(
+            scope,
+            values=values,
+            unset_keys=unset_keys,
+            updated_by=str(updated_by) if updated_by else None
+        )
+        # Read-your-writes in this worker; the global version is left alone so
+        # other workers' writes are still picked up at the next revalidation
+        with self._lock:
+            if account_id:
+                cached = self._accounts.get(scope)
+                if cached:
+                    cached.version, cached.values = version, stored
+            elif self._system:
+                self._system.version, self._system.values = version, stored
+
+    def _system_scope(self):
+        system = self._system
+        if system is not None:
+            metrics.inc('cache_requests_total', ('settings_system', 'hit'))
+        else:
+            metrics.inc('cache_requests_total', ('settings_system', 'miss'))
+            version, values = SettingRepository.load_scopes([Setting.SYSTEM_SCOPE]).get(Setting.SYSTEM_SCOPE, (0, {}))
+            system = self._system = _CachedScope(version, values, {})
+        return system
+
+    def _account_scope(self, account_id):
+        cached = self._accounts.get(account_id)
+        if cached is not None:
+            metrics.inc('cache_requests_total', ('settings_account', 'hit'))
+            return cached
+        metrics.inc('cache_requests_total', ('settings_account', 'miss'))
+
+        version, values = SettingRepository.load_scopes([account_id]).get(account_id, (0, {}))
+        cached = _CachedScope(version, values, self._legacy_account_settings(account_id))
+        with self._lock:
+            self._accounts[account_id] = cached
+            while len(self._accounts) > self.max_cached_accounts:
+                self._accounts.popitem(last=False)
+        return cached
+
+    @staticmethod
+    def _legacy_account_settings(account_id):
+        """Values saved on the account document before the store existed"""
+        try:
+            account = AccountRepository.get_account_by_id(account_id)
+            return flatten_values(account.get_field('settings') or {}) if account else {}
+        except Exception as e:
+            logger.warning(f"Failed to load account settings for {account_id}: {str(e)}")
+            return {}
+
+    def _revalidate(self):
+        """
+        Version check, at most once per interval and never blocking readers:
+        a reader that finds another thread revalidating keeps the cached values
+        """
+        now = time.monotonic()
+        if now < self._next_check or not self._lock.acquire(blocking=False):
+            return
+        try:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.revalidate_seconds
+
+            version = SettingRepository.get_global_version()
+            if version == self._version:
+                return
+
+            cached = {Setting.SYSTEM_SCOPE: self._system} if self._system else {}
+            cached.update(self._accounts)
+            if cached and self._version is not None:
+                current = SettingRepository.get_scope_versions(list(cached))
+                stale = [scope for scope, entry in cached.items() if current.get(scope, 0) != entry.version]
+                if stale:
+                    loaded = SettingRepository.load_scopes(stale)
+                    for scope in stale:
+                        cached[scope].version, cached[scope].values = loaded.get(scope, (0, {}))
+                    logger.info(f"Reloaded {len(stale)} settings scopes at version {version}")
+            elif self._version is None and cached:
+                # First check after a cold start: whatever was cached predates any version
+                self._system = None
+                self._accounts.clear()
+            self._version = version
+        except Exception as e:
+            logger.warning(f"Settings revalidation failed, serving cached values: {str(e)}")
+        finally:
+            self._lock.release()
+
+def validate_setting(key, value, account=False):
+    """Check a value against its setting's type; raises KeyError or ValueError"""
+    spec = (ACCOUNT_SETTINGS if account else SYSTEM_SETTINGS).get(key)
+    if spec is None:
+        raise KeyError(key)
+
+    expected = spec['type']
+    if expected is bool and not isinstance(value, bool):
+        raise ValueError(f"Setting {key} must be true or false")
+    if expected is int and (isinstance(value, bool) or not isinstance(value, int)):
+        raise ValueError(f"Setting {key} must be an integer")
+    if expected is str and not isinstance(value, str):
+        raise ValueError(f"Setting {key} must be a string")
+    return value
+
+# Global settings store instance
+settings_store = SettingsStore()
+
+def init_settings_store(app):
+    """Configure the settings cache from the app config (scopes load on first read)"""
+    settings_store.configure(
+        revalidate_seconds=app.config.get('SETTINGS_REVALIDATE_SECONDS'),
+        max_cached_accounts=app.config.get('SETTINGS_CACHE_MAX_ACCOUNTS')
+    )
+    return settings_store
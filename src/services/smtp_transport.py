@@ -0,0 +1,326 @@
+"""
+Pooled SMTP transport for the email service
+Keeps persistent, TLS-negotiated sessions to our relay and reuses them
+across messages, with per-destination-domain concurrency caps
+
+Can be exercised against a local sink, e.g.:
+    python -m aiosmtpd -n -l localhost:8025
+    MAIL_SERVER=localhost MAIL_PORT=8025 MAIL_USE_TLS=false python app.py
+"""
+
+import contextvars
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parseaddr
+from services.metrics import metrics
+from services.tracing import tracer, SPAN_KIND_CLIENT
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Errors after which the session is unusable and must be re-established
+CONNECTION_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPConnectError,
+    smtplib.SMTPHeloError,
+    ConnectionError,
+    TimeoutError,
+    OSError
+)
+
+class PooledConnection:
+    """A live SMTP session plus bookkeeping used by the pool"""
+
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self.message_count = 0
+
+    def close(self):
+        """Close the session, ignoring errors from an already dead socket"""
+        try:
+            self.smtp.quit()
+        except Exception:
+            try:
+                self.smtp.close()
+            except Exception:
+                pass
+
+class SMTPConnectionPool:
+    """Bounded pool of reusable SMTP sessions"""
+
+    def __init__(self, host, port=587, username=None, password=None, use_tls=True, use_ssl=False,
+                 pool_size=4, max_messages_per_connection=100, max_idle_seconds=60, timeout=30,
+                 domain_limits=None, default_domain_limit=None, max_retries=2):
+        """Configure the pool (connections are opened lazily)"""
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.pool_size = max(1, pool_size)
+        self.max_messages_per_connection = max_messages_per_connection
+        self.max_idle_seconds = max_idle_seconds
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._domain_limits = {d.lower(): n for d, n in (domain_limits or {}).items()}
+        self._default_domain_limit = default_domain_limit
+        self._domain_semaphores = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._closed = False
+        self._queued = 0
+
+        self._stats = {
+            'connections_opened': 0,
+            'connections_reused': 0,
+            'reconnects': 0,
+            'messages_sent': 0,
+            'messages_failed': 0
+        }
+
+    def send(self, message):
+        """Send one email.message.EmailMessage, reconnecting on session failure"""
+        started = time.perf_counter()
+        with tracer.span('email.send', SPAN_KIND_CLIENT, {'email.transport': 'smtp', 'server.address': self.host}) as span:
+            result = self._send(message)
+            if span is not None and not result['success']:
+                span.set_error(result.get('error'))
+        metrics.observe(
+            'email_send_duration_seconds',
+            time.perf_counter() - started,
+            ('smtp', 'sent' if result['success'] else 'failed')
+        )
+        return result
+
+    def _send(self, message):
+        to_email = parseaddr(message['To'] or '')[1]
+        domain = to_email.rsplit('@', 1)[-1].lower()
+        domain_semaphore = self._domain_semaphore(domain)
+
+        if domain_semaphore:
+            domain_semaphore.acquire()
+        try:
+            last_error = None
+            for attempt in range(self.max_retries + 1):
+                try:
+                    connection = self._acquire()
+                except CONNECTION_ERRORS as e:
+                    # Relay unreachable - back off briefly before reconnecting
+                    last_error = e
+                    logger.warning(f"SMTP connect to {self.host}:{self.port} failed (attempt {attempt + 1}): {str(e)}")
+                    time.sleep(min(0.5 * (attempt + 1), 2))
+                    continue
+
+                try:
+                    connection.smtp.send_message(message)
+                except CONNECTION_ERRORS as e:
+                    # Dead or reset session - drop it and retry on a fresh one
+                    last_error = e
+                    self._discard(connection)
+                    self._increment('reconnects')
+                    logger.warning(f"SMTP session failed sending to {to_email} (attempt {attempt + 1}): {str(e)}")
+                    continue
+                except smtplib.SMTPException as e:
+                    # Rejected by the relay - the session is still usable
+                    self._release(connection)
+                    self._increment('messages_failed')
+                    logger.error(f"SMTP relay rejected message to {to_email}: {str(e)}")
+                    return {
+                        'success': False,
+                        'error': str(e),
+                        'email': to_email
+                    }
+
+                connection.message_count += 1
+                self._release(connection)
+                self._increment('messages_sent')
+                return {
+                    'success': True,
+                    'message': 'Email sent successfully',
+                    'email': to_email,
+                    'transport': 'smtp'
+                }
+
+            self._increment('messages_failed')
+            return {
+                'success': False,
+                'error': f"SMTP delivery failed after {self.max_retries + 1} attempts: {str(last_error)}",
+                'email': to_email
+            }
+        except Exception as e:
+            self._increment('messages_failed')
+            logger.error(f"Failed to send email to {to_email} via SMTP: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'email': to_email
+            }
+        finally:
+            if domain_semaphore:
+                domain_semaphore.release()
+
+    def send_many(self, messages):
+        """Send a batch of messages concurrently over the pooled sessions"""
+        if not messages:
+            return []
+        with self._lock:
+            self._queued += len(messages)
+        # Each worker runs in a copy of the caller's context so sends join the caller's trace
+        contexts = [contextvars.copy_context() for _ in messages]
+        return list(self._get_executor().map(
+            lambda context, message: context.run(self._send_queued, message), contexts, messages
+        ))
+
+    def check(self):
+        """Open (or reuse) a session and NOOP it to verify relay configuration"""
+        connection = self._acquire()
+        try:
+            connection.smtp.noop()
+        except Exception:
+            self._discard(connection)
+            raise
+        self._release(connection)
+        return True
+
+    def get_stats(self):
+        """Get pool usage counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['queued'] = self._queued
+        stats['idle_connections'] = self._idle.qsize()
+        stats['pool_size'] = self.pool_size
+        return stats
+
+    def close(self):
+        """Close all idle sessions and stop the worker threads"""
+        self._closed = True
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        logger.info("SMTP connection pool closed")
+
+    def _send_queued(self, message):
+        """Send a message picked up by a send_many worker"""
+        with self._lock:
+            self._queued -= 1
+        return self.send(message)
+
+    def _connect(self):
+        """Open and authenticate a new SMTP session"""
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+
+        try:
+            if not self.use_ssl:
+                smtp.ehlo()
+                if self.use_tls:
+                    smtp.starttls()
+                    smtp.ehlo()
+
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            # Don't leak the socket of a session that never became usable
+            smtp.close()
+            raise
+
+        self._increment('connections_opened')
+        logger.info(f"Opened SMTP session to {self.host}:{self.port}")
+        return PooledConnection(smtp)
+
+    def _acquire(self):
+        """Take an idle session or open a new one, blocking while the pool is exhausted"""
+        if self._closed:
+            raise RuntimeError("SMTP connection pool is closed")
+
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    connection = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+
+                if time.monotonic() - connection.last_used_at > self.max_idle_seconds:
+                    # The relay may have dropped a long-idle session
+                    try:
+                        connection.smtp.noop()
+                    except Exception:
+                        connection.close()
+                        continue
+
+                self._increment('connections_reused')
+                return connection
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, connection):
+        """Return a session to the pool, recycling it once it has sent enough messages"""
+        connection.last_used_at = time.monotonic()
+        if self._closed or connection.message_count >= self.max_messages_per_connection:
+            connection.close()
+        else:
+            self._idle.put(connection)
+        self._slots.release()
+
+    def _discard(self, connection):
+        """Drop a broken session and free its slot"""
+        connection.close()
+        self._slots.release()
+
+    def _domain_semaphore(self, domain):
+        """Get the concurrency semaphore for a destination domain (None if uncapped)"""
+        limit = self._domain_limits.get(domain, self._default_domain_limit)
+        if not limit:
+            return None
+
+        with self._lock:
+            semaphore = self._domain_semaphores.get(domain)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(limit)
+                self._domain_semaphores[domain] = semaphore
+            return semaphore
+
+    def _get_executor(self):
+        """Lazily create the worker threads used by send_many"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.pool_size,
+                    thread_name_prefix='smtp-pool'
+                )
+            return self._executor
+
+    def _increment(self, counter):
+        """Increment a stats counter"""
+        with self._lock:
+            self._stats[counter] += 1
+
+def parse_domain_limits(value):
+    """Parse 'gmail.com:2,outlook.com:4' into {'gmail.com': 2, 'outlook.com': 4}"""
+    limits = {}
+    for item in (value or '').split(','):
+        if ':' in item:
+            domain, limit = item.split(':', 1)
+            try:
+                limits[domain.strip().lower()] = int(limit)
+            except ValueError:
+                logger.warning(f"Ignoring invalid SMTP domain limit: {item}")
+    return limits
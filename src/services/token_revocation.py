@@ -0,0 +1,125 @@
+"""
+Token Revocation
+Revoked JWT ids are stored in MongoDB (dropped by a TTL index at token
+expiry) and mirrored in an in-memory set in every worker, so the
+JWTManager blocklist check is a set lookup rather than a database read.
+
+The set is loaded once, then kept current by an incremental query for
+tokens revoked since the last sync, at most once per sync interval and
+without blocking other requests. Revocations made by this worker apply
+immediately; those made elsewhere apply within one interval. Each sync
+re-reads an overlap window so revocations committed late, or stamped by a
+server with a skewed clock, are not missed.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import jsonify
+from database.repositories.revoked_token_repository import RevokedTokenRepository
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class TokenRevocationStore:
+    """In-memory mirror of the revoked token collection"""
+
+    def __init__(self):
+        self.sync_seconds = 5
+        self.overlap_seconds = 60
+        self._revoked = {}
+        self._loaded = False
+        self._last_sync = None
+        self._next_sync = 0
+        self._lock = threading.Lock()
+
+    def configure(self, sync_seconds=None, overlap_seconds=None):
+        """Apply sync configuration"""
+        if sync_seconds is not None:
+            self.sync_seconds = sync_seconds
+        if overlap_seconds is not None:
+            self.overlap_seconds = overlap_seconds
+
+    def is_revoked(self, jti):
+        """Blocklist check (a set lookup, plus a sync when one is due)"""
+        self._sync()
+        return jti in self._revoked
+
+    def revoke(self, jwt_payload, reason=None):
+        """
+        Revoke a decoded token. Returns False if it was already revoked,
+        which makes refresh-token rotation single-use even across workers.
+        """
+        jti = jwt_payload['jti']
+        expires_at = datetime.utcfromtimestamp(jwt_payload['exp']) if jwt_payload.get('exp') else datetime.utcnow() + timedelta(days=365)
+        newly_revoked = RevokedTokenRepository.revoke(
+            jti,
+            expires_at,
+            token_type=jwt_payload.get('type'),
+            account_id=jwt_payload.get('sub'),
+            reason=reason
+        )
+        self._revoked[jti] = expires_at
+        return newly_revoked
+
+    def get_metrics(self):
+        return {
+            'revoked_tokens': len(self._revoked),
+            'last_sync': self._last_sync.isoformat() + 'Z' if self._last_sync else None
+        }
+
+    def _sync(self):
+        """Load or incrementally refresh the set, at most once per interval"""
+        now = time.monotonic()
+        # Until the first load completes every request waits for it; afterwards nobody does
+        if now < self._next_sync or not self._lock.acquire(blocking=not self._loaded):
+            return
+        try:
+            if now < self._next_sync:
+                return
+            self._next_sync = now + self.sync_seconds
+
+            started = datetime.utcnow()
+            if not self._loaded:
+                self._revoked.update(RevokedTokenRepository.get_unexpired())
+                self._loaded = True
+                logger.info(f"Loaded {len(self._revoked)} revoked tokens")
+            else:
+                since = self._last_sync - timedelta(seconds=self.overlap_seconds)
+                self._revoked.update(RevokedTokenRepository.get_revoked_since(since))
+                self._prune(started)
+            self._last_sync = started
+        except Exception as e:
+            # Keep enforcing what is already known rather than failing every request
+            logger.warning(f"Revoked token sync failed, using cached set: {str(e)}")
+        finally:
+            self._lock.release()
+
+    def _prune(self, now):
+        """Forget tokens that have expired (JWT validation rejects them anyway)"""
+        expired = [jti for jti, expires_at in list(self._revoked.items()) if expires_at <= now]
+        for jti in expired:
+            self._revoked.pop(jti, None)
+
+# Global token revocation store
+token_revocation = TokenRevocationStore()
+
+def init_token_revocation(app, jwt):
+    """Configure the store and register it as the JWTManager blocklist"""
+    token_revocation.configure(
+        sync_seconds=app.config.get('TOKEN_REVOCATION_SYNC_SECONDS'),
+        overlap_seconds=app.config.get('TOKEN_REVOCATION_OVERLAP_SECONDS')
+    )
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return token_revocation.is_revoked(jwt_payload['jti'])
+
+    @jwt.revoked_token_loader
+    def revoked_token_response(jwt_header, jwt_payload):
+        return jsonify({
+            "success": False,
+            "error": {"message": "Token has been revoked"}
+        }), 401
+
+    return token_revocation
@@ -0,0 +1,466 @@
+"""
+Tracing
+OpenTelemetry-compatible request tracing without the SDK dependency.
+
+Every sampled request gets a server span, with child spans for log_route
+views, log_function_call controllers, @traced repositories, each MongoDB
+command and each email send, so a slow request shows where its time went.
+Spans carry W3C trace context: an incoming traceparent header continues the
+caller's trace (and its sampling decision), and the trace id is returned in
+X-Trace-Id.
+
+Finished spans are batched by a background thread and exported as OTLP
+JSON - appended to a file (one ExportTraceServiceRequest per line, the
+OpenTelemetry Collector file format) or POSTed to an OTLP/HTTP endpoint.
+Unsampled requests create no spans at all.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+import traceback
+import urllib.request
+from pymongo import monitoring
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+# The active span of the current request (or thread)
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'kind', 'attributes', 'events',
+                 'status', 'start_ns', 'end_ns', '_started', '_tracer')
+
+    def __init__(self, tracer, name, trace_id, parent_id=None, kind=SPAN_KIND_INTERNAL, attributes=None):
+        self._tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = '%016x' % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes) if attributes else {}
+        self.events = []
+        self.status = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._started = time.perf_counter_ns()
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_error(self, message=None):
+        self.status = (STATUS_ERROR, message or '')
+
+    def record_exception(self, error):
+        """Add an exception event and mark the span failed"""
+        self.events.append({
+            'name': 'exception',
+            'time_ns': time.time_ns(),
+            'attributes': {
+                'exception.type': type(error).__name__,
+                'exception.message': str(error),
+                'exception.stacktrace': ''.join(traceback.format_exception(type(error), error, error.__traceback__))
+            }
+        })
+        self.set_error(str(error))
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = self.start_ns + (time.perf_counter_ns() - self._started)
+            self._tracer._export(self)
+
+    @property
+    def traceparent(self):
+        return f'00-{self.trace_id}-{self.span_id}-01'
+
+class _SpanScope:
+    """Context manager that activates a span and ends it on exit"""
+
+    __slots__ = ('span', '_token')
+
+    def __init__(self, span):
+        self.span = span
+
+    def __enter__(self):
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.span.record_exception(exc)
+        _current_span.reset(self._token)
+        self.span.end()
+        return False
+
+class _NoopScope:
+    """Stands in for a span scope when the current request is not traced"""
+
+    span = None
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SCOPE = _NoopScope()
+
+class Tracer:
+    """Creates spans for sampled requests and exports them in batches"""
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 0.01
+        self.exporter = 'file'
+        self.file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs', 'traces.jsonl')
+        self.endpoint = 'http://localhost:4318/v1/traces'
+        self.service_name = 'ikenei-api'
+        self.batch_size = 512
+        self.flush_seconds = 5
+        self._queue = queue.Queue(maxsize=10000)
+        self._worker = None
+        self._worker_pid = None
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            # Forked workers drop the parent's unexported spans and start their own exporter
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stats = {'exported': 0, 'dropped': 0, 'export_errors': 0}
+
+    def configure(self, enabled=None, sample_rate=None, exporter=None, file_path=None, endpoint=None,
+                  service_name=None, batch_size=None, queue_size=None, flush_seconds=None):
+        """Apply tracing configuration"""
+        if enabled is not None:
+            self.enabled = enabled
+        if sample_rate is not None:
+            self.sample_rate = float(sample_rate)
+        if exporter:
+            if exporter not in ('file', 'otlp'):
+                raise ValueError(f"Unsupported trace exporter: {exporter}")
+            self.exporter = exporter
+        if file_path:
+            self.file_path = file_path
+        if endpoint:
+            self.endpoint = endpoint
+        if service_name:
+            self.service_name = service_name
+        if batch_size:
+            self.batch_size = batch_size
+        if queue_size:
+            self._queue = queue.Queue(maxsize=queue_size)
+        if flush_seconds:
+            self.flush_seconds = flush_seconds
+
+    def start_trace(self, name, traceparent=None, kind=SPAN_KIND_SERVER, attributes=None):
+        """
+        Root span for a request: continues the caller's trace when a valid
+        traceparent is given (keeping its sampling decision), else samples
+        at the configured rate. Returns None when not sampled.
+        """
+        if not self.enabled:
+            return None
+        match = _TRACEPARENT.match(traceparent or '')
+        if match:
+            if not int(match.group(3), 16) & 1:
+                return None
+            trace_id, parent_id = match.group(1), match.group(2)
+        elif random.random() < self.sample_rate:
+            trace_id, parent_id = '%032x' % random.getrandbits(128), None
+        else:
+            return None
+        return Span(self, name, trace_id, parent_id, kind, attributes)
+
+    def activate(self, span):
+        """Make span current; returns a token for deactivate"""
+        return _current_span.set(span)
+
+    def deactivate(self, token):
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Reset from another context (e.g. teardown after a copied context); just clear it
+            _current_span.set(None)
+
+    def current_span(self):
+        return _current_span.get()
+
+    def start_span(self, name, kind=SPAN_KIND_INTERNAL, attributes=None):
+        """Child of the current span without activating it (None when not tracing)"""
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        return Span(self, name, parent.trace_id, parent.span_id, kind, attributes)
+
+    def span(self, name, kind=SPAN_KIND_INTERNAL, attributes=None):
+        """Context manager for a child span of the current one (a no-op when not tracing)"""
+        parent = _current_span.get()
+        if parent is None:
+            return _NOOP_SCOPE
+        return _SpanScope(Span(self, name, parent.trace_id, parent.span_id, kind, attributes))
+
+    def get_metrics(self):
+        return {'enabled': self.enabled, 'sample_rate': self.sample_rate, 'queued': self._queue.qsize(), **self._stats}
+
+    def flush(self):
+        """Export everything queued (the exporter thread, at shutdown and on demand)"""
+        with self._flush_lock:
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return
+                self._export_batch(batch)
+
+    def _export(self, span):
+        if self._worker_pid != os.getpid():
+            self._start_worker()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self._stats['dropped'] += 1
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def _start_worker(self):
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def _export_batch(self, spans):
+        payload = json.dumps(self._to_otlp(spans), separators=(',', ':'))
+        try:
+            if self.exporter == 'otlp':
+                request = urllib.request.Request(
+                    self.endpoint,
+                    data=payload.encode('utf-8'),
+                    headers={'Content-Type': 'application/json'},
+                    method='POST'
+                )
+                with urllib.request.urlopen(request, timeout=5) as response:
+                    response.read()
+            else:
+                os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+                with open(self.file_path, 'a') as f:
+                    f.write(payload + '\n')
+            self._stats['exported'] += len(spans)
+        except Exception as e:
+            self._stats['export_errors'] += 1
+            logger.warning(f"Failed to export {len(spans)} spans: {str(e)}")
+
+    def _to_otlp(self, spans):
+        """An OTLP ExportTraceServiceRequest (JSON encoding)"""
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': _attributes({
+                    'service.name': self.service_name,
+                    'process.pid': os.getpid()
+                })},
+                'scopeSpans': [{
+                    'scope': {'name': 'ikenei.tracing'},
+                    'spans': [_span_to_otlp(span) for span in spans]
+                }]
+            }]
+        }
+
+def _span_to_otlp(span):
+    entry = {
+        'traceId': span.trace_id,
+        'spanId': span.span_id,
+        'name': span.name,
+        'kind': span.kind,
+        'startTimeUnixNano': str(span.start_ns),
+        'endTimeUnixNano': str(span.end_ns),
+        'attributes': _attributes(span.attributes)
+    }
+    if span.parent_id:
+        entry['parentSpanId'] = span.parent_id
+    if span.events:
+        entry['events'] = [
+            {'name': event['name'], 'timeUnixNano': str(event['time_ns']), 'attributes': _attributes(event['attributes'])}
+            for event in span.events
+        ]
+    if span.status:
+        entry['status'] = {'code': span.status[0], 'message': span.status[1]}
+    return entry
+
+def _attributes(values):
+    attributes = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            encoded = {'boolValue': value}
+        elif isinstance(value, int):
+            encoded = {'intValue': str(value)}
+        elif isinstance(value, float):
+            encoded = {'doubleValue': value}
+        else:
+            encoded = {'stringValue': str(value)}
+        attributes.append({'key': key, 'value': encoded})
+    return attributes
+
+def traced(layer):
+    """
+    Class decorator giving every public static or class method a span named
+    Class.method, e.g. @traced('repository') on a repository
+    """
+    def decorator(cls):
+        for name, member in list(vars(cls).items()):
+            if name.startswith('_') or name == 'get_collection':
+                continue
+            if isinstance(member, (staticmethod, classmethod)):
+                func = member.__func__
+                if inspect.isgeneratorfunction(func):
+                    continue
+                setattr(cls, name, type(member)(trace_function(func, layer)))
+        return cls
+    return decorator
+
+def trace_function(func, layer):
+    """Wrap a function in a span (free when the current request is not traced)"""
+    span_name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        parent = _current_span.get()
+        if parent is None:
+            return func(*args, **kwargs)
+        with _SpanScope(Span(tracer, span_name, parent.trace_id, parent.span_id, attributes={'code.layer': layer})):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+class MongoCommandTracing(monitoring.CommandListener):
+    """A client span per MongoDB command, under whatever span issued it"""
+
+    def __init__(self):
+        self._spans = {}
+
+    def started(self, event):
+        if _current_span.get() is None:
+            return
+        target = event.command.get('collection') if event.command_name == 'getMore' else event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else None
+        attributes = {
+            'db.system': 'mongodb',
+            'db.name': event.database_name,
+            'db.operation': event.command_name,
+            'server.address': '%s:%s' % event.connection_id if isinstance(event.connection_id, tuple) else str(event.connection_id)
+        }
+        if collection:
+            attributes['db.mongodb.collection'] = collection
+        span = tracer.start_span(f"{event.command_name} {collection}" if collection else event.command_name, SPAN_KIND_CLIENT, attributes)
+        self._spans[(event.connection_id, event.request_id)] = span
+
+    def succeeded(self, event):
+        span = self._spans.pop((event.connection_id, event.request_id), None)
+        if span is not None:
+            span.end()
+
+    def failed(self, event):
+        span = self._spans.pop((event.connection_id, event.request_id), None)
+        if span is not None:
+            span.set_error(str(event.failure.get('errmsg', event.failure)) if isinstance(event.failure, dict) else str(event.failure))
+            span.end()
+
+# Global tracer and MongoDB listener (passed to the MongoClient)
+tracer = Tracer()
+mongo_command_tracing = MongoCommandTracing()
+
+def init_tracing(app):
+    """Configure tracing and open a server span for each sampled request"""
+    from flask import g, request
+
+    tracer.configure(
+        enabled=app.config.get('TRACING_ENABLED'),
+        sample_rate=app.config.get('TRACING_SAMPLE_RATE'),
+        exporter=app.config.get('TRACING_EXPORTER'),
+        file_path=app.config.get('TRACING_FILE'),
+        endpoint=app.config.get('TRACING_OTLP_ENDPOINT'),
+        service_name=app.config.get('TRACING_SERVICE_NAME'),
+        batch_size=app.config.get('TRACING_BATCH_SIZE'),
+        queue_size=app.config.get('TRACING_QUEUE_SIZE'),
+        flush_seconds=app.config.get('TRACING_FLUSH_SECONDS')
+    )
+    if not tracer.enabled:
+        return tracer
+
+    @app.before_request
+    def start_request_span():
+        route = request.url_rule.rule if request.url_rule else None
+        span = tracer.start_trace(
+            f"{request.method} {route}" if route else request.method,
+            traceparent=request.headers.get('traceparent'),
+            attributes={
+                'http.request.method': request.method,
+                'http.route': route or '',
+                'url.path': request.path,
+                'client.address': request.remote_addr or ''
+            }
+        )
+        if span is not None:
+            g.trace_span = span
+            g.trace_token = tracer.activate(span)
+
+    @app.after_request
+    def tag_request_span(response):
+        span = g.get('trace_span')
+        if span is not None:
+            span.set_attribute('http.response.status_code', response.status_code)
+            if response.status_code >= 500:
+                span.set_error(f"HTTP {response.status_code}")
+            response.headers['X-Trace-Id'] = span.trace_id
+        return response
+
+    @app.teardown_request
+    def end_request_span(error):
+        span = g.pop('trace_span', None)
+        if span is not None:
+            if error is not None:
+                span.record_exception(error)
+            tracer.deactivate(g.pop('trace_token'))
+            span.end()
+
+    import atexit
+    atexit.register(tracer.flush)
+
+    logger.info(f"Tracing {tracer.sample_rate:.0%} of requests to {tracer.endpoint if tracer.exporter == 'otlp' else tracer.file_path}")
+    return tracer
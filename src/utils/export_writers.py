@@ -0,0 +1,186 @@
+"""
+Streaming export writers
+Turn an iterator of row lists into an iterator of encoded byte chunks
+(CSV, gzip-compressed CSV, Parquet or Arrow IPC) so exports of any size
+run in constant memory and can be sent straight to an HTTP response or
+written to a file.
+
+Parquet and Arrow output require the optional pyarrow package.
+"""
+
+import csv
+import io
+import zlib
+from datetime import datetime
+from itertools import islice
+
+# format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'csv.gz': ('application/gzip', '.csv.gz'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', '.arrow')
+}
+
+DEFAULT_CHUNK_ROWS = 5000
+
+def iter_export(rows, columns, export_format, chunk_rows=DEFAULT_CHUNK_ROWS, column_types=None):
+    """
+    Encode rows in the requested format, yielding byte chunks. column_types
+    maps column names to 'string', 'integer', 'float' or 'timestamp' for the
+    Arrow formats; undeclared columns are strings.
+    """
+    if export_format == 'csv':
+        return iter_csv(rows, columns, chunk_rows)
+    if export_format == 'csv.gz':
+        return iter_gzip(iter_csv(rows, columns, chunk_rows))
+    if export_format in ('parquet', 'arrow'):
+        return iter_arrow(rows, columns, export_format, chunk_rows, column_types)
+    raise ValueError(f"Unsupported export format: {export_format}")
+
+def iter_csv(rows, columns, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Encode rows as UTF-8 CSV, one chunk per chunk_rows rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, chunk_rows))
+        writer.writerows([_csv_value(value) for value in row] for row in batch)
+        chunk = buffer.getvalue()
+        if chunk:
+            yield chunk.encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+        if len(batch) < chunk_rows:
+            break
+
+def iter_gzip(chunks, level=6):
+    """Gzip-compress a stream of byte chunks"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def iter_arrow(rows, columns, export_format='parquet', chunk_rows=DEFAULT_CHUNK_ROWS, column_types=None):
+    """Encode rows as Parquet row groups or Arrow IPC record batches
+
+    pyarrow is imported here rather than in the generator so a missing
+    package is reported before any response is started. The schema is
+    declared up front and every value is coerced to its column's type, so
+    a later batch can never fail to fit mid-stream.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError(f"{export_format.title()} export requires the pyarrow package")
+
+    column_types = column_types or {}
+    arrow_types = {
+        'string': pa.string(),
+        'integer': pa.int64(),
+        'float': pa.float64(),
+        'timestamp': pa.timestamp('us')
+    }
+    unknown = set(column_types.values()) - set(arrow_types)
+    if unknown:
+        raise ValueError(f"Unsupported export column types: {', '.join(sorted(unknown))}")
+
+    kinds = [column_types.get(name, 'string') for name in columns]
+    schema = pa.schema([pa.field(name, arrow_types[kind]) for name, kind in zip(columns, kinds)])
+    return _iter_arrow(pa, pq, rows, schema, kinds, export_format, chunk_rows)
+
+def _iter_arrow(pa, pq, rows, schema, kinds, export_format, chunk_rows):
+    sink = _ChunkSink()
+    if export_format == 'parquet':
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, chunk_rows))
+        if batch:
+            arrays = {
+                field.name: [_arrow_value(row[i], kind) for row in batch]
+                for i, (field, kind) in enumerate(zip(schema, kinds))
+            }
+            table = pa.Table.from_pydict(arrays, schema=schema)
+            if export_format == 'parquet':
+                writer.write_table(table)
+            else:
+                writer.write_table(table, max_chunksize=chunk_rows)
+
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+        if len(batch) < chunk_rows:
+            break
+
+    writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+def write_export(chunks, path):
+    """Write a chunk stream to a file; returns the number of bytes written"""
+    size = 0
+    with open(path, 'wb') as output:
+        for chunk in chunks:
+            output.write(chunk)
+            size += len(chunk)
+    return size
+
+def _arrow_value(value, kind):
+    """Coerce a cell to its declared Arrow column type (None when it cannot be)"""
+    if value is None:
+        return None
+    if kind == 'string':
+        return value if isinstance(value, str) else str(value)
+    if kind == 'timestamp':
+        return value if isinstance(value, datetime) else None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if kind == 'integer':
+        return int(number) if number.is_integer() else None
+    return number
+
+def _csv_value(value):
+    """Render a cell for CSV"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat() + 'Z'
+    return value
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that buffers writes until they are drained"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        """Return and forget everything written since the last drain"""
+        chunk = b''.join(self._chunks)
+        self._chunks = []
+        return chunk
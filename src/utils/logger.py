@@ -1,144 +1,419 @@
+import atexit
+import inspect
+import itertools
+import json
 import logging
 import logging.handlers
 import os
-from datetime import datetime
+import queue
+import random
+import reprlib
+import threading
+import time
+from datetime import datetime, timezone
 from flask import request, g
+from werkzeug.exceptions import HTTPException
 import functools
 
+# Fields set on access log records (see log_request_result)
+ACCESS_FIELDS = ('remote_addr', 'method', 'url', 'status_code', 'response_time')
+
+# Argument and body fields whose names contain one of these are never logged
+REDACTED_NAMES = ('password', 'token', 'secret', 'authorization', 'api_key')
+REDACTED = '***'
+
+# The running pipeline: one queue in front of one writer thread per process
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the writer thread without ever blocking the caller.
+    When the bounded queue is full, records below ERROR are dropped (and
+    counted); errors get a short grace period before being dropped too.
+    """
+    
+    def __init__(self, log_queue, error_timeout=0.05):
+        super().__init__(log_queue)
+        self.error_timeout = error_timeout
+        self.dropped = 0
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.ERROR:
+                try:
+                    self.queue.put(record, timeout=self.error_timeout)
+                    return
+                except queue.Full:
+                    pass
+            self.dropped += 1
+    
+    def prepare(self, record):
+        """
+        Render the message and traceback on the calling thread (arguments may
+        change after the call returns) but leave formatting to the writer
+        """
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _plain_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any access log fields included"""
+    
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.threadName
+        }
+        for field in ACCESS_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class _LoggerNameFilter(logging.Filter):
+    """Pass (or, with exclude, drop) records from one logger"""
+    
+    def __init__(self, name, exclude=False):
+        super().__init__()
+        self.logger_name = name
+        self.exclude = exclude
+    
+    def filter(self, record):
+        return (record.name == self.logger_name) != self.exclude
+
+_plain_formatter = logging.Formatter()
+
 def setup_logging(app):
     """
-    Set up comprehensive logging for the Flask application
+    Set up comprehensive logging for the Flask application.
+    Loggers only put records on a bounded queue; a single listener thread
+    formats them and does all file I/O and rotation, so request threads
+    never wait on disk.
     """
+    global _pipeline
+    
     # Create logs directory if it doesn't exist
-    logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
+    logs_dir = app.config.get('LOG_DIR') or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
     os.makedirs(logs_dir, exist_ok=True)
+    level = logging.getLevelName(str(app.config.get('LOG_LEVEL') or 'INFO').upper())
+    if not isinstance(level, int):
+        level = logging.INFO
     
-    # Configure logging format
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    # Configure logging format (text, or one JSON object per line)
+    if (app.config.get('LOG_FORMAT') or 'text').lower() == 'json':
+        formatter = access_formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        access_formatter = logging.Formatter(
+            '%(asctime)s - %(remote_addr)s - %(method)s %(url)s - %(status_code)s - %(response_time)sms'
+        )
     
-    # Set up file handlers
+    # Set up file handlers (only ever called from the listener thread)
     # General application log
-    app_log_file = os.path.join(logs_dir, 'app.log')
     app_handler = logging.handlers.RotatingFileHandler(
-        app_log_file, maxBytes=10*1024*1024, backupCount=5
+        os.path.join(logs_dir, 'app.log'), maxBytes=10*1024*1024, backupCount=5
     )
     app_handler.setFormatter(formatter)
-    app_handler.setLevel(logging.INFO)
+    app_handler.setLevel(level)
+    app_handler.addFilter(_LoggerNameFilter('access', exclude=True))
     
     # Error log
-    error_log_file = os.path.join(logs_dir, 'error.log')
     error_handler = logging.handlers.RotatingFileHandler(
-        error_log_file, maxBytes=10*1024*1024, backupCount=5
+        os.path.join(logs_dir, 'error.log'), maxBytes=10*1024*1024, backupCount=5
     )
     error_handler.setFormatter(formatter)
     error_handler.setLevel(logging.ERROR)
+    error_handler.addFilter(_LoggerNameFilter('access', exclude=True))
     
     # API access log
-    access_log_file = os.path.join(logs_dir, 'access.log')
     access_handler = logging.handlers.RotatingFileHandler(
-        access_log_file, maxBytes=10*1024*1024, backupCount=5
-    )
-    access_formatter = logging.Formatter(
-        '%(asctime)s - %(remote_addr)s - %(method)s %(url)s - %(status_code)s - %(response_time)sms'
+        os.path.join(logs_dir, 'access.log'), maxBytes=10*1024*1024, backupCount=5
     )
     access_handler.setFormatter(access_formatter)
     access_handler.setLevel(logging.INFO)
+    access_handler.addFilter(_LoggerNameFilter('access'))
     
-    # Configure Flask app logger
-    app.logger.setLevel(logging.INFO)
-    app.logger.addHandler(app_handler)
-    app.logger.addHandler(error_handler)
-    
-    # Configure root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    root_logger.addHandler(app_handler)
-    root_logger.addHandler(error_handler)
+    handlers = [app_handler, error_handler, access_handler]
     
     # Console handler for development
     if app.debug:
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
         console_handler.setLevel(logging.DEBUG)
-        app.logger.addHandler(console_handler)
-        root_logger.addHandler(console_handler)
+        console_handler.addFilter(_LoggerNameFilter('access', exclude=True))
+        handlers.append(console_handler)
+    
+    call_logging.configure(
+        hot_path=app.config.get('LOG_HOT_PATH'),
+        sample_rate=app.config.get('LOG_CALL_SAMPLE_RATE'),
+        sample_rates=app.config.get('LOG_CALL_SAMPLE_RATES'),
+        max_arg_length=app.config.get('LOG_ARG_MAX_LENGTH')
+    )
+    
+    with _pipeline_lock:
+        # Calling setup again (e.g. one app per test) replaces the pipeline rather than stacking handlers
+        _stop_pipeline()
+        
+        log_queue = queue.Queue(maxsize=int(app.config.get('LOG_QUEUE_SIZE') or 10000))
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        _pipeline = {'queue': log_queue, 'handler': queue_handler, 'listener': listener, 'handlers': handlers}
+        
+        # Configure root logger; the Flask app logger propagates to it
+        root_logger = logging.getLogger()
+        root_logger.setLevel(level)
+        root_logger.addHandler(queue_handler)
+        app.logger.setLevel(level)
+        
+        # The access log is kept out of the application logs
+        access_logger = logging.getLogger('access')
+        access_logger.setLevel(logging.INFO)
+        access_logger.propagate = False
+        access_logger.addHandler(queue_handler)
     
     # Set up request logging
     @app.before_request
     def log_request_info():
-        g.start_time = datetime.now()
-        app.logger.info(f"Request started: {request.method} {request.url} from {request.remote_addr}")
+        g.start_time = time.perf_counter()
+        if not call_logging.hot_path:
+            app.logger.info("Request started: %s %s from %s", request.method, request.url, request.remote_addr)
         
         # Only try to access JSON for requests that might have a body
-        if request.method in ['POST', 'PUT', 'PATCH'] and request.content_type == 'application/json':
-            try:
-                if request.json:
-                    app.logger.debug(f"Request body: {request.json}")
-            except Exception:
-                # Ignore JSON parsing errors for logging
-                pass
+        if app.logger.isEnabledFor(logging.DEBUG) and request.method in ['POST', 'PUT', 'PATCH'] and request.is_json:
+            # Parsed once and cached for the view; malformed bodies are the view's problem
+            body = request.get_json(silent=True)
+            if body:
+                app.logger.debug("Request body: %s", summarize(body))
     
     @app.after_request
     def log_request_result(response):
         if hasattr(g, 'start_time'):
-            response_time = (datetime.now() - g.start_time).total_seconds() * 1000
+            response_time = (time.perf_counter() - g.start_time) * 1000
             
             # Log to access log
-            access_logger = logging.getLogger('access')
-            access_logger.addHandler(access_handler)
-            access_record = logging.LogRecord(
-                name='access',
-                level=logging.INFO,
-                pathname='',
-                lineno=0,
-                msg='',
-                args=(),
-                exc_info=None
-            )
-            access_record.remote_addr = request.remote_addr
-            access_record.method = request.method
-            access_record.url = request.url
-            access_record.status_code = response.status_code
-            access_record.response_time = f"{response_time:.2f}"
-            access_handler.emit(access_record)
+            logging.getLogger('access').info('', extra={
+                'remote_addr': request.remote_addr,
+                'method': request.method,
+                'url': request.url,
+                'status_code': response.status_code,
+                'response_time': f"{response_time:.2f}"
+            })
             
-            # Log to app log
-            app.logger.info(
-                f"Request completed: {request.method} {request.url} - "
-                f"Status: {response.status_code} - Time: {response_time:.2f}ms"
-            )
+            # Log to app log (the access log already has it in hot path mode)
+            if not call_logging.hot_path:
+                app.logger.info(
+                    "Request completed: %s %s - Status: %s - Time: %.2fms",
+                    request.method, request.url, response.status_code, response_time
+                )
         
         return response
     
     # Error handler
     @app.errorhandler(Exception)
     def log_exception(error):
+        if isinstance(error, HTTPException):
+            # 404s, 405s and aborts keep their own status
+            return error
         app.logger.error(f"Unhandled exception: {str(error)}", exc_info=True)
         return {"error": "Internal server error"}, 500
     
     app.logger.info("Logging system initialized")
     return app
 
-def log_function_call(func):
+def _stop_pipeline():
+    """Flush queued records, then detach and close the current pipeline"""
+    global _pipeline
+    if _pipeline is None:
+        return
+    _pipeline['listener'].stop()
+    for name in (None, 'access'):
+        logging.getLogger(name).removeHandler(_pipeline['handler'])
+    for handler in _pipeline['handlers']:
+        handler.close()
+    _pipeline = None
+
+def shutdown_logging():
+    """Write out everything still queued and stop the writer thread"""
+    with _pipeline_lock:
+        _stop_pipeline()
+
+atexit.register(shutdown_logging)
+
+def _restart_pipeline_after_fork():
     """
-    Decorator to log function calls in controllers
+    Threads do not survive fork: give a forked worker a fresh queue and its
+    own writer thread (records the parent still had queued stay with it)
     """
+    global _pipeline_lock
+    _pipeline_lock = threading.Lock()
+    pipeline = _pipeline
+    if pipeline is None:
+        return
+    
+    log_queue = queue.Queue(maxsize=pipeline['queue'].maxsize)
+    pipeline['handler'].queue = log_queue
+    pipeline['handler'].dropped = 0
+    listener = logging.handlers.QueueListener(log_queue, *pipeline['handlers'], respect_handler_level=True)
+    listener.start()
+    pipeline.update(queue=log_queue, listener=listener)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_pipeline_after_fork)
+
+def get_logging_stats():
+    """Queue depth and dropped record count of the logging pipeline"""
+    pipeline = _pipeline
+    if pipeline is None:
+        return {'queued': 0, 'max_queue': 0, 'dropped': 0}
+    return {
+        'queued': pipeline['queue'].qsize(),
+        'max_queue': pipeline['queue'].maxsize,
+        'dropped': pipeline['handler'].dropped
+    }
+
+class _SummaryRepr(reprlib.Repr):
+    """Bounded repr: long strings, lists and dicts are cut short and secrets masked"""
+    
+    def __init__(self):
+        super().__init__()
+        self.maxlevel = 3
+        self.maxlist = self.maxtuple = self.maxset = self.maxdict = 10
+        self.maxstring = self.maxother = 120
+    
+    def repr_dict(self, x, level):
+        if not x:
+            return '{}'
+        if level <= 0:
+            return '{...}'
+        # Unlike reprlib, do not sort: only the first few keys are ever looked at
+        pieces = [
+            f"{self.repr1(key, level - 1)}: {REDACTED if is_redacted_name(key) else self.repr1(x[key], level - 1)}"
+            for key in itertools.islice(x, self.maxdict)
+        ]
+        if len(x) > self.maxdict:
+            pieces.append(f'... {len(x)} keys')
+        return '{' + ', '.join(pieces) + '}'
+
+_summary_repr = _SummaryRepr()
+
+def is_redacted_name(name):
+    name = str(name).lower()
+    return any(part in name for part in REDACTED_NAMES)
+
+def summarize(value, max_length=None):
+    """Short, redacted repr of a value for logging (never serializes large payloads)"""
+    text = _summary_repr.repr(value)
+    max_length = max_length or call_logging.max_arg_length
+    return text if len(text) <= max_length else text[:max_length] + '...'
+
+class LazyArguments:
+    """Call arguments rendered only if the log record is actually emitted"""
+    
+    __slots__ = ('names', 'args', 'kwargs')
+    
+    def __init__(self, names, args, kwargs):
+        self.names = names
+        self.args = args
+        self.kwargs = kwargs
+    
+    def __str__(self):
+        named = list(zip(self.names, self.args)) + [(f'arg{i}', arg) for i, arg in enumerate(self.args[len(self.names):], len(self.names))]
+        named += list(self.kwargs.items())
+        return ', '.join(f'{name}={REDACTED if is_redacted_name(name) else summarize(value)}' for name, value in named)
+
+class CallLogPolicy:
+    """
+    Decides which calls log_function_call and log_route write entry and exit
+    lines for. Sampling is per function (by qualified name); hot path mode
+    turns both off entirely. Errors are always logged, with arguments.
+    """
+    
+    def __init__(self):
+        self.hot_path = False
+        self.sample_rate = 1.0
+        self.sample_rates = {}
+        self.max_arg_length = 500
+    
+    def configure(self, hot_path=None, sample_rate=None, sample_rates=None, max_arg_length=None):
+        """Apply call logging configuration"""
+        if hot_path is not None:
+            self.hot_path = hot_path
+        if sample_rate is not None:
+            self.sample_rate = float(sample_rate)
+        if sample_rates:
+            if isinstance(sample_rates, str):
+                sample_rates = json.loads(sample_rates)
+            self.sample_rates = {name: float(rate) for name, rate in sample_rates.items()}
+        if max_arg_length:
+            self.max_arg_length = max_arg_length
+    
+    def sampled(self, name, hot=False, sample_rate=None):
+        """Whether to log this call's entry and exit"""
+        if self.hot_path:
+            return False
+        rate = self.sample_rates.get(name)
+        if rate is None:
+            rate = 0.0 if hot else (sample_rate if sample_rate is not None else self.sample_rate)
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+# Global call logging policy
+call_logging = CallLogPolicy()
+
+def log_function_call(func=None, *, hot=False, sample_rate=None):
+    """
+    Decorator to log function calls in controllers.
+    Use @log_function_call(hot=True) on request-path functions whose entry and
+    exit should not be logged (unless LOG_CALL_SAMPLE_RATES names them), or
+    sample_rate=0.1 to log one call in ten; failures are always logged.
+    """
+    if func is None:
+        return functools.partial(log_function_call, hot=hot, sample_rate=sample_rate)
+    
+    logger = logging.getLogger(func.__module__)
+    name = func.__qualname__
+    try:
+        arg_names = [
+            param.name for param in inspect.signature(func).parameters.values()
+            if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD)
+        ]
+    except (TypeError, ValueError):
+        arg_names = []
+    
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        logger = logging.getLogger(func.__module__)
-        logger.info(f"Calling {func.__name__} with args: {args}, kwargs: {kwargs}")
+        logged = logger.isEnabledFor(logging.INFO) and call_logging.sampled(name, hot, sample_rate)
+        if logged:
+            logger.info("Calling %s with %s", func.__name__, LazyArguments(arg_names, args, kwargs))
         
         try:
             result = func(*args, **kwargs)
-            logger.info(f"{func.__name__} completed successfully")
+            if logged:
+                logger.info("%s completed successfully", func.__name__)
             return result
         except Exception as e:
-            logger.error(f"Error in {func.__name__}: {str(e)}", exc_info=True)
+            logger.error("Error in %s(%s): %s", func.__name__, LazyArguments(arg_names, args, kwargs), e, exc_info=True)
             raise
     
-    return wrapper
+    # Imported here: services import this module at load time
+    from services.tracing import trace_function
+    return trace_function(wrapper, 'controller')
 
 def get_logger(name):
     """
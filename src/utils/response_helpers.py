@@ -95,3 +95,16 @@ def handle_exception(e):
         details=str(e) if hasattr(e, '__str__') else None,
         status_code=500
     )
+
+def too_many_requests_response(retry_after=1, message="Too many requests, please slow down"):
+    """
+    Create a rate limited error response with a Retry-After header
+    """
+    response, status_code = error_response(
+        message=message,
+        error_code="RATE_LIMITED",
+        details={"retry_after": retry_after},
+        status_code=429
+    )
+    response.headers['Retry-After'] = str(retry_after)
+    return response, status_code
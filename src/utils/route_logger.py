@@ -1,50 +1,58 @@
 import functools
+import logging
+import time
 from flask import request
-from utils.logger import get_logger
+from utils.logger import get_logger, call_logging, summarize
+from services.tracing import trace_function
 
-def log_route(func):
+def log_route(func=None, *, hot=False, sample_rate=None):
     """
-    Decorator to automatically log entry and exit for route functions
+    Decorator to automatically log entry and exit for route functions.
+    Takes the same hot and sample_rate options as log_function_call; request
+    details are only rendered when DEBUG is enabled, and errors always log.
+    Traced requests also get a span for the view.
     """
+    if func is None:
+        return functools.partial(log_route, hot=hot, sample_rate=sample_rate)
+
+    logger = get_logger(func.__module__)
+    name = func.__qualname__
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        logger = get_logger(func.__module__)
-        
-        # Extract route info
-        method = request.method
-        path = request.path
-        
-        # Log entry
-        logger.info(f"=== ENTRY: {method} {path} ===")
-        
-        # Log request parameters if any
-        if request.args:
-            logger.debug(f"Query parameters: {dict(request.args)}")
-        
-        # Only try to access JSON for requests that might have a body
-        if request.method in ['POST', 'PUT', 'PATCH'] and request.content_type == 'application/json':
-            try:
-                if request.json:
-                    logger.debug(f"Request body: {request.json}")
-            except Exception:
-                # Ignore JSON parsing errors for logging
-                pass
-        
-        # Log path parameters
-        if kwargs:
-            logger.debug(f"Path parameters: {kwargs}")
-        
+        logged = logger.isEnabledFor(logging.INFO) and call_logging.sampled(name, hot, sample_rate)
+
+        if logged:
+            started = time.perf_counter()
+            logger.info("=== ENTRY: %s %s ===", request.method, request.path)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                # Log request parameters if any
+                if request.args:
+                    logger.debug("Query parameters: %s", summarize(request.args.to_dict()))
+
+                # The body is parsed once and cached for the view; malformed bodies are the view's problem
+                if request.method in ['POST', 'PUT', 'PATCH'] and request.is_json:
+                    body = request.get_json(silent=True)
+                    if body:
+                        logger.debug("Request body: %s", summarize(body))
+
+                # Log path parameters
+                if kwargs:
+                    logger.debug("Path parameters: %s", summarize(kwargs))
+
         try:
             # Execute the route function
             result = func(*args, **kwargs)
-            
+
             # Log successful exit
-            logger.info(f"=== EXIT: {method} {path} - SUCCESS ===")
+            if logged:
+                logger.info("=== EXIT: %s %s - SUCCESS (%.2fms) ===", request.method, request.path, (time.perf_counter() - started) * 1000)
             return result
-            
+
         except Exception as e:
             # Log error exit
-            logger.error(f"=== EXIT: {method} {path} - ERROR: {str(e)} ===")
+            logger.error("=== EXIT: %s %s - ERROR: %s ===", request.method, request.path, e, exc_info=True)
             raise
-    
-    return wrapper
+
+    return trace_function(wrapper, 'route')